@@ -3,8 +3,7 @@
 from django.apps import AppConfig
 
 import core_main_app.permissions.discover as discover
-from core_main_app.components.data.models import Data
-from core_main_app.utils.databases.mongoengine_database import init_text_index
+from core_main_app.utils.search.search_backend_factory import get_search_backend
 
 
 class InitApp(AppConfig):
@@ -20,4 +19,4 @@ class InitApp(AppConfig):
         """
         discover.init_rules(self.apps)
         discover.create_public_workspace()
-        init_text_index(Data)
+        get_search_backend().init()
@@ -32,6 +32,15 @@ class ModelError(Exception):
         return repr(self.message)
 
 
+class BulkInsertError(ModelError):
+    """ Exception raised when some documents of a bulk insert are not inserted (the others are inserted)
+    """
+    def __init__(self, message, errors):
+        super(BulkInsertError, self).__init__(message)
+        # index of the document in the inserted list -> error message
+        self.errors = errors
+
+
 class RestApiError(Exception):
     """ Exception raised by the the REST Api
     """
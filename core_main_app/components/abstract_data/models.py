@@ -3,10 +3,11 @@
 from io import BytesIO
 
 from django_mongoengine import fields, Document
+from mongoengine.connection import get_db
 
 from core_main_app.commons.regex import NOT_EMPTY_OR_WHITESPACES
 from core_main_app.settings import GRIDFS_DATA_COLLECTION, SEARCHABLE_DATA_OCCURRENCES_LIMIT
-from core_main_app.utils import xml as xml_utils
+from core_main_app.utils.xml_dict import xml_to_dict
 
 
 class AbstractData(Document):
@@ -49,6 +50,46 @@ class AbstractData(Document):
         """
         self._xml_content = value
 
+    @staticmethod
+    def prefetch_xml_content(data_list):
+        """ Read the xml files of a list of data with one query on the files and one query on the chunks, and set
+        the xml content of each data. Data with an xml content already set are skipped. Files that can not be read
+        at once are read on access to the xml content.
+
+        Args:
+            data_list:
+
+        Returns:
+
+        """
+        data_list = [data for data in data_list
+                     if data._xml_content is None and data.xml_file is not None and data.xml_file.grid_id is not None]
+        if len(data_list) == 0:
+            return
+
+        xml_file = data_list[0].xml_file
+        database = get_db(xml_file.db_alias)
+        files_collection = database['{}.files'.format(xml_file.collection_name)]
+        chunks_collection = database['{}.chunks'.format(xml_file.collection_name)]
+
+        grid_ids = list(set(data.xml_file.grid_id for data in data_list))
+        file_lengths = dict((grid_file['_id'], grid_file['length'])
+                            for grid_file in files_collection.find({'_id': {'$in': grid_ids}}, {'length': 1}))
+
+        chunks_by_file = dict((grid_id, []) for grid_id in file_lengths)
+        for chunk in chunks_collection.find({'files_id': {'$in': file_lengths.keys()}},
+                                            {'files_id': 1, 'n': 1, 'data': 1}):
+            chunks_by_file[chunk['files_id']].append((chunk['n'], chunk['data']))
+
+        for data in data_list:
+            grid_id = data.xml_file.grid_id
+            if grid_id not in chunks_by_file:
+                continue
+            content = b''.join(chunk_data for n, chunk_data in sorted(chunks_by_file[grid_id]))
+            # incomplete file: let the file be read on access
+            if len(content) == file_lengths[grid_id]:
+                data._xml_content = content
+
     def convert_and_save(self):
         """ Save Data object and convert the xml to dict if needed.
 
@@ -66,15 +107,18 @@ class AbstractData(Document):
         Returns:
 
         """
-        # transform xml content into a dictionary
-        dict_content = xml_utils.raw_xml_to_dict(self.xml_content, xml_utils.post_processor)
-        # if limit on element occurrences is set
-        if SEARCHABLE_DATA_OCCURRENCES_LIMIT is not None:
-            # Remove lists which size exceed the limit size
-            xml_utils.remove_lists_from_xml_dict(dict_content,
-                                                 SEARCHABLE_DATA_OCCURRENCES_LIMIT)
-        # store dictionary
-        self.dict_content = dict_content
+        # transform xml content into a dictionary, without the lists which size exceed the limit (if set)
+        self.dict_content = xml_to_dict(self.xml_content, SEARCHABLE_DATA_OCCURRENCES_LIMIT,
+                                        self.get_searchable_paths())
+
+    def get_searchable_paths(self):
+        """ Return the paths of the xml content kept in the dict content.
+
+        Returns:
+            List of paths, None to keep the whole xml content.
+
+        """
+        return None
 
     def convert_to_file(self):
         """ Convert the xml string into a file.
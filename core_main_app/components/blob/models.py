@@ -2,7 +2,10 @@
 """
 from django_mongoengine import fields, Document
 
+from bson.objectid import ObjectId
+
 from blob_utils.blob_host_factory import BLOBHostFactory
+from blob_utils.gridfs_blob_host import GridFSBLOBHost
 from core_main_app.commons.regex import NOT_EMPTY_OR_WHITESPACES
 from core_main_app.settings import BLOB_HOST, BLOB_HOST_URI, BLOB_HOST_USER, BLOB_HOST_PASSWORD
 from core_main_app.commons import exceptions
@@ -104,6 +107,21 @@ class Blob(Document):
         """
         self._blob = value
 
+    def open_blob_file(self):
+        """ Return the blob file, to be read without loading it in memory. Only available when the blob host is GridFS.
+
+        Returns:
+            GridOut, None if the blob file can not be opened.
+
+        """
+        blob_host = Blob.blob_host()
+        if self.handle is None or not isinstance(blob_host, GridFSBLOBHost):
+            return None
+        try:
+            return blob_host.fs.get(ObjectId(self.handle))
+        except Exception:
+            return None
+
     def save_blob(self):
         """ Save blob on the blob host.
 
@@ -2,12 +2,15 @@
 """
 
 import core_main_app.permissions.rights as rights
-from core_main_app.settings import CAN_SET_PUBLIC_DATA_TO_PRIVATE, CAN_ANONYMOUS_ACCESS_PUBLIC_DATA
+from core_main_app.settings import CAN_SET_PUBLIC_DATA_TO_PRIVATE, CAN_ANONYMOUS_ACCESS_PUBLIC_DATA, \
+    VERIFY_DATA_QUERY_RESULTS, USE_ACCESS_PRINCIPALS
 from core_main_app.components.workspace import api as workspace_api
+from core_main_app.components.workspace.access_context import get_access_context
 from core_main_app.permissions import api as permissions_api
+from core_main_app.permissions import principals
 from core_main_app.utils.access_control.exceptions import AccessControlError
 from core_main_app.utils.raw_query.mongo_raw_query import add_access_criteria, \
-    add_aggregate_access_criteria
+    add_aggregate_access_criteria, add_principals_access_criteria, add_aggregate_principals_access_criteria
 
 
 def has_perm_publish_data(user):
@@ -103,8 +106,7 @@ def _check_can_write_workspace(workspace, user):
     Returns:
 
     """
-    accessible_workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(user)
-    if workspace not in accessible_workspaces:
+    if not get_access_context(user).can_write(workspace):
         raise AccessControlError("The user does not have the permission to write into this workspace.")
 
 
@@ -118,9 +120,7 @@ def _check_can_read_or_write_workspace(workspace, user):
     Returns:
 
     """
-    accessible_write_workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(user)
-    accessible_read_workspaces = workspace_api.get_all_workspaces_with_read_access_by_user(user)
-    if workspace not in list(accessible_write_workspaces) + list(accessible_read_workspaces):
+    if not get_access_context(user).can_read_or_write(workspace):
         raise AccessControlError("The user does not have the permission to write into this workspace.")
 
 
@@ -181,6 +181,25 @@ def can_write_data(func, data, user):
     return func(data, user)
 
 
+def can_write_data_list(func, data_list, user):
+    """ Can write each data of the list.
+
+    Args:
+        func:
+        data_list:
+        user:
+
+    Returns:
+
+    """
+    if user.is_superuser:
+        return func(data_list, user)
+
+    for data in data_list:
+        check_can_write_data(data, user)
+    return func(data_list, user)
+
+
 def can_read_data(func, data, user):
     """ Can read data.
 
@@ -199,7 +218,7 @@ def can_read_data(func, data, user):
     return func(data, user)
 
 
-def can_read_data_query(func, query, user, order_by_field=None):
+def can_read_data_query(func, query, user, order_by_field=None, fields=None):
     """ Can read a data, given a query.
 
     Args:
@@ -207,20 +226,51 @@ def can_read_data_query(func, query, user, order_by_field=None):
         query:
         user:
         order_by_field
+        fields
 
     Returns:
 
     """
     if user.is_superuser:
-        return func(query, user, order_by_field)
+        return func(query, user, order_by_field, fields)
 
     # update the query
     query = _update_can_read_query(query, user)
     # get list of data
-    data_list = func(query, user, order_by_field)
-    # TODO: check if necessary because it is time consuming (checking that user has access to list of returned data)
-    # check that user can access the list of data
-    _check_can_read_data_list(data_list, user)
+    data_list = func(query, user, order_by_field, fields)
+    # the access criteria of the query only return accessible data: the list is not checked unless required, so
+    # the results can be paginated without loading them all
+    if VERIFY_DATA_QUERY_RESULTS:
+        # check that user can access the list of data
+        _check_can_read_data_list(data_list, user)
+    return data_list
+
+
+def can_read_data_text_query(func, query, text, mode, user, fields=None, limit=None):
+    """ Can read a data, given a query and a full text search.
+
+    Args:
+        func:
+        query:
+        text:
+        mode:
+        user:
+        fields:
+        limit:
+
+    Returns:
+
+    """
+    if user.is_superuser:
+        return func(query, text, mode, user, fields, limit)
+
+    # update the query
+    query = _update_can_read_query(query, user)
+    # get list of data
+    data_list = func(query, text, mode, user, fields, limit)
+    if VERIFY_DATA_QUERY_RESULTS:
+        # check that user can access the list of data
+        _check_can_read_data_list(data_list, user)
     return data_list
 
 
@@ -300,10 +350,8 @@ def check_can_write_data(data, user):
     """
     if data.user_id != str(user.id):
         if hasattr(data, 'workspace') and data.workspace is not None:
-            # get list of accessible workspaces
-            accessible_workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(user)
-            # check that accessed data belongs to an accessible workspace
-            if data.workspace not in accessible_workspaces:
+            # check that accessed data belongs to a workspace with write access
+            if not get_access_context(user).can_write(data.workspace):
                 raise AccessControlError("The user doesn't have enough rights to access this data.")
         # workspace is not set
         else:
@@ -324,10 +372,8 @@ def _check_can_read_data(data, user):
     if data.user_id != str(user.id):
         # workspace is set
         if hasattr(data, 'workspace') and data.workspace is not None:
-            # get list of accessible workspaces
-            accessible_workspaces = workspace_api.get_all_workspaces_with_read_access_by_user(user)
-            # check that accessed data belongs to an accessible workspace
-            if data.workspace not in accessible_workspaces:
+            # check that accessed data belongs to a workspace with read access
+            if not get_access_context(user).can_read(data.workspace):
                 raise AccessControlError("The user doesn't have enough rights to access this data.")
         # workspace is not set
         else:
@@ -345,15 +391,15 @@ def _check_can_read_data_list(data_list, user):
 
     """
     if len(data_list) > 0:
-        # get list of accessible workspaces
-        accessible_workspaces = workspace_api.get_all_workspaces_with_read_access_by_user(user)
+        access_context = get_access_context(user)
+        user_id = str(user.id)
         # check access is correct
         for data in data_list:
             # user is data owner
-            if data.user_id == str(user.id):
+            if data.user_id == user_id:
                 continue
             # user is not owner or data not in accessible workspace
-            if data.workspace is None or data.workspace not in accessible_workspaces:
+            if data.workspace is None or not access_context.can_read(data.workspace):
                 raise AccessControlError("The user doesn't have enough rights to access this data.")
 
 
@@ -368,6 +414,10 @@ def _update_can_read_query(query, user):
 
     """
 
+    if USE_ACCESS_PRINCIPALS:
+        # single query on the principals stored on the data
+        return add_principals_access_criteria(query, _get_read_principals_by_user(user), user)
+
     accessible_workspaces = _get_read_accessible_workspaces_by_user(user)
     # update query with workspace criteria
     query = add_access_criteria(query, accessible_workspaces, user)
@@ -385,6 +435,10 @@ def _update_can_read_aggregate_query(query, user):
 
     """
 
+    if USE_ACCESS_PRINCIPALS:
+        # single query on the principals stored on the data
+        return add_aggregate_principals_access_criteria(query, _get_read_principals_by_user(user), user)
+
     accessible_workspaces = _get_read_accessible_workspaces_by_user(user)
     # update query with workspace criteria
     query = add_aggregate_access_criteria(query, accessible_workspaces, user)
@@ -405,7 +459,20 @@ def _get_read_accessible_workspaces_by_user(user):
     else:
         # workspace case
         # list accessible workspaces
-        accessible_workspaces = [workspace.id for workspace in
-                                 workspace_api.get_all_workspaces_with_read_access_by_user(user)]
+        accessible_workspaces = list(get_access_context(user).read_workspace_ids)
 
     return accessible_workspaces
+
+
+def _get_read_principals_by_user(user):
+    """ Get the principals used to read the data.
+
+    Args:
+        user:
+
+    Returns:
+
+    """
+    if not CAN_ANONYMOUS_ACCESS_PUBLIC_DATA and user.is_anonymous:
+        return []
+    return principals.get_principals_by_user(user)
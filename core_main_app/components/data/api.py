@@ -1,18 +1,32 @@
 """ Data API
 """
 import datetime
+from collections import OrderedDict
 
 from xml_utils.xsd_tree.xsd_tree import XSDTree
 
 from core_main_app.components.data.models import Data
-from core_main_app.utils.xml import validate_xml_data
+from core_main_app.settings import XERCES_VALIDATION
+from core_main_app.utils import data_query_cache, xsd_schema_cache
+from core_main_app.utils.search.search_backend_factory import get_search_backend
+from core_main_app.utils.xml import validate_xml_data, validate_xml_data_many
 from core_main_app.commons import exceptions as exceptions
 from core_main_app.utils.access_control.decorators import access_control
 from core_main_app.components.data.access_control import can_read_data_id, can_read_user, can_write_data, \
     can_read_data_query, can_change_owner, can_read_list_data_id, can_write_data_workspace,\
-    can_read_or_write_data_workspace, has_perm_administration, can_read_aggregate_query
+    can_read_or_write_data_workspace, has_perm_administration, can_read_aggregate_query, can_write_data_list, \
+    can_read_data_text_query
 from core_main_app.components.workspace import api as workspace_api
 
+BULK_STATUS_CREATED = 'created'
+BULK_STATUS_UPDATED = 'updated'
+BULK_STATUS_ERROR = 'error'
+
+# data fields stored under another name
+_PROJECTION_FIELD_NAMES = {'xml_content': 'xml_file'}
+# data fields always loaded, needed by the access control
+_PROJECTION_REQUIRED_FIELDS = ['user_id', 'workspace']
+
 
 @access_control(can_write_data_workspace)
 def assign(data, workspace, user):
@@ -27,7 +41,9 @@ def assign(data, workspace, user):
 
     """
     data.workspace = workspace
-    return data.save()
+    saved_data = data.save()
+    _invalidate_query_cache([data])
+    return saved_data
 
 
 @access_control(can_read_or_write_data_workspace)
@@ -82,23 +98,25 @@ def get_all(user, order_by_field=None):
     return Data.get_all(order_by_field)
 
 
-def get_all_accessible_by_user(user):
-    """ Return all data accessible by a user.
+def get_all_accessible_by_user(user, order_by_field=None):
+    """ Return all data accessible by a user: data owned by the user or in a workspace readable or writable by the
+    user. The data are read with a single query, when the returned queryset is evaluated.
 
         Parameters:
             user:
+            order_by_field: Order by field.
 
         Returns: data collection
     """
+    if workspace_api.can_access_all_workspaces(user):
+        # all the workspaces are accessible: do not list them
+        return Data.get_all_by_user_id_or_list_workspace(user.id, None, order_by_field)
 
-    read_workspaces = workspace_api.get_all_workspaces_with_read_access_by_user(user)
-    write_workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(user)
-    user_accessible_workspaces = list(set().union(read_workspaces, write_workspaces))
-
-    accessible_data = Data.get_all_by_list_workspace(user_accessible_workspaces)
-    owned_data = get_all_by_user(user)
-
-    return list(set().union(owned_data, accessible_data))
+    accessible_workspace_ids = set(workspace.id for workspace in
+                                   workspace_api.get_all_workspaces_with_read_access_by_user(user))
+    accessible_workspace_ids.update(workspace.id for workspace in
+                                    workspace_api.get_all_workspaces_with_write_access_by_user(user))
+    return Data.get_all_by_user_id_or_list_workspace(user.id, list(accessible_workspace_ids), order_by_field)
 
 
 def get_all_by_user(user, order_by_field=None):
@@ -141,7 +159,185 @@ def upsert(data, user):
 
     data.last_modification_date = datetime.datetime.now()
     check_xml_file_is_valid(data)
-    return data.convert_and_save()
+    saved_data = data.convert_and_save()
+    get_search_backend().index_data([data])
+    _invalidate_query_cache([data])
+    return saved_data
+
+
+@access_control(can_write_data_list)
+def bulk_upsert(data_list, user):
+    """ Save or update a list of data. Data are grouped by template so each schema is compiled once, and new data
+    are inserted in a single database call.
+
+    Args:
+        data_list:
+        user:
+
+    Returns:
+        List of status, one per data in the order of the list (index, title, status, id, message).
+
+    """
+    report = [{'index': index, 'title': data.title, 'status': BULK_STATUS_CREATED, 'id': None, 'message': None}
+              for index, data in enumerate(data_list)]
+    new_data_list = []
+
+    for template, indexed_data_list in _group_data_by_template(data_list).values():
+        # validate the xml of all the data of the template
+        errors = _validate_data_list(template, [data for index, data in indexed_data_list])
+
+        for (index, data), error in zip(indexed_data_list, errors):
+            if error is not None:
+                _set_bulk_error(report[index], error)
+                continue
+
+            try:
+                data.last_modification_date = datetime.datetime.now()
+                if data.id is None:
+                    _prepare_data_for_insert(data)
+                    new_data_list.append((index, data))
+                else:
+                    data.convert_and_save()
+                    report[index]['status'] = BULK_STATUS_UPDATED
+                    report[index]['id'] = str(data.id)
+            except Exception as e:
+                _set_bulk_error(report[index], e.message)
+
+    if len(new_data_list) > 0:
+        # position of the data in the inserted list -> error message
+        insert_errors = {}
+        try:
+            inserted_ids = Data.insert_many([data for index, data in new_data_list])
+        except exceptions.BulkInsertError as e:
+            # the other data are inserted
+            inserted_ids = [data.pk for index, data in new_data_list]
+            insert_errors = e.errors
+        except Exception as e:
+            inserted_ids = [None] * len(new_data_list)
+            insert_errors = dict.fromkeys(range(len(new_data_list)), e.message)
+
+        for position, ((index, data), inserted_id) in enumerate(zip(new_data_list, inserted_ids)):
+            if position in insert_errors:
+                data.pk = None
+                data.xml_file.delete()
+                _set_bulk_error(report[index], "Unable to save data: {}".format(insert_errors[position]))
+            else:
+                data.pk = inserted_id
+                report[index]['id'] = str(inserted_id)
+
+    get_search_backend().index_data([data for data, status in zip(data_list, report)
+                                     if status['status'] != BULK_STATUS_ERROR])
+    _invalidate_query_cache(data_list)
+    return report
+
+
+def _invalidate_query_cache(data_list):
+    """ Invalidate the cached query results of the templates of the data.
+
+    Args:
+        data_list:
+
+    Returns:
+
+    """
+    data_query_cache.invalidate([data.template.id for data in data_list if data.template is not None])
+
+
+def _group_data_by_template(data_list):
+    """ Group a list of data by template, keeping their index in the list.
+
+    Args:
+        data_list:
+
+    Returns:
+        OrderedDict: template key -> (template, list of (index, data))
+
+    """
+    data_by_template = OrderedDict()
+    for index, data in enumerate(data_list):
+        template = data.template
+        template_key = template.id if template is not None and template.id is not None else id(template)
+        if template_key not in data_by_template:
+            data_by_template[template_key] = (template, [])
+        data_by_template[template_key][1].append((index, data))
+    return data_by_template
+
+
+def _validate_data_list(template, data_list):
+    """ Validate the xml content of a list of data against the same template.
+
+    Args:
+        template:
+        data_list:
+
+    Returns:
+        List of errors, in the order of the list (None if no errors, string otherwise).
+
+    """
+    errors = [None] * len(data_list)
+    xml_strings = []
+    xml_strings_index = []
+    for index, data in enumerate(data_list):
+        if data.xml_content is None:
+            errors[index] = "Unable to save data: xml_content field is not set."
+        else:
+            xml_strings.append(data.xml_content)
+            xml_strings_index.append(index)
+
+    if len(xml_strings) > 0:
+        try:
+            if XERCES_VALIDATION:
+                xsd_tree = XSDTree.build_tree(template.content)
+                compiled_schema = None
+            else:
+                # get the compiled schema from the cache
+                compiled_schema = xsd_schema_cache.get_xml_schema(template)
+                xsd_tree = compiled_schema.xsd_tree
+        except Exception as e:
+            xml_errors = ["Unable to read the template: {}".format(e.message)] * len(xml_strings)
+        else:
+            try:
+                xml_errors = validate_xml_data_many(xsd_tree, xml_strings, compiled_schema)
+            except Exception as e:
+                xml_errors = ["Unable to validate the data: {}".format(e.message)] * len(xml_strings)
+
+        for index, error in zip(xml_strings_index, xml_errors):
+            errors[index] = error
+
+    return errors
+
+
+def _prepare_data_for_insert(data):
+    """ Convert a new data to dict and save its xml file, before inserting it.
+
+    Args:
+        data:
+
+    Returns:
+
+    """
+    data.convert_to_dict()
+    data.convert_to_file()
+    try:
+        data.validate()
+    except Exception:
+        # the data will not be inserted, remove its file
+        data.xml_file.delete()
+        raise
+
+
+def _set_bulk_error(status, message):
+    """ Set the error of a bulk upsert status.
+
+    Args:
+        status:
+        message:
+
+    Returns:
+
+    """
+    status['status'] = BULK_STATUS_ERROR
+    status['message'] = message
 
 
 def check_xml_file_is_valid(data):
@@ -160,31 +356,126 @@ def check_xml_file_is_valid(data):
     except Exception as e:
         raise exceptions.XMLError(e.message)
 
-    try:
-        xsd_tree = XSDTree.build_tree(template.content)
-    except Exception as e:
-        raise exceptions.XSDError(e.message)
+    if XERCES_VALIDATION:
+        try:
+            xsd_tree = XSDTree.build_tree(template.content)
+        except Exception as e:
+            raise exceptions.XSDError(e.message)
+
+        error = validate_xml_data(xsd_tree, xml_tree)
+    else:
+        # get the compiled schema from the cache
+        try:
+            xml_schema = xsd_schema_cache.get_xml_schema(template)
+        except exceptions.XSDError:
+            raise
+        except Exception as e:
+            raise exceptions.XMLError(e.message)
+
+        error = xml_schema.validate(xml_tree)
 
-    error = validate_xml_data(xsd_tree, xml_tree)
     if error is not None:
         raise exceptions.XMLError(error)
     else:
         return True
 
 
+def rebuild_dict_content(template_list=None):
+    """ Convert again the xml content of the data into their dict content, after a change of the searchable paths of
+    their template. Only the dict content of the data is saved.
+
+    Args:
+        template_list: Templates of the data to rebuild (all data if None).
+
+    Returns:
+        Number of data rebuilt, list of errors (data id, message).
+
+    """
+    data_list = Data.get_all() if template_list is None else Data.get_all_by_list_template(template_list)
+
+    rebuilt_count = 0
+    errors = []
+    for data in data_list.no_cache():
+        try:
+            data.convert_to_dict()
+            data.save_dict_content()
+            get_search_backend().index_data([data])
+            rebuilt_count += 1
+        except Exception as e:
+            errors.append((str(data.id), e.message))
+
+    if template_list is None:
+        # the data of all the templates changed
+        data_query_cache.invalidate_all()
+    else:
+        data_query_cache.invalidate([template.id for template in template_list])
+    return rebuilt_count, errors
+
+
 @access_control(can_read_data_query)
-def execute_query(query, user, order_by_field=None):
+def execute_query(query, user, order_by_field=None, fields=None):
     """Execute a query on the Data collection.
 
     Args:
         query:
         user:
         order_by_field
+        fields: List of data fields to load (all fields if None).
 
     Returns:
 
     """
-    return Data.execute_query(query, order_by_field)
+    return Data.execute_query(query, order_by_field, get_projection(fields))
+
+
+@access_control(can_read_data_text_query)
+def execute_text_query(query, text, mode, user, fields=None, limit=None):
+    """Execute a query and a keyword search with the search backend, the most relevant data first.
+
+    Args:
+        query:
+        text: Keywords.
+        mode: all, any or phrase.
+        user:
+        fields: List of data fields to load (all fields if None).
+        limit: Maximum number of data returned (all data if None).
+
+    Returns:
+
+    """
+    return get_search_backend().execute_text_query(query, text, mode, get_projection(fields), limit)
+
+
+def rebuild_search_index():
+    """ Build the index of the search backend again from all the data.
+
+    Returns:
+        Number of data indexed.
+
+    """
+    return get_search_backend().rebuild(Data.get_all().no_cache())
+
+
+def get_projection(fields):
+    """ Return the database fields to load to get the given data fields. The xml content is read from its file
+    only when requested, and the dict content is not loaded unless requested.
+
+    Args:
+        fields: List of data fields (None for all fields).
+
+    Returns:
+        List of database fields (None for all fields).
+
+    """
+    if fields is None:
+        return None
+
+    projection = list(_PROJECTION_REQUIRED_FIELDS)
+    for field in fields:
+        field = _PROJECTION_FIELD_NAMES.get(field, field)
+        if field not in projection:
+            projection.append(field)
+    return projection
 
 
 @access_control(can_write_data)
@@ -199,6 +490,8 @@ def delete(data, user):
 
     """
     data.delete()
+    get_search_backend().delete_data([data])
+    _invalidate_query_cache([data])
 
 
 @access_control(can_change_owner)
@@ -215,6 +508,7 @@ def change_owner(data, new_user, user):
     # FIXME: user can transfer data to anybody, too permissive
     data.user_id = str(new_user.id)
     data.save()
+    _invalidate_query_cache([data])
 
 
 def is_data_public(data):
@@ -1,8 +1,11 @@
 """ Data model
 """
 
+from bson.objectid import ObjectId
 from django_mongoengine import fields
 from mongoengine import errors as mongoengine_errors
+from mongoengine.queryset.visitor import Q
+from pymongo.errors import BulkWriteError
 from mongoengine.queryset.base import NULLIFY
 
 from core_main_app.commons import exceptions
@@ -21,6 +24,53 @@ class Data(AbstractData):
     template = fields.ReferenceField(Template, blank=False)
     user_id = fields.StringField()
     workspace = fields.ReferenceField(Workspace, reverse_delete_rule=NULLIFY, blank=True)
+    # read principals of the workspace, maintained when the rights of the workspace change
+    read_principals = fields.ListField(fields.StringField(), blank=True)
+
+    meta = {
+        'indexes': [
+            # one index per clause of the access criteria ($or on workspace and user_id), sorted by date
+            ('workspace', '-last_modification_date'),
+            ('user_id', '-last_modification_date'),
+            ('read_principals', '-last_modification_date'),
+            'template',
+            '-last_modification_date',
+        ],
+        'index_background': True,
+    }
+
+    def save(self, *args, **kwargs):
+        """ Save the data, with the read principals of its workspace. The read principals are read when the data is
+        created or moved to another workspace: otherwise, they are maintained when the rights of the workspace change.
+
+        Returns:
+
+        """
+        if self._created or 'workspace' in self._changed_fields:
+            self.read_principals = _get_read_principals(self.workspace)
+        return super(Data, self).save(*args, **kwargs)
+
+    def get_searchable_paths(self):
+        """ Return the paths of the xml content kept in the dict content, set on the template.
+
+        Returns:
+            List of paths, None to keep the whole xml content.
+
+        """
+        if self.template is not None and self.template.searchable_paths:
+            return self.template.searchable_paths
+        return None
+
+    def save_dict_content(self):
+        """ Save the dict content of the data, without saving its xml file.
+
+        Returns:
+
+        """
+        try:
+            Data.objects(pk=self.pk).update_one(set__dict_content=self.dict_content)
+        except mongoengine_errors.OperationError as e:
+            raise exceptions.ModelError(e.message)
 
     @staticmethod
     def get_all(order_by_field=None):
@@ -47,6 +97,24 @@ class Data(AbstractData):
         """
         return Data.objects(user_id=str(user_id)).order_by(order_by_field)
 
+    @staticmethod
+    def get_all_by_user_id_or_list_workspace(user_id, list_workspace, order_by_field=None):
+        """ Get all data owned by the given user id or that belong to the list of workspace, in a single query.
+
+        Args:
+            user_id:
+            list_workspace: List of workspaces or workspace ids (any workspace if None).
+            order_by_field: Order by field.
+
+        Returns:
+
+        """
+        if list_workspace is None:
+            workspace_criteria = Q(workspace__exists=True, workspace__ne=None)
+        else:
+            workspace_criteria = Q(workspace__in=list_workspace)
+        return Data.objects(Q(user_id=str(user_id)) | workspace_criteria).order_by(order_by_field)
+
     @staticmethod
     def get_all_except_user_id(user_id):
         """ Get all data non relative to the given user id
@@ -90,17 +158,41 @@ class Data(AbstractData):
             raise exceptions.ModelError(ex.message)
 
     @staticmethod
-    def execute_query(query, order_by_field=None):
+    def execute_query(query, order_by_field=None, projection=None):
         """Execute a query.
 
         Args:
             query:
             order_by_field: Order by field.
+            projection: List of fields to load (all fields if None).
+
+        Returns:
+
+        """
+        queryset = Data.objects(__raw__=query).order_by(order_by_field)
+        if projection is not None:
+            queryset = queryset.only(*projection)
+        return queryset
+
+    @staticmethod
+    def execute_text_query(query, text, projection=None, limit=None):
+        """Execute a query and a full text search, sorted by relevance (text score). Requires a text index.
+
+        Args:
+            query:
+            text: Search string of the full text query.
+            projection: List of fields to load (all fields if None).
+            limit: Maximum number of results (all results if None).
 
         Returns:
 
         """
-        return Data.objects(__raw__=query).order_by(order_by_field)
+        queryset = Data.objects(__raw__=query).search_text(text).order_by('$text_score')
+        if projection is not None:
+            queryset = queryset.only(*projection)
+        if limit is not None:
+            queryset = queryset.limit(limit)
+        return queryset
 
     @staticmethod
     def get_all_by_workspace(workspace):
@@ -138,6 +230,69 @@ class Data(AbstractData):
         """
         return Data.objects(template__in=list_template).all()
 
+    @staticmethod
+    def insert_many(data_list):
+        """ Insert a list of new data in a single database call. The insertion is not ordered: a data that can not be
+        inserted does not stop the insertion of the others.
+
+        Args:
+            data_list:
+
+        Returns:
+            List of inserted ids.
+
+        Raises:
+            BulkInsertError: Some data are not inserted, the others are inserted.
+
+        """
+        read_principals_by_workspace = {}
+        documents = []
+        for data in data_list:
+            workspace_id = data.workspace.pk if data.workspace is not None else None
+            if workspace_id not in read_principals_by_workspace:
+                read_principals_by_workspace[workspace_id] = _get_read_principals(data.workspace)
+            data.read_principals = read_principals_by_workspace[workspace_id]
+            if data.pk is None:
+                # id set before the insertion, to know the ids of the inserted data when some insertions fail
+                data.pk = ObjectId()
+            documents.append(data.to_mongo())
+
+        try:
+            Data._get_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            errors = {write_error['index']: write_error['errmsg'] for write_error in e.details['writeErrors']}
+            raise exceptions.BulkInsertError("Unable to insert {} data.".format(len(errors)), errors)
+        return [data.pk for data in data_list]
+
+    @staticmethod
+    def set_read_principals_by_workspace(workspace, read_principals):
+        """ Set the read principals of the data of a workspace.
+
+        Args:
+            workspace:
+            read_principals:
+
+        Returns:
+
+        """
+        try:
+            Data.objects(workspace=workspace).update(set__read_principals=read_principals)
+        except mongoengine_errors.OperationError as e:
+            raise exceptions.ModelError(e.message)
+
+    @staticmethod
+    def clear_read_principals_without_workspace():
+        """ Remove the read principals of the data without workspace.
+
+        Returns:
+            Number of data updated.
+
+        """
+        try:
+            return Data.objects(workspace=None, read_principals__ne=[]).update(set__read_principals=[])
+        except mongoengine_errors.OperationError as e:
+            raise exceptions.ModelError(e.message)
+
     @staticmethod
     def aggregate(pipeline):
         """Execute an aggregate on the Data collection.
@@ -149,3 +304,19 @@ class Data(AbstractData):
 
         """
         return Data.objects.aggregate(*pipeline)
+
+
+def _get_read_principals(workspace):
+    """ Get the read principals of the data of a workspace.
+
+    Args:
+        workspace: Workspace or None.
+
+    Returns:
+
+    """
+    if workspace is None:
+        return []
+    # read from the database: the workspace object of the data may be older than the last change of its rights
+    read_principals = Workspace.objects(pk=workspace.pk).scalar('read_principals').first()
+    return list(read_principals or [])
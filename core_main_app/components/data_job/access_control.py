@@ -0,0 +1,20 @@
+""" Set of functions to define the rules for access control
+"""
+from core_main_app.utils.access_control.exceptions import AccessControlError
+
+
+def can_read_data_job(func, data_job_id, user):
+    """ Can read a data job: only its owner or a superuser.
+
+    Args:
+        func:
+        data_job_id:
+        user:
+
+    Returns:
+
+    """
+    data_job = func(data_job_id, user)
+    if user.is_superuser or data_job.user_id == str(user.id):
+        return data_job
+    raise AccessControlError("The user doesn't have enough rights to access this job.")
@@ -0,0 +1,187 @@
+""" Data job API
+"""
+import datetime
+from collections import OrderedDict
+from logging import getLogger
+
+import core_main_app.components.data_job.tasks as tasks
+from core_main_app.commons import exceptions
+from core_main_app.components.data import api as data_api
+from core_main_app.components.data.models import Data
+from core_main_app.components.data_job.access_control import can_read_data_job
+from core_main_app.components.data_job.models import DataJob, STATUS_DONE, STATUS_ERROR
+from core_main_app.components.user import api as user_api
+from core_main_app.settings import DATA_INGESTION_BATCH_SIZE, DATA_INGESTION_BATCH_DELAY, DATA_INGESTION_JOB_TIMEOUT
+from core_main_app.utils.access_control.decorators import access_control
+
+logger = getLogger(__name__)
+
+
+def create(template, title, xml_content, user):
+    """ Create a job saving a data in the background. The data is validated and saved with the other data of the
+    template received during the batch delay.
+
+    Args:
+        template:
+        title:
+        xml_content:
+        user: Owner of the data.
+
+    Returns:
+        DataJob.
+
+    """
+    if xml_content is None:
+        raise exceptions.ApiError("Unable to save data: xml_content field is not set.")
+
+    data_job = DataJob(template=template, title=title, user_id=str(user.id))
+    data_job.xml_content = xml_content
+    data_job.convert_to_file()
+    data_job.save()
+
+    try:
+        # the first task started after the delay processes all the jobs received for the template meanwhile
+        tasks.process_data_jobs.apply_async((str(template.id),), countdown=DATA_INGESTION_BATCH_DELAY)
+    except Exception as e:
+        # the job would never be processed
+        logger.error("Unable to enqueue data job {0}: {1}".format(str(data_job.id), e.message))
+        _delete(data_job)
+        raise exceptions.ApiError("Unable to start the background saving of the data.")
+    return data_job
+
+
+@access_control(can_read_data_job)
+def get_by_id(data_job_id, user):
+    """ Return the data job with the given id.
+
+    Args:
+        data_job_id:
+        user:
+
+    Returns:
+
+    """
+    return DataJob.get_by_id(data_job_id)
+
+
+def process_pending_jobs(template_id, batch_size=DATA_INGESTION_BATCH_SIZE):
+    """ Validate and save the data of the pending jobs of a template, by batches.
+
+    Args:
+        template_id:
+        batch_size:
+
+    Returns:
+        Number of jobs processed.
+
+    """
+    processed_count = 0
+    while True:
+        data_jobs = DataJob.claim_pending_jobs(template_id, batch_size, _get_stale_claim_date())
+        if len(data_jobs) == 0:
+            return processed_count
+        _process_batch(data_jobs)
+        processed_count += len(data_jobs)
+
+
+def resume_unprocessed_jobs():
+    """ Enqueue a task for each template with jobs left unprocessed: pending jobs whose task did not start, and running
+    jobs whose worker stopped during the batch.
+
+    Returns:
+        Number of tasks enqueued.
+
+    """
+    now = datetime.datetime.utcnow()
+    # pending jobs are processed by the task started after the batch delay
+    pending_date = now - datetime.timedelta(seconds=DATA_INGESTION_BATCH_DELAY + DATA_INGESTION_JOB_TIMEOUT)
+    template_ids = DataJob.get_template_ids_of_unprocessed_jobs(pending_date, _get_stale_claim_date())
+    for template_id in template_ids:
+        tasks.process_data_jobs.apply_async((str(template_id),))
+    return len(template_ids)
+
+
+def _get_stale_claim_date():
+    """ Get the date before which running jobs are considered stopped.
+
+    Returns:
+
+    """
+    return datetime.datetime.utcnow() - datetime.timedelta(seconds=DATA_INGESTION_JOB_TIMEOUT)
+
+
+def _process_batch(data_jobs):
+    """ Validate and save the data of a batch of jobs, with one bulk upsert per owner.
+
+    Args:
+        data_jobs:
+
+    Returns:
+
+    """
+    data_jobs_by_user_id = OrderedDict()
+    for data_job in data_jobs:
+        data_jobs_by_user_id.setdefault(data_job.user_id, []).append(data_job)
+
+    for user_id, user_data_jobs in data_jobs_by_user_id.items():
+        try:
+            user = user_api.get_user_by_id(user_id)
+            data_list = [_get_data(data_job) for data_job in user_data_jobs]
+            report = data_api.bulk_upsert(data_list, user)
+        except Exception as e:
+            logger.error("Unable to process the data jobs of user {0}: {1}".format(user_id, e.message))
+            report = [{'status': data_api.BULK_STATUS_ERROR, 'id': None, 'message': e.message}] * len(user_data_jobs)
+
+        for data_job, status in zip(user_data_jobs, report):
+            _complete(data_job, status)
+
+
+def _get_data(data_job):
+    """ Build the data of a job.
+
+    Args:
+        data_job:
+
+    Returns:
+
+    """
+    data = Data(template=data_job.template, title=data_job.title, user_id=data_job.user_id)
+    data.xml_content = data_job.xml_content
+    return data
+
+
+def _complete(data_job, status):
+    """ Save the result of a job, and delete its xml file.
+
+    Args:
+        data_job:
+        status: Bulk upsert status of the data of the job.
+
+    Returns:
+
+    """
+    data_job.status = STATUS_ERROR if status['status'] == data_api.BULK_STATUS_ERROR else STATUS_DONE
+    data_job.data_id = status['id']
+    data_job.message = status['message']
+    data_job.completion_date = datetime.datetime.utcnow()
+    try:
+        data_job.delete_xml_file()
+    except Exception as e:
+        logger.warning("Unable to delete the xml file of data job {0}: {1}".format(str(data_job.id), e.message))
+    data_job.save()
+
+
+def _delete(data_job):
+    """ Delete a job and its xml file.
+
+    Args:
+        data_job:
+
+    Returns:
+
+    """
+    try:
+        data_job.delete_xml_file()
+    except Exception as e:
+        logger.warning("Unable to delete the xml file of data job {0}: {1}".format(str(data_job.id), e.message))
+    data_job.delete()
@@ -0,0 +1,171 @@
+""" Data job model: data waiting to be validated and saved by a background task.
+"""
+import datetime
+from io import BytesIO
+
+from bson.objectid import ObjectId
+from django_mongoengine import fields, Document
+from mongoengine import errors as mongoengine_errors
+from mongoengine.queryset.visitor import Q
+
+from core_main_app.commons import exceptions
+from core_main_app.commons.regex import NOT_EMPTY_OR_WHITESPACES
+from core_main_app.components.template.models import Template
+from core_main_app.settings import GRIDFS_DATA_COLLECTION
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_ERROR = 'error'
+
+
+class DataJob(Document):
+    """ Data job object
+    """
+    template = fields.ReferenceField(Template, blank=False)
+    title = fields.StringField(blank=False, regex=NOT_EMPTY_OR_WHITESPACES)
+    user_id = fields.StringField(blank=False)
+    # xml content, stored with the data files until the data is saved
+    xml_file = fields.FileField(blank=True, collection_name=GRIDFS_DATA_COLLECTION)
+    status = fields.StringField(default=STATUS_PENDING,
+                                choices=(STATUS_PENDING, STATUS_RUNNING, STATUS_DONE, STATUS_ERROR))
+    # id of the batch of jobs processed together
+    batch_id = fields.StringField(blank=True)
+    # date the job was claimed by a batch, to claim again the jobs of a worker that stopped
+    claim_date = fields.DateTimeField(blank=True)
+    data_id = fields.StringField(blank=True)
+    message = fields.StringField(blank=True)
+    creation_date = fields.DateTimeField(default=datetime.datetime.utcnow)
+    completion_date = fields.DateTimeField(blank=True)
+
+    meta = {
+        'indexes': [
+            ('template', 'status'),
+            ('status', 'claim_date'),
+            'batch_id',
+        ],
+        'index_background': True,
+    }
+
+    _xml_content = None
+
+    @property
+    def xml_content(self):
+        """ Get xml content - read from the saved file.
+
+        Returns:
+
+        """
+        if self._xml_content is None and self.xml_file is not None and self.xml_file.grid_id is not None:
+            self._xml_content = self.xml_file.read()
+        return self._xml_content
+
+    @xml_content.setter
+    def xml_content(self, value):
+        """ Set xml content - to be saved as a file.
+
+        Args:
+            value:
+
+        Returns:
+
+        """
+        self._xml_content = value
+
+    def convert_to_file(self):
+        """ Store the xml content in a file.
+
+        Returns:
+
+        """
+        try:
+            xml_file = BytesIO(self.xml_content.encode('utf-8'))
+        except Exception:
+            xml_file = BytesIO(self.xml_content)
+        self.xml_file.put(xml_file, content_type='application/xml')
+
+    def delete_xml_file(self):
+        """ Delete the file of the xml content, once the data is saved.
+
+        Returns:
+
+        """
+        if self.xml_file is not None and self.xml_file.grid_id is not None:
+            self.xml_file.delete()
+
+    @staticmethod
+    def get_by_id(data_job_id):
+        """ Return the object with the given id.
+
+        Args:
+            data_job_id:
+
+        Returns:
+            DataJob
+
+        """
+        try:
+            return DataJob.objects.get(pk=str(data_job_id))
+        except mongoengine_errors.DoesNotExist as e:
+            raise exceptions.DoesNotExist(e.message)
+        except Exception as ex:
+            raise exceptions.ModelError(ex.message)
+
+    @staticmethod
+    def claim_pending_jobs(template_id, batch_size, stale_claim_date=None):
+        """ Mark pending jobs of a template as running and return them. A job is only claimed by one batch, even if
+        several tasks claim jobs at the same time. Running jobs claimed before the stale claim date (worker stopped
+        during the batch) are claimed again.
+
+        Args:
+            template_id:
+            batch_size: Maximum number of jobs to claim.
+            stale_claim_date: Date before which running jobs are claimed again (never if None).
+
+        Returns:
+            List of DataJob.
+
+        """
+        claimable_criteria = _get_claimable_criteria(stale_claim_date)
+        claimable_job_ids = DataJob.objects(claimable_criteria, template=template_id)\
+            .order_by('creation_date').limit(batch_size).scalar('id')
+        claimable_job_ids = list(claimable_job_ids)
+        if len(claimable_job_ids) == 0:
+            return []
+
+        batch_id = str(ObjectId())
+        DataJob.objects(claimable_criteria, pk__in=claimable_job_ids).update(set__status=STATUS_RUNNING,
+                                                                             set__batch_id=batch_id,
+                                                                             set__claim_date=datetime.datetime.utcnow())
+        return list(DataJob.objects(batch_id=batch_id).order_by('creation_date'))
+
+    @staticmethod
+    def get_template_ids_of_unprocessed_jobs(pending_date, stale_claim_date):
+        """ Return the ids of the templates of the jobs left unprocessed: pending jobs created before the pending date
+        (task not started), and running jobs claimed before the stale claim date (worker stopped).
+
+        Args:
+            pending_date:
+            stale_claim_date:
+
+        Returns:
+            List of template ids.
+
+        """
+        unprocessed_jobs = DataJob.objects(Q(status=STATUS_PENDING, creation_date__lt=pending_date) |
+                                           Q(status=STATUS_RUNNING, claim_date__lt=stale_claim_date))
+        return list(set(template.id for template in unprocessed_jobs.scalar('template').no_dereference()))
+
+
+def _get_claimable_criteria(stale_claim_date):
+    """ Get the criteria of the jobs that can be claimed.
+
+    Args:
+        stale_claim_date: Date before which running jobs are claimed again (never if None).
+
+    Returns:
+
+    """
+    if stale_claim_date is None:
+        return Q(status=STATUS_PENDING)
+    return Q(status=STATUS_PENDING) | Q(status=STATUS_RUNNING, claim_date__lt=stale_claim_date)
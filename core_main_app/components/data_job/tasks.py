@@ -0,0 +1,21 @@
+""" Data job tasks
+"""
+from __future__ import absolute_import
+
+from celery import shared_task
+
+
+@shared_task
+def process_data_jobs(template_id):
+    """ Validate and save the pending data of a template, by batches.
+
+    Args:
+        template_id:
+
+    Returns:
+        Number of jobs processed.
+
+    """
+    # imported here: the api enqueues this task
+    from core_main_app.components.data_job import api as data_job_api
+    return data_job_api.process_pending_jobs(template_id)
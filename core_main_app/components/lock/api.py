@@ -3,48 +3,62 @@
 """
 import datetime
 
-from core_main_app.commons.exceptions import LockError
-from core_main_app.components.lock.models import Lock
+from core_main_app.commons.exceptions import LockError, NotUniqueError
+from core_main_app.components.lock.models import DatabaseLockObject
 from core_main_app.settings import LOCK_OBJECT_TTL
 
 
 def is_object_locked(object, user):
-    """ Check if the object is locked.
+    """ Check if the object is locked by another user.
 
     Args:
         object:
+        user:
     Returns:
     """
-    try:
-        lock = Lock.acquire()
-        _check_object_locked(object, user, lock)
-        return False
-    except LockError, ler:
-        return True
-    finally:
-        Lock.release()
+    database_lock_object = DatabaseLockObject.get_active_lock_by_object(object, _get_expiry_date())
+    return database_lock_object is not None and database_lock_object.user_id != str(user.id)
+
+
+def get_lock_status_many(objects, user):
+    """ Check if objects are locked by another user, with a single query.
+
+    Args:
+        objects:
+        user:
+    Returns:
+        Dict: object id -> True if the object is locked by another user, False otherwise.
+    """
+    lock_status = {object.id: False for object in objects}
+    if len(lock_status) == 0:
+        return lock_status
+
+    user_id = str(user.id)
+    for database_lock_object in DatabaseLockObject.get_all_active_locks_by_object_list(objects,
+                                                                                       _get_expiry_date()):
+        # the referenced object is not dereferenced, only its id is read
+        object_id = database_lock_object.to_mongo()['object']
+        lock_status[object_id] = database_lock_object.user_id != user_id
+    return lock_status
 
 
 def set_lock_object(object, user):
-    """ Set lock on object.
+    """ Set lock on object. The lock is renewed if it is already owned by the user.
 
     Args:
         object:
         user:
     Returns:
     """
+    now = _get_now()
     try:
-        lock = Lock.acquire()
-        if not _check_object_locked(object, user, lock):
-            lock.set_lock(object, user)
-    except LockError, ler:
-        raise ler
-    finally:
-        Lock.release()
+        DatabaseLockObject.upsert_lock(object, str(user.id), now, now - datetime.timedelta(seconds=LOCK_OBJECT_TTL))
+    except NotUniqueError:
+        raise LockError('The object is used by another user and is locked.')
 
 
 def remove_lock_on_object(object, user):
-    """ Remove lock on object.
+    """ Remove lock on object. Only the user who created the lock can remove it.
 
     Args:
         object:
@@ -52,44 +66,22 @@ def remove_lock_on_object(object, user):
     Returns:
     """
     try:
-        lock = Lock.acquire()
-        database_lock_object = lock.get_object_locked(object)
-        # Only the user who created the lock can remove it
-        if database_lock_object.user_id == str(user.id):
-            lock.remove_lock(database_lock_object)
+        DatabaseLockObject.delete_lock(object, str(user.id))
     except:
         pass
-    finally:
-        Lock.release()
-
 
-def _check_object_locked(object, user, lock):
-    """ Check all conditions of a lock object to define if it is locked or not.
-        If there is no lock on object, return false.
-        If there is a lock but owned by the user, return true.
-        If there is a lock no owned by the user, raise LockError exception.
 
-    Args:
-        object:
-        user:
-        lock:
+def _get_now():
+    """ Return the current date. Dates are in UTC, as expected by the TTL index of the locks.
 
     Returns:
     """
-    try:
-        database_lock_object = lock.get_object_locked(object)
-    except:
-        return False
+    return datetime.datetime.utcnow()
 
-    # Check if lock has expired
-    date = database_lock_object.lock_date
-    if (datetime.datetime.now() - date).total_seconds() > LOCK_OBJECT_TTL:
-        lock.remove_lock(database_lock_object)
-        return False
 
-    # If the user who requested the object is the same as the one who locked the object
-    # then it is not locked for him
-    if database_lock_object.user_id == str(user.id):
-        return True
+def _get_expiry_date():
+    """ Return the date before which locks have expired.
 
-    raise LockError('The object is used by another user and is locked.')
+    Returns:
+    """
+    return _get_now() - datetime.timedelta(seconds=LOCK_OBJECT_TTL)
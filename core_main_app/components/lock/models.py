@@ -1,96 +1,130 @@
 """
  Lock model
 """
-import datetime
-import threading
-
-from bson.dbref import DBRef
 from django_mongoengine import Document, fields
 from mongoengine import errors as mongoengine_errors
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 from core_main_app.commons import exceptions
-
-sem = threading.Semaphore()
+from core_main_app.settings import LOCK_OBJECT_TTL
 
 
-class Lock():
+class DatabaseLockObject(Document):
     """
-    Class Lock. Singleton thread safe.
-    Only this object should be called to be used for an action regarding locking a Document.
+    Class DatabaseLockObject. One lock per object (unique index), removed by the database once expired (TTL index).
     """
-    __singleton_lock = threading.Lock()
-    __singleton_instance = None
 
-    @classmethod
-    def acquire(cls):
-        if not cls.__singleton_instance:
-            with cls.__singleton_lock:
-                if not cls.__singleton_instance:
-                    cls.__singleton_instance = cls()
-        sem.acquire()
-        return cls.__singleton_instance
+    object = fields.ReferenceField(Document, blank=False)
+    user_id = fields.StringField(blank=False)
+    lock_date = fields.DateTimeField(blank=False)
 
-    @classmethod
-    def release(cls):
-        sem.release()
+    meta = {
+        'indexes': [
+            {'fields': ['object'], 'unique': True},
+            # NOTE: the database removes expired locks about every minute, queries also filter them
+            {'fields': ['lock_date'], 'expireAfterSeconds': LOCK_OBJECT_TTL},
+        ],
+        'index_background': True,
+    }
 
-    def set_lock(self, object, user):
-        """ Set lock on a Document.
+    @staticmethod
+    def get_lock_by_object(object):
+        """ Get lock relative to the given object.
 
         Args:
             object:
-            user:
 
         Returns:
+
         """
-        database_lock_object = DatabaseLockObject()
-        database_lock_object.object = DBRef(object._class_name, object.id)
-        database_lock_object.user_id = str(user.id)
-        database_lock_object.lock_date = datetime.datetime.now()
-        database_lock_object.save()
+        return DatabaseLockObject.objects.get(object=object)
 
-    def remove_lock(self, database_lock_object):
-        """ Remove a lock.
+    @staticmethod
+    def get_active_lock_by_object(object, expiry_date):
+        """ Get the lock of an object, if it has not expired.
 
         Args:
-            database_lock_object:
+            object:
+            expiry_date: Locks set before this date have expired.
 
         Returns:
+            DatabaseLockObject, None if the object is not locked.
+
         """
-        database_lock_object.delete()
+        try:
+            return DatabaseLockObject.objects(object=object, lock_date__gte=expiry_date).first()
+        except Exception as ex:
+            raise exceptions.ModelError(ex.message)
 
-    def get_object_locked(self, object):
-        """ Get the locked object.
+    @staticmethod
+    def get_all_active_locks_by_object_list(object_list, expiry_date):
+        """ Get the locks of a list of objects, if they have not expired.
 
         Args:
-            object:
+            object_list:
+            expiry_date: Locks set before this date have expired.
+
         Returns:
+            List of DatabaseLockObject.
+
         """
         try:
-            return DatabaseLockObject.get_lock_by_object(object)
-        except mongoengine_errors.DoesNotExist as e:
-            raise exceptions.DoesNotExist(e.message)
+            return DatabaseLockObject.objects(object__in=object_list, lock_date__gte=expiry_date)
         except Exception as ex:
             raise exceptions.ModelError(ex.message)
 
+    @staticmethod
+    def upsert_lock(object, user_id, lock_date, expiry_date):
+        """ Lock an object for a user, in a single atomic operation. The lock is created if the object is not locked,
+        and renewed if the object is locked by the same user or if the lock has expired.
 
-class DatabaseLockObject(Document):
-    """
-    Class DatabaseLockObject.
-    """
+        Args:
+            object:
+            user_id:
+            lock_date:
+            expiry_date: Locks set before this date have expired.
 
-    object = fields.ReferenceField(Document, blank=False)
-    user_id = fields.StringField(blank=False)
-    lock_date = fields.DateTimeField(blank=False)
+        Returns:
+            Lock document (dict).
+
+        Raises:
+            NotUniqueError: The object is locked by another user.
+
+        """
+        # the lock can be taken if it belongs to the user or if it has expired, otherwise the insertion of a new lock
+        # fails on the unique index
+        query = {
+            'object': object.id,
+            '$or': [{'user_id': user_id}, {'lock_date': {'$lt': expiry_date}}]
+        }
+        update = {'$set': {'user_id': user_id, 'lock_date': lock_date}}
+
+        # concurrent upserts on the same object can fail once on the unique index: retry to match the new lock
+        for attempt in range(2):
+            try:
+                return DatabaseLockObject._get_collection().find_one_and_update(query,
+                                                                                update,
+                                                                                upsert=True,
+                                                                                return_document=ReturnDocument.AFTER)
+            except DuplicateKeyError as e:
+                if attempt > 0:
+                    raise exceptions.NotUniqueError(str(e))
+            except Exception as ex:
+                raise exceptions.ModelError(str(ex))
 
     @staticmethod
-    def get_lock_by_object(object):
-        """ Get lock relative to the given object.
+    def delete_lock(object, user_id):
+        """ Delete the lock of an object, if it belongs to the user.
 
         Args:
             object:
+            user_id:
 
         Returns:
 
         """
-        return DatabaseLockObject.objects.get(object=object)
+        try:
+            DatabaseLockObject.objects(object=object, user_id=user_id).delete()
+        except mongoengine_errors.OperationError as e:
+            raise exceptions.ModelError(e.message)
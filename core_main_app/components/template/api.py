@@ -3,8 +3,10 @@ Template API
 """
 from core_main_app.commons import exceptions
 from core_main_app.components.template.models import Template
+from core_main_app.utils import xsd_schema_cache
+from core_main_app.utils.xml_dict import is_path_valid
 from core_main_app.utils.xml import is_schema_valid, get_hash, \
-    get_template_with_server_dependencies, get_local_dependencies
+    get_template_with_server_dependencies, get_local_dependencies, build_xsd_tree
 
 
 def upsert(template):
@@ -16,14 +18,22 @@ def upsert(template):
     Returns:
 
     """
+    # Parse the schema once for all the checks
+    xsd_tree = build_xsd_tree(template.content)
     # Check if schema is valid
-    is_schema_valid(template.content)
+    is_schema_valid(template.content, xsd_tree)
+    # Keep previous hash to invalidate the compiled schema
+    previous_hash = template.hash
     # Get hash for the template
-    template.hash = get_hash(template.content)
+    template.hash = get_hash(template.content, xsd_tree)
     # Register local dependencies
-    _register_local_dependencies(template)
+    _register_local_dependencies(template, xsd_tree)
     # Save template
-    return template.save()
+    saved_template = template.save()
+    # Invalidate compiled schemas of the template and of the templates depending on it
+    xsd_schema_cache.invalidate(previous_hash)
+    _invalidate_compiled_schemas(template)
+    return saved_template
 
 
 def init_template_with_dependencies(template, dependencies_dict):
@@ -59,6 +69,27 @@ def set_display_name(template, display_name):
     template.save()
 
 
+def set_searchable_paths(template, searchable_paths):
+    """Set the paths of the xml kept in the dict content of the data of the template. The dict content of the
+    existing data is updated by the rebuild_dict_content command.
+
+    Args:
+        template:
+        searchable_paths: List of paths (whole xml if empty).
+
+    Returns:
+
+    """
+    invalid_paths = [path for path in searchable_paths if not is_path_valid(path)]
+    if len(invalid_paths) > 0:
+        raise exceptions.ApiError(u"Invalid searchable paths: {}.".format(u', '.join(unicode(path)
+                                                                                   for path in invalid_paths)))
+    # Set searchable paths
+    template.searchable_paths = list(searchable_paths)
+    # Save
+    template.save()
+
+
 def get(template_id):
     """Get a template.
 
@@ -124,14 +155,31 @@ def delete(template):
     Returns:
 
     """
+    _invalidate_compiled_schemas(template)
     template.delete()
 
 
-def _register_local_dependencies(template):
+def _invalidate_compiled_schemas(template):
+    """ Invalidate the compiled schemas of the template and of the templates depending on it.
+
+    Args:
+        template: Template instance.
+
+    Returns:
+
+    """
+    xsd_schema_cache.invalidate(template.hash)
+    if template.id is not None:
+        for dependent_template in get_all_templates_by_dependencies([template.id]):
+            xsd_schema_cache.invalidate(dependent_template.hash)
+
+
+def _register_local_dependencies(template, xsd_tree=None):
     """ Register local dependencies for the given template.
 
     Args:
         template: Template instance.
+        xsd_tree: Tree of the template content (parsed from the content if not provided).
 
     Returns:
 
@@ -139,7 +187,7 @@ def _register_local_dependencies(template):
     # Clean all dependencies. Template content could have been changed.
     del template.dependencies
     # Get local dependencies
-    local_dependencies = get_local_dependencies(template.content)
+    local_dependencies = get_local_dependencies(template.content, xsd_tree)
     for local_dependency in local_dependencies:
         try:
             # get the dependency
@@ -14,8 +14,17 @@ class Template(Document):
     hash = fields.StringField()
     _display_name = fields.StringField(blank=True)
     dependencies = fields.ListField(fields.ReferenceField("self"), default=[], blank=True)
-
-    meta = {'allow_inheritance': True}
+    # paths of the xml kept in the dict content of the data (whole xml if empty), see utils.xml_dict
+    searchable_paths = fields.ListField(fields.StringField(), default=[], blank=True)
+
+    meta = {
+        'allow_inheritance': True,
+        'indexes': [
+            'hash',
+            'dependencies',
+        ],
+        'index_background': True,
+    }
 
     @staticmethod
     def get_all(is_cls):
@@ -3,6 +3,7 @@
 from core_main_app.components.template_xsl_rendering.models import TemplateXslRendering
 from core_main_app.components.template import api as template_api
 from core_main_app.commons import exceptions
+from core_main_app.utils import xslt_cache
 
 
 def add_or_delete(template_id, list_xslt, detail_xslt, template_xsl_rendering_id=None):
@@ -47,7 +48,10 @@ def _upsert(template_xsl_rendering):
         TemplateXslRendering instance
 
     """
-    return template_xsl_rendering.save()
+    template_xsl_rendering = template_xsl_rendering.save()
+    # the XSLT used to render the data of the template changed
+    xslt_cache.invalidate()
+    return template_xsl_rendering
 
 
 def delete(template_xsl_rendering):
@@ -58,6 +62,8 @@ def delete(template_xsl_rendering):
 
     """
     template_xsl_rendering.delete()
+    # the XSLT used to render the data of the template changed
+    xslt_cache.invalidate()
 
 
 def get_by_id(template_xsl_rendering_id):
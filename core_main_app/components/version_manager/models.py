@@ -21,7 +21,15 @@ class VersionManager(Document):
     is_disabled = fields.BooleanField(default=False)
     disabled_versions = fields.ListField(default=[], blank=True)
 
-    meta = {'allow_inheritance': True}
+    meta = {
+        'allow_inheritance': True,
+        'indexes': [
+            # template version managers are found by their versions
+            'versions',
+            ('user', 'is_disabled'),
+        ],
+        'index_background': True,
+    }
 
     def disable(self):
         """Disable the Version Manager.
@@ -0,0 +1,178 @@
+""" Workspace access context: workspaces a user can read and write, computed once and shared by access control rules
+"""
+import time
+
+from core_main_app.components.workspace import api as workspace_api
+from core_main_app.permissions import api as permission_api
+from core_main_app.settings import WORKSPACE_ACCESS_CONTEXT_TTL
+
+# name of the user attribute holding the access context
+ACCESS_CONTEXT_ATTRIBUTE = '_workspace_access_context'
+
+
+class WorkspaceAccessContext(object):
+    """ Ids of the workspaces a user can read and write. Each set is computed on first use.
+    """
+
+    def __init__(self, user, version=None, creation_time=None):
+        """ Create the access context.
+
+        Args:
+            user: User of the context.
+            version: Version of the permissions used to compute the context.
+            creation_time: Time of creation of the context.
+        """
+        self.user = user
+        self.version = version
+        self.creation_time = time.time() if creation_time is None else creation_time
+        self._read_workspace_ids = None
+        self._write_workspace_ids = None
+
+    @property
+    def read_workspace_ids(self):
+        """ Ids of the workspaces with read access.
+
+        Returns:
+
+        """
+        if self._read_workspace_ids is None:
+            self._read_workspace_ids = frozenset(
+                workspace.id for workspace in workspace_api.get_all_workspaces_with_read_access_by_user(self.user))
+        return self._read_workspace_ids
+
+    @property
+    def write_workspace_ids(self):
+        """ Ids of the workspaces with write access.
+
+        Returns:
+
+        """
+        if self._write_workspace_ids is None:
+            self._write_workspace_ids = frozenset(
+                workspace.id for workspace in workspace_api.get_all_workspaces_with_write_access_by_user(self.user))
+        return self._write_workspace_ids
+
+    def can_read(self, workspace):
+        """ Check if the workspace can be read.
+
+        Args:
+            workspace: Workspace or workspace id.
+
+        Returns:
+
+        """
+        return _get_workspace_id(workspace) in self.read_workspace_ids
+
+    def can_write(self, workspace):
+        """ Check if the workspace can be written.
+
+        Args:
+            workspace: Workspace or workspace id.
+
+        Returns:
+
+        """
+        return _get_workspace_id(workspace) in self.write_workspace_ids
+
+    def can_read_or_write(self, workspace):
+        """ Check if the workspace can be read or written.
+
+        Args:
+            workspace: Workspace or workspace id.
+
+        Returns:
+
+        """
+        workspace_id = _get_workspace_id(workspace)
+        return workspace_id in self.read_workspace_ids or workspace_id in self.write_workspace_ids
+
+    def is_expired(self, ttl=WORKSPACE_ACCESS_CONTEXT_TTL):
+        """ Check if the context is outdated: too old, or computed before a permission change.
+
+        Args:
+            ttl: Time to live of the context, in seconds.
+
+        Returns:
+
+        """
+        return self.version != permission_api.get_access_version() or time.time() - self.creation_time >= ttl
+
+
+class AllWorkspacesAccessContext(WorkspaceAccessContext):
+    """ Access context of a user reading and writing all the workspaces: checks do not compute the workspace ids.
+    """
+
+    def can_read(self, workspace):
+        return True
+
+    def can_write(self, workspace):
+        return True
+
+    def can_read_or_write(self, workspace):
+        return True
+
+
+def get_access_context(user):
+    """ Get the access context of a user. The context is kept on the user object (one per request) and reused until
+    it expires or the permissions change.
+
+    Args:
+        user:
+
+    Returns:
+        WorkspaceAccessContext
+
+    """
+    access_context = getattr(user, ACCESS_CONTEXT_ATTRIBUTE, None)
+    if access_context is not None and not access_context.is_expired():
+        return access_context
+
+    access_context = build_access_context(user)
+    try:
+        setattr(user, ACCESS_CONTEXT_ATTRIBUTE, access_context)
+    except AttributeError:
+        # user object does not accept attributes, context is not reused
+        pass
+    return access_context
+
+
+def build_access_context(user):
+    """ Create a new access context for a user.
+
+    Args:
+        user:
+
+    Returns:
+        WorkspaceAccessContext
+
+    """
+    # a permission change after this point expires the context
+    version = permission_api.get_access_version()
+    if workspace_api.can_access_all_workspaces(user):
+        return AllWorkspacesAccessContext(user, version=version)
+    return WorkspaceAccessContext(user, version=version)
+
+
+def clear_access_context(user):
+    """ Remove the access context kept on a user object.
+
+    Args:
+        user:
+
+    Returns:
+
+    """
+    if getattr(user, ACCESS_CONTEXT_ATTRIBUTE, None) is not None:
+        setattr(user, ACCESS_CONTEXT_ATTRIBUTE, None)
+
+
+def _get_workspace_id(workspace):
+    """ Get the id of a workspace.
+
+    Args:
+        workspace: Workspace or workspace id.
+
+    Returns:
+
+    """
+    return getattr(workspace, 'id', workspace)
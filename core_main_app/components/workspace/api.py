@@ -6,8 +6,11 @@ from core_main_app.components.group import api as group_api
 from core_main_app.components.user import api as user_api
 from core_main_app.components.workspace.access_control import can_delete_workspace, is_workspace_owner, \
     is_workspace_owner_to_perform_action_for_others
+from core_main_app.components.workspace import principals as workspace_principals
 from core_main_app.components.workspace.models import Workspace
 from core_main_app.permissions import api as permission_api
+from core_main_app.permissions import principals
+from core_main_app.settings import USE_ACCESS_PRINCIPALS
 from core_main_app.utils.access_control.decorators import access_control
 
 
@@ -23,7 +26,10 @@ def create_and_save(title, owner_id=None, is_public=False):
     """
     workspace = _create_workspace(title, owner_id, is_public)
     try:
-        return workspace.save()
+        workspace_principals.set_principals(workspace)
+        workspace = workspace.save()
+        permission_api.invalidate_access()
+        return workspace
     except Exception as ex:
         # Rollback permissions
         permission_api.delete_permission(workspace.read_perm_id)
@@ -63,9 +69,11 @@ def delete(workspace, user):
 
     Returns:
     """
+    workspace_principals.clear_data_principals(workspace)
     permission_api.delete_permission(workspace.read_perm_id)
     permission_api.delete_permission(workspace.write_perm_id)
     workspace.delete()
+    permission_api.invalidate_access()
 
 
 def set_title(workspace, new_title):
@@ -129,6 +137,19 @@ def get_by_id_list(list_workspace_id):
     return list_workspace
 
 
+def can_access_all_workspaces(user):
+    """ Check if a user can read and write all the workspaces (superuser). The workspaces of these users are not
+    filtered by permissions.
+
+    Args:
+        user
+
+    Returns:
+
+    """
+    return user.is_superuser
+
+
 def get_all_workspaces_with_read_access_by_user(user):
     """ Get all workspaces with read access for the given user.
 
@@ -138,6 +159,10 @@ def get_all_workspaces_with_read_access_by_user(user):
     Returns:
 
     """
+    if can_access_all_workspaces(user):
+        return Workspace.get_all()
+    if USE_ACCESS_PRINCIPALS:
+        return Workspace.get_all_by_read_principals(principals.get_principals_by_user(user))
     read_permissions = permission_api.get_all_workspace_permissions_user_can_read(user)
     return Workspace.get_all_workspaces_with_read_access_by_user_id(user.id, read_permissions)
 
@@ -151,6 +176,12 @@ def get_all_workspaces_with_write_access_by_user(user):
     Returns:
 
     """
+    if can_access_all_workspaces(user):
+        return Workspace.get_all()
+    if USE_ACCESS_PRINCIPALS:
+        # anonymous users do not write
+        write_principals = [] if user.is_anonymous else principals.get_principals_by_user(user)
+        return Workspace.get_all_by_write_principals(write_principals)
     write_permissions = permission_api.get_all_workspace_permissions_user_can_write(user)
     return Workspace.get_all_workspaces_with_write_access_by_user_id(user.id, write_permissions)
 
@@ -164,6 +195,8 @@ def get_all_workspaces_with_read_access_not_owned_by_user(user):
     Returns:
 
     """
+    if can_access_all_workspaces(user):
+        return Workspace.get_all_not_owned_by_user_id(user.id)
     read_permissions = permission_api.get_all_workspace_permissions_user_can_read(user)
     return Workspace.get_all_workspaces_with_read_access_not_owned_by_user_id(user.id, read_permissions)
 
@@ -177,6 +210,8 @@ def get_all_workspaces_with_write_access_not_owned_by_user_id(user):
     Returns:
 
     """
+    if can_access_all_workspaces(user):
+        return Workspace.get_all_not_owned_by_user_id(user.id)
     write_permissions = permission_api.get_all_workspace_permissions_user_can_write(user)
     return Workspace.get_all_workspaces_with_write_access_not_owned_by_user_id(user.id, write_permissions)
 
@@ -269,6 +304,8 @@ def set_workspace_public(workspace, user):
     """
     workspace.is_public = True
     workspace.save()
+    workspace_principals.update_principals(workspace)
+    permission_api.invalidate_access()
 
 
 def can_user_read_workspace(workspace, user):
@@ -280,7 +317,7 @@ def can_user_read_workspace(workspace, user):
 
     Return:
     """
-    if is_workspace_public(workspace):
+    if is_workspace_public(workspace) or can_access_all_workspaces(user):
         return True
     permission_label = permission_api.get_permission_label(workspace.read_perm_id)
     return str(workspace.owner) == str(user.id) or user.has_perm(permission_label)
@@ -295,6 +332,8 @@ def can_user_write_workspace(workspace, user):
 
     Return:
     """
+    if can_access_all_workspaces(user):
+        return True
     permission_label = permission_api.get_permission_label(workspace.write_perm_id)
     return str(workspace.owner) == str(user.id) or user.has_perm(permission_label)
 
@@ -19,6 +19,21 @@ class Workspace(Document):
     read_perm_id = fields.StringField(blank=False)
     write_perm_id = fields.StringField(blank=False)
     is_public = fields.BooleanField(default=False)
+    # users, groups and public with read and write access, maintained when the rights of the workspace change
+    read_principals = fields.ListField(fields.StringField(), blank=True)
+    write_principals = fields.ListField(fields.StringField(), blank=True)
+
+    meta = {
+        'indexes': [
+            ('owner', 'is_public'),
+            'read_perm_id',
+            'write_perm_id',
+            'is_public',
+            'read_principals',
+            'write_principals',
+        ],
+        'index_background': True,
+    }
 
     @staticmethod
     def get_all():
@@ -112,6 +127,78 @@ class Workspace(Document):
         """
         return Workspace.objects(owner__ne=str(user_id), write_perm_id__in=write_permissions).all()
 
+    def save_principals(self):
+        """ Save the principals of the workspace, without saving the other fields.
+
+        Returns:
+
+        """
+        try:
+            Workspace.objects(pk=self.pk).update_one(set__read_principals=self.read_principals,
+                                                     set__write_principals=self.write_principals)
+        except mongoengine_errors.OperationError as e:
+            raise exceptions.ModelError(e.message)
+
+    @staticmethod
+    def get_all_by_read_principals(principals):
+        """ Get all workspaces readable by one of the principals.
+
+        Args:
+            principals:
+
+        Returns:
+
+        """
+        return Workspace.objects(read_principals__in=principals).all()
+
+    @staticmethod
+    def get_all_by_write_principals(principals):
+        """ Get all workspaces writable by one of the principals.
+
+        Args:
+            principals:
+
+        Returns:
+
+        """
+        return Workspace.objects(write_principals__in=principals).all()
+
+    @staticmethod
+    def get_all_by_principal(principal):
+        """ Get all workspaces with a principal in their read or write principals.
+
+        Args:
+            principal:
+
+        Returns:
+
+        """
+        return Workspace.objects(Q(read_principals=principal) | Q(write_principals=principal)).all()
+
+    @staticmethod
+    def get_all_by_permission_id_list(permission_ids):
+        """ Get all workspaces using one of the permissions for read or write access.
+
+        Args:
+            permission_ids:
+
+        Returns:
+
+        """
+        return Workspace.objects(Q(read_perm_id__in=permission_ids) | Q(write_perm_id__in=permission_ids)).all()
+
+    @staticmethod
+    def get_all_not_owned_by_user_id(user_id):
+        """ Get all workspaces not owned by the given user id.
+
+        Args:
+            user_id
+
+        Returns:
+
+        """
+        return Workspace.objects(owner__ne=str(user_id)).all()
+
     @staticmethod
     def get_all_public_workspaces():
         """ Get all public workspaces.
@@ -0,0 +1,119 @@
+""" Principals of the workspaces and of their data, updated when the rights of the workspaces change.
+"""
+from django.contrib.auth.models import User, Group
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from core_main_app.components.data.models import Data
+from core_main_app.components.workspace.models import Workspace
+from core_main_app.permissions import principals
+
+
+def set_principals(workspace):
+    """ Compute the read and write principals of a workspace from its owner, its visibility and the users and groups
+    holding its permissions. The workspace is not saved.
+
+    Args:
+        workspace:
+
+    Returns:
+
+    """
+    read_principals = set(principals.get_principals_by_permission(workspace.read_perm_id))
+    write_principals = set(principals.get_principals_by_permission(workspace.write_perm_id))
+    if workspace.owner:
+        owner_principal = principals.get_user_principal(workspace.owner)
+        read_principals.add(owner_principal)
+        write_principals.add(owner_principal)
+    if workspace.is_public:
+        read_principals.add(principals.PUBLIC_PRINCIPAL)
+    workspace.read_principals = sorted(read_principals)
+    workspace.write_principals = sorted(write_principals)
+
+
+def update_principals(workspace):
+    """ Compute and save the principals of a workspace and of its data.
+
+    Args:
+        workspace:
+
+    Returns:
+
+    """
+    set_principals(workspace)
+    workspace.save_principals()
+    Data.set_read_principals_by_workspace(workspace, workspace.read_principals)
+
+
+def update_principals_by_permission_ids(permission_ids):
+    """ Update the principals of the workspaces using the permissions.
+
+    Args:
+        permission_ids:
+
+    Returns:
+
+    """
+    for workspace in Workspace.get_all_by_permission_id_list([str(permission_id)
+                                                              for permission_id in permission_ids]):
+        update_principals(workspace)
+
+
+def clear_data_principals(workspace):
+    """ Remove the principals of the data of a workspace, before the workspace is deleted.
+
+    Args:
+        workspace:
+
+    Returns:
+
+    """
+    Data.set_read_principals_by_workspace(workspace, [])
+
+
+def rebuild_principals():
+    """ Compute and save the principals of all the workspaces and data.
+
+    Returns:
+        Number of workspaces updated.
+
+    """
+    count = 0
+    for workspace in Workspace.objects.all():
+        update_principals(workspace)
+        count += 1
+    Data.clear_read_principals_without_workspace()
+    return count
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def _update_principals_on_permissions_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """ Update the principals of the workspaces when permissions are granted to or revoked from users and groups.
+
+    Args:
+        sender:
+        instance: User or group (permission if reverse).
+        action:
+        reverse:
+        pk_set: Ids of the permissions (users or groups if reverse).
+        **kwargs:
+
+    Returns:
+
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        update_principals_by_permission_ids([instance.pk])
+    elif action == 'post_clear':
+        # the cleared permissions are not known: update the workspaces of the user or group
+        if isinstance(instance, Group):
+            principal = principals.get_group_principal(instance.pk, instance.name)
+        else:
+            principal = principals.get_user_principal(instance.pk)
+        for workspace in Workspace.get_all_by_principal(principal):
+            update_principals(workspace)
+    else:
+        update_principals_by_permission_ids(pk_set)
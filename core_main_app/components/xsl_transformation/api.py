@@ -2,7 +2,7 @@
 """
 from core_main_app.commons import exceptions
 from core_main_app.components.xsl_transformation.models import XslTransformation
-from core_main_app.utils import xml
+from core_main_app.utils import xml, xslt_cache
 from core_main_app.utils.xml import is_well_formed_xml, has_xsl_namespace
 
 
@@ -53,7 +53,10 @@ def upsert(xsl_transformation):
     elif not has_xsl_namespace(xsl_transformation.content):
         raise exceptions.ApiError("XSLT namespace not found in the uploaded file.")
     else:
-        return xsl_transformation.save_object()
+        xsl_transformation = xsl_transformation.save_object()
+        # the XSLT used to render the data may have changed
+        xslt_cache.invalidate()
+        return xsl_transformation
 
 
 def delete(xsl_transformation):
@@ -64,6 +67,8 @@ def delete(xsl_transformation):
 
     """
     xsl_transformation.delete()
+    # the XSLT used to render the data may have changed
+    xslt_cache.invalidate()
 
 
 def xsl_transform(xml_content, xslt_name):
@@ -79,6 +84,6 @@ def xsl_transform(xml_content, xslt_name):
     xslt_object = get_by_name(xslt_name)
 
     try:
-        return xml.xsl_transform(xml_content, xslt_object.content)
+        return xml.xsl_transform(xml_content, xslt_object.content, xslt_object.id)
     except Exception:
         raise exceptions.ApiError("An unexpected exception happened while transforming the XML")
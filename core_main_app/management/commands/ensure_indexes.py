@@ -0,0 +1,36 @@
+""" Create or verify the indexes declared by the documents.
+
+Usage:
+    python manage.py ensure_indexes [--check]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core_main_app.utils.databases import indexes
+
+
+class Command(BaseCommand):
+    """ Create or verify the indexes of the documents.
+    """
+    help = 'Create the missing indexes of the documents in the background, or list them with --check.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', dest='check', default=False,
+                            help='List the missing and extra indexes without creating them.')
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            indexes.ensure_indexes()
+            self.stdout.write('Missing indexes created, built in the background.')
+
+        has_missing_indexes = False
+        for collection_name, comparison in sorted(indexes.compare_indexes().items()):
+            for index in comparison['missing']:
+                has_missing_indexes = True
+                self.stdout.write('{}: missing index {}'.format(collection_name, index))
+            for index in comparison['extra']:
+                self.stdout.write('{}: extra index {}'.format(collection_name, index))
+
+        if options['check'] and has_missing_indexes:
+            raise CommandError('Some indexes are missing, run the command without --check to create them.')
+        self.stdout.write('All indexes are declared in the database.' if not has_missing_indexes
+                          else 'Some indexes are still missing.')
@@ -0,0 +1,19 @@
+""" Compute and save the principals of all the workspaces and data, before enabling USE_ACCESS_PRINCIPALS or to
+repair them.
+
+Usage:
+    python manage.py rebuild_access_principals
+"""
+from django.core.management.base import BaseCommand
+
+from core_main_app.components.workspace import principals as workspace_principals
+
+
+class Command(BaseCommand):
+    """ Rebuild the principals of the workspaces and data.
+    """
+    help = 'Compute and save the principals (users, groups, public) of all the workspaces and of their data.'
+
+    def handle(self, *args, **options):
+        count = workspace_principals.rebuild_principals()
+        self.stdout.write('Principals of {} workspace(s) and of their data rebuilt.'.format(count))
@@ -0,0 +1,34 @@
+""" Rebuild the dict content of the data, after a change of the searchable paths of their template.
+
+Usage:
+    python manage.py rebuild_dict_content [--template <template_id> ...]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core_main_app.commons import exceptions
+from core_main_app.components.data import api as data_api
+from core_main_app.components.template import api as template_api
+
+
+class Command(BaseCommand):
+    """ Rebuild the dict content of the data.
+    """
+    help = 'Rebuild the dict content of the data from their xml content, using the searchable paths of their template.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', action='append', dest='template_ids', default=None,
+                            help='Id of a template of the data to rebuild (all data if not set). Can be repeated.')
+
+    def handle(self, *args, **options):
+        template_list = None
+        if options['template_ids'] is not None:
+            try:
+                template_list = [template_api.get(template_id) for template_id in options['template_ids']]
+            except (exceptions.DoesNotExist, exceptions.ModelError) as e:
+                raise CommandError('Template not found: {}'.format(e.message))
+
+        rebuilt_count, errors = data_api.rebuild_dict_content(template_list)
+
+        for data_id, message in errors:
+            self.stderr.write('Unable to rebuild data {}: {}'.format(data_id, message))
+        self.stdout.write('{} data rebuilt, {} errors.'.format(rebuilt_count, len(errors)))
@@ -0,0 +1,18 @@
+""" Build the index of the search backend again from all the data, after a change of SEARCH_BACKEND or to repair it.
+
+Usage:
+    python manage.py rebuild_search_index
+"""
+from django.core.management.base import BaseCommand
+
+from core_main_app.components.data import api as data_api
+
+
+class Command(BaseCommand):
+    """ Rebuild the index of the search backend.
+    """
+    help = 'Build the index of the keyword search backend (SEARCH_BACKEND) again from all the data.'
+
+    def handle(self, *args, **options):
+        count = data_api.rebuild_search_index()
+        self.stdout.write('Search index rebuilt with {} data.'.format(count))
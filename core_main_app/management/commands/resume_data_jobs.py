@@ -0,0 +1,19 @@
+""" Enqueue again the data jobs left unprocessed (broker unavailable, worker stopped during a batch). Can be run
+periodically (cron) when USE_BACKGROUND_DATA_INGESTION is enabled.
+
+Usage:
+    python manage.py resume_data_jobs
+"""
+from django.core.management.base import BaseCommand
+
+from core_main_app.components.data_job import api as data_job_api
+
+
+class Command(BaseCommand):
+    """ Resume the unprocessed data jobs.
+    """
+    help = 'Enqueue a task for each template with pending data jobs not started, or running data jobs stopped.'
+
+    def handle(self, *args, **options):
+        count = data_job_api.resume_unprocessed_jobs()
+        self.stdout.write('Data jobs of {} template(s) enqueued.'.format(count))
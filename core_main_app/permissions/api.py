@@ -1,16 +1,27 @@
 """
 Permissions API
 """
+import time
 
-from django.contrib.auth.models import Permission, ContentType
+from django.contrib.auth.models import Permission, ContentType, User
+from django.core.cache import caches
 from django.db import IntegrityError
 from django.db.models import Q
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
 
 from core_main_app.commons import exceptions
 from core_main_app.components.group import api as group_api
 from core_main_app.components.user import api as user_api
 from core_main_app.permissions.rights import CAN_READ_NAME, CAN_READ_CODENAME, CONTENT_TYPE_APP_LABEL,\
     CAN_WRITE_NAME, CAN_WRITE_CODENAME
+from core_main_app.settings import WORKSPACE_PERMISSIONS_CACHE, WORKSPACE_PERMISSIONS_CACHE_TTL
+
+# cache key of the version of the workspace permissions, changed each time a permission is granted, revoked, created
+# or deleted
+ACCESS_VERSION_KEY = 'core_main_app:workspace_permissions:version'
+# cache key of the workspace permission ids of a user, with the version used to compute them
+USER_PERMISSIONS_KEY = 'core_main_app:workspace_permissions:{0}:{1}'
 
 
 def _title_to_codename(title):
@@ -81,9 +92,89 @@ def _create_perm(name, content_type, codename):
 
     if not created:
         raise exceptions.NotUniqueError("The permission already exists.")
+
+    invalidate_access()
     return perm
 
 
+def get_access_version():
+    """ Get the current version of the workspace permissions, shared by the processes using the cache.
+
+    Returns:
+
+    """
+    cache = _get_cache()
+    version = cache.get(ACCESS_VERSION_KEY)
+    if version is None:
+        version = _init_access_version(cache)
+    return version
+
+
+def invalidate_access():
+    """ Change the version of the workspace permissions, so access computed before are not reused.
+
+    Returns:
+
+    """
+    cache = _get_cache()
+    try:
+        cache.incr(ACCESS_VERSION_KEY)
+    except ValueError:
+        # no version in the cache yet
+        cache.set(ACCESS_VERSION_KEY, _new_access_version(), None)
+
+
+def _init_access_version(cache):
+    """ Store a version of the workspace permissions in the cache, if it has none.
+
+    Args:
+        cache:
+
+    Returns:
+        Current version.
+
+    """
+    version = _new_access_version()
+    cache.add(ACCESS_VERSION_KEY, version, None)
+    # another process may have stored its version first
+    return cache.get(ACCESS_VERSION_KEY, version)
+
+
+def _new_access_version():
+    """ Create a version of the workspace permissions, different from the versions used before it was evicted from
+    the cache.
+
+    Returns:
+
+    """
+    return int(time.time() * 1000000)
+
+
+def _get_cache():
+    """ Get the cache of the workspace permissions.
+
+    Returns:
+
+    """
+    return caches[WORKSPACE_PERMISSIONS_CACHE]
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def _invalidate_access_on_user_groups_change(sender, action, **kwargs):
+    """ Change the version of the workspace permissions when users join or leave groups.
+
+    Args:
+        sender:
+        action:
+        **kwargs:
+
+    Returns:
+
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_access()
+
+
 def add_permission_to_user(user, permission):
     """ Add permission to user.
 
@@ -95,6 +186,7 @@ def add_permission_to_user(user, permission):
     """
     user.user_permissions.add(permission)
     user.save()
+    invalidate_access()
 
 
 def add_permission_to_group(group, permission):
@@ -108,6 +200,7 @@ def add_permission_to_group(group, permission):
     """
     group.permissions.add(permission)
     group.save()
+    invalidate_access()
 
 
 def remove_permission_to_user(user, permission):
@@ -121,6 +214,7 @@ def remove_permission_to_user(user, permission):
     """
     user.user_permissions.remove(permission)
     user.save()
+    invalidate_access()
 
 
 def remove_permission_to_group(group, permission):
@@ -134,6 +228,7 @@ def remove_permission_to_group(group, permission):
     """
     group.permissions.remove(permission)
     group.save()
+    invalidate_access()
 
 
 def get_all_workspace_permissions_user_can_write(user):
@@ -145,17 +240,7 @@ def get_all_workspace_permissions_user_can_write(user):
     Return:
 
     """
-    # TODO: fix the super user case
-    if user.is_superuser:
-        return [str(perm.id) for perm in Permission.objects.filter(content_type__app_label=CONTENT_TYPE_APP_LABEL,
-                                                                   codename__startswith=CAN_WRITE_CODENAME)]
-    elif user.is_anonymous:
-        # No permissions.
-        return []
-    else:
-        return [str(perm.id) for perm in Permission.objects.filter((Q(user=user) | Q(group__in=user.groups.all())),
-                                                                   content_type__app_label=CONTENT_TYPE_APP_LABEL,
-                                                                   codename__startswith=CAN_WRITE_CODENAME)]
+    return _get_workspace_permission_ids(user, CAN_WRITE_CODENAME)
 
 
 def get_all_workspace_permissions_user_can_read(user):
@@ -166,19 +251,85 @@ def get_all_workspace_permissions_user_can_read(user):
 
     Return:
     """
-    #TODO: fix the super user case
+    return _get_workspace_permission_ids(user, CAN_READ_CODENAME)
+
+
+def _get_workspace_permission_ids(user, codename):
+    """ Get the workspace permission ids of a user from the cache, compute them if the cached ids are missing or
+    outdated.
+
+    Args:
+        user:
+        codename: Codename prefix of the permissions (read or write).
+
+    Returns:
+
+    """
+    if WORKSPACE_PERMISSIONS_CACHE_TTL <= 0:
+        return _query_workspace_permission_ids(user, codename)
+
+    cache = _get_cache()
+    key = USER_PERMISSIONS_KEY.format(codename, _get_user_cache_key(user))
+    # version and permission ids in a single cache round trip
+    values = cache.get_many([ACCESS_VERSION_KEY, key])
+    version = values.get(ACCESS_VERSION_KEY)
+    if version is None:
+        version = _init_access_version(cache)
+
+    cached_permission_ids = values.get(key)
+    if cached_permission_ids is not None and cached_permission_ids[0] == version:
+        return list(cached_permission_ids[1])
+
+    # permissions changed during the query are stored with the previous version, and computed again on next call
+    permission_ids = _query_workspace_permission_ids(user, codename)
+    cache.set(key, (version, permission_ids), WORKSPACE_PERMISSIONS_CACHE_TTL)
+    return permission_ids
+
+
+def _get_user_cache_key(user):
+    """ Get the part of the cache key identifying the permissions of a user.
+
+    Args:
+        user:
+
+    Returns:
+
+    """
     if user.is_superuser:
-        return [str(perm.id) for perm in Permission.objects.filter(content_type__app_label=CONTENT_TYPE_APP_LABEL,
-                                                                   codename__startswith=CAN_READ_CODENAME)]
+        # superusers share the same permissions (the workspace API does not list them, superusers access all the
+        # workspaces)
+        return 'superuser'
     elif user.is_anonymous:
-        return [str(perm.id) for perm in Permission.objects.filter(group=group_api.get_anonymous_group(),
-                                                                   content_type__app_label=CONTENT_TYPE_APP_LABEL,
-                                                                   codename__startswith=CAN_READ_CODENAME)]
+        return 'anonymous'
     else:
-        return [str(perm.id) for perm in Permission.objects.filter((Q(user=user)
-                                                                    | Q(group__in=user.groups.all())),
-                                                                   content_type__app_label=CONTENT_TYPE_APP_LABEL,
-                                                                   codename__startswith=CAN_READ_CODENAME)]
+        return 'user_{}'.format(user.id)
+
+
+def _query_workspace_permission_ids(user, codename):
+    """ Get the workspace permission ids of a user from the database.
+
+    Args:
+        user:
+        codename: Codename prefix of the permissions (read or write).
+
+    Returns:
+
+    """
+    if user.is_superuser:
+        permissions = Permission.objects.filter(content_type__app_label=CONTENT_TYPE_APP_LABEL,
+                                                codename__startswith=codename)
+    elif user.is_anonymous:
+        if codename != CAN_READ_CODENAME:
+            # No permissions.
+            return []
+        permissions = Permission.objects.filter(group=group_api.get_anonymous_group(),
+                                                content_type__app_label=CONTENT_TYPE_APP_LABEL,
+                                                codename__startswith=codename)
+    else:
+        permissions = Permission.objects.filter((Q(user=user) | Q(group__in=user.groups.all())),
+                                                content_type__app_label=CONTENT_TYPE_APP_LABEL,
+                                                codename__startswith=codename)
+    return [str(perm.id) for perm in permissions]
 
 
 def get_by_id(permission_id):
@@ -206,6 +357,8 @@ def delete_permission(permission_id):
     except Exception, e:
         pass
 
+    invalidate_access()
+
 
 def get_permission_label(permission_id):
     """ Get the label of a permission.
@@ -0,0 +1,78 @@
+""" Principals: ids of the users and groups holding a right, stored on the documents to authorize queries without
+listing the permissions of the user.
+"""
+from django.contrib.auth.models import User, Group
+
+import core_main_app.permissions.rights as rights
+
+# principal of all the users, anonymous or not
+PUBLIC_PRINCIPAL = 'public'
+# principal of the anonymous group
+ANONYMOUS_PRINCIPAL = 'anonymous'
+
+USER_PRINCIPAL_PREFIX = 'user:'
+GROUP_PRINCIPAL_PREFIX = 'group:'
+
+
+def get_user_principal(user_id):
+    """ Get the principal of a user.
+
+    Args:
+        user_id:
+
+    Returns:
+
+    """
+    return USER_PRINCIPAL_PREFIX + str(user_id)
+
+
+def get_group_principal(group_id, group_name):
+    """ Get the principal of a group.
+
+    Args:
+        group_id:
+        group_name:
+
+    Returns:
+
+    """
+    if group_name == rights.anonymous_group:
+        return ANONYMOUS_PRINCIPAL
+    return GROUP_PRINCIPAL_PREFIX + str(group_id)
+
+
+def get_principals_by_user(user):
+    """ Get the principals of a user: the user, its groups, and the public principal.
+
+    Args:
+        user:
+
+    Returns:
+        List of principals.
+
+    """
+    if user.is_anonymous:
+        return [ANONYMOUS_PRINCIPAL, PUBLIC_PRINCIPAL]
+
+    principals = [get_user_principal(user.id), PUBLIC_PRINCIPAL]
+    principals.extend(get_group_principal(group_id, group_name)
+                      for group_id, group_name in user.groups.values_list('id', 'name'))
+    return principals
+
+
+def get_principals_by_permission(permission_id):
+    """ Get the principals of the users and groups holding a permission.
+
+    Args:
+        permission_id:
+
+    Returns:
+        List of principals.
+
+    """
+    principals = [get_user_principal(user_id)
+                  for user_id in User.objects.filter(user_permissions__id=permission_id).values_list('id', flat=True)]
+    principals.extend(get_group_principal(group_id, group_name)
+                      for group_id, group_name in Group.objects.filter(permissions__id=permission_id)
+                      .values_list('id', 'name'))
+    return principals
@@ -10,7 +10,7 @@ import core_main_app.components.blob.api as blob_api
 from core_main_app.commons import exceptions
 from core_main_app.rest.blob.serializers import BlobSerializer, DeleteBlobsSerializer
 from core_main_app.utils.access_control.exceptions import AccessControlError
-from core_main_app.utils.file import get_file_http_response
+from core_main_app.utils.file import get_file_http_response, get_file_stream_http_response
 
 
 class BlobList(APIView):
@@ -194,7 +194,11 @@ class BlobDownload(APIView):
             # Get object
             blob_object = self.get_object(pk)
 
-            return get_file_http_response(blob_object.blob, blob_object.filename)
+            # stream the file if possible
+            blob_file = blob_object.open_blob_file()
+            if blob_file is not None:
+                return get_file_stream_http_response(request, blob_file, blob_object.filename)
+            return get_file_http_response(blob_object.blob, blob_object.filename, request=request)
         except Http404:
             content = {'message': 'Blob not found.'}
             return Response(content, status=status.HTTP_404_NOT_FOUND)
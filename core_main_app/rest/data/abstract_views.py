@@ -7,7 +7,10 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core_main_app.commons.exceptions import RestApiError
 from core_main_app.components.data import api as data_api
+from core_main_app.rest.data.utils import get_fields_from_request
+from core_main_app.utils import data_query_cache
 from core_main_app.utils.query.constants import VISIBILITY_OPTION
 from core_main_app.utils.query.mongo.query_builder import QueryBuilder
 
@@ -59,13 +62,30 @@ class AbstractExecuteLocalQueryView(APIView):
             if query is not None:
                 # prepare query
                 raw_query = self.build_query(query, templates, options)
+                if not data_query_cache.is_enabled():
+                    return self.build_response(self.execute_raw_query(raw_query))
+
+                # return the cached results of the query
+                cache_key = data_query_cache.get_key(type(self).__name__, raw_query,
+                                                     [template['id'] for template in templates],
+                                                     self.request.user, self.get_cache_parameters())
+                results = data_query_cache.get_results(cache_key)
+                if results is not None:
+                    return Response(results)
+
                 # execute query
                 data_list = self.execute_raw_query(raw_query)
                 # build and return response
-                return self.build_response(data_list)
+                response = self.build_response(data_list)
+                if response.status_code == status.HTTP_200_OK:
+                    data_query_cache.set_results(cache_key, response.data)
+                return response
             else:
                 content = {'message': 'Expected parameters not provided.'}
                 return Response(content, status=status.HTTP_400_BAD_REQUEST)
+        except RestApiError as rest_api_error:
+            content = {'message': rest_api_error.message}
+            return Response(content, status=status.HTTP_400_BAD_REQUEST)
         except Exception as api_exception:
             content = {'message': api_exception.message}
             return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -93,6 +113,32 @@ class AbstractExecuteLocalQueryView(APIView):
         # get raw query
         return query_builder.get_raw_query()
 
+    def get_fields(self):
+        """ Return the data fields to load, from the fields parameter of the request.
+
+        Returns:
+            List of fields, None to load all fields.
+
+        """
+        return get_fields_from_request(self.request)
+
+    def get_cache_parameters(self):
+        """ Return the parameters of the request, other than the query, changing the response (page, cursor, fields,
+        options).
+
+        Returns:
+            Parameters used in the key of the cached results.
+
+        """
+        data = self.request.data if hasattr(self.request.data, 'get') else {}
+        return {
+            'url': self.request.build_absolute_uri(),
+            'all': data.get('all', None),
+            'pagination': data.get('pagination', None),
+            'fields': data.get('fields', None),
+            'options': data.get('options', None),
+        }
+
     def execute_raw_query(self, raw_query):
         """ Execute the raw query in database.
         Args:
@@ -102,7 +148,7 @@ class AbstractExecuteLocalQueryView(APIView):
             Results of the query.
 
         """
-        return data_api.execute_query(raw_query, self.request.user)
+        return data_api.execute_query(raw_query, self.request.user, fields=self.get_fields())
 
     @abstractmethod
     def build_response(self, data_list):
@@ -5,6 +5,7 @@ from rest_framework_mongoengine.serializers import DocumentSerializer
 
 import core_main_app.components.data.api as data_api
 from core_main_app.components.data.models import Data
+from core_main_app.components.data_job.models import DataJob
 
 
 class XMLContentField(serializers.Field):
@@ -35,6 +36,21 @@ class DataSerializer(DocumentSerializer):
                   "last_modification_date"]
         read_only_fields = ('id', 'user_id', 'last_modification_date', )
 
+    def __init__(self, *args, **kwargs):
+        """ Create the serializer.
+
+        Args:
+            *args:
+            **kwargs: fields - List of fields to serialize (all fields if None).
+        """
+        fields = kwargs.pop('fields', None)
+        super(DataSerializer, self).__init__(*args, **kwargs)
+
+        if fields is not None:
+            # drop the fields not requested
+            for field_name in set(self.fields.keys()) - set(fields):
+                self.fields.pop(field_name)
+
     def create(self, validated_data):
         """
         Create and return a new `Data` instance, given the validated data.
@@ -75,3 +91,21 @@ class DataWithTemplateInfoSerializer(DocumentSerializer):
                   "xml_content",
                   "last_modification_date"]
 
+
+class DataJobSerializer(DocumentSerializer):
+    """ Data job serializer
+    """
+    class Meta:
+        """ Meta
+        """
+        model = DataJob
+        fields = ["id",
+                  "template",
+                  "user_id",
+                  "title",
+                  "status",
+                  "data_id",
+                  "message",
+                  "creation_date",
+                  "completion_date"]
+        read_only_fields = fields
@@ -0,0 +1,224 @@
+""" Utils for data rest Apis
+"""
+import json
+import tarfile
+import zipfile
+
+from core_main_app.commons.exceptions import RestApiError
+from core_main_app.components.data.models import Data
+from core_main_app.rest.data.serializers import DataSerializer
+from core_main_app.components.template import api as template_api
+from core_main_app.settings import BULK_UPLOAD_MAX_FILES, BULK_UPLOAD_MAX_FILE_SIZE, BULK_UPLOAD_MAX_TOTAL_SIZE, \
+    BULK_UPLOAD_MAX_RECORDS
+
+
+def get_data_list_from_archive(archive_file, template, user):
+    """ Build a list of data from the XML files of a zip or tar archive. The title of each data is its file name.
+
+    Args:
+        archive_file: Uploaded archive.
+        template: Template of the data.
+        user:
+
+    Returns:
+        List of data.
+
+    """
+    data_list = []
+    for file_name, xml_content in _read_archive(archive_file):
+        data = Data(template=template, title=file_name, user_id=str(user.id))
+        data.xml_content = xml_content
+        data_list.append(data)
+    return data_list
+
+
+def get_data_list_from_ndjson(stream, user, template_id=None):
+    """ Build a list of data from a newline delimited JSON stream, one data per line:
+        {"template": "<template_id>", "title": "<title>", "xml_content": "<xml>"}
+
+    Args:
+        stream: Iterable of lines.
+        user:
+        template_id: Template id used for the lines without template.
+
+    Returns:
+        List of data.
+
+    Raises:
+        RestApiError: A line is invalid, or the stream exceeds the bulk upload limits.
+
+    """
+    data_list = []
+    templates = {}
+    total_size = 0
+    for line_number, line in enumerate(stream, 1):
+        if len(line) > BULK_UPLOAD_MAX_FILE_SIZE:
+            raise RestApiError("Line {} is larger than {} bytes.".format(line_number, BULK_UPLOAD_MAX_FILE_SIZE))
+        total_size += len(line)
+        if total_size > BULK_UPLOAD_MAX_TOTAL_SIZE:
+            raise RestApiError("The stream is larger than {} bytes.".format(BULK_UPLOAD_MAX_TOTAL_SIZE))
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            line_template_id = record.get('template', template_id)
+            title = record['title']
+            xml_content = record['xml_content']
+        except Exception:
+            raise RestApiError("Line {} is not a valid data record.".format(line_number))
+
+        if line_template_id is None:
+            raise RestApiError("Line {}: template not provided.".format(line_number))
+        if line_template_id not in templates:
+            # raises DoesNotExist if the template is not found
+            templates[line_template_id] = template_api.get(line_template_id)
+
+        if len(data_list) == BULK_UPLOAD_MAX_RECORDS:
+            raise RestApiError("The stream contains more than {} data.".format(BULK_UPLOAD_MAX_RECORDS))
+        data = Data(template=templates[line_template_id], title=title, user_id=str(user.id))
+        data.xml_content = xml_content
+        data_list.append(data)
+    return data_list
+
+
+def get_fields_from_request(request):
+    """ Return the data fields requested with the fields parameter: comma separated list (fields=id,title) in the
+    query parameters or in the request data, or list of field names in the request data.
+
+    Args:
+        request:
+
+    Returns:
+        List of fields, None if all fields are requested.
+
+    """
+    fields = request.query_params.get('fields', None)
+    if fields is None and hasattr(request.data, 'get'):
+        fields = request.data.get('fields', None)
+    if fields is None:
+        return None
+
+    if isinstance(fields, basestring):
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown_fields = [field for field in fields if field not in DataSerializer.Meta.fields]
+    if len(unknown_fields) > 0:
+        raise RestApiError("Unknown fields: {}.".format(', '.join(unknown_fields)))
+    return fields
+
+
+def prefetch_xml_content(data_list, fields=None):
+    """ Read at once the xml files of a list of data to serialize, if the xml content is serialized.
+
+    Args:
+        data_list:
+        fields: Serialized fields (all fields if None).
+
+    Returns:
+        List of data.
+
+    """
+    data_list = list(data_list)
+    if fields is None or 'xml_content' in fields:
+        Data.prefetch_xml_content(data_list)
+    return data_list
+
+
+def _read_archive(archive_file):
+    """ Iterate over the files of a zip or tar archive. The number of files and their decompressed size are limited
+    (BULK_UPLOAD_MAX_FILES, BULK_UPLOAD_MAX_FILE_SIZE, BULK_UPLOAD_MAX_TOTAL_SIZE).
+
+    Args:
+        archive_file:
+
+    Returns:
+        Generator of (file name, file content).
+
+    """
+    limits = _ArchiveLimits()
+    if zipfile.is_zipfile(archive_file):
+        archive_file.seek(0)
+        with zipfile.ZipFile(archive_file) as archive:
+            for info in archive.infolist():
+                if not info.filename.endswith('/'):
+                    limits.check_file(info.filename, info.file_size)
+                    with archive.open(info) as member_file:
+                        yield _get_file_name(info.filename), limits.read(info.filename, member_file)
+    else:
+        archive_file.seek(0)
+        try:
+            archive = tarfile.open(fileobj=archive_file)
+        except tarfile.TarError:
+            raise RestApiError("The uploaded file is not a zip or tar archive.")
+        with archive:
+            for member in archive:
+                if member.isfile():
+                    limits.check_file(member.name, member.size)
+                    yield _get_file_name(member.name), limits.read(member.name, archive.extractfile(member))
+
+
+class _ArchiveLimits(object):
+    """ Number of files and decompressed size of the files read from an archive, checked against the limits.
+    """
+
+    def __init__(self):
+        self.file_count = 0
+        self.total_size = 0
+
+    def check_file(self, path, size):
+        """ Check the limits before reading a file, with the size declared by the archive.
+
+        Args:
+            path:
+            size:
+
+        Returns:
+
+        """
+        self.file_count += 1
+        if self.file_count > BULK_UPLOAD_MAX_FILES:
+            raise RestApiError("The archive contains more than {} files.".format(BULK_UPLOAD_MAX_FILES))
+        self._check_size(path, size)
+
+    def read(self, path, member_file):
+        """ Read a file of the archive, without reading more than the limits: the size declared by the archive may
+        be wrong.
+
+        Args:
+            path:
+            member_file:
+
+        Returns:
+
+        """
+        content = member_file.read(min(BULK_UPLOAD_MAX_FILE_SIZE, BULK_UPLOAD_MAX_TOTAL_SIZE - self.total_size) + 1)
+        self._check_size(path, len(content))
+        self.total_size += len(content)
+        return content
+
+    def _check_size(self, path, size):
+        """ Check the size of a file against the limits.
+
+        Args:
+            path:
+            size:
+
+        Returns:
+
+        """
+        if size > BULK_UPLOAD_MAX_FILE_SIZE:
+            raise RestApiError("The file {} is larger than {} bytes.".format(path, BULK_UPLOAD_MAX_FILE_SIZE))
+        if self.total_size + size > BULK_UPLOAD_MAX_TOTAL_SIZE:
+            raise RestApiError("The files of the archive are larger than {} bytes.".format(BULK_UPLOAD_MAX_TOTAL_SIZE))
+
+
+def _get_file_name(path):
+    """ Return the name of a file in an archive, without its folders.
+
+    Args:
+        path:
+
+    Returns:
+
+    """
+    return path.rsplit('/', 1)[-1]
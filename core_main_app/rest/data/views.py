@@ -2,6 +2,7 @@
 """
 import json
 
+from django.core.exceptions import RequestDataTooBig
 from django.http import Http404
 from rest_framework import status
 from rest_framework.decorators import api_view
@@ -11,14 +12,23 @@ from rest_framework.views import APIView
 
 from core_main_app.commons import exceptions
 from core_main_app.components.data import api as data_api
+from core_main_app.components.data_job import api as data_job_api
+from core_main_app.components.template import api as template_api
 from core_main_app.components.workspace import api as workspace_api
 from core_main_app.rest.data.abstract_views import AbstractExecuteLocalQueryView
-from core_main_app.rest.data.serializers import DataSerializer, DataWithTemplateInfoSerializer
+from core_main_app.rest.data.serializers import DataSerializer, DataWithTemplateInfoSerializer, DataJobSerializer
+from core_main_app.rest.data.utils import get_data_list_from_archive, get_data_list_from_ndjson, \
+    get_fields_from_request, prefetch_xml_content
+from core_main_app.settings import USE_BACKGROUND_DATA_INGESTION, KEYWORD_SEARCH_MAX_RESULTS
 from core_main_app.utils.access_control.exceptions import AccessControlError
 from core_main_app.utils.boolean import to_bool
-from core_main_app.utils.databases.pymongo_database import get_full_text_query
-from core_main_app.utils.file import get_file_http_response
-from core_main_app.utils.pagination.rest_framework_paginator.pagination import StandardResultsSetPagination
+from core_main_app.utils.databases.pymongo_database import get_keywords
+from core_main_app.utils.file import get_file_http_response, get_file_stream_http_response
+from core_main_app.utils.highlight import get_snippet, get_xml_text
+from core_main_app.utils.pagination.rest_framework_paginator.pagination import StandardResultsSetPagination, \
+    KeysetResultsSetPagination, LimitedResultsSetPagination, is_cursor_pagination_requested
+from core_main_app.utils.query.constants import KEYWORD_MODE_OPTION, KEYWORD_MODE_ALL, KEYWORD_MODE_ANY, \
+    KEYWORD_MODE_PHRASE, HIGHLIGHT_OPTION
 
 
 # FIXME: permissions
@@ -32,6 +42,11 @@ class DataList(APIView):
         Query Params:
             template: template id
             title: title
+            accessible: true to get all the data accessible by the user (owned or in an accessible workspace)
+            fields: comma separated list of fields to return (id,title)
+            pagination: cursor, to get pages of results
+            cursor: cursor of the page (returned in the next and previous links)
+            count: exact, approximate or none (cursor pagination only)
 
         Args:
             request:
@@ -41,7 +56,10 @@ class DataList(APIView):
         """
         try:
             # Get object
-            data_object_list = data_api.get_all_by_user(request.user)
+            if self.request.query_params.get('accessible', None) == 'true':
+                data_object_list = data_api.get_all_accessible_by_user(request.user)
+            else:
+                data_object_list = data_api.get_all_by_user(request.user)
 
             # Apply filters
             template = self.request.query_params.get('template', None)
@@ -52,11 +70,31 @@ class DataList(APIView):
             if title is not None:
                 data_object_list = data_object_list.filter(title=title)
 
+            # Load the returned fields only
+            fields = get_fields_from_request(request)
+            data_object_list = data_object_list.only(
+                *data_api.get_projection(fields if fields is not None else DataSerializer.Meta.fields))
+
+            if is_cursor_pagination_requested(request):
+                # Get requested page from list of results
+                paginator = KeysetResultsSetPagination()
+                page = paginator.paginate_queryset(data_object_list, request)
+
+                # Serialize page
+                data_serializer = DataSerializer(prefetch_xml_content(page, fields), many=True, fields=fields)
+
+                # Return paginated response
+                return paginator.get_paginated_response(data_serializer.data)
+
             # Serialize object
-            data_serializer = DataSerializer(data_object_list, many=True)
+            data_serializer = DataSerializer(prefetch_xml_content(data_object_list, fields), many=True,
+                                             fields=fields)
 
             # Return response
             return Response(data_serializer.data, status=status.HTTP_200_OK)
+        except exceptions.RestApiError as rest_api_error:
+            content = {'message': rest_api_error.message}
+            return Response(content, status=status.HTTP_400_BAD_REQUEST)
         except Exception as api_exception:
             content = {'message': api_exception.message}
             return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -76,6 +114,15 @@ class DataList(APIView):
 
             # Validate data
             data_serializer.is_valid(True)
+
+            if USE_BACKGROUND_DATA_INGESTION:
+                # Save data in the background, return the job to follow
+                data_job = data_job_api.create(data_serializer.validated_data['template'],
+                                               data_serializer.validated_data['title'],
+                                               data_serializer.validated_data['xml_content'],
+                                               request.user)
+                return Response(DataJobSerializer(data_job).data, status=status.HTTP_202_ACCEPTED)
+
             # Save data
             data_serializer.save(user=request.user)
 
@@ -92,6 +139,94 @@ class DataList(APIView):
             return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class DataJobDetail(APIView):
+    """ Retrieve the status of a data saved in the background.
+    """
+    def get(self, request, pk):
+        """ Retrieve a data job
+
+        /rest/data/jobs/<id>/
+
+        Args:
+            request:
+            pk:
+
+        Returns:
+
+        """
+        try:
+            data_job = data_job_api.get_by_id(pk, request.user)
+            return Response(DataJobSerializer(data_job).data)
+        except exceptions.DoesNotExist:
+            content = {'message': 'Job not found.'}
+            return Response(content, status=status.HTTP_404_NOT_FOUND)
+        except AccessControlError as ace:
+            content = {'message': ace.message}
+            return Response(content, status=status.HTTP_403_FORBIDDEN)
+        except Exception as api_exception:
+            content = {'message': api_exception.message}
+            return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class DataBulkUpload(APIView):
+    """ Create a list of data.
+    """
+    def post(self, request):
+        """ Create data in bulk, from an archive of XML files or from an NDJSON stream.
+
+        /rest/data/bulk/
+
+        Archive (multipart/form-data):
+            template: template id
+            file: zip or tar archive of XML files (the file names are used as titles)
+
+        NDJSON stream (application/x-ndjson), one data per line:
+            {"template": "<template_id>", "title": "<title>", "xml_content": "<xml>"}
+            /rest/data/bulk/?template=<template_id> sets the template of the lines without template
+
+        Args:
+            request:
+
+        Returns:
+            Status of each data (index, title, status, id, message)
+
+        """
+        try:
+            if request.content_type.startswith('application/x-ndjson'):
+                # read the lines from the request stream, the size of the stream is limited by the bulk upload settings
+                data_list = get_data_list_from_ndjson(request._request,
+                                                      request.user,
+                                                      request.query_params.get('template', None))
+            else:
+                archive_file = request.FILES.get('file', None)
+                template_id = request.data.get('template', None)
+                if archive_file is None or template_id is None:
+                    content = {'message': 'Expected parameters not provided.'}
+                    return Response(content, status=status.HTTP_400_BAD_REQUEST)
+                data_list = get_data_list_from_archive(archive_file, template_api.get(template_id), request.user)
+
+            # Save data
+            report = data_api.bulk_upsert(data_list, request.user)
+
+            # Return the status of each data
+            return Response(report, status=status.HTTP_200_OK)
+        except exceptions.RestApiError as rest_api_error:
+            content = {'message': rest_api_error.message}
+            return Response(content, status=status.HTTP_400_BAD_REQUEST)
+        except exceptions.DoesNotExist:
+            content = {'message': 'Template not found.'}
+            return Response(content, status=status.HTTP_400_BAD_REQUEST)
+        except AccessControlError as ace:
+            content = {'message': ace.message}
+            return Response(content, status=status.HTTP_403_FORBIDDEN)
+        except RequestDataTooBig as request_data_too_big:
+            content = {'message': request_data_too_big.message}
+            return Response(content, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        except Exception as api_exception:
+            content = {'message': api_exception.message}
+            return Response(content, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class DataDetail(APIView):
     """
     Retrieve, update or delete a data.
@@ -232,7 +367,12 @@ class DataDownload(APIView):
             # Get object
             data_object = self.get_object(request, pk)
 
-            return get_file_http_response(data_object.xml_content, data_object.title, 'text/xml', 'xml')
+            # stream the file if possible
+            xml_file = data_object.xml_file.get() if data_object.xml_file else None
+            if xml_file is not None:
+                return get_file_stream_http_response(request, xml_file, data_object.title, 'text/xml', 'xml')
+            return get_file_http_response(data_object.xml_content, data_object.title, 'text/xml', 'xml',
+                                          request=request)
         except Http404:
             content = {'message': 'Data not found.'}
             return Response(content, status=status.HTTP_404_NOT_FOUND)
@@ -286,10 +426,13 @@ class ExecuteLocalQueryView(AbstractExecuteLocalQueryView):
 
         /rest/data/query/
         /rest/data/query/?page=2
+        /rest/data/query/?cursor=<cursor>
 
         Example Data:
             {"query": "{\"root.element.value\": 2}"}
             {"query": "{\"root.element.value\": 2}", "all": "true"}
+            {"query": "{\"root.element.value\": 2}", "pagination": "cursor"}
+            {"query": "{\"root.element.value\": 2}", "fields": "id,title"}
             {"query": "{\"root.element.value\": 2}", "templates": "[{\"id\":\"<template_id>\"}]"}
             {"query": "{}", "templates": "[{\"id\":\"<template_id>\"}]"}
 
@@ -301,6 +444,15 @@ class ExecuteLocalQueryView(AbstractExecuteLocalQueryView):
         """
         return super(ExecuteLocalQueryView, self).post(request)
 
+    def get_fields(self):
+        """ Return the data fields to load: the requested fields, or the fields of the serializer.
+
+        Returns:
+
+        """
+        fields = super(ExecuteLocalQueryView, self).get_fields()
+        return fields if fields is not None else DataSerializer.Meta.fields
+
     def build_response(self, data_list):
         """ Build the response.
 
@@ -313,26 +465,83 @@ class ExecuteLocalQueryView(AbstractExecuteLocalQueryView):
         """
         if 'all' in self.request.data and to_bool(self.request.data['all']):
             # Serialize data list
-            data_serializer = DataSerializer(data_list, many=True)
+            serialized_data_list = self.serialize_data_list(data_list)
             # Return response
-            return Response(data_serializer.data)
+            return Response(serialized_data_list)
         else:
             # Get paginator
-            paginator = StandardResultsSetPagination()
+            paginator = self.get_paginator()
 
             # Get requested page from list of results
             page = paginator.paginate_queryset(data_list, self.request)
 
             # Serialize page
-            data_serializer = DataSerializer(page, many=True)
+            serialized_data_list = self.serialize_data_list(page)
 
             # Return paginated response
-            return paginator.get_paginated_response(data_serializer.data)
+            return paginator.get_paginated_response(serialized_data_list)
+
+    def get_paginator(self):
+        """ Return the paginator of the results.
+
+        Returns:
+
+        """
+        if is_cursor_pagination_requested(self.request):
+            return KeysetResultsSetPagination()
+        return StandardResultsSetPagination()
+
+    def serialize_data_list(self, data_list):
+        """ Serialize a list of data.
+
+        Args:
+            data_list:
+
+        Returns:
+            List of serialized data.
+
+        """
+        fields = self.get_fields()
+        data_serializer = DataSerializer(prefetch_xml_content(data_list, fields), many=True, fields=fields)
+        return data_serializer.data
 
 
 class ExecuteLocalKeywordQueryView(ExecuteLocalQueryView):
+    """ Keyword search. Results are sorted by relevance (text score) and limited to the most relevant results, so the
+    matches are not all counted.
+    """
+    def __init__(self, **kwargs):
+        super(ExecuteLocalKeywordQueryView, self).__init__(**kwargs)
+        self.keywords = []
+        self.mode = KEYWORD_MODE_ALL
+        self.highlight = False
+
+    def post(self, request):
+        """ Execute a keyword search.
+
+        /rest/data/query/keyword/
+        /rest/data/query/keyword/?page=2
+
+        Example Data:
+            {"query": "keyword1 keyword2"}
+            {"query": "keyword1 keyword2", "options": "{\"keyword_mode\": \"any\"}"}
+            {"query": "keyword1 keyword2", "options": "{\"keyword_mode\": \"phrase\", \"highlight\": true}"}
+
+        Options:
+            keyword_mode: all (default, data with all the keywords), any (data with one of the keywords) or phrase
+                (data with the keywords in this order)
+            highlight: add an extract of the data with the keywords highlighted (snippet) to each result
+
+        Args:
+            request:
+
+        Returns:
+
+        """
+        return super(ExecuteLocalKeywordQueryView, self).post(request)
+
     def build_query(self, query, templates, options):
-        """ Build the raw query. Prepare the query for a keyword search.
+        """ Build the raw query. The keywords are searched by the search backend, with the raw query.
         Args:
             query:
             templates:
@@ -342,9 +551,93 @@ class ExecuteLocalKeywordQueryView(ExecuteLocalQueryView):
             The raw query.
 
         """
-        # build query builder
-        query = json.dumps(get_full_text_query(query))
-        return super(ExecuteLocalKeywordQueryView, self).build_query(str(query), templates, options)
+        self.mode = options.get(KEYWORD_MODE_OPTION, KEYWORD_MODE_ALL)
+        if self.mode not in (KEYWORD_MODE_ALL, KEYWORD_MODE_ANY, KEYWORD_MODE_PHRASE):
+            raise exceptions.RestApiError("Unknown keyword mode: {}.".format(self.mode))
+
+        self.keywords = get_keywords(query)
+        self.highlight = to_bool(options.get(HIGHLIGHT_OPTION, False))
+        return super(ExecuteLocalKeywordQueryView, self).build_query('{}', templates, options)
+
+    def get_cache_parameters(self):
+        """ Return the parameters of the request, other than the query, changing the response.
+
+        Returns:
+
+        """
+        parameters = super(ExecuteLocalKeywordQueryView, self).get_cache_parameters()
+        parameters['keywords'] = self.keywords
+        return parameters
+
+    def execute_raw_query(self, raw_query):
+        """ Execute the raw query and the keyword search, the most relevant data first.
+        Args:
+            raw_query: Query to execute.
+
+        Returns:
+            Results of the query.
+
+        """
+        if len(self.keywords) == 0:
+            # no keyword: all the data matching the raw query
+            return data_api.execute_query(raw_query, self.request.user, fields=self._get_loaded_fields())
+
+        return data_api.execute_text_query(raw_query, ' '.join(self.keywords), self.mode, self.request.user,
+                                           fields=self._get_loaded_fields(), limit=KEYWORD_SEARCH_MAX_RESULTS)
+
+    def get_paginator(self):
+        """ Return the paginator of the results. The results are sorted by relevance: the pages are numbered, and
+        counted up to the limit of the search.
+
+        Returns:
+
+        """
+        if len(self.keywords) > 0 and KEYWORD_SEARCH_MAX_RESULTS is not None:
+            return LimitedResultsSetPagination()
+        return StandardResultsSetPagination()
+
+    def serialize_data_list(self, data_list):
+        """ Serialize a list of data, with the highlighted keywords if requested.
+
+        Args:
+            data_list:
+
+        Returns:
+            List of serialized data.
+
+        """
+        data_list = prefetch_xml_content(data_list, self._get_loaded_fields())
+        data_serializer = DataSerializer(data_list, many=True, fields=self.get_fields())
+        serialized_data_list = data_serializer.data
+        if self.highlight:
+            self._add_snippets(data_list, serialized_data_list)
+        return serialized_data_list
+
+    def _get_loaded_fields(self):
+        """ Return the data fields to load. The xml content is loaded to highlight the keywords.
+
+        Returns:
+
+        """
+        fields = self.get_fields()
+        if self.highlight and 'xml_content' not in fields:
+            fields = list(fields) + ['xml_content']
+        return fields
+
+    def _add_snippets(self, data_list, serialized_data_list):
+        """ Add the extract of the data with the highlighted keywords to the serialized data.
+
+        Args:
+            data_list:
+            serialized_data_list:
+
+        Returns:
+
+        """
+        for data, serialized_data in zip(data_list, serialized_data_list):
+            xml_content = data.xml_content
+            serialized_data['snippet'] = get_snippet(get_xml_text(xml_content), self.keywords) \
+                if xml_content is not None else None
 
 
 class DataAssign(APIView):
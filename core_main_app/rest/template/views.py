@@ -89,7 +89,8 @@ class TemplateDownload(APIView):
             # Get object
             template_object = self.get_object(pk)
 
-            return get_file_http_response(template_object.content, template_object.filename, 'text/xsd', 'xsd')
+            return get_file_http_response(template_object.content, template_object.filename, 'text/xsd', 'xsd',
+                                          request=request)
         except Http404:
             content = {'message': 'Template not found.'}
             return Response(content, status=status.HTTP_404_NOT_FOUND)
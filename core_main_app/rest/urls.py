@@ -65,6 +65,12 @@ urlpatterns = [
     url(r'^data/$', data_views.DataList.as_view(),
         name='core_main_app_rest_data_list'),
 
+    url(r'^data/bulk/$', data_views.DataBulkUpload.as_view(),
+        name='core_main_app_rest_data_bulk'),
+
+    url(r'^data/jobs/(?P<pk>\w+)/$', data_views.DataJobDetail.as_view(),
+        name='core_main_app_rest_data_job_detail'),
+
     url(r'^data/download/(?P<pk>\w+)/$', data_views.DataDownload.as_view(),
         name='core_main_app_rest_data_download'),
 
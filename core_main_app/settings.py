@@ -34,6 +34,72 @@ XERCES_VALIDATION = getattr(settings, 'XERCES_VALIDATION', False)
 """:py:class:`bool`: Enables Xerces validation (requires additional packages).
 """
 
+XSD_SCHEMA_CACHE_SIZE = getattr(settings, 'XSD_SCHEMA_CACHE_SIZE', 50)
+""" int: Maximum number of compiled XML schemas kept in memory for data validation (0 disables the cache).
+"""
+
+XSLT_CACHE_SIZE = getattr(settings, 'XSLT_CACHE_SIZE', 50)
+""" int: Maximum number of compiled XSLT kept in memory by each thread (0 disables the cache).
+"""
+
+XSLT_RENDERING_CACHE_TTL = getattr(settings, 'XSLT_RENDERING_CACHE_TTL', 60)
+""" int: Number of seconds the XSLT used to render the data of a template is kept in memory (0 disables the cache).
+"""
+
+XML_VALIDATION_PROCESSES = getattr(settings, 'XML_VALIDATION_PROCESSES', None)
+""" :py:class:`int` | :py:attr:`None`: Number of processes validating documents in parallel (None: number of CPUs).
+"""
+
+XML_VALIDATION_MIN_BATCH_SIZE = getattr(settings, 'XML_VALIDATION_MIN_BATCH_SIZE', 20)
+""" int: Minimum number of documents to validate before using a pool of processes.
+"""
+
+BULK_UPLOAD_MAX_FILES = getattr(settings, 'BULK_UPLOAD_MAX_FILES', 10000)
+""" int: Maximum number of files of an archive uploaded to create data in bulk.
+"""
+
+BULK_UPLOAD_MAX_RECORDS = getattr(settings, 'BULK_UPLOAD_MAX_RECORDS', 10000)
+""" int: Maximum number of data of an NDJSON stream uploaded to create data in bulk.
+"""
+
+BULK_UPLOAD_MAX_FILE_SIZE = getattr(settings, 'BULK_UPLOAD_MAX_FILE_SIZE', 10 * 1024 * 1024)
+""" int: Maximum size in bytes of a file of an archive (once decompressed) or of a line of an NDJSON stream uploaded
+to create data in bulk.
+"""
+
+BULK_UPLOAD_MAX_TOTAL_SIZE = getattr(settings, 'BULK_UPLOAD_MAX_TOTAL_SIZE', 200 * 1024 * 1024)
+""" int: Maximum size in bytes of the files of an archive (once decompressed) or of an NDJSON stream uploaded to
+create data in bulk.
+"""
+
+# Queries
+PREPARED_QUERY_CACHE_SIZE = getattr(settings, 'PREPARED_QUERY_CACHE_SIZE', 500)
+""" int: Maximum number of parsed and prepared data queries kept in memory (0 disables the cache).
+"""
+
+QUERY_REGEX_CACHE_SIZE = getattr(settings, 'QUERY_REGEX_CACHE_SIZE', 500)
+""" int: Maximum number of compiled regular expressions of the data queries kept in memory (0 disables the cache).
+"""
+
+KEYWORD_SEARCH_MAX_RESULTS = getattr(settings, 'KEYWORD_SEARCH_MAX_RESULTS', 1000)
+""" :py:class:`int` | :py:attr:`None`: Maximum number of results of a keyword search, the most relevant first. The
+results are counted up to this limit (None: all results are counted).
+"""
+
+KEYWORD_SNIPPET_LENGTH = getattr(settings, 'KEYWORD_SNIPPET_LENGTH', 200)
+""" int: Length of the extract of the data returned with the results of a keyword search, when highlight is requested.
+"""
+
+SEARCH_BACKEND = getattr(settings, 'SEARCH_BACKEND', 'mongo')
+""" str: Engine of the keyword search: mongo (text index of MongoDB on all the strings of the data) or local
+(inverted index of the searchable paths of the data, in a local file). Run the rebuild_search_index command after a
+change.
+"""
+
+LOCAL_SEARCH_INDEX_PATH = getattr(settings, 'LOCAL_SEARCH_INDEX_PATH', 'search_index.sqlite3')
+""" str: Path of the index file of the local search backend.
+"""
+
 # GridFS
 GRIDFS_DATA_COLLECTION = getattr(settings, 'GRIDFS_DATA_COLLECTION', 'fs_data')
 """ str: Collection name for file storage in MongoDB.
@@ -44,6 +110,23 @@ USE_BACKGROUND_TASK = getattr(settings, 'USE_BACKGROUND_TASK', False)
 """ bool: Define use of celery for background tasks
 """
 
+USE_BACKGROUND_DATA_INGESTION = getattr(settings, 'USE_BACKGROUND_DATA_INGESTION', False)
+""" bool: Save the data created with the REST API in a background task (celery): the request returns a job to follow.
+"""
+
+DATA_INGESTION_BATCH_SIZE = getattr(settings, 'DATA_INGESTION_BATCH_SIZE', 100)
+""" int: Maximum number of data of a template validated and saved together by the background task.
+"""
+
+DATA_INGESTION_BATCH_DELAY = getattr(settings, 'DATA_INGESTION_BATCH_DELAY', 2)
+""" int: Number of seconds the background task waits to group the data received for a template.
+"""
+
+DATA_INGESTION_JOB_TIMEOUT = getattr(settings, 'DATA_INGESTION_JOB_TIMEOUT', 3600)
+""" int: Number of seconds after which a running data job is considered stopped (worker stopped during the batch), and
+is claimed again.
+"""
+
 BROKER_URL = getattr(settings, 'BROKER_URL', 'redis://localhost:6379/0')
 """ str: Celery broker address
 """
@@ -131,11 +214,51 @@ LOCK_OBJECT_TTL = getattr(settings, 'LOCK_OBJECT_TTL', 600)  # 10 min
 """ int: Lock duration on files
 """
 
+# Workspace access
+WORKSPACE_ACCESS_CONTEXT_TTL = getattr(settings, 'WORKSPACE_ACCESS_CONTEXT_TTL', 5)
+""" int: Number of seconds the workspaces accessible by a user are reused before being computed again (0 disables it).
+"""
+
+WORKSPACE_PERMISSIONS_CACHE = getattr(settings, 'WORKSPACE_PERMISSIONS_CACHE', 'default')
+""" str: Django cache (alias of CACHES) storing the workspace permissions of the users. Use a cache shared by the
+workers (e.g. memcached) so a permission change is seen by all of them.
+"""
+
+WORKSPACE_PERMISSIONS_CACHE_TTL = getattr(settings, 'WORKSPACE_PERMISSIONS_CACHE_TTL', 300)
+""" int: Number of seconds the workspace permissions of a user are kept in the cache (0 disables the cache).
+"""
+
+USE_ACCESS_PRINCIPALS = getattr(settings, 'USE_ACCESS_PRINCIPALS', False)
+""" bool: Authorize the data and workspace queries with the principals (users, groups, public) stored on the documents,
+instead of listing the permissions of the user. Run the rebuild_access_principals command before enabling it.
+"""
+
+VERIFY_DATA_QUERY_RESULTS = getattr(settings, 'VERIFY_DATA_QUERY_RESULTS', False)
+""" bool: Check the access to each data returned by a query. Queries are already filtered by the access criteria,
+so results are returned lazily without verification by default.
+"""
+
+DATA_QUERY_CACHE = getattr(settings, 'DATA_QUERY_CACHE', 'default')
+""" str: Django cache (alias of CACHES) storing the results of the data queries of the REST API.
+"""
+
+DATA_QUERY_CACHE_TTL = getattr(settings, 'DATA_QUERY_CACHE_TTL', 0)
+""" int: Number of seconds the results of a data query are kept in the cache (0 disables the cache).
+"""
+
 # Results per page for paginator
 RESULTS_PER_PAGE = getattr(settings, 'RESULTS_PER_PAGE', 10)
 """ int: Results per page
 """
 
+CURSOR_PAGINATION_COUNT_MODE = getattr(settings, 'CURSOR_PAGINATION_COUNT_MODE', 'approximate')
+""" str: Count of the results returned with cursor pagination: exact, approximate (counted up to a limit) or none.
+"""
+
+CURSOR_PAGINATION_APPROXIMATE_COUNT_LIMIT = getattr(settings, 'CURSOR_PAGINATION_APPROXIMATE_COUNT_LIMIT', 1000)
+""" int: Maximum number of results counted by the approximate count of cursor pagination.
+"""
+
 CAN_SET_PUBLIC_DATA_TO_PRIVATE = getattr(settings, 'CAN_SET_PUBLIC_DATA_TO_PRIVATE', True)
 """ bool: Can set public data to private
 """
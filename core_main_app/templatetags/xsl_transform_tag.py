@@ -1,16 +1,25 @@
 """XSL Transformation tag
 """
+import time
+
 from django import template
 from django.contrib.staticfiles import finders
 
 from core_main_app.commons import exceptions
 from core_main_app.components.template_xsl_rendering import api as template_xsl_rendering_api
-from core_main_app.settings import DEFAULT_DATA_RENDERING_XSLT
+from core_main_app.settings import DEFAULT_DATA_RENDERING_XSLT, XSLT_CACHE_SIZE, XSLT_RENDERING_CACHE_TTL
+from core_main_app.utils import xslt_cache
 from core_main_app.utils.file import read_file_content
+from core_main_app.utils.lru_cache import LRUCache
 from core_main_app.utils.xml import xsl_transform
 
 register = template.Library()
 
+# XSLT used to render the data of a template: (template id, template hash, xslt type) -> (generation, time, xslt)
+_rendering_xslt_cache = LRUCache(XSLT_CACHE_SIZE)
+# content of the default XSLT
+_default_xslt = None
+
 
 class XSLType(object):
     type_list = "List"
@@ -64,24 +73,62 @@ def _render_xml_as_html(xml_string, template_id=None, template_hash=None, xslt_t
 
     """
     try:
-        try:
-            if template_id:
-                template_xsl_rendering = template_xsl_rendering_api.get_by_template_id(template_id)
-            elif template_hash:
-                template_xsl_rendering = template_xsl_rendering_api.get_by_template_hash(template_hash)
-            else:
-                raise Exception("No template information provided. Default xslt will be used.")
-
-            if xslt_type == XSLType.type_list:
-                xslt_string = template_xsl_rendering.list_xslt.content
-            elif xslt_type == XSLType.type_detail:
-                xslt_string = template_xsl_rendering.detail_xslt.content
-            else:
-                raise Exception("XSLT Type unknown. Default xslt will be used.")
-        except (Exception, exceptions.DoesNotExist):
-            default_xslt_path = finders.find(DEFAULT_DATA_RENDERING_XSLT)
-            xslt_string = read_file_content(default_xslt_path)
-
-        return xsl_transform(xml_string, xslt_string)
+        xslt_id, xslt_string = _get_rendering_xslt(template_id, template_hash, xslt_type)
+        return xsl_transform(xml_string, xslt_string, xslt_id)
     except Exception:
         return xml_string
+
+
+def _get_rendering_xslt(template_id=None, template_hash=None, xslt_type=XSLType.type_list):
+    """ Return the XSLT rendering the data of a template. The XSLT is kept in memory for the next data.
+
+    Args:
+        template_id:
+        template_hash:
+        xslt_type:
+
+    Returns:
+        XslTransformation id (None for the default xslt), XSLT string
+
+    """
+    key = (template_id, template_hash, xslt_type)
+    entry = _rendering_xslt_cache.get(key)
+    # reuse the XSLT if recent enough and if no XSLT changed
+    if entry is not None and entry[0] == xslt_cache.get_generation() \
+            and time.time() - entry[1] < XSLT_RENDERING_CACHE_TTL:
+        return entry[2]
+
+    generation = xslt_cache.get_generation()
+    try:
+        if template_id:
+            template_xsl_rendering = template_xsl_rendering_api.get_by_template_id(template_id)
+        elif template_hash:
+            template_xsl_rendering = template_xsl_rendering_api.get_by_template_hash(template_hash)
+        else:
+            raise Exception("No template information provided. Default xslt will be used.")
+
+        if xslt_type == XSLType.type_list:
+            xslt = template_xsl_rendering.list_xslt
+        elif xslt_type == XSLType.type_detail:
+            xslt = template_xsl_rendering.detail_xslt
+        else:
+            raise Exception("XSLT Type unknown. Default xslt will be used.")
+        rendering_xslt = (xslt.id, xslt.content)
+    except (Exception, exceptions.DoesNotExist):
+        rendering_xslt = (None, _get_default_xslt())
+
+    _rendering_xslt_cache.set(key, (generation, time.time(), rendering_xslt))
+    return rendering_xslt
+
+
+def _get_default_xslt():
+    """ Return the default XSLT, read once from the static files.
+
+    Returns:
+
+    """
+    global _default_xslt
+    if _default_xslt is None:
+        default_xslt_path = finders.find(DEFAULT_DATA_RENDERING_XSLT)
+        _default_xslt = read_file_content(default_xslt_path)
+    return _default_xslt
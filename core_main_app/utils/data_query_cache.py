@@ -0,0 +1,220 @@
+""" Cache of the results of the data queries, stored in the Django cache. Results are keyed by the query, the user and
+the version of the workspace permissions, and by a generation counter per template changed each time a data of the
+template is saved or deleted. A global generation, included in every key, is changed when all the data change.
+"""
+import hashlib
+import threading
+import time
+
+from bson import json_util
+from django.core.cache import caches
+
+from core_main_app.permissions import api as permission_api
+from core_main_app.settings import DATA_QUERY_CACHE, DATA_QUERY_CACHE_TTL
+
+KEY_PREFIX = 'core_main_app:data_query:'
+# generation of the queries not filtered by template
+ALL_TEMPLATES = 'all'
+# generation of all the queries
+EPOCH = 'epoch'
+
+_stats_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def is_enabled():
+    """ Check if the query results are cached.
+
+    Returns:
+
+    """
+    return DATA_QUERY_CACHE_TTL > 0
+
+
+def get_key(name, raw_query, template_ids, user, parameters=None):
+    """ Return the cache key of the results of a query.
+
+    Args:
+        name: Name of the query (e.g. view name).
+        raw_query: Query, with the template and visibility criteria.
+        template_ids: Ids of the templates filtering the query (all templates if empty).
+        user: User executing the query.
+        parameters: Other parameters changing the results (pagination, fields).
+
+    Returns:
+
+    """
+    template_keys = sorted(str(template_id) for template_id in template_ids) or [ALL_TEMPLATES]
+    generation_keys = [_get_generation_key(template_key) for template_key in template_keys + [EPOCH]]
+    generations = _get_generations(generation_keys)
+
+    key_content = json_util.dumps([
+        name,
+        raw_query,
+        parameters,
+        str(user.id) if not user.is_anonymous else None,
+        permission_api.get_access_version(),
+        [generations.get(generation_key) for generation_key in generation_keys],
+    ], sort_keys=True)
+    return KEY_PREFIX + hashlib.sha1(key_content.encode('utf-8')).hexdigest()
+
+
+def get_results(key):
+    """ Return the cached results of a query.
+
+    Args:
+        key:
+
+    Returns:
+        Results, None if not in the cache.
+
+    """
+    global _hits, _misses
+    value = _get_cache().get(key)
+    with _stats_lock:
+        if value is None:
+            _misses += 1
+        else:
+            _hits += 1
+    return value
+
+
+def set_results(key, value):
+    """ Store the results of a query.
+
+    Args:
+        key:
+        value:
+
+    Returns:
+
+    """
+    _get_cache().set(key, value, DATA_QUERY_CACHE_TTL)
+
+
+def invalidate(template_ids):
+    """ Change the generation of templates, so the cached results of the queries on their data are not reused.
+
+    Args:
+        template_ids: Ids of the templates of the data saved or deleted.
+
+    Returns:
+
+    """
+    if not is_enabled():
+        return
+
+    template_keys = set(str(template_id) for template_id in template_ids)
+    # queries not filtered by template return data of all templates
+    template_keys.add(ALL_TEMPLATES)
+    for template_key in template_keys:
+        _increment_generation(template_key)
+
+
+def invalidate_all():
+    """ Change the global generation, so no cached results are reused (e.g. after a change of all the data).
+
+    Returns:
+
+    """
+    if not is_enabled():
+        return
+
+    _increment_generation(EPOCH)
+
+
+def get_stats():
+    """ Return the hit/miss counters of the cache, for this process.
+
+    Returns:
+        dict: hits, misses and hit ratio.
+
+    """
+    with _stats_lock:
+        lookups = _hits + _misses
+        return {
+            'hits': _hits,
+            'misses': _misses,
+            'hit_ratio': float(_hits) / lookups if lookups > 0 else 0.0,
+        }
+
+
+def clear_stats():
+    """ Reset the hit/miss counters.
+
+    Returns:
+
+    """
+    global _hits, _misses
+    with _stats_lock:
+        _hits = 0
+        _misses = 0
+
+
+def _get_generations(generation_keys):
+    """ Return the generations of templates, starting the missing ones.
+
+    Args:
+        generation_keys:
+
+    Returns:
+        Dict: generation key -> generation.
+
+    """
+    cache = _get_cache()
+    generations = cache.get_many(generation_keys)
+    for generation_key in generation_keys:
+        if generation_key not in generations:
+            # new generation, so results cached before an eviction of the generation are not reused
+            cache.add(generation_key, _new_generation(), None)
+            generations[generation_key] = cache.get(generation_key)
+    return generations
+
+
+def _increment_generation(template_key):
+    """ Change the generation of a template.
+
+    Args:
+        template_key:
+
+    Returns:
+
+    """
+    cache = _get_cache()
+    generation_key = _get_generation_key(template_key)
+    try:
+        cache.incr(generation_key)
+    except ValueError:
+        # generation not in the cache (evicted or never read): start a new one
+        cache.set(generation_key, _new_generation(), None)
+
+
+def _new_generation():
+    """ Return a new generation, different from the generations used before.
+
+    Returns:
+
+    """
+    return int(time.time() * 1000000)
+
+
+def _get_generation_key(template_key):
+    """ Return the cache key of the generation of a template.
+
+    Args:
+        template_key:
+
+    Returns:
+
+    """
+    return KEY_PREFIX + 'generation:' + template_key
+
+
+def _get_cache():
+    """ Get the cache of the query results.
+
+    Returns:
+
+    """
+    return caches[DATA_QUERY_CACHE]
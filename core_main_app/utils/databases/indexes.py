@@ -0,0 +1,117 @@
+""" Management of the indexes declared by the documents (meta indexes), and query plan helpers to check that the
+queries use them.
+"""
+from core_main_app.components.data.models import Data
+from core_main_app.components.data_job.models import DataJob
+from core_main_app.components.lock.models import DatabaseLockObject
+from core_main_app.components.template.models import Template
+from core_main_app.components.version_manager.models import VersionManager
+from core_main_app.components.workspace.models import Workspace
+
+# documents declaring indexes (subclasses stored in the same collection share the indexes of their parent)
+INDEXED_DOCUMENTS = [Data, DataJob, Workspace, Template, VersionManager, DatabaseLockObject]
+
+# stage of a query plan reading the whole collection
+COLLECTION_SCAN_STAGE = 'COLLSCAN'
+
+
+def ensure_indexes(documents=None):
+    """ Create the missing indexes of the documents. Indexes are built in the background.
+
+    Args:
+        documents: List of documents (all indexed documents if None).
+
+    Returns:
+
+    """
+    for document in _get_documents(documents):
+        document.ensure_indexes()
+
+
+def compare_indexes(documents=None):
+    """ Compare the indexes declared by the documents with the indexes of the database.
+
+    Args:
+        documents: List of documents (all indexed documents if None).
+
+    Returns:
+        Dict: collection name -> {'missing': list of index keys, 'extra': list of index keys}
+
+    """
+    differences = {}
+    for document in _get_documents(documents):
+        comparison = document.compare_indexes()
+        # the _id index and the text indexes are not declared by the documents
+        comparison['extra'] = [index for index in comparison['extra']
+                               if index != [('_id', 1)] and not _is_text_index(index)]
+        differences[document._get_collection_name()] = comparison
+    return differences
+
+
+def get_query_plan_stages(queryset):
+    """ Return the stages of the winning plan of a query.
+
+    Args:
+        queryset: QuerySet or pymongo Cursor.
+
+    Returns:
+        List of stage names, from the last stage to the first.
+
+    """
+    explanation = queryset.explain()
+    plan = explanation['queryPlanner']['winningPlan']
+    return _get_plan_stages(plan)
+
+
+def uses_collection_scan(queryset):
+    """ Check if a query reads the whole collection instead of using an index.
+
+    Args:
+        queryset: QuerySet or pymongo Cursor.
+
+    Returns:
+
+    """
+    return COLLECTION_SCAN_STAGE in get_query_plan_stages(queryset)
+
+
+def _get_plan_stages(plan):
+    """ Return the stages of a query plan and of its input stages.
+
+    Args:
+        plan:
+
+    Returns:
+
+    """
+    stages = [plan['stage']]
+    input_stages = plan.get('inputStages', [])
+    if 'inputStage' in plan:
+        input_stages = [plan['inputStage']] + input_stages
+    for input_stage in input_stages:
+        stages.extend(_get_plan_stages(input_stage))
+    return stages
+
+
+def _get_documents(documents):
+    """ Return the documents to process.
+
+    Args:
+        documents:
+
+    Returns:
+
+    """
+    return INDEXED_DOCUMENTS if documents is None else documents
+
+
+def _is_text_index(index):
+    """ Check if an index is a text index.
+
+    Args:
+        index: Index keys.
+
+    Returns:
+
+    """
+    return any(key in ('_fts', '_ftsx') for key, direction in index)
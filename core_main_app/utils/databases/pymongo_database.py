@@ -6,6 +6,7 @@ from pymongo import MongoClient
 from pymongo.errors import OperationFailure
 
 from core_main_app.commons import exceptions
+from core_main_app.utils.query.constants import KEYWORD_MODE_ALL, KEYWORD_MODE_ANY, KEYWORD_MODE_PHRASE
 
 
 class Database(object):
@@ -75,20 +76,55 @@ class Database(object):
                 pass
 
 
-def get_full_text_query(text):
+def get_keywords(text):
+    """ Return the keywords of a text.
+
+    Args:
+        text:
+
+    Returns: List of keywords
+
+    """
+    return re.sub("[^\w]", " ", text, flags=re.UNICODE).split()
+
+
+def get_full_text_search(text, mode=KEYWORD_MODE_ALL):
+    """ Return the search string of a full text query.
+
+    Args:
+        text: List of keywords
+        mode: all (documents with all the keywords), any (documents with one of the keywords, the most relevant
+            first) or phrase (documents with the keywords in this order)
+
+    Returns: The search string, empty if the text has no keyword
+
+    """
+    word_list = get_keywords(text)
+    if len(word_list) == 0:
+        return ''
+
+    if mode == KEYWORD_MODE_ALL:
+        return ' '.join(['"'+x+'"' for x in word_list])
+    elif mode == KEYWORD_MODE_ANY:
+        return ' '.join(word_list)
+    elif mode == KEYWORD_MODE_PHRASE:
+        return '"' + ' '.join(word_list) + '"'
+    raise exceptions.ApiError("Unknown keyword mode: {}.".format(mode))
+
+
+def get_full_text_query(text, mode=KEYWORD_MODE_ALL):
     """ Return a full text query.
 
     Args:
         text: List of keywords
+        mode: all, any or phrase
 
     Returns: The corresponding query
 
     """
     full_text_query = {}
-    word_list = re.sub("[^\w]", " ", text, flags=re.UNICODE).split()
-    word_list = ['"'+x+'"' for x in word_list]
-    word_list = ' '.join(word_list)
-    if len(word_list) > 0:
-        full_text_query = {'$text': {'$search': word_list}}
+    search = get_full_text_search(text, mode)
+    if len(search) > 0:
+        full_text_query = {'$text': {'$search': search}}
 
     return full_text_query
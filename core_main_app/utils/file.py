@@ -1,13 +1,26 @@
 """File utils
 """
+import hashlib
+import re
 from io import BytesIO
 from mimetypes import guess_type
 
 from core_main_app.commons.exceptions import CoreError
-from django.http.response import HttpResponse
+from django.http.response import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 
+# default size of the chunks sent by a streaming response (GridFS default chunk size)
+STREAM_CHUNK_SIZE = 255 * 1024
 
-def get_file_http_response(file_content, file_name, content_type=None, extension=''):
+_RANGE_REGEX = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    """ The requested range is outside of the file.
+    """
+    pass
+
+
+def get_file_http_response(file_content, file_name, content_type=None, extension='', request=None):
     """Return http response with file to download.
 
     Args:
@@ -15,34 +28,204 @@ def get_file_http_response(file_content, file_name, content_type=None, extension
         file_name:
         content_type:
         extension:
+        request: If set, the response is streamed and supports Range and If-None-Match headers.
 
     Returns:
 
     """
     try:
         # set file content
+        if file_content is None:
+            file_content = b''
         try:
-            _file = BytesIO(file_content.encode('utf-8'))
+            file_content = file_content.encode('utf-8')
         except Exception:
-            _file = BytesIO(file_content)
+            pass
+        _file = BytesIO(file_content)
+
+        if request is not None:
+            return get_file_stream_http_response(request, _file, file_name, content_type, extension,
+                                                 length=len(file_content),
+                                                 md5=hashlib.md5(file_content).hexdigest())
+
         # guess file content type if not set
         if content_type is None:
             content_type = guess_type(file_name)
         # set file in http response
         response = HttpResponse(_file, content_type=content_type)
-        # set filename extension
-        if not file_name.endswith(extension):
-            if not extension.startswith("."):
-                extension = "." + extension
-            file_name += extension
         # set content disposition in response
-        response['Content-Disposition'] = 'attachment; filename=' + file_name
+        response['Content-Disposition'] = 'attachment; filename=' + _get_file_name(file_name, extension)
         # return response
         return response
     except Exception:
         raise CoreError('An unexpected error occurred.')
 
 
+def get_file_stream_http_response(request, file_object, file_name, content_type=None, extension='', length=None,
+                                  md5=None):
+    """Return http response streaming a file to download, without reading it in memory. Supports single byte
+    ranges (Range, If-Range) and conditional requests (If-None-Match) based on the md5 of the file.
+
+    Args:
+        request:
+        file_object: File with read and seek methods (e.g. GridOut from GridFS).
+        file_name:
+        content_type:
+        extension:
+        length: Size of the file (length attribute of the file if not set).
+        md5: Md5 of the file (md5 attribute of the file if not set).
+
+    Returns:
+
+    """
+    try:
+        length = file_object.length if length is None else length
+        md5 = getattr(file_object, 'md5', None) if md5 is None else md5
+        etag = '"{}"'.format(md5) if md5 else None
+
+        # file not modified since the client got it
+        if etag is not None and _etag_matches(request.META.get('HTTP_IF_NONE_MATCH', None), etag):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+        try:
+            byte_range = _get_byte_range(request, length, etag)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */{}'.format(length)
+            return response
+
+        # guess file content type if not set
+        if content_type is None:
+            content_type = guess_type(file_name)[0] or 'application/octet-stream'
+
+        chunk_size = getattr(file_object, 'chunk_size', None) or STREAM_CHUNK_SIZE
+        if byte_range is None:
+            response = StreamingHttpResponse(_stream_file(file_object, 0, length, chunk_size),
+                                             content_type=content_type)
+            response['Content-Length'] = str(length)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(_stream_file(file_object, start, end - start + 1, chunk_size),
+                                             status=206,
+                                             content_type=content_type)
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, length)
+
+        response['Accept-Ranges'] = 'bytes'
+        if etag is not None:
+            response['ETag'] = etag
+        # set content disposition in response
+        response['Content-Disposition'] = 'attachment; filename=' + _get_file_name(file_name, extension)
+        return response
+    except Exception:
+        raise CoreError('An unexpected error occurred.')
+
+
+def _get_file_name(file_name, extension):
+    """Return the file name with its extension.
+
+    Args:
+        file_name:
+        extension:
+
+    Returns:
+
+    """
+    if not file_name.endswith(extension):
+        if not extension.startswith("."):
+            extension = "." + extension
+        file_name += extension
+    return file_name
+
+
+def _etag_matches(if_none_match, etag):
+    """Check if an If-None-Match header matches an ETag.
+
+    Args:
+        if_none_match:
+        etag:
+
+    Returns:
+
+    """
+    if if_none_match is None:
+        return False
+    etags = [value.strip() for value in if_none_match.split(',')]
+    return '*' in etags or etag in etags or 'W/' + etag in etags
+
+
+def _get_byte_range(request, length, etag):
+    """Return the byte range requested by the Range header.
+
+    Args:
+        request:
+        length: Size of the file.
+        etag:
+
+    Returns:
+        (first byte, last byte), None to send the whole file.
+
+    Raises:
+        RangeNotSatisfiable: The range is outside of the file.
+
+    """
+    range_header = request.META.get('HTTP_RANGE', None)
+    if range_header is None:
+        return None
+
+    # the range only applies to the version of the file given by If-Range
+    if_range = request.META.get('HTTP_IF_RANGE', None)
+    if if_range is not None and if_range != etag:
+        return None
+
+    # only single ranges are supported, send the whole file otherwise
+    match = _RANGE_REGEX.match(range_header.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if first == '' and last == '':
+        return None
+    if first == '':
+        # suffix range: last bytes of the file
+        suffix_length = int(last)
+        if suffix_length == 0 or length == 0:
+            raise RangeNotSatisfiable()
+        return max(length - suffix_length, 0), length - 1
+
+    first = int(first)
+    last = length - 1 if last == '' else min(int(last), length - 1)
+    if first >= length:
+        raise RangeNotSatisfiable()
+    if last < first:
+        return None
+    return first, last
+
+
+def _stream_file(file_object, start, size, chunk_size):
+    """Read a part of a file chunk by chunk.
+
+    Args:
+        file_object:
+        start: Position of the first byte.
+        size: Number of bytes to read.
+        chunk_size:
+
+    Returns:
+
+    """
+    file_object.seek(start)
+    remaining = size
+    while remaining > 0:
+        chunk = file_object.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+
 def read_file_content(file_path):
     """Read the content of a file.
 
@@ -0,0 +1,74 @@
+""" Highlight of the keywords of a search in the content of the results
+"""
+import re
+
+from django.utils.html import escape
+from lxml import etree
+
+from core_main_app.settings import KEYWORD_SNIPPET_LENGTH
+
+HIGHLIGHT_START = '<em>'
+HIGHLIGHT_END = '</em>'
+ELLIPSIS = '...'
+
+
+def get_xml_text(xml_content):
+    """ Return the text of an XML document, without the tags and with the entities resolved (the text is not
+    escaped).
+
+    Args:
+        xml_content:
+
+    Returns:
+
+    """
+    try:
+        # explicit parser: the default parser may be set to remove the comments, which would merge the text around them
+        parser = etree.XMLParser(remove_comments=False, resolve_entities=False)
+        xml_bytes = xml_content.encode('utf-8') if isinstance(xml_content, unicode) else xml_content
+        # text nodes only, not the content of the comments and processing instructions
+        text_nodes = etree.fromstring(xml_bytes, parser).xpath('//text()')
+    except Exception:
+        # not well-formed XML
+        text_nodes = [re.sub(r'<[^>]*>', ' ', xml_content)]
+    return ' '.join(' '.join(text_nodes).split())
+
+
+def get_snippet(text, keywords, length=KEYWORD_SNIPPET_LENGTH):
+    """ Return an extract of a text around the first keyword found, with the keywords highlighted. The text is
+    HTML escaped.
+
+    Args:
+        text:
+        keywords: List of keywords.
+        length: Length of the extract.
+
+    Returns:
+        The extract, the start of the text if no keyword is found.
+
+    """
+    if len(keywords) == 0:
+        keywords_regex = None
+        first_match = None
+    else:
+        keywords_regex = re.compile(r'\b(?:{})\b'.format('|'.join(re.escape(keyword) for keyword in keywords)),
+                                    flags=re.IGNORECASE | re.UNICODE)
+        first_match = keywords_regex.search(text)
+
+    # center the extract on the first keyword
+    start = 0 if first_match is None else max(0, first_match.start() - length // 2)
+    end = min(len(text), start + length)
+    start = max(0, end - length)
+    extract = text[start:end]
+
+    parts = [] if start == 0 else [ELLIPSIS]
+    position = 0
+    if keywords_regex is not None:
+        for match in keywords_regex.finditer(extract):
+            parts.extend([escape(extract[position:match.start()]),
+                          HIGHLIGHT_START, escape(match.group()), HIGHLIGHT_END])
+            position = match.end()
+    parts.append(escape(extract[position:]))
+    if end < len(text):
+        parts.append(ELLIPSIS)
+    return ''.join(parts)
@@ -0,0 +1,107 @@
+""" Bounded least-recently-used cache
+"""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """ Thread safe, size bounded, least-recently-used cache keeping hit/miss counters.
+    """
+
+    def __init__(self, max_size):
+        """ Create an LRU cache.
+
+        Args:
+            max_size: Maximum number of entries. A size of 0 disables the cache.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        """ Return the value stored for the key, and mark it as recently used.
+
+        Args:
+            key:
+            default: Value returned if the key is not in the cache.
+
+        Returns:
+
+        """
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            # re-insert the entry at the end (most recently used)
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """ Store a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key:
+            value:
+
+        Returns:
+
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """ Remove the entry stored for the key, if any.
+
+        Args:
+            key:
+
+        Returns:
+
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """ Remove all entries and reset the counters.
+
+        Returns:
+
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self):
+        """ Return the cache statistics.
+
+        Returns:
+            dict: hits, misses, current size and maximum size of the cache.
+
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -1,9 +1,330 @@
 """Pagination configuration for rest_framework
 """
+import base64
+from collections import OrderedDict
 
-from rest_framework.pagination import PageNumberPagination
-from core_main_app.settings import RESULTS_PER_PAGE
+from bson import json_util
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from mongoengine import Document
+from mongoengine.queryset.visitor import Q
+from rest_framework.pagination import PageNumberPagination, BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core_main_app.commons.exceptions import RestApiError
+from core_main_app.settings import RESULTS_PER_PAGE, CURSOR_PAGINATION_COUNT_MODE, \
+    CURSOR_PAGINATION_APPROXIMATE_COUNT_LIMIT
+
+COUNT_EXACT = 'exact'
+COUNT_APPROXIMATE = 'approximate'
+COUNT_NONE = 'none'
+
+PAGINATION_PARAM = 'pagination'
+CURSOR_PAGINATION = 'cursor'
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = RESULTS_PER_PAGE
+
+
+class LimitedCountPaginator(Paginator):
+    """ Paginator of a limited mongoengine queryset (or of a list): the results are counted up to the limit of the
+    queryset instead of counting all the matches.
+    """
+
+    @cached_property
+    def count(self):
+        """ Return the number of results, up to the limit of the queryset.
+
+        Returns:
+
+        """
+        if isinstance(self.object_list, list):
+            return len(self.object_list)
+        return self.object_list.count(with_limit_and_skip=True)
+
+
+class LimitedResultsSetPagination(StandardResultsSetPagination):
+    """ Page number pagination of the first results of a limited queryset (e.g. most relevant results of a search).
+    """
+    django_paginator_class = LimitedCountPaginator
+
+
+class KeysetResultsSetPagination(BasePagination):
+    """ Cursor pagination of a mongoengine queryset. Results are sorted by the order field and the id, and a page
+    starts where the previous one ended (range query on the sort keys), so deep pages cost the same as the first one.
+
+    Response:
+        count: number of results (None if not counted)
+        count_is_exact: False if the count is a lower bound
+        next: url of the next page (opaque cursor)
+        previous: url of the previous page (opaque cursor)
+        results: page of results
+    """
+    page_size = RESULTS_PER_PAGE
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def __init__(self, order_by_field=None, count_mode=CURSOR_PAGINATION_COUNT_MODE):
+        """ Create the paginator.
+
+        Args:
+            order_by_field: Top level field to sort on, prefixed by '-' for descending order (id if not set).
+            count_mode: exact, approximate or none, can be changed by the count query parameter.
+        """
+        self.order_by_field = order_by_field
+        self.count_mode = count_mode
+        self.request = None
+        self.page = None
+        self.count = None
+        self.count_is_exact = False
+        self.has_next = False
+        self.has_previous = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """ Return the page of results requested by the cursor of the request.
+
+        Args:
+            queryset: mongoengine queryset.
+            request:
+            view:
+
+        Returns:
+            List of results.
+
+        """
+        self.request = request
+        cursor = self.decode_cursor(request)
+
+        # count the results before moving to the cursor
+        self._count(queryset, request.query_params.get(self.count_query_param, self.count_mode))
+
+        field, ascending = _parse_order_by_field(self.order_by_field)
+        is_reversed = cursor is not None and cursor['reverse']
+        # a previous page is read in the reverse order, from its cursor
+        scan_ascending = ascending != is_reversed
+        queryset = queryset.order_by(*_get_sort_keys(field, scan_ascending))
+        if cursor is not None:
+            queryset = queryset.filter(_get_keyset_filter(field, cursor['value'], cursor['id'], scan_ascending))
+
+        # get one more result to know if a page follows
+        results = list(queryset.limit(self.page_size + 1))
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if is_reversed:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        """ Return the paginated response.
+
+        Args:
+            data: Serialized page.
+
+        Returns:
+
+        """
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('count_is_exact', self.count_is_exact),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_next_link(self):
+        """ Return the url of the next page.
+
+        Returns:
+
+        """
+        if not self.has_next or len(self.page) == 0:
+            return None
+        return self._get_link(self.encode_cursor(self.page[-1], reverse=False))
+
+    def get_previous_link(self):
+        """ Return the url of the previous page.
+
+        Returns:
+
+        """
+        if not self.has_previous or len(self.page) == 0:
+            return None
+        return self._get_link(self.encode_cursor(self.page[0], reverse=True))
+
+    def encode_cursor(self, item, reverse):
+        """ Encode the position of an item in an opaque cursor.
+
+        Args:
+            item: Item of the page.
+            reverse: True to read the results before the item, False to read the results after.
+
+        Returns:
+
+        """
+        field, ascending = _parse_order_by_field(self.order_by_field)
+        cursor = {
+            'field': self.order_by_field,
+            'value': _get_item_value(item, field) if field is not None else None,
+            'id': item.pk,
+            'reverse': reverse
+        }
+        return base64.urlsafe_b64encode(json_util.dumps(cursor))
+
+    def decode_cursor(self, request):
+        """ Decode the cursor of the request.
+
+        Args:
+            request:
+
+        Returns:
+            The cursor (dict), None if no cursor is given.
+
+        """
+        encoded_cursor = request.query_params.get(self.cursor_query_param, None)
+        if encoded_cursor is None:
+            return None
+
+        try:
+            cursor = json_util.loads(base64.urlsafe_b64decode(str(encoded_cursor)))
+            if cursor['field'] != self.order_by_field or 'id' not in cursor or 'value' not in cursor:
+                raise ValueError()
+            cursor['reverse'] = bool(cursor.get('reverse', False))
+            return cursor
+        except Exception:
+            raise RestApiError("Invalid cursor.")
+
+    def _count(self, queryset, count_mode):
+        """ Count the results.
+
+        Args:
+            queryset:
+            count_mode:
+
+        Returns:
+
+        """
+        if count_mode == COUNT_EXACT:
+            self.count = queryset.count()
+            self.count_is_exact = True
+        elif count_mode == COUNT_APPROXIMATE:
+            # stop counting at the limit
+            self.count = queryset.limit(CURSOR_PAGINATION_APPROXIMATE_COUNT_LIMIT).count(with_limit_and_skip=True)
+            self.count_is_exact = self.count < CURSOR_PAGINATION_APPROXIMATE_COUNT_LIMIT
+        else:
+            self.count = None
+            self.count_is_exact = False
+
+    def _get_link(self, encoded_cursor):
+        """ Return the url of the request with a cursor.
+
+        Args:
+            encoded_cursor:
+
+        Returns:
+
+        """
+        url = self.request.build_absolute_uri()
+        # the cursor replaces the page number
+        url = remove_query_param(url, 'page')
+        return replace_query_param(url, self.cursor_query_param, encoded_cursor)
+
+
+def is_cursor_pagination_requested(request):
+    """ Check if the request asks for cursor pagination (pagination=cursor, or a cursor is given).
+
+    Args:
+        request:
+
+    Returns:
+
+    """
+    if KeysetResultsSetPagination.cursor_query_param in request.query_params:
+        return True
+    pagination = request.query_params.get(PAGINATION_PARAM, None)
+    if pagination is None and hasattr(request.data, 'get'):
+        pagination = request.data.get(PAGINATION_PARAM, None)
+    return pagination == CURSOR_PAGINATION
+
+
+def _parse_order_by_field(order_by_field):
+    """ Return the field name and the direction of the order.
+
+    Args:
+        order_by_field:
+
+    Returns:
+        field (None to sort by id only), True if ascending
+
+    """
+    if not order_by_field:
+        return None, True
+    if order_by_field.startswith('-'):
+        return order_by_field[1:], False
+    return order_by_field.lstrip('+'), True
+
+
+def _get_sort_keys(field, ascending):
+    """ Return the sort keys of a query.
+
+    Args:
+        field:
+        ascending:
+
+    Returns:
+
+    """
+    prefix = '' if ascending else '-'
+    sort_keys = [prefix + 'id']
+    if field is not None:
+        sort_keys.insert(0, prefix + field)
+    return sort_keys
+
+
+def _get_keyset_filter(field, value, last_id, ascending):
+    """ Return the filter selecting the results after a position, in the order of the scan.
+
+    Args:
+        field: Order field (None to sort by id only).
+        value: Value of the order field at the position.
+        last_id: Id at the position.
+        ascending: Direction of the scan.
+
+    Returns:
+
+    """
+    id_operator = 'gt' if ascending else 'lt'
+    after_id = Q(**{'id__' + id_operator: last_id})
+    if field is None:
+        return after_id
+
+    same_value = Q(**{field: value}) & after_id
+    # null values are sorted before all the other values
+    if value is None:
+        return same_value | Q(**{field + '__ne': None}) if ascending else same_value
+    after_value = Q(**{field + '__' + id_operator: value})
+    return same_value | after_value if ascending else same_value | after_value | Q(**{field: None})
+
+
+def _get_item_value(item, field):
+    """ Return the value of the order field of an item.
+
+    Args:
+        item:
+        field:
+
+    Returns:
+
+    """
+    value = getattr(item, field)
+    # references are sorted by id
+    return value.pk if isinstance(value, Document) else value
@@ -5,3 +5,10 @@ VISIBILITY_OPTION = 'visibility'
 VISIBILITY_USER = 'user'
 VISIBILITY_ALL = 'all'
 VISIBILITY_PUBLIC = 'public'
+
+KEYWORD_MODE_OPTION = 'keyword_mode'
+KEYWORD_MODE_ALL = 'all'
+KEYWORD_MODE_ANY = 'any'
+KEYWORD_MODE_PHRASE = 'phrase'
+
+HIGHLIGHT_OPTION = 'highlight'
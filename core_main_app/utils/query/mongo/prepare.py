@@ -1,11 +1,51 @@
 """Mongo query builder tools
 """
+import json
 import re
-import copy
+
+from core_main_app.settings import PREPARED_QUERY_CACHE_SIZE, QUERY_REGEX_CACHE_SIZE
+from core_main_app.utils.lru_cache import LRUCache
+
+# operators whose value is a list of queries
+LOGICAL_OPERATORS = ("$and", "$or", "$nor")
+
+# prepared queries, by raw query and preparation options
+_prepared_queries = LRUCache(PREPARED_QUERY_CACHE_SIZE)
+# compiled regular expressions, by pattern
+_regexes = LRUCache(QUERY_REGEX_CACHE_SIZE)
+
+
+def _get_regex(pattern):
+    """Return the compiled regular expression of a pattern
+
+    Args:
+        pattern:
+
+    Returns:
+
+    """
+    regex = _regexes.get(pattern)
+    if regex is None:
+        regex = re.compile(pattern)
+        _regexes.set(pattern, regex)
+    return regex
+
+
+def _is_regex(value):
+    """Check if a value is a regular expression (/pattern/)
+
+    Args:
+        value:
+
+    Returns:
+
+    """
+    return isinstance(value, basestring) and len(value) >= 2 and value[0] == "/" and value[-1] == "/"
 
 
 def _compile_regex(query):
-    """Compile all regular expressions in the query
+    """Compile all regular expressions in the query, including the expressions nested in logical operators
+    ($and, $or, $nor), $not and $elemMatch
 
     Args:
         query:
@@ -13,45 +53,77 @@ def _compile_regex(query):
     Returns:
 
     """
-    for key, value in query.iteritems():
-        if key == "$and" or key == "$or":
-            for sub_value in value:
-                _compile_regex(sub_value)
-        elif isinstance(value, unicode) or isinstance(value, str):
-            if len(value) >= 2 and value[0] == "/" and value[-1] == "/":
-                query[key] = re.compile(value[1:-1])
-        elif isinstance(value, dict):
-            _compile_regex(value)
+    # documents of the query left to process
+    documents = [query]
+    while documents:
+        document = documents.pop()
+        for key, value in document.iteritems():
+            if key in LOGICAL_OPERATORS:
+                documents.extend(value)
+            elif _is_regex(value):
+                document[key] = _get_regex(value[1:-1])
+            elif isinstance(value, dict):
+                documents.append(value)
 
 
 def _add_sub_document_root(query, sub_document_root):
-    """Adds a sub document root to each criteria
+    """Adds a sub document root to each criteria. Fields under $elemMatch are relative to the array element and
+    are left unchanged.
 
     Returns:
 
     """
-    for key in query.keys():
-        if key == "$and" or key == "$or":
-            for value in query[key]:
-                _add_sub_document_root(value, sub_document_root)
-        elif not key.startswith("$"):
-            query["{}.{}".format(sub_document_root, key)] = query.pop(key)
+    # documents of the query left to process
+    documents = [query]
+    while documents:
+        document = documents.pop()
+        for key in document.keys():
+            if key in LOGICAL_OPERATORS:
+                documents.extend(document[key])
+            elif not key.startswith("$"):
+                document["{}.{}".format(sub_document_root, key)] = document.pop(key)
 
 
-def prepare_query(query_dict, regex=True, sub_document_root=None):
-    """Prepares the query to before executing it
+def _copy_query(query):
+    """Copy the dicts and lists of a query. Other values (strings, numbers, compiled regular expressions) are
+    immutable and shared with the copy.
 
     Args:
-        query_dict:
+        query:
+
+    Returns:
+
+    """
+    query_copy = {}
+    # (source, copy) containers left to copy
+    containers = [(query, query_copy)]
+    while containers:
+        source, target = containers.pop()
+        items = source.iteritems() if isinstance(source, dict) else enumerate(source)
+        for key, value in items:
+            if isinstance(value, dict):
+                value_copy = {}
+            elif isinstance(value, list):
+                value_copy = [None] * len(value)
+            else:
+                target[key] = value
+                continue
+            target[key] = value_copy
+            containers.append((value, value_copy))
+    return query_copy
+
+
+def _prepare(query, regex, sub_document_root):
+    """Prepares the query in place
+
+    Args:
+        query:
         regex:
         sub_document_root:
 
     Returns:
 
     """
-    # get a copy of the query
-    query = copy.deepcopy(query_dict)
-
     if regex:
         # compile the regular expressions
         _compile_regex(query)
@@ -61,3 +133,62 @@ def prepare_query(query_dict, regex=True, sub_document_root=None):
         _add_sub_document_root(query, sub_document_root)
 
     return query
+
+
+def prepare_query(query_dict, regex=True, sub_document_root=None):
+    """Prepares the query to before executing it
+
+    Args:
+        query_dict:
+        regex:
+        sub_document_root:
+
+    Returns:
+
+    """
+    # prepare a copy of the query
+    return _prepare(_copy_query(query_dict), regex, sub_document_root)
+
+
+def prepare_raw_query(raw_query, regex=True, sub_document_root=None):
+    """Prepares a JSON query to before executing it. Prepared queries are cached: the same JSON query is parsed and
+    prepared once.
+
+    Args:
+        raw_query: JSON string.
+        regex:
+        sub_document_root:
+
+    Returns:
+        Copy of the prepared query, that can be modified.
+
+    """
+    key = (raw_query, regex, sub_document_root)
+    query = _prepared_queries.get(key)
+    if query is None:
+        query = _prepare(json.loads(raw_query), regex, sub_document_root)
+        _prepared_queries.set(key, query)
+    return _copy_query(query)
+
+
+def get_stats():
+    """Return the statistics of the prepared queries and compiled regular expressions caches
+
+    Returns:
+        dict: statistics of each cache.
+
+    """
+    return {
+        'queries': _prepared_queries.get_stats(),
+        'regexes': _regexes.get_stats(),
+    }
+
+
+def clear_cache():
+    """Remove the prepared queries and compiled regular expressions from the caches
+
+    Returns:
+
+    """
+    _prepared_queries.clear()
+    _regexes.clear()
@@ -14,10 +14,7 @@ def add_access_criteria(query, accessible_workspaces, user):
 
     """
     access_criteria = _get_accessible_criteria(accessible_workspaces, user)
-    # add access criteria to original query
-    query = {'$and': [query, access_criteria]}
-    # return query
-    return query
+    return _add_criteria(query, access_criteria)
 
 
 def add_aggregate_access_criteria(query, accessible_workspaces, user):
@@ -31,8 +28,67 @@ def add_aggregate_access_criteria(query, accessible_workspaces, user):
     Returns:
 
     """
-    has_match_criteria = False
     access_criteria = _get_accessible_criteria(accessible_workspaces, user)
+    return _add_aggregate_criteria(query, access_criteria)
+
+
+def add_principals_access_criteria(query, principals, user):
+    """ Add access criteria to the query, using the read principals stored on the data.
+
+    Args:
+        query:
+        principals: Principals of the user.
+        user:
+
+    Returns:
+
+    """
+    access_criteria = _get_principals_criteria(principals, user)
+    return _add_criteria(query, access_criteria)
+
+
+def add_aggregate_principals_access_criteria(query, principals, user):
+    """ Add access criteria to an aggregation query, using the read principals stored on the data.
+
+    Args:
+        query:
+        principals: Principals of the user.
+        user:
+
+    Returns:
+
+    """
+    access_criteria = _get_principals_criteria(principals, user)
+    return _add_aggregate_criteria(query, access_criteria)
+
+
+def _add_criteria(query, access_criteria):
+    """ Add criteria to a query.
+
+    Args:
+        query:
+        access_criteria:
+
+    Returns:
+
+    """
+    # add access criteria to original query
+    query = {'$and': [query, access_criteria]}
+    # return query
+    return query
+
+
+def _add_aggregate_criteria(query, access_criteria):
+    """ Add criteria to an aggregation query.
+
+    Args:
+        query:
+        access_criteria:
+
+    Returns:
+
+    """
+    has_match_criteria = False
     # Update $match with access criteria if exist.
     for elt in query:
         if '$match' in elt:
@@ -64,3 +120,17 @@ def _get_accessible_criteria(accessible_workspaces, user):
     access_criteria = {'$or': [workspace_criteria, user_criteria]}
     # return access criteria
     return access_criteria
+
+
+def _get_principals_criteria(principals, user):
+    """ Get accessible criteria using the read principals of the data.
+
+    Args:
+        principals:
+        user:
+
+    Returns:
+
+    """
+    # data readable by one of the principals of the user, or owned by the user
+    return {'$or': [{'read_principals': {'$in': principals}}, {'user_id': str(user.id)}]}
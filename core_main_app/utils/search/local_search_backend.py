@@ -0,0 +1,271 @@
+""" Full text search with a local inverted index, stored in a SQLite file
+"""
+import math
+import os
+import sqlite3
+import threading
+
+from bson.objectid import ObjectId
+
+from core_main_app.components.data.models import Data
+from core_main_app.settings import LOCAL_SEARCH_INDEX_PATH
+from core_main_app.utils.databases.pymongo_database import get_keywords
+from core_main_app.utils.query.constants import KEYWORD_MODE_ANY, KEYWORD_MODE_PHRASE
+from core_main_app.utils.search.search_backend import SearchBackend
+
+# number of ranked data read at once from the database, to filter them with the query
+DATA_BATCH_SIZE = 500
+# seconds waited for the lock of the index file, written by several processes
+LOCK_TIMEOUT = 30
+
+CREATE_TABLES = [
+    'CREATE TABLE IF NOT EXISTS documents (data_id TEXT PRIMARY KEY, length INTEGER NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS postings (term TEXT NOT NULL, data_id TEXT NOT NULL, frequency INTEGER NOT NULL, '
+    'positions TEXT NOT NULL, PRIMARY KEY (term, data_id))',
+    'CREATE INDEX IF NOT EXISTS postings_data_id ON postings (data_id)',
+]
+
+
+class LocalSearchBackend(SearchBackend):
+    """ Full text search with an inverted index of the strings of the dict content of the data (the searchable
+    paths of their template), stored in a SQLite file and updated when the data are saved or deleted. Results are
+    ranked by TF-IDF, then filtered by the query (template, visibility and access criteria) in the database.
+    """
+
+    def __init__(self, path=LOCAL_SEARCH_INDEX_PATH):
+        """ Create the backend.
+
+        Args:
+            path: Path of the index file (':memory:' for an index in memory).
+        """
+        self.path = path
+        self._connection = None
+        self._connection_pid = None
+        self._lock = threading.RLock()
+
+    def init(self):
+        """ Create the tables of the index, if missing.
+
+        Returns:
+
+        """
+        with self._lock:
+            self._get_connection()
+
+    def execute_text_query(self, query, text, mode, projection=None, limit=None):
+        """ Return the data matching a query and containing the keywords, the most relevant first.
+
+        Args:
+            query:
+            text:
+            mode:
+            projection:
+            limit:
+
+        Returns:
+            List of data.
+
+        """
+        terms = [_to_unicode(keyword.lower()) for keyword in get_keywords(text)]
+        if len(terms) == 0:
+            return []
+
+        ranked_data_ids = self.rank(terms, mode)
+        results = []
+        for start in range(0, len(ranked_data_ids), DATA_BATCH_SIZE):
+            data_ids = ranked_data_ids[start:start + DATA_BATCH_SIZE]
+            # keep the data matching the query, in the order of the ranking
+            data_query = {'$and': [query, {'_id': {'$in': [ObjectId(data_id) for data_id in data_ids]}}]}
+            data_by_id = {str(data.pk): data for data in Data.execute_query(data_query, projection=projection)}
+            for data_id in data_ids:
+                if data_id in data_by_id:
+                    results.append(data_by_id[data_id])
+                    if limit is not None and len(results) >= limit:
+                        return results
+        return results
+
+    def rank(self, terms, mode):
+        """ Return the ids of the data containing the terms, the most relevant first.
+
+        Args:
+            terms: List of lower case terms.
+            mode: all, any or phrase.
+
+        Returns:
+            List of data ids.
+
+        """
+        unique_terms = sorted(set(terms))
+        with self._lock:
+            connection = self._get_connection()
+            document_count = connection.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+            rows = connection.execute('SELECT p.term, p.data_id, p.frequency, p.positions, d.length '
+                                      'FROM postings p JOIN documents d ON d.data_id = p.data_id '
+                                      'WHERE p.term IN ({})'.format(', '.join('?' * len(unique_terms))),
+                                      unique_terms).fetchall()
+
+        # postings of the terms, by data
+        postings_by_data = {}
+        lengths = {}
+        document_frequencies = dict.fromkeys(unique_terms, 0)
+        for term, data_id, frequency, positions, length in rows:
+            postings_by_data.setdefault(data_id, {})[term] = (frequency, positions)
+            lengths[data_id] = length
+            document_frequencies[term] += 1
+
+        idf = {term: math.log(1.0 + float(document_count) / frequency)
+               for term, frequency in document_frequencies.iteritems() if frequency > 0}
+        scores = {}
+        for data_id, postings in postings_by_data.iteritems():
+            if mode != KEYWORD_MODE_ANY and len(postings) < len(unique_terms):
+                continue
+            if mode == KEYWORD_MODE_PHRASE and not _contains_phrase(postings, terms):
+                continue
+            scores[data_id] = sum(frequency * idf[term] for term, (frequency, positions) in postings.iteritems()) \
+                / math.sqrt(max(lengths[data_id], 1))
+
+        return sorted(scores, key=lambda data_id: (-scores[data_id], data_id))
+
+    def index_data(self, data_list):
+        """ Add saved data to the index, or update them.
+
+        Args:
+            data_list:
+
+        Returns:
+
+        """
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                for data in data_list:
+                    if data.pk is None:
+                        continue
+                    data_id = str(data.pk)
+                    positions_by_term, length = _get_positions_by_term(data.dict_content)
+                    connection.execute('DELETE FROM postings WHERE data_id = ?', (data_id,))
+                    connection.executemany('INSERT INTO postings VALUES (?, ?, ?, ?)',
+                                           [(term, data_id, len(positions), ','.join(str(position)
+                                                                                     for position in positions))
+                                            for term, positions in positions_by_term.iteritems()])
+                    connection.execute('INSERT OR REPLACE INTO documents VALUES (?, ?)', (data_id, length))
+
+    def delete_data(self, data_list):
+        """ Remove deleted data from the index.
+
+        Args:
+            data_list:
+
+        Returns:
+
+        """
+        data_ids = [(str(data.pk),) for data in data_list if data.pk is not None]
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.executemany('DELETE FROM postings WHERE data_id = ?', data_ids)
+                connection.executemany('DELETE FROM documents WHERE data_id = ?', data_ids)
+
+    def rebuild(self, data_list):
+        """ Build the index again from all the data.
+
+        Args:
+            data_list: All the data.
+
+        Returns:
+            Number of data indexed.
+
+        """
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute('DELETE FROM postings')
+                connection.execute('DELETE FROM documents')
+
+        count = 0
+        batch = []
+        for data in data_list:
+            batch.append(data)
+            if len(batch) == DATA_BATCH_SIZE:
+                self.index_data(batch)
+                count += len(batch)
+                batch = []
+        self.index_data(batch)
+        return count + len(batch)
+
+    def _get_connection(self):
+        """ Return the connection to the index file of the current process, creating the tables if missing. Must be
+        called with the lock.
+
+        Returns:
+
+        """
+        # a connection is not shared with the forked processes
+        if self._connection is None or self._connection_pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT, check_same_thread=False)
+            if self.path != ':memory:':
+                # readers do not wait for the writers
+                connection.execute('PRAGMA journal_mode=WAL')
+            with connection:
+                for statement in CREATE_TABLES:
+                    connection.execute(statement)
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+
+def _get_positions_by_term(dict_content):
+    """ Return the positions of the terms of the strings of a dict content.
+
+    Args:
+        dict_content:
+
+    Returns:
+        Dict: term -> list of positions, number of terms.
+
+    """
+    positions_by_term = {}
+    length = 0
+    position = 0
+    values = [dict_content] if dict_content is not None else []
+    while values:
+        value = values.pop()
+        if isinstance(value, dict):
+            values.extend(reversed(value.values()))
+        elif isinstance(value, list):
+            values.extend(reversed(value))
+        elif isinstance(value, basestring):
+            for term in get_keywords(value):
+                positions_by_term.setdefault(_to_unicode(term.lower()), []).append(position)
+                position += 1
+                length += 1
+            # a phrase does not span two strings
+            position += 1
+    return positions_by_term, length
+
+
+def _contains_phrase(postings, terms):
+    """ Check if the terms follow each other in a data.
+
+    Args:
+        postings: Dict: term -> (frequency, positions).
+        terms: List of terms of the phrase.
+
+    Returns:
+
+    """
+    positions = {term: set(int(position) for position in postings[term][1].split(',')) for term in set(terms)}
+    return any(all(start + offset in positions[term] for offset, term in enumerate(terms))
+               for start in positions[terms[0]])
+
+
+def _to_unicode(value):
+    """ Return a string as unicode.
+
+    Args:
+        value:
+
+    Returns:
+
+    """
+    return value if isinstance(value, unicode) else value.decode('utf-8')
@@ -0,0 +1,35 @@
+""" Full text search with the text index of the data collection
+"""
+from core_main_app.components.data.models import Data
+from core_main_app.utils.databases.mongoengine_database import init_text_index
+from core_main_app.utils.databases.pymongo_database import get_full_text_search
+from core_main_app.utils.search.search_backend import SearchBackend
+
+
+class MongoTextSearchBackend(SearchBackend):
+    """ Full text search with a MongoDB text index on all the strings of the data. The index is maintained by the
+    database when the data are saved.
+    """
+
+    def init(self):
+        """ Create the text index of the data collection, if missing.
+
+        Returns:
+
+        """
+        init_text_index(Data)
+
+    def execute_text_query(self, query, text, mode, projection=None, limit=None):
+        """ Return the data matching a query and containing the keywords, sorted by text score.
+
+        Args:
+            query:
+            text:
+            mode:
+            projection:
+            limit:
+
+        Returns:
+
+        """
+        return Data.execute_text_query(query, get_full_text_search(text, mode), projection, limit)
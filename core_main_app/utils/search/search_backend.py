@@ -0,0 +1,70 @@
+""" Full text search backend: engine searching the keywords in the data, and maintaining its index when the data are
+saved or deleted.
+"""
+from abc import ABCMeta, abstractmethod
+
+
+class SearchBackend(object):
+    """ Full text search backend.
+    """
+    __metaclass__ = ABCMeta
+
+    def init(self):
+        """ Create the index of the backend, if missing.
+
+        Returns:
+
+        """
+        pass
+
+    @abstractmethod
+    def execute_text_query(self, query, text, mode, projection=None, limit=None):
+        """ Return the data matching a query and containing the keywords, the most relevant first.
+
+        Args:
+            query: Raw query on the data (template, visibility and access criteria).
+            text: Keywords.
+            mode: all, any or phrase.
+            projection: List of fields to load (all fields if None).
+            limit: Maximum number of results (all results if None).
+
+        Returns:
+            Ordered list or queryset of data.
+
+        """
+        raise NotImplementedError("execute_text_query method is not implemented.")
+
+    def index_data(self, data_list):
+        """ Add saved data to the index, or update them.
+
+        Args:
+            data_list:
+
+        Returns:
+
+        """
+        pass
+
+    def delete_data(self, data_list):
+        """ Remove deleted data from the index.
+
+        Args:
+            data_list:
+
+        Returns:
+
+        """
+        pass
+
+    def rebuild(self, data_list):
+        """ Build the index again from all the data.
+
+        Args:
+            data_list: All the data.
+
+        Returns:
+            Number of data indexed.
+
+        """
+        self.init()
+        return 0
@@ -0,0 +1,40 @@
+""" Creation of the full text search backend chosen by the SEARCH_BACKEND setting
+"""
+from core_main_app.commons import exceptions
+from core_main_app.settings import SEARCH_BACKEND
+from core_main_app.utils.search.local_search_backend import LocalSearchBackend
+from core_main_app.utils.search.mongo_text_search_backend import MongoTextSearchBackend
+
+MONGO_TEXT_SEARCH_BACKEND = 'mongo'
+LOCAL_SEARCH_BACKEND = 'local'
+
+_search_backend = None
+
+
+def get_search_backend():
+    """ Return the search backend of the deployment.
+
+    Returns:
+
+    """
+    global _search_backend
+    if _search_backend is None:
+        _search_backend = create_search_backend(SEARCH_BACKEND)
+    return _search_backend
+
+
+def create_search_backend(name):
+    """ Create a search backend.
+
+    Args:
+        name: mongo or local.
+
+    Returns:
+
+    """
+    if name == MONGO_TEXT_SEARCH_BACKEND:
+        return MongoTextSearchBackend()
+    elif name == LOCAL_SEARCH_BACKEND:
+        return LocalSearchBackend()
+    raise exceptions.CoreError("SEARCH_BACKEND should take a value in {}.".format(
+        [MONGO_TEXT_SEARCH_BACKEND, LOCAL_SEARCH_BACKEND]))
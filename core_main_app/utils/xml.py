@@ -1,24 +1,40 @@
 """
     Xml utils provide too l operation for xml data
 """
+import atexit
+import copy
+import hashlib
 import json
+import multiprocessing
+import os
+import re
+import threading
 from collections import OrderedDict
+from io import BytesIO
 from urlparse import urlparse
 
 import xmltodict
 from django.core.urlresolvers import reverse
+from lxml import etree
 
 import core_main_app.commons.exceptions as exceptions
 import xml_utils.commons.constants as xml_utils_constants
 import xml_utils.xml_validation.validation as xml_validation
 from core_main_app.commons.exceptions import XMLError
-from core_main_app.settings import XERCES_VALIDATION, SERVER_URI
+from core_main_app.settings import XERCES_VALIDATION, SERVER_URI, XML_VALIDATION_PROCESSES, \
+    XML_VALIDATION_MIN_BATCH_SIZE, XSD_SCHEMA_CACHE_SIZE
+from core_main_app.utils import xslt_cache
+from core_main_app.utils.lru_cache import LRUCache
 from core_main_app.utils.urls import get_template_download_pattern
 from xml_utils.commons.constants import XSL_NAMESPACE
 from xml_utils.xsd_hash import xsd_hash
 from xml_utils.xsd_tree.operations.namespaces import get_namespaces
 from xml_utils.xsd_tree.xsd_tree import XSDTree
 
+# first characters of the strings converted to numbers by int and float (sign, digits, decimal point, inf and nan)
+_NUMBER_FIRST_CHARS = frozenset('+-.0123456789iInN')
+_INTEGER_REGEX = re.compile(r'^\s*[+-]?\s*\d+\s*$', re.UNICODE)
+
 
 def validate_xml_schema(xsd_tree):
     """Check if XSD schema is valid, send XSD Schema to server to be validated if XERCES_VALIDATION is true.
@@ -61,8 +77,171 @@ def validate_xml_data(xsd_tree, xml_tree):
     return error
 
 
-def is_schema_valid(xsd_string):
-    """Test if the schema is valid to be uploaded.
+def validate_xml_data_many(xsd_tree, xml_strings, compiled_schema=None):
+    """Check if a list of XML documents is valid against the same schema. The schema is compiled once, and the
+    documents are validated in a pool of processes if the list is large enough, except in a daemonic process.
+
+    Args:
+        xsd_tree:
+        xml_strings: List of XML strings.
+        compiled_schema: Compiled schema of the XSD tree (CompiledXmlSchema), used instead of compiling it again.
+
+    Returns: List of errors, in the order of the documents (None if no errors, string otherwise)
+
+    """
+    if XERCES_VALIDATION:
+        return [_validate_xml_string_with_xsd_tree(xsd_tree, xml_string) for xml_string in xml_strings]
+
+    processes = XML_VALIDATION_PROCESSES or multiprocessing.cpu_count()
+    # a daemonic process (e.g. celery worker) can not start the processes of a pool
+    if processes <= 1 or len(xml_strings) < XML_VALIDATION_MIN_BATCH_SIZE or multiprocessing.current_process().daemon:
+        # validate in the current process
+        if compiled_schema is not None:
+            return [_validate_xml_string_with_compiled_schema(compiled_schema, xml_string)
+                    for xml_string in xml_strings]
+        try:
+            xml_schema = etree.XMLSchema(xsd_tree)
+        except Exception as e:
+            return [e.message] * len(xml_strings)
+        return [_validate_xml_string_with_schema(xml_schema, xml_string) for xml_string in xml_strings]
+
+    # the processes of the pool keep the compiled schemas between calls, keyed by the hash of the schema
+    xsd_string = XSDTree.tostring(xsd_tree)
+    schema_key = hashlib.sha1(xsd_string.encode('utf-8') if isinstance(xsd_string, unicode) else xsd_string)\
+        .hexdigest()
+    chunk_size = max(1, len(xml_strings) // (processes * 4))
+    chunks = [(schema_key, xsd_string, xml_strings[start:start + chunk_size])
+              for start in range(0, len(xml_strings), chunk_size)]
+    chunk_errors = _get_validation_pool(processes).map(_validate_xml_strings_in_process, chunks, 1)
+    return [error for errors in chunk_errors for error in errors]
+
+
+def shutdown_validation_pool():
+    """Stop the processes of the validation pool. The pool is started again by the next validation using it.
+
+    Returns:
+
+    """
+    global _validation_pool
+    with _validation_pool_lock:
+        if _validation_pool is not None and _validation_pool_pid == os.getpid():
+            _validation_pool.terminate()
+            _validation_pool.join()
+        _validation_pool = None
+
+
+# pool of validation processes, kept between calls, and id of the process that started it
+_validation_pool = None
+_validation_pool_pid = None
+_validation_pool_processes = None
+_validation_pool_lock = threading.Lock()
+
+
+def _get_validation_pool(processes):
+    """Return the pool of validation processes, start it if needed.
+
+    Args:
+        processes: Number of processes of the pool.
+
+    Returns:
+
+    """
+    global _validation_pool, _validation_pool_pid, _validation_pool_processes
+    with _validation_pool_lock:
+        # a forked process (e.g. web server worker) can not use the pool of its parent
+        if _validation_pool is not None and _validation_pool_pid != os.getpid():
+            _validation_pool = None
+        if _validation_pool is not None and _validation_pool_processes != processes:
+            _validation_pool.terminate()
+            _validation_pool.join()
+            _validation_pool = None
+        if _validation_pool is None:
+            _validation_pool = multiprocessing.Pool(processes)
+            _validation_pool_pid = os.getpid()
+            _validation_pool_processes = processes
+        return _validation_pool
+
+
+atexit.register(shutdown_validation_pool)
+
+# compiled schemas of a validation process
+_process_xml_schemas = LRUCache(XSD_SCHEMA_CACHE_SIZE)
+
+
+def _validate_xml_strings_in_process(chunk):
+    """Validate XML strings in a validation process. The schema is compiled the first time the process uses it.
+
+    Args:
+        chunk: Key of the schema, XSD string and list of XML strings.
+
+    Returns: List of errors (None if no errors, string otherwise)
+
+    """
+    schema_key, xsd_string, xml_strings = chunk
+    xml_schema = _process_xml_schemas.get(schema_key)
+    if xml_schema is None:
+        try:
+            xml_schema = etree.XMLSchema(XSDTree.build_tree(xsd_string))
+        except Exception as e:
+            return [e.message] * len(xml_strings)
+        _process_xml_schemas.set(schema_key, xml_schema)
+    return [_validate_xml_string_with_schema(xml_schema, xml_string) for xml_string in xml_strings]
+
+
+def _validate_xml_string_with_schema(xml_schema, xml_string):
+    """Validate an XML string against a compiled schema.
+
+    Args:
+        xml_schema:
+        xml_string:
+
+    Returns: None if no errors, string otherwise
+
+    """
+    try:
+        xml_schema.assertValid(XSDTree.build_tree(xml_string))
+    except Exception as e:
+        return e.message
+    return None
+
+
+def _validate_xml_string_with_compiled_schema(compiled_schema, xml_string):
+    """Validate an XML string against a compiled schema shared between threads.
+
+    Args:
+        compiled_schema: CompiledXmlSchema.
+        xml_string:
+
+    Returns: None if no errors, string otherwise
+
+    """
+    try:
+        xml_tree = XSDTree.build_tree(xml_string)
+    except Exception as e:
+        return e.message
+    return compiled_schema.validate(xml_tree)
+
+
+def _validate_xml_string_with_xsd_tree(xsd_tree, xml_string):
+    """Validate an XML string against an XSD tree.
+
+    Args:
+        xsd_tree:
+        xml_string:
+
+    Returns: None if no errors, string otherwise
+
+    """
+    try:
+        xml_tree = XSDTree.build_tree(xml_string)
+    except Exception as e:
+        return e.message
+    return validate_xml_data(xsd_tree, xml_tree)
+
+
+def build_xsd_tree(xsd_string):
+    """Parse an XSD string once, to be shared by the schema checks, the hashing and the dependency extraction.
+    Blank text, comments and processing instructions are removed, as for the hashing.
 
     Args:
         xsd_string:
@@ -70,16 +249,36 @@ def is_schema_valid(xsd_string):
     Returns:
 
     """
-    if not is_well_formed_xml(xsd_string):
+    try:
+        parser = etree.XMLParser(remove_blank_text=True, remove_comments=True, remove_pis=True)
+        try:
+            return etree.parse(BytesIO(xsd_string.encode('utf-8')), parser)
+        except Exception:
+            return etree.parse(BytesIO(xsd_string), parser)
+    except Exception:
         raise exceptions.XMLError('Uploaded file is not well formatted XML.')
 
+
+def is_schema_valid(xsd_string, xsd_tree=None):
+    """Test if the schema is valid to be uploaded.
+
+    Args:
+        xsd_string:
+        xsd_tree: Tree of the schema, from build_xsd_tree (parsed from xsd_string if not provided).
+
+    Returns:
+
+    """
+    if xsd_tree is None:
+        xsd_tree = build_xsd_tree(xsd_string)
+
     # Check schema support by the core
-    errors = _check_core_support(xsd_string)
+    errors = _check_core_support(xsd_string, xsd_tree)
     if len(errors) > 0:
         errors_str = ", ".join(errors)
         raise exceptions.CoreError(errors_str)
 
-    error = validate_xml_schema(XSDTree.build_tree(xsd_string))
+    error = validate_xml_schema(xsd_tree)
     if error is not None:
         raise exceptions.XSDError(error)
 
@@ -214,21 +413,47 @@ def get_template_with_server_dependencies(xsd_string, dependencies):
     return updated_xsd_string
 
 
-def get_hash(xml_string):
+def get_hash(xml_string, xml_tree=None):
     """Get the hash of an XML string.
 
     Args:
         xml_string:
+        xml_tree: Tree of the XML string, from build_xsd_tree (parsed from xml_string if not provided).
 
     Returns:
 
     """
     try:
-        return xsd_hash.get_hash(xml_string)
+        if xml_tree is None:
+            return xsd_hash.get_hash(xml_string)
+        return _get_hash_from_tree(xml_tree)
     except Exception, e:
         raise exceptions.XSDError("Something wrong happened during the hashing.")
 
 
+def _get_hash_from_tree(xml_tree):
+    """Get the hash of an XML tree built by build_xsd_tree. Same result as xsd_hash.get_hash on the XML string.
+
+    Args:
+        xml_tree:
+
+    Returns:
+
+    """
+    # work on a copy: the shared tree keeps its annotations
+    xml_tree = copy.deepcopy(xml_tree)
+    # remove all annotations
+    for annotation in xml_tree.findall(".//{http://www.w3.org/2001/XMLSchema}annotation"):
+        annotation.getparent().remove(annotation)
+    clean_xml_string = etree.tostring(xml_tree)
+
+    # transform into dict and order it
+    xml_dict = xmltodict.parse(clean_xml_string, dict_constructor=dict)
+    clean_ordered_xml_string = str(xsd_hash.sort_dict(xml_dict))
+
+    return hashlib.sha1(clean_ordered_xml_string).hexdigest()
+
+
 def post_processor(path, key, value):
     """ Called after XML to JSON transformation.
 
@@ -251,6 +476,17 @@ def convert_value(value):
     Returns:
 
     """
+    if isinstance(value, basestring):
+        # most values are not numbers: skip the conversions when the first character can not start a number
+        first_char = value.lstrip()[:1]
+        if first_char == '' or (first_char not in _NUMBER_FIRST_CHARS and not first_char.isdigit()):
+            return value
+        if _INTEGER_REGEX.match(value) is None:
+            # not an integer, no need to try int first
+            try:
+                return float(value)
+            except ValueError:
+                return value
     try:
         return int(value)
     except (ValueError, TypeError):
@@ -260,16 +496,18 @@ def convert_value(value):
             return value
 
 
-def get_imports_and_includes(xsd_string):
+def get_imports_and_includes(xsd_string, xsd_tree=None):
     """Get a list of imports and includes in the file.
 
     Args:
         xsd_string:
+        xsd_tree: Tree of the schema (parsed from xsd_string if not provided).
 
     Returns: list of imports, list of includes
 
     """
-    xsd_tree = XSDTree.build_tree(xsd_string)
+    if xsd_tree is None:
+        xsd_tree = XSDTree.build_tree(xsd_string)
     # get the imports
     imports = xsd_tree.findall("{}import".format(xml_utils_constants.LXML_SCHEMA_NAMESPACE))
     # get the includes
@@ -306,11 +544,12 @@ def update_dependencies(xsd_string, dependencies):
     return xsd_tree
 
 
-def get_local_dependencies(xsd_string):
+def get_local_dependencies(xsd_string, xsd_tree=None):
     """Get local dependencies from an xsd.
 
         Args:
             xsd_string: XSD as string.
+            xsd_tree: Tree of the XSD (parsed from xsd_string if not provided).
 
         Returns:
             Local dependencies
@@ -319,7 +558,7 @@ def get_local_dependencies(xsd_string):
     # declare list of dependencies
     dependencies = []
     # Get includes and imports
-    imports, includes = get_imports_and_includes(xsd_string)
+    imports, includes = get_imports_and_includes(xsd_string, xsd_tree)
     # list of includes and imports
     xsd_includes_imports = imports + includes
 
@@ -341,11 +580,12 @@ def get_local_dependencies(xsd_string):
     return dependencies
 
 
-def _check_core_support(xsd_string):
+def _check_core_support(xsd_string, xsd_tree=None):
     """Check that the format of the the schema is supported by the current version of the Core.
 
     Args:
         xsd_string:
+        xsd_tree: Tree of the schema (parsed from xsd_string if not provided).
 
     Returns:
 
@@ -353,13 +593,8 @@ def _check_core_support(xsd_string):
     # list of errors
     errors = []
 
-    # build xsd tree
-    xsd_tree = XSDTree.build_tree(xsd_string)
-
-    # get the imports
-    imports = xsd_tree.findall("{}import".format(xml_utils_constants.LXML_SCHEMA_NAMESPACE))
-    # get the includes
-    includes = xsd_tree.findall("{}include".format(xml_utils_constants.LXML_SCHEMA_NAMESPACE))
+    # get the imports and includes
+    imports, includes = get_imports_and_includes(xsd_string, xsd_tree)
 
     if len(imports) != 0 or len(includes) != 0:
         for el_import in imports:
@@ -398,23 +633,24 @@ def _get_schema_location_uri(schema_id):
     return str(SERVER_URI) + url
 
 
-def xsl_transform(xml_string, xslt_string):
+def xsl_transform(xml_string, xslt_string, xslt_id=None):
     """Apply transformation to xml.
 
     Args:
         xml_string:
         xslt_string:
+        xslt_id: Id of the XslTransformation, if any.
 
     Returns:
 
     """
     try:
-        # Build the XSD and XSLT tree
-        xslt_tree = XSDTree.build_tree(xslt_string)
+        # Get the compiled XSLT transformation
+        transform = xslt_cache.get_xslt_transform(xslt_string, xslt_id)
+        # Build the XSD tree
         xsd_tree = XSDTree.build_tree(xml_string)
 
-        # Get the XSLT transformation and transform the XSD
-        transform = XSDTree.transform_to_xslt(xslt_tree)
+        # Transform the XSD
         transformed_tree = transform(xsd_tree)
         return str(transformed_tree)
     except Exception:
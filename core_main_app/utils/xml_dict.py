@@ -0,0 +1,317 @@
+""" Streaming conversion of XML documents into dictionaries.
+
+Builds the same dictionary as xmltodict.parse with the post_processor of core_main_app.utils.xml (same expat parser,
+same keys and values), reading the document chunk by chunk. Lists of elements longer than the occurrence limit are
+dropped while parsing, so the elements over the limit are never converted.
+
+The dictionary can be restricted to a list of paths, using the keys of the dictionary: element names separated by
+slashes from the root element, * for any element name, and @name or @* for attributes in the last step
+(e.g. /root/record/name, /root/*/@id). Only the selected elements and attributes, and the elements containing
+them, are kept.
+"""
+from __future__ import absolute_import
+
+import re
+from collections import OrderedDict
+from xml.parsers import expat
+
+import core_main_app.commons.exceptions as exceptions
+from core_main_app.utils.xml import convert_value
+
+# size of the chunks of the document given to the parser
+PARSER_CHUNK_SIZE = 64 * 1024
+
+ATTRIBUTE_PREFIX = '@'
+TEXT_KEY = '#text'
+
+PATH_SEPARATOR = '/'
+WILDCARD = '*'
+
+# occurrence count of the child elements over the limit
+_DROPPED = -1
+
+_PATH_STEP_REGEX = re.compile(r'^@?[^/@\[\]\s]+$')
+
+
+def is_path_valid(path):
+    """ Check if a path selecting a part of the dictionary is valid.
+
+    Args:
+        path:
+
+    Returns:
+
+    """
+    if not isinstance(path, basestring):
+        return False
+    steps = _get_path_steps(path)
+    if len(steps) == 0:
+        return False
+    for index, step in enumerate(steps):
+        if _PATH_STEP_REGEX.match(step) is None:
+            return False
+        # attributes can only be selected by the last step
+        if step.startswith(ATTRIBUTE_PREFIX) and index != len(steps) - 1:
+            return False
+    return True
+
+
+def _get_path_steps(path):
+    """ Split a path into steps.
+
+    Args:
+        path:
+
+    Returns:
+
+    """
+    if path.startswith(PATH_SEPARATOR):
+        path = path[len(PATH_SEPARATOR):]
+    return path.split(PATH_SEPARATOR)
+
+
+class _PathNode(object):
+    """ Node of the tree of the selected paths.
+    """
+
+    def __init__(self):
+        self.children = {}
+        # the element (or attribute) is selected with all its content
+        self.selected = False
+
+    def get_children(self, name):
+        """ Return the nodes matching a child name.
+
+        Args:
+            name:
+
+        Returns:
+
+        """
+        return [node for node in (self.children.get(name), self.children.get(WILDCARD)) if node is not None]
+
+
+def _build_path_tree(paths):
+    """ Build the tree of the selected paths.
+
+    Args:
+        paths:
+
+    Returns:
+
+    Raises:
+        XMLError: A path is not valid.
+
+    """
+    root = _PathNode()
+    for path in paths:
+        if not is_path_valid(path):
+            raise exceptions.XMLError("Invalid path: {}.".format(path))
+        node = root
+        for step in _get_path_steps(path):
+            node = node.children.setdefault(step, _PathNode())
+        node.selected = True
+    return root
+
+
+def xml_to_dict(raw_xml, max_list_size=None, paths=None):
+    """ Transform a raw xml to dict, converting values to numbers when possible.
+
+    Args:
+        raw_xml: XML string.
+        max_list_size: Lists of elements with more items are removed from the dict (no limit if None).
+        paths: Paths of the elements and attributes kept in the dict (whole document if None).
+
+    Returns:
+        OrderedDict.
+
+    """
+    handler = _XmlDictHandler(max_list_size, _build_path_tree(paths) if paths is not None else None)
+
+    # same parser configuration as xmltodict
+    parser = expat.ParserCreate('utf-8' if isinstance(raw_xml, unicode) else None)
+    parser.ordered_attributes = True
+    parser.buffer_text = True
+    parser.StartNamespaceDeclHandler = handler.start_namespace_declaration
+    parser.StartElementHandler = handler.start_element
+    parser.EndElementHandler = handler.end_element
+    parser.CharacterDataHandler = handler.characters
+    # do not expand entities
+    parser.DefaultHandler = lambda data: None
+    parser.ExternalEntityRefHandler = lambda *args: 1
+
+    try:
+        for chunk in _iter_chunks(raw_xml):
+            parser.Parse(chunk, False)
+        parser.Parse(b'', True)
+    except expat.ExpatError:
+        raise exceptions.XMLError("An unexpected error happened during the XML parsing.")
+    return handler.item
+
+
+def _iter_chunks(raw_xml):
+    """ Iterate over the chunks of an XML string, encoded in utf-8 if unicode.
+
+    Args:
+        raw_xml:
+
+    Returns:
+
+    """
+    start = 0
+    while start < len(raw_xml):
+        end = start + PARSER_CHUNK_SIZE
+        # do not split surrogate pairs (narrow unicode builds)
+        if isinstance(raw_xml, unicode) and u'\ud800' <= raw_xml[end - 1:end] <= u'\udbff':
+            end += 1
+        chunk = raw_xml[start:end]
+        if isinstance(chunk, unicode):
+            chunk = chunk.encode('utf-8')
+        yield chunk
+        start = end
+
+
+def _is_attribute_selected(path_nodes, name):
+    """ Check if an attribute of an element containing selected elements is selected.
+
+    Args:
+        path_nodes:
+        name:
+
+    Returns:
+
+    """
+    for node in path_nodes:
+        for attribute_node in (node.children.get(ATTRIBUTE_PREFIX + name),
+                               node.children.get(ATTRIBUTE_PREFIX + WILDCARD)):
+            if attribute_node is not None and attribute_node.selected:
+                return True
+    return False
+
+
+class _XmlDictHandler(object):
+    """ Expat handler building the dictionary of a document.
+    """
+
+    def __init__(self, max_list_size, path_tree=None):
+        self.max_list_size = max_list_size
+        # item, text, child occurrences and path nodes of the ancestors of the current element
+        self.stack = []
+        # item, text, child occurrences and path nodes of the current element
+        self.item = None
+        self.data = []
+        self.occurrences = {}
+        # nodes of the path tree matching the current element (None if the whole element is kept)
+        self.path_nodes = [path_tree] if path_tree is not None else None
+        # depth in the element being dropped (0 if not dropping)
+        self.drop_depth = 0
+        self.namespace_declarations = OrderedDict()
+
+    def start_namespace_declaration(self, prefix, uri):
+        self.namespace_declarations[prefix or ''] = uri
+
+    def start_element(self, name, attributes):
+        # namespace declarations are kept until an element with attributes, as xmltodict does
+        if attributes and self.namespace_declarations:
+            attributes = attributes + ['xmlns', self.namespace_declarations]
+            self.namespace_declarations = OrderedDict()
+
+        if self.drop_depth > 0:
+            self.drop_depth += 1
+            return
+
+        path_nodes = self._get_child_path_nodes(name)
+        if path_nodes == [] or (self.max_list_size is not None and not self._add_occurrence(name)):
+            self.drop_depth = 1
+            return
+
+        self.stack.append((self.item, self.data, self.occurrences, self.path_nodes))
+        self.item = None
+        if attributes:
+            self.item = OrderedDict((ATTRIBUTE_PREFIX + attributes[index], convert_value(attributes[index + 1]))
+                                    for index in range(0, len(attributes), 2)
+                                    if path_nodes is None or _is_attribute_selected(path_nodes, attributes[index]))
+            self.item = self.item or None
+        self.data = []
+        self.occurrences = {}
+        self.path_nodes = path_nodes
+
+    def end_element(self, name):
+        if self.drop_depth > 0:
+            self.drop_depth -= 1
+            return
+
+        data = None
+        if self.data:
+            data = ''.join(self.data).strip() or None
+        item = self.item
+        self.item, self.data, self.occurrences, self.path_nodes = self.stack.pop()
+
+        if item is not None:
+            if data:
+                item[TEXT_KEY] = convert_value(data)
+            self._push(name, item)
+        else:
+            self._push(name, convert_value(data))
+
+    def characters(self, data):
+        # the text of the elements containing the selected elements is not kept
+        if self.drop_depth == 0 and self.path_nodes is None:
+            self.data.append(data)
+
+    def _get_child_path_nodes(self, name):
+        """ Return the nodes of the path tree matching a child of the current element.
+
+        Args:
+            name:
+
+        Returns:
+            None if the whole child is kept, list of nodes otherwise (empty if the child is not kept).
+
+        """
+        if self.path_nodes is None:
+            return None
+        child_nodes = [child_node for node in self.path_nodes for child_node in node.get_children(name)]
+        if any(child_node.selected for child_node in child_nodes):
+            return None
+        return child_nodes
+
+    def _add_occurrence(self, name):
+        """ Count an occurrence of a child element of the current element.
+
+        Args:
+            name:
+
+        Returns:
+            False if the element is dropped because its list exceeds the limit.
+
+        """
+        occurrences = self.occurrences.get(name, 0)
+        if occurrences == _DROPPED:
+            return False
+        # elements become a list from their second occurrence
+        if occurrences >= 1 and occurrences >= self.max_list_size:
+            self.occurrences[name] = _DROPPED
+            del self.item[name]
+            return False
+        self.occurrences[name] = occurrences + 1
+        return True
+
+    def _push(self, key, value):
+        """ Add a child value to the current element.
+
+        Args:
+            key:
+            value:
+
+        Returns:
+
+        """
+        if self.item is None:
+            self.item = OrderedDict()
+        if key not in self.item:
+            self.item[key] = value
+        elif isinstance(self.item[key], list):
+            self.item[key].append(value)
+        else:
+            self.item[key] = [self.item[key], value]
@@ -0,0 +1,109 @@
+""" Process wide cache of compiled XML schemas, keyed by template hash
+"""
+import threading
+
+from lxml import etree
+
+from core_main_app.commons import exceptions
+from core_main_app.settings import XSD_SCHEMA_CACHE_SIZE
+from core_main_app.utils.lru_cache import LRUCache
+from xml_utils.xsd_tree.xsd_tree import XSDTree
+
+_xml_schema_cache = LRUCache(XSD_SCHEMA_CACHE_SIZE)
+
+
+class CompiledXmlSchema(object):
+    """ Compiled XML schema, safe to share between threads.
+    """
+
+    def __init__(self, xml_schema, xsd_tree=None):
+        """ Wrap a compiled lxml schema.
+
+        Args:
+            xml_schema: lxml XMLSchema object.
+            xsd_tree: Parsed XSD of the schema (not modified).
+        """
+        self.xml_schema = xml_schema
+        self.xsd_tree = xsd_tree
+        # the error log of an lxml schema is shared by all the validations using it
+        self._lock = threading.Lock()
+
+    def validate(self, xml_tree):
+        """ Validate an XML tree against the schema.
+
+        Args:
+            xml_tree:
+
+        Returns: None if no errors, string otherwise
+
+        """
+        with self._lock:
+            try:
+                self.xml_schema.assertValid(xml_tree)
+            except Exception as e:
+                return e.message
+        return None
+
+
+def get_xml_schema(template):
+    """ Return the compiled schema of a template. Compile and cache it if needed.
+
+    Args:
+        template:
+
+    Returns:
+        CompiledXmlSchema
+
+    Raises:
+        XSDError: The template content is not well formed.
+        XMLSchemaParseError: The template content is not a valid schema.
+
+    """
+    template_hash = template.hash
+    if template_hash:
+        compiled_schema = _xml_schema_cache.get(template_hash)
+        if compiled_schema is not None:
+            return compiled_schema
+
+    try:
+        xsd_tree = XSDTree.build_tree(template.content)
+    except Exception as e:
+        raise exceptions.XSDError(e.message)
+
+    compiled_schema = CompiledXmlSchema(etree.XMLSchema(xsd_tree), xsd_tree)
+    # templates without hash are not registered yet: nothing to key them by
+    if template_hash:
+        _xml_schema_cache.set(template_hash, compiled_schema)
+
+    return compiled_schema
+
+
+def invalidate(template_hash):
+    """ Remove the compiled schema of a template hash from the cache.
+
+    Args:
+        template_hash:
+
+    Returns:
+
+    """
+    if template_hash:
+        _xml_schema_cache.delete(template_hash)
+
+
+def clear():
+    """ Remove all compiled schemas from the cache.
+
+    Returns:
+
+    """
+    _xml_schema_cache.clear()
+
+
+def get_stats():
+    """ Return the hit/miss counters and size of the cache.
+
+    Returns:
+
+    """
+    return _xml_schema_cache.get_stats()
@@ -0,0 +1,94 @@
+""" Cache of compiled XSLT, keyed by XslTransformation id and content hash. lxml XSLT objects are not thread-safe:
+each thread keeps its own compiled XSLT.
+"""
+import hashlib
+import threading
+
+from core_main_app.settings import XSLT_CACHE_SIZE
+from core_main_app.utils.lru_cache import LRUCache
+from xml_utils.xsd_tree.xsd_tree import XSDTree
+
+_thread_cache = threading.local()
+# changed on each invalidation, the cache of each thread is cleared when it sees a new generation
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def get_xslt_transform(xslt_string, xslt_id=None):
+    """ Return the compiled XSLT of an XSLT string. Compile and cache it if needed.
+
+    Args:
+        xslt_string:
+        xslt_id: Id of the XslTransformation, if any.
+
+    Returns:
+        lxml XSLT object, only usable by the current thread.
+
+    """
+    cache = _get_cache()
+    key = (str(xslt_id) if xslt_id is not None else None, get_content_hash(xslt_string))
+    transform = cache.get(key)
+    if transform is None:
+        transform = XSDTree.transform_to_xslt(XSDTree.build_tree(xslt_string))
+        cache.set(key, transform)
+    return transform
+
+
+def get_content_hash(xslt_string):
+    """ Return the hash of an XSLT string.
+
+    Args:
+        xslt_string:
+
+    Returns:
+
+    """
+    try:
+        return hashlib.sha1(xslt_string.encode('utf-8')).hexdigest()
+    except Exception:
+        return hashlib.sha1(xslt_string).hexdigest()
+
+
+def invalidate():
+    """ Remove the compiled XSLT from the cache of all threads. The caches of the other threads are not reachable:
+    all of them are cleared. A modified XSLT does not need it (entries are keyed by content hash), but the XSLT
+    looked up for the rendering of the data, kept until the next invalidation, are looked up again.
+
+    Returns:
+
+    """
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+def get_generation():
+    """ Return the number of invalidations of the cache.
+
+    Returns:
+
+    """
+    return _generation
+
+
+def get_stats():
+    """ Return the hit/miss counters and size of the cache of the current thread.
+
+    Returns:
+
+    """
+    return _get_cache().get_stats()
+
+
+def _get_cache():
+    """ Return the cache of the current thread, cleared if the cache was invalidated.
+
+    Returns:
+
+    """
+    cache = getattr(_thread_cache, 'cache', None)
+    if cache is None or _thread_cache.generation != _generation:
+        cache = LRUCache(XSLT_CACHE_SIZE)
+        _thread_cache.cache = cache
+        _thread_cache.generation = _generation
+    return cache
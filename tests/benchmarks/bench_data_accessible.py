@@ -0,0 +1,136 @@
+""" Accessible data benchmark: data owned by a user or in the workspaces accessible by the user, with the previous union
+of the owned data and the workspace data loaded in memory against the single $or query.
+
+Run with:
+    python -m tests.benchmarks.bench_data_accessible
+
+Set DATA_ACCESSIBLE_BENCHMARK_DATABASE_HOST to a mongodb:// URI to run against a real database (mongomock by default,
+where queries scan the whole collection and are much slower than on a real database).
+"""
+import datetime
+import os
+import random
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.test_settings")
+django.setup()
+
+from bson.objectid import ObjectId
+
+from core_main_app.components.data.models import Data
+from core_main_app.utils.databases.mongoengine_database import Database
+
+DATABASE_HOST = os.environ.get('DATA_ACCESSIBLE_BENCHMARK_DATABASE_HOST', 'mongomock://localhost')
+DATABASE_NAME = os.environ.get('DATA_ACCESSIBLE_BENCHMARK_DATABASE_NAME', 'bench_data_accessible')
+DATA_COUNT = int(os.environ.get('DATA_ACCESSIBLE_BENCHMARK_DATA', 100000))
+WORKSPACE_COUNT = int(os.environ.get('DATA_ACCESSIBLE_BENCHMARK_WORKSPACES', 100))
+USER_COUNT = int(os.environ.get('DATA_ACCESSIBLE_BENCHMARK_USERS', 100))
+# number of workspaces accessible by the user
+ACCESSIBLE_WORKSPACE_COUNT = int(os.environ.get('DATA_ACCESSIBLE_BENCHMARK_ACCESSIBLE_WORKSPACES', 10))
+PAGE_SIZE = 10
+# batch size of the insertions
+BATCH_SIZE = 5000
+
+
+def create_data(count):
+    """ Create data owned by random users, in random workspaces or without workspace.
+
+    Args:
+        count:
+
+    Returns:
+        List of workspace ids.
+
+    """
+    Data.objects.delete()
+    random.seed(20180101)
+    template_id = ObjectId()
+    workspace_ids = [ObjectId() for _ in range(WORKSPACE_COUNT)]
+    start_date = datetime.datetime(2018, 1, 1)
+    for start in range(0, count, BATCH_SIZE):
+        Data._get_collection().insert_many([
+            {'template': template_id,
+             'title': 'data {}'.format(index),
+             'user_id': str(random.randrange(USER_COUNT)),
+             'workspace': random.choice(workspace_ids) if random.random() < 0.5 else None,
+             'last_modification_date': start_date + datetime.timedelta(seconds=index)}
+            for index in range(start, min(start + BATCH_SIZE, count))])
+    return workspace_ids
+
+
+def get_all_accessible_with_union(user_id, workspace_ids):
+    """ Data accessible by a user, with the union of the owned data and the workspace data (previous implementation).
+
+    Args:
+        user_id:
+        workspace_ids:
+
+    Returns:
+
+    """
+    accessible_data = Data.get_all_by_list_workspace(workspace_ids)
+    owned_data = Data.get_all_by_user_id(user_id)
+    return list(set().union(owned_data, accessible_data))
+
+
+def get_all_accessible(user_id, workspace_ids):
+    """ Data accessible by a user, with a single query.
+
+    Args:
+        user_id:
+        workspace_ids:
+
+    Returns:
+
+    """
+    return Data.get_all_by_user_id_or_list_workspace(user_id, workspace_ids, '-last_modification_date')
+
+
+def _timed(function, *args):
+    start = time.time()
+    result = function(*args)
+    return time.time() - start, result
+
+
+def bench(count):
+    """ Compare the union and the single query on a number of data.
+
+    Args:
+        count:
+
+    Returns:
+
+    """
+    workspace_ids = create_data(count)
+    accessible_workspace_ids = workspace_ids[:ACCESSIBLE_WORKSPACE_COUNT]
+    user_id = '0'
+
+    union_duration, union_data = _timed(get_all_accessible_with_union, user_id, accessible_workspace_ids)
+    query_duration, query_data = _timed(lambda: list(get_all_accessible(user_id, accessible_workspace_ids)))
+    assert set(data.id for data in union_data) == set(data.id for data in query_data), \
+        'The two implementations returned different data'
+
+    count_duration, accessible_count = _timed(lambda: get_all_accessible(user_id, accessible_workspace_ids).count())
+    assert accessible_count == len(union_data)
+    page_duration, page = _timed(lambda: list(get_all_accessible(user_id, accessible_workspace_ids)[:PAGE_SIZE]))
+    assert len(page) == min(PAGE_SIZE, accessible_count)
+    # the union loads the owned data and the workspace data, even to read one page
+    union_loaded = Data.get_all_by_user_id(user_id).count() + \
+        Data.get_all_by_list_workspace(accessible_workspace_ids).count()
+
+    print('{} data, {} accessible (union / single query): all data {:.2f}s / {:.2f}s, count {:.2f}s, '
+          'first page of {} {:.2f}s (data loaded: {} / {})'.format(count, accessible_count, union_duration,
+                                                                  query_duration, count_duration, PAGE_SIZE,
+                                                                  page_duration, union_loaded, len(page)))
+
+
+if __name__ == '__main__':
+    database = Database(DATABASE_HOST, DATABASE_NAME)
+    database.connect()
+    try:
+        bench(DATA_COUNT)
+    finally:
+        database.clean_database()
+        database.disconnect()
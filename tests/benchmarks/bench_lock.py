@@ -0,0 +1,156 @@
+""" Lock benchmarks: contention on lock creation, and lock status of a page of objects.
+
+Run with:
+    python -m tests.benchmarks.bench_lock
+
+Set LOCK_BENCHMARK_DATABASE_HOST to a mongodb:// URI to run against a real database (mongomock by default). Several
+processes can be started against the same database to measure the contention between processes.
+"""
+import os
+import threading
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.test_settings")
+django.setup()
+
+from core_main_app.commons.exceptions import LockError
+from core_main_app.components.lock import api as lock_api
+from core_main_app.components.lock.models import DatabaseLockObject
+from core_main_app.components.template.models import Template
+from core_main_app.utils.databases.mongoengine_database import Database
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+
+DATABASE_HOST = os.environ.get('LOCK_BENCHMARK_DATABASE_HOST', 'mongomock://localhost')
+DATABASE_NAME = os.environ.get('LOCK_BENCHMARK_DATABASE_NAME', 'bench_lock')
+THREADS = int(os.environ.get('LOCK_BENCHMARK_THREADS', 16))
+ITERATIONS = int(os.environ.get('LOCK_BENCHMARK_ITERATIONS', 200))
+PAGE_SIZE = int(os.environ.get('LOCK_BENCHMARK_PAGE_SIZE', 50))
+
+
+def _create_object(index):
+    """ Create an object to lock.
+
+    Args:
+        index:
+
+    Returns:
+
+    """
+    return Template(filename='file_{}.xsd'.format(index), content='<schema/>', hash=str(index)).save()
+
+
+def _run_threads(target, args_list):
+    """ Run a function in several threads at the same time.
+
+    Args:
+        target:
+        args_list: Arguments of each thread.
+
+    Returns:
+        Duration in seconds.
+
+    """
+    start_event = threading.Event()
+    threads = [threading.Thread(target=_wait_and_run, args=(start_event, target, args)) for args in args_list]
+    for thread in threads:
+        thread.start()
+    start = time.time()
+    start_event.set()
+    for thread in threads:
+        thread.join()
+    return time.time() - start
+
+
+def _wait_and_run(start_event, target, args):
+    start_event.wait()
+    target(*args)
+
+
+def bench_same_object():
+    """ All threads try to lock the same object: exactly one of them must own it.
+
+    Returns:
+
+    """
+    winners = []
+    losers = []
+
+    def _lock(user):
+        try:
+            lock_api.set_lock_object(locked_object, user)
+            winners.append(user.id)
+        except LockError:
+            losers.append(user.id)
+
+    for iteration in range(ITERATIONS / THREADS or 1):
+        locked_object = _create_object('same_{}'.format(iteration))
+        del winners[:]
+        del losers[:]
+        duration = _run_threads(_lock, [(create_mock_user(str(index)),) for index in range(THREADS)])
+        assert len(winners) == 1, 'Expected one lock owner, got {}'.format(len(winners))
+        assert DatabaseLockObject.objects(object=locked_object).count() == 1
+    print('same object: {} threads, one owner per object, last round in {:.4f}s'.format(THREADS, duration))
+
+
+def bench_distinct_objects():
+    """ Each thread locks and unlocks its own objects: measures the throughput of uncontended locks.
+
+    Returns:
+
+    """
+    objects = [[_create_object('distinct_{}_{}'.format(thread, index)) for index in range(ITERATIONS / THREADS or 1)]
+               for thread in range(THREADS)]
+
+    def _lock_and_release(user, object_list):
+        for locked_object in object_list:
+            lock_api.set_lock_object(locked_object, user)
+            lock_api.remove_lock_on_object(locked_object, user)
+
+    duration = _run_threads(_lock_and_release,
+                            [(create_mock_user(str(index)), objects[index]) for index in range(THREADS)])
+    operations = sum(len(object_list) for object_list in objects)
+    print('distinct objects: {} lock/unlock in {:.4f}s ({:.0f} ops/s)'.format(operations, duration,
+                                                                               operations / duration))
+
+
+def bench_lock_status_page():
+    """ Lock status of a page of objects, half of them locked: one query per object against a single query.
+
+    Returns:
+
+    """
+    page = [_create_object('page_{}'.format(index)) for index in range(PAGE_SIZE)]
+    owner = create_mock_user('owner')
+    for locked_object in page[::2]:
+        lock_api.set_lock_object(locked_object, owner)
+    user = create_mock_user('user')
+
+    start = time.time()
+    for iteration in range(ITERATIONS):
+        loop_status = {locked_object.id: lock_api.is_object_locked(locked_object, user) for locked_object in page}
+    loop_duration = time.time() - start
+
+    start = time.time()
+    for iteration in range(ITERATIONS):
+        batch_status = lock_api.get_lock_status_many(page, user)
+    batch_duration = time.time() - start
+
+    assert loop_status == batch_status
+    print('lock status of {} objects: per object {:.2f}ms, batch {:.2f}ms ({:.1f}x)'.format(
+        PAGE_SIZE, loop_duration * 1000 / ITERATIONS, batch_duration * 1000 / ITERATIONS,
+        loop_duration / batch_duration))
+
+
+if __name__ == '__main__':
+    database = Database(DATABASE_HOST, DATABASE_NAME)
+    database.connect()
+    try:
+        DatabaseLockObject.ensure_indexes()
+        bench_same_object()
+        bench_distinct_objects()
+        bench_lock_status_page()
+    finally:
+        database.clean_database()
+        database.disconnect()
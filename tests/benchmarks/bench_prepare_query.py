@@ -0,0 +1,81 @@
+""" Query preparation benchmark: parsing and preparation of the same JSON queries (regular expressions, sub document
+root), without the caches and with the prepared query and regular expression caches.
+
+Run with:
+    python -m tests.benchmarks.bench_prepare_query
+"""
+import json
+import os
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.test_settings")
+django.setup()
+
+from mock import patch
+
+from core_main_app.utils.lru_cache import LRUCache
+from core_main_app.utils.query.mongo import prepare
+
+QUERIES = int(os.environ.get('PREPARE_QUERY_BENCHMARK_QUERIES', 50))
+CRITERIA = int(os.environ.get('PREPARE_QUERY_BENCHMARK_CRITERIA', 20))
+REPEAT = int(os.environ.get('PREPARE_QUERY_BENCHMARK_REPEAT', 20))
+
+
+def generate_queries(count, criteria):
+    """ Generate JSON queries mixing regular expressions, logical operators, $not and $elemMatch.
+
+    Args:
+        count:
+        criteria: Number of criteria per query.
+
+    Returns:
+
+    """
+    queries = []
+    for index in range(count):
+        query = {"$and": [
+            {"$or": [{"root.element{}".format(i): "/value{}.*/".format(index)},
+                     {"root.element{}.#text".format(i): {"$not": "/other{}/".format(i)}},
+                     {"root.list{}".format(i): {"$elemMatch": {"child": "/child.*/", "value": {"$gt": i}}}}]}
+            for i in range(criteria)
+        ]}
+        queries.append(json.dumps(query))
+    return queries
+
+
+def prepare_without_cache(queries):
+    """ Parse and prepare the queries without the caches.
+
+    Args:
+        queries:
+
+    Returns:
+
+    """
+    with patch.object(prepare, '_regexes', LRUCache(0)):
+        for query in queries:
+            prepare.prepare_query(json.loads(query), regex=True, sub_document_root='dict_content')
+
+
+def prepare_with_cache(queries):
+    """ Prepare the queries with the caches.
+
+    Args:
+        queries:
+
+    Returns:
+
+    """
+    for query in queries:
+        prepare.prepare_raw_query(query, regex=True, sub_document_root='dict_content')
+
+
+if __name__ == '__main__':
+    queries = generate_queries(QUERIES, CRITERIA)
+    prepare.clear_cache()
+    without_cache = min(timeit.repeat(lambda: prepare_without_cache(queries), number=1, repeat=REPEAT))
+    with_cache = min(timeit.repeat(lambda: prepare_with_cache(queries), number=1, repeat=REPEAT))
+    print('{} queries of {} criteria: without cache {:.2f}ms/query, with cache {:.2f}ms/query'.format(
+        QUERIES, CRITERIA, without_cache * 1000 / QUERIES, with_cache * 1000 / QUERIES))
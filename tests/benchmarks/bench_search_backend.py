@@ -0,0 +1,112 @@
+""" Search backend benchmark: insertion of data, then keyword searches in each mode, with the MongoDB text index and
+with the local inverted index.
+
+Run with:
+    python -m tests.benchmarks.bench_search_backend
+
+Set SEARCH_BENCHMARK_DATABASE_HOST to a mongodb:// URI to run against a real database. The mongo backend is skipped
+with mongomock (default), which does not support text indexes.
+"""
+import os
+import random
+import tempfile
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.test_settings")
+django.setup()
+
+from core_main_app.components.data.models import Data
+from core_main_app.components.template.models import Template
+from core_main_app.utils.databases.mongoengine_database import Database
+from core_main_app.utils.query.constants import KEYWORD_MODE_ALL, KEYWORD_MODE_ANY, KEYWORD_MODE_PHRASE
+from core_main_app.utils.search.local_search_backend import LocalSearchBackend
+from core_main_app.utils.search.mongo_text_search_backend import MongoTextSearchBackend
+
+DATABASE_HOST = os.environ.get('SEARCH_BENCHMARK_DATABASE_HOST', 'mongomock://localhost')
+DATABASE_NAME = os.environ.get('SEARCH_BENCHMARK_DATABASE_NAME', 'bench_search')
+DATA_COUNT = int(os.environ.get('SEARCH_BENCHMARK_DATA', 10000))
+QUERIES = int(os.environ.get('SEARCH_BENCHMARK_QUERIES', 50))
+# batch size of the insertions
+BATCH_SIZE = 1000
+
+WORDS = ['alloy', 'steel', 'copper', 'polymer', 'ceramic', 'tensile', 'strength', 'thermal', 'conductivity',
+         'density', 'fatigue', 'fracture', 'hardness', 'elastic', 'modulus', 'grain', 'boundary', 'phase',
+         'diagram', 'crystal', 'lattice', 'defect', 'diffusion', 'corrosion', 'oxide', 'coating', 'sample', 'test']
+
+
+def generate_data(template, count):
+    """ Generate data with random sentences.
+
+    Args:
+        template:
+        count:
+
+    Returns:
+
+    """
+    random.seed(0)
+    for start in range(0, count, BATCH_SIZE):
+        yield [Data(template=template, user_id='1', title='data {}'.format(index),
+                    dict_content={'root': {'name': ' '.join(random.sample(WORDS, 3)),
+                                           'description': ' '.join(random.choice(WORDS) for i in range(30)),
+                                           'value': index}})
+               for index in range(start, min(start + BATCH_SIZE, count))]
+
+
+def bench(backend):
+    """ Insert the data and index them, then search keywords in each mode.
+
+    Args:
+        backend:
+
+    Returns:
+
+    """
+    Data.objects.delete()
+    template = Template(filename='template.xsd', content='<xs:schema/>', hash='hash').save()
+    backend.init()
+
+    insert_duration = 0
+    for data_list in generate_data(template, DATA_COUNT):
+        start = time.time()
+        for data, inserted_id in zip(data_list, Data.insert_many(data_list)):
+            data.pk = inserted_id
+        backend.index_data(data_list)
+        insert_duration += time.time() - start
+
+    random.seed(1)
+    durations = {}
+    for mode in (KEYWORD_MODE_ALL, KEYWORD_MODE_ANY, KEYWORD_MODE_PHRASE):
+        start = time.time()
+        for query in range(QUERIES):
+            backend.execute_text_query({}, ' '.join(random.sample(WORDS, 2)), mode, projection=['title'], limit=100)
+        durations[mode] = (time.time() - start) * 1000 / QUERIES
+
+    print('{}: {} data inserted and indexed in {:.2f}s, search all {:.1f}ms, any {:.1f}ms, phrase {:.1f}ms'.format(
+        type(backend).__name__, DATA_COUNT, insert_duration, durations[KEYWORD_MODE_ALL],
+        durations[KEYWORD_MODE_ANY], durations[KEYWORD_MODE_PHRASE]))
+
+    if isinstance(backend, LocalSearchBackend):
+        # ranking in the index only, without reading the data from the database
+        start = time.time()
+        for query in range(QUERIES):
+            backend.rank(random.sample(WORDS, 2), KEYWORD_MODE_ANY)
+        print('{}: ranking only {:.1f}ms'.format(type(backend).__name__, (time.time() - start) * 1000 / QUERIES))
+
+
+if __name__ == '__main__':
+    database = Database(DATABASE_HOST, DATABASE_NAME)
+    database.connect()
+    index_path = os.path.join(tempfile.mkdtemp(), 'search_index.sqlite3')
+    try:
+        bench(LocalSearchBackend(index_path))
+        if DATABASE_HOST.startswith('mongomock'):
+            print('MongoTextSearchBackend: skipped (text indexes are not supported by mongomock)')
+        else:
+            bench(MongoTextSearchBackend())
+    finally:
+        os.remove(index_path)
+        database.clean_database()
+        database.disconnect()
@@ -0,0 +1,86 @@
+""" Validation benchmark: validation of a batch of documents against the same schema in the current process and in
+pools of processes of increasing size. The first call of each pool compiles the schema in its processes (cold), the
+next calls reuse the compiled schema (warm).
+
+Run with:
+    python -m tests.benchmarks.bench_validation
+"""
+import multiprocessing
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.test_settings")
+django.setup()
+
+from mock import patch
+
+from core_main_app.utils import xml as xml_utils
+from xml_utils.xsd_tree.xsd_tree import XSDTree
+
+DOCUMENTS = int(os.environ.get('VALIDATION_BENCHMARK_DOCUMENTS', 2000))
+RECORDS = int(os.environ.get('VALIDATION_BENCHMARK_RECORDS', 200))
+ITERATIONS = int(os.environ.get('VALIDATION_BENCHMARK_ITERATIONS', 3))
+
+SCHEMA = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+         '<xs:element name="root"><xs:complexType><xs:sequence>' \
+         '<xs:element name="record" maxOccurs="unbounded"><xs:complexType><xs:sequence>' \
+         '<xs:element name="name" type="xs:string"/>' \
+         '<xs:element name="value" type="xs:decimal"/>' \
+         '<xs:element name="date" type="xs:date"/>' \
+         '</xs:sequence><xs:attribute name="id" type="xs:integer" use="required"/></xs:complexType></xs:element>' \
+         '</xs:sequence></xs:complexType></xs:element></xs:schema>'
+
+
+def generate_documents(count, records):
+    """ Generate XML documents, one invalid document out of ten.
+
+    Args:
+        count:
+        records: Number of records per document.
+
+    Returns:
+
+    """
+    record = '<record id="{0}"><name>name {0}</name><value>{1}</value><date>2018-01-01</date></record>'
+    documents = []
+    for index in range(count):
+        value = 'invalid' if index % 10 == 0 else '{}.5'.format(index)
+        documents.append('<root>{}</root>'.format(''.join(record.format(i, value) for i in range(records))))
+    return documents
+
+
+def bench(xsd_tree, documents, processes):
+    """ Validate the documents with a number of processes.
+
+    Args:
+        xsd_tree:
+        documents:
+        processes: Number of processes (1: current process).
+
+    Returns:
+        Duration of the first call, best duration of the next calls, errors.
+
+    """
+    with patch.object(xml_utils, 'XML_VALIDATION_PROCESSES', processes):
+        durations = []
+        for iteration in range(ITERATIONS):
+            start = time.time()
+            errors = xml_utils.validate_xml_data_many(xsd_tree, documents)
+            durations.append(time.time() - start)
+    xml_utils.shutdown_validation_pool()
+    return durations[0], min(durations[1:] or durations), errors
+
+
+if __name__ == '__main__':
+    xsd_tree = XSDTree.build_tree(SCHEMA)
+    documents = generate_documents(DOCUMENTS, RECORDS)
+    print('{} documents of {} records, {} CPUs'.format(DOCUMENTS, RECORDS, multiprocessing.cpu_count()))
+    results = {}
+    process_counts = sorted(set([1, 2, 4, multiprocessing.cpu_count()]))
+    for processes in process_counts:
+        cold, warm, errors = bench(xsd_tree, documents, processes)
+        results[processes] = [error is None for error in errors]
+        print('{} process(es): first call {:.2f}s, next calls {:.2f}s'.format(processes, cold, warm))
+    assert len(set(tuple(result) for result in results.values())) == 1, 'The validations returned different errors'
@@ -0,0 +1,166 @@
+""" Superuser workspace access benchmark: workspaces readable by a superuser and access check of one workspace, with
+the permissions of all the workspaces listed in a $in query against the superuser path.
+
+Run with:
+    python -m tests.benchmarks.bench_workspace_superuser
+
+Set WORKSPACE_BENCHMARK_DATABASE_HOST to a mongodb:// URI to run against a real database (mongomock by default, where
+$in queries on large lists are much slower than on a real database).
+"""
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.test_settings")
+django.setup()
+
+from django.contrib.auth.models import Permission, ContentType
+from django.core.management import call_command
+
+from core_main_app.components.workspace import api as workspace_api
+from core_main_app.components.workspace.access_context import WorkspaceAccessContext, build_access_context
+from core_main_app.components.workspace.models import Workspace
+from core_main_app.permissions import api as permission_api
+from core_main_app.permissions.rights import CAN_READ_CODENAME, CAN_WRITE_CODENAME, CONTENT_TYPE_APP_LABEL
+from core_main_app.utils.databases.mongoengine_database import Database
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+
+DATABASE_HOST = os.environ.get('WORKSPACE_BENCHMARK_DATABASE_HOST', 'mongomock://localhost')
+DATABASE_NAME = os.environ.get('WORKSPACE_BENCHMARK_DATABASE_NAME', 'bench_workspace')
+SIZES = [int(size) for size in os.environ.get('WORKSPACE_BENCHMARK_SIZES', '10000,100000').split(',')]
+# batch size of the insertions
+BATCH_SIZE = 5000
+
+
+def create_workspaces(count):
+    """ Create workspaces and their read and write permissions.
+
+    Args:
+        count:
+
+    Returns:
+
+    """
+    Permission.objects.all().delete()
+    Workspace.objects.delete()
+    content_type, created = ContentType.objects.get_or_create(app_label=CONTENT_TYPE_APP_LABEL, model='main')
+    for start in range(0, count, BATCH_SIZE):
+        indexes = range(start, min(start + BATCH_SIZE, count))
+        permissions = []
+        for index in indexes:
+            for codename in (CAN_READ_CODENAME, CAN_WRITE_CODENAME):
+                permissions.append(Permission(name='{} {}'.format(codename, index), content_type=content_type,
+                                              codename='{}{}'.format(codename, index)))
+        Permission.objects.bulk_create(permissions)
+        permission_ids = dict(Permission.objects.filter(codename__in=[permission.codename
+                                                                      for permission in permissions])
+                              .values_list('codename', 'id'))
+        Workspace._get_collection().insert_many([
+            {'title': 'workspace {}'.format(index),
+             'owner': str(index % 100),
+             'read_perm_id': str(permission_ids['{}{}'.format(CAN_READ_CODENAME, index)]),
+             'write_perm_id': str(permission_ids['{}{}'.format(CAN_WRITE_CODENAME, index)]),
+             'is_public': False}
+            for index in indexes])
+    permission_api.invalidate_access()
+
+
+def get_workspace_ids_with_permissions(user):
+    """ Workspaces readable by a user, listing all the read permissions (previous superuser path).
+
+    Args:
+        user:
+
+    Returns:
+
+    """
+    read_permissions = permission_api._query_workspace_permission_ids(user, CAN_READ_CODENAME)
+    return set(workspace.id
+               for workspace in Workspace.get_all_workspaces_with_read_access_by_user_id(user.id, read_permissions))
+
+
+def get_workspace_ids(user):
+    """ Workspaces readable by a user, with the superuser path of the workspace API.
+
+    Args:
+        user:
+
+    Returns:
+
+    """
+    return set(workspace.id for workspace in workspace_api.get_all_workspaces_with_read_access_by_user(user))
+
+
+def count_workspaces_with_permissions(user):
+    """ Number of workspaces readable by a user, listing all the read permissions (previous superuser path).
+
+    Args:
+        user:
+
+    Returns:
+
+    """
+    read_permissions = permission_api._query_workspace_permission_ids(user, CAN_READ_CODENAME)
+    return Workspace.get_all_workspaces_with_read_access_by_user_id(user.id, read_permissions).count()
+
+
+def count_workspaces(user):
+    """ Number of workspaces readable by a user, with the superuser path of the workspace API.
+
+    Args:
+        user:
+
+    Returns:
+
+    """
+    return workspace_api.get_all_workspaces_with_read_access_by_user(user).count()
+
+
+def _timed(function, *args):
+    start = time.time()
+    result = function(*args)
+    return time.time() - start, result
+
+
+def bench(count):
+    """ Compare the two paths on a number of workspaces.
+
+    Args:
+        count:
+
+    Returns:
+
+    """
+    create_workspaces(count)
+    superuser = create_mock_user('superuser', is_superuser=True)
+    workspace = Workspace.objects.first()
+
+    permissions_duration, permissions_ids = _timed(get_workspace_ids_with_permissions, superuser)
+    superuser_duration, superuser_ids = _timed(get_workspace_ids, superuser)
+    assert permissions_ids == superuser_ids, 'The two paths returned different workspaces'
+
+    permissions_count_duration, permissions_count = _timed(count_workspaces_with_permissions, superuser)
+    superuser_count_duration, superuser_count = _timed(count_workspaces, superuser)
+    assert permissions_count == superuser_count == count
+
+    permissions_check_duration, can_read = _timed(lambda: WorkspaceAccessContext(superuser).can_read(workspace))
+    superuser_check_duration, superuser_can_read = _timed(lambda: build_access_context(superuser).can_read(workspace))
+    assert can_read and superuser_can_read
+
+    print('{} workspaces (with permissions / superuser path): list {:.2f}s / {:.2f}s, count {:.2f}s / {:.4f}s, '
+          'access check {:.2f}s / {:.4f}s'.format(count, permissions_duration, superuser_duration,
+                                                   permissions_count_duration, superuser_count_duration,
+                                                   permissions_check_duration, superuser_check_duration))
+
+
+if __name__ == '__main__':
+    call_command('migrate', verbosity=0)
+    database = Database(DATABASE_HOST, DATABASE_NAME)
+    database.connect()
+    try:
+        for size in SIZES:
+            bench(size)
+    finally:
+        database.clean_database()
+        database.disconnect()
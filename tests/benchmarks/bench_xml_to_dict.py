@@ -0,0 +1,94 @@
+""" XML to dict conversion benchmark: xmltodict followed by remove_lists_from_xml_dict against the streaming
+conversion of xml_dict, on a generated document.
+
+Run with:
+    python -m tests.benchmarks.bench_xml_to_dict
+
+Each conversion runs in its own process to measure its peak memory (maximum resident set size).
+"""
+import multiprocessing
+import os
+import resource
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.test_settings")
+django.setup()
+
+from core_main_app.utils import xml as xml_utils
+from core_main_app.utils.xml_dict import xml_to_dict
+
+DOCUMENT_SIZE_MB = float(os.environ.get('XML_DICT_BENCHMARK_SIZE_MB', 20))
+OCCURRENCES_LIMIT = int(os.environ.get('XML_DICT_BENCHMARK_OCCURRENCES_LIMIT', 100))
+
+
+def generate_document(size_mb):
+    """ Generate an XML document with short lists (kept) and one long list of records (over the limit).
+
+    Args:
+        size_mb: Approximate size of the document.
+
+    Returns:
+
+    """
+    record = u'<record id="{0}"><name>name {0}</name><value>{0}.5</value><tag>a</tag><tag>b</tag></record>'
+    parts = [u'<root><header><title>benchmark</title><count>1</count></header>']
+    size = 0
+    index = 0
+    while size < size_mb * 1024 * 1024:
+        part = record.format(index)
+        parts.append(part)
+        size += len(part)
+        index += 1
+    parts.append(u'</root>')
+    return u''.join(parts)
+
+
+def convert_with_xmltodict(xml_string):
+    dict_content = xml_utils.raw_xml_to_dict(xml_string, xml_utils.post_processor)
+    xml_utils.remove_lists_from_xml_dict(dict_content, OCCURRENCES_LIMIT)
+    return dict_content
+
+
+def convert_with_xml_dict(xml_string):
+    return xml_to_dict(xml_string, OCCURRENCES_LIMIT)
+
+
+def _run(convert, xml_string, queue):
+    """ Convert the document and send the duration and the memory used by the conversion.
+
+    Args:
+        convert:
+        xml_string:
+        queue:
+
+    Returns:
+
+    """
+    start_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    dict_content = convert(xml_string)
+    duration = time.time() - start
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((duration, (peak_memory - start_memory) / 1024.0, repr(dict_content)))
+
+
+def bench(convert, xml_string):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run, args=(convert, xml_string, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+if __name__ == '__main__':
+    document = generate_document(DOCUMENT_SIZE_MB)
+    print('document: {:.1f}MB, occurrences limit: {}'.format(len(document) / 1024.0 / 1024, OCCURRENCES_LIMIT))
+    results = {}
+    for name, method in [('xmltodict + remove_lists_from_xml_dict', convert_with_xmltodict),
+                         ('xml_dict.xml_to_dict', convert_with_xml_dict)]:
+        duration, memory, results[name] = bench(method, document)
+        print('{}: {:.2f}s, peak memory +{:.1f}MB'.format(name, duration, memory))
+    assert len(set(results.values())) == 1, 'The conversions returned different dicts'
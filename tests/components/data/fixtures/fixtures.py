@@ -1,5 +1,7 @@
 """ Fixtures files for Data
 """
+import random
+
 from core_main_app.utils.integration_tests.fixture_interface import FixtureInterface
 from core_main_app.components.data.models import Data
 from core_main_app.components.template.models import Template
@@ -84,6 +86,23 @@ class QueryDataFixtures(DataFixtures):
         self.data_collection = [self.data_1, self.data_2]
 
 
+class PaginationDataFixtures(DataFixtures):
+    """ Data fixtures for pagination, with titles shared by several data
+    """
+    NB_DATA = 25
+
+    def generate_data_collection(self):
+        """ Generate a Data collection.
+
+        Returns:
+
+        """
+        # NOTE: no xml_content to avoid using unsupported GridFS mock
+        self.data_collection = [Data(template=self.template, user_id='1', dict_content=None,
+                                     title='title {}'.format(index % 3)).save()
+                                for index in range(self.NB_DATA)]
+
+
 class AccessControlDataFixture(FixtureInterface):
     """ Access Control Data fixture
     """
@@ -158,3 +177,73 @@ class AccessControlDataFixture(FixtureInterface):
                                      owner='2',
                                      read_perm_id='2',
                                      write_perm_id='2').save()
+
+
+class RandomAccessControlDataFixture(FixtureInterface):
+    """ Access Control Data fixture with randomly owned data, in random workspaces
+    """
+    USER_IDS = ['1', '2', '3', '4']
+    TITLES = ['title 1', 'title 2', 'title 3']
+    NB_WORKSPACES = 4
+    NB_DATA = 30
+
+    template = None
+    workspace_collection = None
+    data_collection = None
+
+    def __init__(self, seed):
+        """ Create the fixture.
+
+        Args:
+            seed: Seed of the random generator.
+        """
+        self.random = random.Random(seed)
+
+    def insert_data(self):
+        """ Insert a set of Data.
+
+        Returns:
+
+        """
+        self.generate_template()
+        self.generate_workspace_collection()
+        self.generate_data_collection()
+
+    def generate_template(self):
+        """ Generate an unique Template.
+
+        Returns:
+
+        """
+        template = Template()
+        template.content = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+                           '<xs:element name="tag"></xs:element></xs:schema>'
+        template.hash = ""
+        template.filename = "filename"
+        self.template = template.save()
+
+    def generate_workspace_collection(self):
+        """ Generate a Workspace collection.
+
+        Returns:
+
+        """
+        self.workspace_collection = [Workspace(title="Workspace {}".format(index),
+                                               owner=self.random.choice(self.USER_IDS),
+                                               read_perm_id=str(index),
+                                               write_perm_id=str(index)).save()
+                                     for index in range(self.NB_WORKSPACES)]
+
+    def generate_data_collection(self):
+        """ Generate a Data collection.
+
+        Returns:
+
+        """
+        self.data_collection = []
+        for index in range(self.NB_DATA):
+            workspace = self.random.choice(self.workspace_collection + [None])
+            self.data_collection.append(Data(template=self.template,
+                                             title=self.random.choice(self.TITLES),
+                                             user_id=self.random.choice(self.USER_IDS),
+                                             workspace=workspace.id if workspace is not None else None).save())
@@ -1,12 +1,16 @@
 """ Unit Test Data
 """
 from core_main_app.utils.integration_tests.integration_base_test_case import MongoIntegrationBaseTestCase
-from tests.components.data.fixtures.fixtures import DataFixtures
+from tests.components.data.fixtures.fixtures import DataFixtures, QueryDataFixtures
 from core_main_app.components.data.models import Data
 from core_main_app.commons import exceptions
 from bson.objectid import ObjectId
+from mock import patch
+from mongoengine.connection import get_db
+from pymongo.errors import BulkWriteError
 
 fixture_data = DataFixtures()
+fixture_data_query = QueryDataFixtures()
 
 
 class TestDataGetAll(MongoIntegrationBaseTestCase):
@@ -82,3 +86,127 @@ class TestDataGetAllExceptUserId(MongoIntegrationBaseTestCase):
         result = Data.get_all_except_user_id(user_id)
         # Assert
         self.assertTrue(result.count() > 0)
+
+
+class TestDataExecuteQuery(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data_query
+
+    def test_data_execute_query_with_projection_does_not_load_other_fields(self):
+        # Act
+        result = Data.execute_query({'title': 'title'}, projection=['title'])
+        # Assert
+        self.assertEqual(result[0].title, 'title')
+        self.assertFalse(result[0].dict_content)
+
+    def test_data_execute_query_without_projection_loads_all_fields(self):
+        # Act
+        result = Data.execute_query({'title': 'title'})
+        # Assert
+        self.assertEqual(result[0].dict_content, self.fixture.data_1.dict_content)
+
+
+class TestDataExecuteTextQuery(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data_query
+
+    def test_data_execute_text_query_searches_text_with_query(self):
+        # Act
+        result = Data.execute_text_query({'title': 'title'}, '"value"')
+        # Assert
+        self.assertEqual(result._query, {'$and': [{'title': 'title'}, {'$text': {'$search': '"value"'}}]})
+
+    def test_data_execute_text_query_sorts_by_text_score(self):
+        # Act
+        result = Data.execute_text_query({'title': 'title'}, '"value"')
+        # Assert
+        self.assertEqual(result._ordering, [('_text_score', {'$meta': 'textScore'})])
+
+    def test_data_execute_text_query_with_limit_limits_results(self):
+        # Act
+        result = Data.execute_text_query({'title': 'title'}, '"value"', limit=10)
+        # Assert
+        self.assertEqual(result._limit, 10)
+
+
+class TestDataInsertMany(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data
+
+    def test_data_insert_many_returns_ids_of_inserted_data(self):
+        # Arrange
+        data_list = [Data(template=self.fixture.template, user_id='1', title='new title {}'.format(index))
+                     for index in range(2)]
+        # Act
+        inserted_ids = Data.insert_many(data_list)
+        # Assert
+        self.assertEqual([Data.get_by_id(inserted_id).title for inserted_id in inserted_ids],
+                         ['new title 0', 'new title 1'])
+
+    def test_data_insert_many_raises_bulk_insert_error_with_errors_of_data_not_inserted(self):
+        # Arrange
+        data_list = [Data(template=self.fixture.template, user_id='1', title='new title {}'.format(index))
+                     for index in range(3)]
+        bulk_write_error = BulkWriteError({'writeErrors': [{'index': 1, 'code': 11000, 'errmsg': 'duplicate key'}]})
+        # Act
+        with patch.object(Data._get_collection(), 'insert_many', side_effect=bulk_write_error):
+            with self.assertRaises(exceptions.BulkInsertError) as context:
+                Data.insert_many(data_list)
+        # Assert
+        self.assertEqual(context.exception.errors, {1: 'duplicate key'})
+        self.assertTrue(all(data.pk is not None for data in data_list))
+
+
+class TestDataPrefetchXmlContent(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data
+
+    def test_prefetch_xml_content_sets_xml_content_from_chunks(self):
+        # Arrange
+        data = _create_data_with_file(['<tag>', 'value</tag>'])
+        # Act
+        Data.prefetch_xml_content([data])
+        # Assert
+        self.assertEqual(data._xml_content, '<tag>value</tag>')
+
+    def test_prefetch_xml_content_skips_incomplete_file(self):
+        # Arrange
+        data = _create_data_with_file(['<tag>', 'value</tag>'], length=100)
+        # Act
+        Data.prefetch_xml_content([data])
+        # Assert
+        self.assertIsNone(data._xml_content)
+
+    def test_prefetch_xml_content_keeps_xml_content_already_set(self):
+        # Arrange
+        data = _create_data_with_file(['<tag>value</tag>'])
+        data.xml_content = '<tag>other</tag>'
+        # Act
+        Data.prefetch_xml_content([data])
+        # Assert
+        self.assertEqual(data._xml_content, '<tag>other</tag>')
+
+
+def _create_data_with_file(chunks, length=None):
+    """ Create a data and write its file directly in the GridFS collections (GridFS is not supported by the mock).
+
+    Args:
+        chunks:
+        length:
+
+    Returns:
+
+    """
+    data = Data(title='title', user_id='1')
+    database = get_db(data.xml_file.db_alias)
+    grid_id = ObjectId()
+    database[data.xml_file.collection_name + '.files'].insert_one({
+        '_id': grid_id,
+        'length': length if length is not None else sum(len(chunk) for chunk in chunks),
+        'chunkSize': 255 * 1024
+    })
+    # insert the chunks in reverse order, the order is given by n
+    for n, chunk in reversed(list(enumerate(chunks))):
+        database[data.xml_file.collection_name + '.chunks'].insert_one({'files_id': grid_id, 'n': n, 'data': chunk})
+    data.xml_file.grid_id = grid_id
+    return data
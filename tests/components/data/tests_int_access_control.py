@@ -9,9 +9,10 @@ from core_main_app.components.data.models import Data
 from core_main_app.utils.access_control.exceptions import AccessControlError
 from core_main_app.utils.integration_tests.integration_base_test_case import MongoIntegrationBaseTestCase
 from core_main_app.utils.tests_tools.MockUser import create_mock_user
-from tests.components.data.fixtures.fixtures import AccessControlDataFixture
+from tests.components.data.fixtures.fixtures import AccessControlDataFixture, RandomAccessControlDataFixture
 
 fixture_data = AccessControlDataFixture()
+random_fixture_data = RandomAccessControlDataFixture(seed=20180101)
 
 # NOTE: Uncomment to test in debug
 # from django.conf import settings
@@ -115,6 +116,48 @@ class TestDataGetAllByUser(MongoIntegrationBaseTestCase):
         self.assertTrue(data.user_id == '1' for data in data_list)
 
 
+class TestDataGetAllAccessibleByUser(MongoIntegrationBaseTestCase):
+
+    fixture = fixture_data
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_write_access_by_user')
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_get_all_accessible_by_user_returns_owned_data_and_workspace_data(
+            self, get_all_workspaces_with_read_access_by_user, get_all_workspaces_with_write_access_by_user):
+        mock_user = _create_user('1')
+        get_all_workspaces_with_read_access_by_user.return_value = [fixture_data.workspace_2]
+        get_all_workspaces_with_write_access_by_user.return_value = []
+        data_list = data_api.get_all_accessible_by_user(mock_user)
+        self.assertEqual(set(data.title for data in data_list), {'Data 1', 'Data 3', 'Data 4'})
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_write_access_by_user')
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_get_all_accessible_by_user_returns_owned_data_in_accessible_workspace_once(
+            self, get_all_workspaces_with_read_access_by_user, get_all_workspaces_with_write_access_by_user):
+        mock_user = _create_user('1')
+        get_all_workspaces_with_read_access_by_user.return_value = [fixture_data.workspace_1]
+        get_all_workspaces_with_write_access_by_user.return_value = [fixture_data.workspace_1]
+        data_list = data_api.get_all_accessible_by_user(mock_user)
+        self.assertEqual(sorted(data.title for data in data_list), ['Data 1', 'Data 3'])
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_write_access_by_user')
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_get_all_accessible_by_user_returns_ordered_queryset(
+            self, get_all_workspaces_with_read_access_by_user, get_all_workspaces_with_write_access_by_user):
+        mock_user = _create_user('2')
+        get_all_workspaces_with_read_access_by_user.return_value = []
+        get_all_workspaces_with_write_access_by_user.return_value = [fixture_data.workspace_1]
+        data_list = data_api.get_all_accessible_by_user(mock_user, order_by_field='-title')
+        self.assertEqual(data_list.count(), 3)
+        self.assertEqual([data.title for data in data_list], ['Data 4', 'Data 3', 'Data 2'])
+        self.assertEqual([data.title for data in data_list[1:2]], ['Data 3'])
+
+    def test_get_all_accessible_by_user_as_superuser_returns_owned_data_and_all_workspace_data(self):
+        mock_user = _create_user('1', is_superuser=True)
+        data_list = data_api.get_all_accessible_by_user(mock_user)
+        self.assertEqual(set(data.title for data in data_list), {'Data 1', 'Data 3', 'Data 4'})
+
+
 class TestDataGetAllExceptUser(MongoIntegrationBaseTestCase):
     # NOTE: Will always fail when private data are present (data.workspace=None, data.user_id!=user.id)
     fixture = fixture_data
@@ -211,6 +254,63 @@ class TestDataExecuteQuery(MongoIntegrationBaseTestCase):
         self.assertTrue(len(data_list) == 4)
 
 
+class TestDataExecuteQueryTrustedResults(MongoIntegrationBaseTestCase):
+    """ Check, on random data, users, workspace accesses and queries, that returning the results of the query
+    without verification is equivalent to checking each data.
+    """
+
+    fixture = random_fixture_data
+    NB_EXAMPLES = 50
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_trusted_results_are_the_verified_results(self, get_all_workspaces_with_read_access_by_user):
+        for user, accessible_workspaces, query in self._generate_examples():
+            get_all_workspaces_with_read_access_by_user.return_value = accessible_workspaces
+            # trusted results
+            with patch('core_main_app.components.data.access_control.VERIFY_DATA_QUERY_RESULTS', False):
+                trusted_ids = [data.id for data in data_api.execute_query(query, user)]
+            # verified results, raise if any data is not accessible
+            with patch('core_main_app.components.data.access_control.VERIFY_DATA_QUERY_RESULTS', True):
+                verified_ids = [data.id for data in data_api.execute_query(query, _create_user(user.id))]
+            self.assertEqual(trusted_ids, verified_ids)
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_trusted_results_are_the_accessible_data_matching_the_query(self,
+                                                                        get_all_workspaces_with_read_access_by_user):
+        for user, accessible_workspaces, query in self._generate_examples():
+            get_all_workspaces_with_read_access_by_user.return_value = accessible_workspaces
+            with patch('core_main_app.components.data.access_control.VERIFY_DATA_QUERY_RESULTS', False):
+                trusted_ids = set(data.id for data in data_api.execute_query(query, user))
+            accessible_workspace_ids = [workspace.id for workspace in accessible_workspaces]
+            expected_ids = set(data.id for data in self.fixture.data_collection
+                               if _match(data, query) and (data.user_id == user.id or
+                                                           (data.workspace is not None and
+                                                            data.workspace.id in accessible_workspace_ids)))
+            self.assertEqual(trusted_ids, expected_ids)
+
+    def _generate_examples(self):
+        """ Generate random users, accessible workspaces and queries.
+
+        Returns:
+
+        """
+        generator = self.fixture.random
+        workspaces = self.fixture.workspace_collection
+        for _ in range(self.NB_EXAMPLES):
+            user = _create_user(generator.choice(self.fixture.USER_IDS))
+            accessible_workspaces = generator.sample(workspaces, generator.randint(0, len(workspaces)))
+            query = generator.choice([
+                {},
+                {'title': generator.choice(self.fixture.TITLES)},
+                {'user_id': generator.choice(self.fixture.USER_IDS)},
+                {'workspace': generator.choice(workspaces).id},
+                {'workspace': None},
+                {'$or': [{'title': generator.choice(self.fixture.TITLES)},
+                         {'user_id': generator.choice(self.fixture.USER_IDS)}]},
+            ])
+            yield user, accessible_workspaces, query
+
+
 class TestDataDelete(MongoIntegrationBaseTestCase):
 
     fixture = fixture_data
@@ -293,3 +393,25 @@ class TestDataChangeOwner(MongoIntegrationBaseTestCase):
 
 def _create_user(user_id, is_superuser=False):
     return create_mock_user(user_id, is_superuser=is_superuser)
+
+
+def _match(data, query):
+    """ Check if a data matches one of the queries generated by the tests.
+
+    Args:
+        data:
+        query:
+
+    Returns:
+
+    """
+    if '$or' in query:
+        return any(_match(data, sub_query) for sub_query in query['$or'])
+    for field, value in query.items():
+        if field == 'workspace':
+            data_value = data.workspace.id if data.workspace is not None else None
+        else:
+            data_value = getattr(data, field)
+        if data_value != value:
+            return False
+    return True
@@ -3,12 +3,15 @@
 from collections import OrderedDict
 from unittest.case import TestCase
 
+from bson.objectid import ObjectId
 from mock import patch
 
 import core_main_app.components.data.api as data_api
 from core_main_app.commons import exceptions
 from core_main_app.components.data.models import Data
 from core_main_app.components.template.models import Template
+from core_main_app.components.workspace.models import Workspace
+from core_main_app.utils import xsd_schema_cache
 from core_main_app.utils.access_control.exceptions import AccessControlError
 from core_main_app.utils.tests_tools.MockUser import create_mock_user
 
@@ -55,6 +58,42 @@ class TestDataGetAllExceptUser(TestCase):
             data_api.get_all_except_user(mock_user)
 
 
+class TestDataGetAllAccessibleByUser(TestCase):
+
+    @patch("core_main_app.components.workspace.api.get_all_workspaces_with_write_access_by_user")
+    @patch("core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user")
+    @patch.object(Data, 'get_all_by_user_id_or_list_workspace')
+    def test_data_get_all_accessible_by_user_queries_owned_data_or_accessible_workspaces_once(
+            self, mock_get_all_by_user_id_or_list_workspace, get_all_workspaces_with_read_access_by_user,
+            get_all_workspaces_with_write_access_by_user):
+        # Arrange
+        mock_workspace_1 = Workspace(id='5a5f64dd2b7e4e7b1e3c1a11')
+        mock_workspace_2 = Workspace(id='5a5f64dd2b7e4e7b1e3c1a12')
+        get_all_workspaces_with_read_access_by_user.return_value = [mock_workspace_1, mock_workspace_2]
+        get_all_workspaces_with_write_access_by_user.return_value = [mock_workspace_1]
+        mock_user = _create_user('1')
+        # Act
+        data_api.get_all_accessible_by_user(mock_user, order_by_field='title')
+        # Assert
+        self.assertEqual(mock_get_all_by_user_id_or_list_workspace.call_count, 1)
+        user_id, list_workspace, order_by_field = mock_get_all_by_user_id_or_list_workspace.call_args[0]
+        self.assertEqual(user_id, '1')
+        self.assertEqual(sorted(list_workspace), sorted([mock_workspace_1.id, mock_workspace_2.id]))
+        self.assertEqual(order_by_field, 'title')
+
+    @patch("core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user")
+    @patch.object(Data, 'get_all_by_user_id_or_list_workspace')
+    def test_data_get_all_accessible_by_superuser_does_not_list_workspaces(
+            self, mock_get_all_by_user_id_or_list_workspace, get_all_workspaces_with_read_access_by_user):
+        # Arrange
+        mock_user = create_mock_user('1', is_superuser=True)
+        # Act
+        data_api.get_all_accessible_by_user(mock_user)
+        # Assert
+        mock_get_all_by_user_id_or_list_workspace.assert_called_once_with('1', None, None)
+        get_all_workspaces_with_read_access_by_user.assert_not_called()
+
+
 class TestDataUpsert(TestCase):
 
     @patch.object(Data, 'convert_to_file')
@@ -124,6 +163,20 @@ class TestDataUpsert(TestCase):
         # Assert
         self.assertIsNotNone(result.last_modification_date)
 
+    @patch.object(data_api, 'get_search_backend')
+    @patch.object(Data, 'convert_to_file')
+    @patch.object(data_api, 'check_xml_file_is_valid')
+    @patch.object(Data, 'save')
+    def test_data_upsert_indexes_data(self, mock_save, mock_check, mock_convert_file, mock_get_search_backend):
+        # Arrange
+        data = _create_data(_get_template(), user_id='2', title='title', content='<tag></tag>')
+        mock_save.return_value = data
+        mock_user = _create_user('2')
+        # Act
+        data_api.upsert(data, mock_user)
+        # Assert
+        mock_get_search_backend.return_value.index_data.assert_called_once_with([data])
+
     def test_data_upsert_raises_xml_error_if_failed_during_xml_validation(self):
         # Arrange
         data = _create_data(None, user_id='3', title='title', content='')
@@ -152,6 +205,225 @@ class TestDataUpsert(TestCase):
             data_api.upsert(data, mock_user)
 
 
+class TestDataBulkUpsert(TestCase):
+
+    @patch.object(Data, 'insert_many')
+    @patch.object(Data, 'validate')
+    @patch.object(Data, 'convert_to_file')
+    def test_data_bulk_upsert_inserts_valid_data_and_reports_created(self, mock_convert_file, mock_validate,
+                                                                     mock_insert_many):
+        # Arrange
+        template = _get_template()
+        data_list = [_create_data(template, user_id='1', title='title_1', content='<tag>1</tag>'),
+                     _create_data(template, user_id='1', title='title_2', content='<tag>2</tag>')]
+        mock_insert_many.return_value = ['id_1', 'id_2']
+        mock_user = _create_user('1')
+        # Act
+        report = data_api.bulk_upsert(data_list, mock_user)
+        # Assert
+        self.assertEqual([status['status'] for status in report], [data_api.BULK_STATUS_CREATED] * 2)
+        self.assertEqual([status['id'] for status in report], ['id_1', 'id_2'])
+        mock_insert_many.assert_called_once_with(data_list)
+
+    @patch.object(Data, 'insert_many')
+    @patch.object(Data, 'validate')
+    @patch.object(Data, 'convert_to_file')
+    def test_data_bulk_upsert_reports_invalid_data_and_inserts_the_others(self, mock_convert_file, mock_validate,
+                                                                          mock_insert_many):
+        # Arrange
+        template = _get_template()
+        valid_data = _create_data(template, user_id='1', title='title_1', content='<tag>1</tag>')
+        invalid_data = _create_data(template, user_id='1', title='title_2', content='<other>2</other>')
+        mock_insert_many.return_value = ['id_1']
+        mock_user = _create_user('1')
+        # Act
+        report = data_api.bulk_upsert([invalid_data, valid_data], mock_user)
+        # Assert
+        self.assertEqual(report[0]['status'], data_api.BULK_STATUS_ERROR)
+        self.assertIsNotNone(report[0]['message'])
+        self.assertEqual(report[1]['status'], data_api.BULK_STATUS_CREATED)
+        mock_insert_many.assert_called_once_with([valid_data])
+
+    @patch.object(Data, 'insert_many')
+    def test_data_bulk_upsert_reports_error_for_all_data_of_an_invalid_template(self, mock_insert_many):
+        # Arrange
+        template = _get_template()
+        template.content += "<"
+        data_list = [_create_data(template, user_id='1', title='title_1', content='<tag>1</tag>')]
+        mock_user = _create_user('1')
+        # Act
+        report = data_api.bulk_upsert(data_list, mock_user)
+        # Assert
+        self.assertEqual(report[0]['status'], data_api.BULK_STATUS_ERROR)
+        self.assertFalse(mock_insert_many.called)
+
+    @patch.object(xsd_schema_cache, 'get_xml_schema', wraps=xsd_schema_cache.get_xml_schema)
+    @patch.object(Data, 'insert_many')
+    @patch.object(Data, 'validate')
+    @patch.object(Data, 'convert_to_file')
+    def test_data_bulk_upsert_validates_with_cached_schema_of_template(self, mock_convert_file, mock_validate,
+                                                                       mock_insert_many, mock_get_xml_schema):
+        # Arrange
+        template = _get_template()
+        data_list = [_create_data(template, user_id='1', title='title_1', content='<tag>1</tag>')]
+        mock_insert_many.return_value = ['id_1']
+        mock_user = _create_user('1')
+        # Act
+        data_api.bulk_upsert(data_list, mock_user)
+        # Assert
+        mock_get_xml_schema.assert_called_once_with(template)
+
+    @patch.object(data_api, 'validate_xml_data_many')
+    @patch.object(Data, 'insert_many')
+    def test_data_bulk_upsert_reports_validation_failure_not_as_template_error(self, mock_insert_many,
+                                                                               mock_validate_xml_data_many):
+        # Arrange
+        template = _get_template()
+        data_list = [_create_data(template, user_id='1', title='title_1', content='<tag>1</tag>')]
+        mock_validate_xml_data_many.side_effect = OSError('pool error')
+        mock_user = _create_user('1')
+        # Act
+        report = data_api.bulk_upsert(data_list, mock_user)
+        # Assert
+        self.assertEqual(report[0]['status'], data_api.BULK_STATUS_ERROR)
+        self.assertIn('Unable to validate the data', report[0]['message'])
+        self.assertNotIn('template', report[0]['message'])
+        self.assertFalse(mock_insert_many.called)
+
+    @patch.object(Data, 'insert_many')
+    @patch.object(Data, 'validate')
+    @patch.object(Data, 'convert_to_file')
+    def test_data_bulk_upsert_reports_data_not_inserted_and_keeps_the_inserted_ones(self, mock_convert_file,
+                                                                                    mock_validate,
+                                                                                    mock_insert_many):
+        # Arrange
+        template = _get_template()
+        data_list = [_create_data(template, user_id='1', title='title_{}'.format(index), content='<tag>1</tag>')
+                     for index in range(3)]
+        inserted_ids = [ObjectId() for _ in data_list]
+
+        def insert_many(new_data_list):
+            for data, inserted_id in zip(new_data_list, inserted_ids):
+                data.pk = inserted_id
+            raise exceptions.BulkInsertError("Unable to insert 1 data.", {1: 'duplicate key'})
+
+        mock_insert_many.side_effect = insert_many
+        mock_user = _create_user('1')
+        # Act
+        with patch.object(Data, 'xml_file') as mock_xml_file:
+            report = data_api.bulk_upsert(data_list, mock_user)
+        # Assert
+        self.assertEqual([status['status'] for status in report],
+                         [data_api.BULK_STATUS_CREATED, data_api.BULK_STATUS_ERROR, data_api.BULK_STATUS_CREATED])
+        self.assertEqual([status['id'] for status in report], [str(inserted_ids[0]), None, str(inserted_ids[2])])
+        self.assertIn('duplicate key', report[1]['message'])
+        self.assertIsNone(data_list[1].pk)
+        self.assertEqual(mock_xml_file.delete.call_count, 1)
+
+    def test_data_bulk_upsert_raises_access_control_error_if_user_is_not_owner(self):
+        # Arrange
+        data_list = [_create_data(_get_template(), user_id='2', title='title_1', content='<tag>1</tag>')]
+        mock_user = _create_user('1')
+        # Act # Assert
+        with self.assertRaises(AccessControlError):
+            data_api.bulk_upsert(data_list, mock_user)
+
+
+    @patch.object(data_api, 'get_search_backend')
+    @patch.object(Data, 'insert_many')
+    @patch.object(Data, 'validate')
+    @patch.object(Data, 'convert_to_file')
+    def test_data_bulk_upsert_indexes_saved_data(self, mock_convert_file, mock_validate, mock_insert_many,
+                                                 mock_get_search_backend):
+        # Arrange
+        template = _get_template()
+        invalid_data = _create_data(template, user_id='1', title='title_1', content='<other>1</other>')
+        valid_data = _create_data(template, user_id='1', title='title_2', content='<tag>2</tag>')
+        mock_insert_many.return_value = ['id_2']
+        mock_user = _create_user('1')
+        # Act
+        data_api.bulk_upsert([invalid_data, valid_data], mock_user)
+        # Assert
+        mock_get_search_backend.return_value.index_data.assert_called_once_with([valid_data])
+
+
+class TestDataGetProjection(TestCase):
+
+    def test_get_projection_returns_none_if_all_fields_are_requested(self):
+        # Act # Assert
+        self.assertIsNone(data_api.get_projection(None))
+
+    def test_get_projection_maps_xml_content_to_xml_file(self):
+        # Act
+        projection = data_api.get_projection(['xml_content'])
+        # Assert
+        self.assertTrue('xml_file' in projection)
+        self.assertFalse('xml_content' in projection)
+
+    def test_get_projection_always_returns_access_control_fields(self):
+        # Act
+        projection = data_api.get_projection(['title'])
+        # Assert
+        self.assertEqual(set(projection), {'title', 'user_id', 'workspace'})
+
+
+class TestDataConvertToDict(TestCase):
+
+    def test_convert_to_dict_keeps_whole_xml_if_template_has_no_searchable_paths(self):
+        # Arrange
+        data = _create_data(_get_template(), user_id='1', title='title', content='<tag><a>1</a><b>2</b></tag>')
+        # Act
+        data.convert_to_dict()
+        # Assert
+        self.assertEqual(data.dict_content, {'tag': {'a': 1, 'b': 2}})
+
+    def test_convert_to_dict_keeps_searchable_paths_of_template(self):
+        # Arrange
+        template = _get_template()
+        template.searchable_paths = ['/tag/a']
+        data = _create_data(template, user_id='1', title='title', content='<tag><a>1</a><b>2</b></tag>')
+        # Act
+        data.convert_to_dict()
+        # Assert
+        self.assertEqual(data.dict_content, {'tag': {'a': 1}})
+
+
+class TestDataRebuildDictContent(TestCase):
+
+    @patch.object(Data, 'save_dict_content')
+    @patch.object(Data, 'get_all_by_list_template')
+    def test_rebuild_dict_content_converts_and_saves_dict_content_of_data_of_templates(self, mock_get_all_by_template,
+                                                                                       mock_save_dict_content):
+        # Arrange
+        template = _get_template()
+        template.searchable_paths = ['/tag/a']
+        data = _create_data(template, user_id='1', title='title', content='<tag><a>1</a><b>2</b></tag>')
+        mock_get_all_by_template.return_value.no_cache.return_value = [data]
+        # Act
+        rebuilt_count, errors = data_api.rebuild_dict_content([template])
+        # Assert
+        mock_get_all_by_template.assert_called_once_with([template])
+        self.assertEqual((rebuilt_count, errors), (1, []))
+        self.assertEqual(data.dict_content, {'tag': {'a': 1}})
+        self.assertEqual(mock_save_dict_content.call_count, 1)
+
+    @patch.object(Data, 'save_dict_content')
+    @patch.object(Data, 'get_all')
+    def test_rebuild_dict_content_reports_invalid_data_and_rebuilds_the_others(self, mock_get_all,
+                                                                                mock_save_dict_content):
+        # Arrange
+        template = _get_template()
+        invalid_data = _create_data(template, user_id='1', title='title', content='<tag>')
+        valid_data = _create_data(template, user_id='1', title='title', content='<tag>1</tag>')
+        mock_get_all.return_value.no_cache.return_value = [invalid_data, valid_data]
+        # Act
+        rebuilt_count, errors = data_api.rebuild_dict_content()
+        # Assert
+        self.assertEqual(rebuilt_count, 1)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(mock_save_dict_content.call_count, 1)
+
+
 class TestDataCheckXmlFileIsValid(TestCase):
 
     def test_data_check_xml_file_is_valid_raises_xml_error_if_failed_during_xml_validation(self):
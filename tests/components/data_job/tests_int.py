@@ -0,0 +1,121 @@
+""" Integration Test Data Job
+"""
+import datetime
+
+from core_main_app.components.data_job.models import DataJob, STATUS_PENDING, STATUS_RUNNING
+from core_main_app.utils.integration_tests.integration_base_test_case import MongoIntegrationBaseTestCase
+from tests.components.data.fixtures.fixtures import DataFixtures
+
+fixture_data = DataFixtures()
+
+
+class TestClaimPendingJobs(MongoIntegrationBaseTestCase):
+    fixture = fixture_data
+
+    def test_claim_pending_jobs_returns_at_most_batch_size_jobs(self):
+        # Arrange
+        _create_data_jobs(self.fixture.template, 3)
+
+        # Act
+        data_jobs = DataJob.claim_pending_jobs(self.fixture.template.id, 2)
+
+        # Assert
+        self.assertEqual(len(data_jobs), 2)
+        self.assertTrue(all(data_job.status == STATUS_RUNNING for data_job in data_jobs))
+        self.assertEqual(len(set(data_job.batch_id for data_job in data_jobs)), 1)
+
+    def test_claim_pending_jobs_does_not_claim_jobs_twice(self):
+        # Arrange
+        _create_data_jobs(self.fixture.template, 3)
+
+        # Act
+        first_batch = DataJob.claim_pending_jobs(self.fixture.template.id, 2)
+        second_batch = DataJob.claim_pending_jobs(self.fixture.template.id, 2)
+        third_batch = DataJob.claim_pending_jobs(self.fixture.template.id, 2)
+
+        # Assert
+        self.assertEqual(len(second_batch), 1)
+        self.assertEqual(third_batch, [])
+        self.assertEqual(len(set(data_job.id for data_job in first_batch + second_batch)), 3)
+
+    def test_claim_pending_jobs_ignores_jobs_of_other_templates(self):
+        # Arrange
+        _create_data_jobs(self.fixture.template, 1)
+
+        # Act
+        data_jobs = DataJob.claim_pending_jobs('507f1f77bcf86cd799439011', 2)
+
+        # Assert
+        self.assertEqual(data_jobs, [])
+        self.assertEqual(DataJob.objects(status=STATUS_PENDING).count(), 1)
+
+    def test_claim_pending_jobs_claims_stale_running_jobs_again(self):
+        # Arrange
+        _create_data_jobs(self.fixture.template, 1)
+        first_batch = DataJob.claim_pending_jobs(self.fixture.template.id, 2)
+
+        # Act
+        data_jobs = DataJob.claim_pending_jobs(self.fixture.template.id, 2,
+                                               datetime.datetime.utcnow() + datetime.timedelta(seconds=1))
+
+        # Assert
+        self.assertEqual([data_job.id for data_job in data_jobs], [first_batch[0].id])
+        self.assertNotEqual(data_jobs[0].batch_id, first_batch[0].batch_id)
+
+    def test_claim_pending_jobs_does_not_claim_running_jobs_claimed_after_stale_date(self):
+        # Arrange
+        _create_data_jobs(self.fixture.template, 1)
+        DataJob.claim_pending_jobs(self.fixture.template.id, 2)
+
+        # Act
+        data_jobs = DataJob.claim_pending_jobs(self.fixture.template.id, 2,
+                                               datetime.datetime.utcnow() - datetime.timedelta(hours=1))
+
+        # Assert
+        self.assertEqual(data_jobs, [])
+
+
+class TestGetTemplateIdsOfUnprocessedJobs(MongoIntegrationBaseTestCase):
+    fixture = fixture_data
+
+    def test_get_template_ids_of_unprocessed_jobs_returns_template_of_old_pending_jobs(self):
+        # Arrange
+        _create_data_jobs(self.fixture.template, 2)
+
+        # Act
+        template_ids = DataJob.get_template_ids_of_unprocessed_jobs(
+            datetime.datetime.utcnow() + datetime.timedelta(seconds=1), datetime.datetime.utcnow())
+
+        # Assert
+        self.assertEqual(template_ids, [self.fixture.template.id])
+
+    def test_get_template_ids_of_unprocessed_jobs_returns_template_of_stale_running_jobs(self):
+        # Arrange
+        _create_data_jobs(self.fixture.template, 1)
+        DataJob.claim_pending_jobs(self.fixture.template.id, 1)
+
+        # Act
+        template_ids = DataJob.get_template_ids_of_unprocessed_jobs(
+            datetime.datetime.utcnow() - datetime.timedelta(hours=1),
+            datetime.datetime.utcnow() + datetime.timedelta(seconds=1))
+
+        # Assert
+        self.assertEqual(template_ids, [self.fixture.template.id])
+
+    def test_get_template_ids_of_unprocessed_jobs_ignores_recent_jobs(self):
+        # Arrange
+        _create_data_jobs(self.fixture.template, 2)
+        DataJob.claim_pending_jobs(self.fixture.template.id, 1)
+
+        # Act
+        template_ids = DataJob.get_template_ids_of_unprocessed_jobs(
+            datetime.datetime.utcnow() - datetime.timedelta(hours=1),
+            datetime.datetime.utcnow() - datetime.timedelta(hours=1))
+
+        # Assert
+        self.assertEqual(template_ids, [])
+
+
+def _create_data_jobs(template, count):
+    for index in range(count):
+        DataJob(template=template, title='title {}'.format(index), user_id='1').save()
@@ -0,0 +1,209 @@
+""" Unit Test Data Job
+"""
+from unittest.case import TestCase
+
+from bson.objectid import ObjectId
+from mock import patch
+
+import core_main_app.components.data_job.api as data_job_api
+from core_main_app.commons import exceptions
+from core_main_app.components.data import api as data_api
+from core_main_app.components.data_job import tasks
+from core_main_app.components.data_job.models import DataJob, STATUS_DONE, STATUS_ERROR
+from core_main_app.components.template.models import Template
+from core_main_app.components.user import api as user_api
+from core_main_app.utils.access_control.exceptions import AccessControlError
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+
+
+class TestDataJobCreate(TestCase):
+
+    @patch.object(tasks.process_data_jobs, 'apply_async')
+    @patch.object(DataJob, 'save')
+    @patch.object(DataJob, 'convert_to_file')
+    def test_create_saves_job_and_enqueues_task(self, mock_convert_to_file, mock_save, mock_apply_async):
+        # Arrange
+        template = _get_template()
+        user = create_mock_user('1')
+
+        # Act
+        data_job = data_job_api.create(template, 'title', '<tag></tag>', user)
+
+        # Assert
+        self.assertEqual(data_job.user_id, '1')
+        self.assertEqual(data_job.xml_content, '<tag></tag>')
+        self.assertTrue(mock_convert_to_file.called)
+        self.assertTrue(mock_save.called)
+        self.assertEqual(mock_apply_async.call_args[0][0], (str(template.id),))
+
+    @patch.object(tasks.process_data_jobs, 'apply_async')
+    @patch.object(DataJob, 'save')
+    def test_create_without_xml_content_raises_api_error(self, mock_save, mock_apply_async):
+        # Act # Assert
+        with self.assertRaises(exceptions.ApiError):
+            data_job_api.create(_get_template(), 'title', None, create_mock_user('1'))
+        self.assertFalse(mock_save.called)
+        self.assertFalse(mock_apply_async.called)
+
+    @patch.object(DataJob, 'delete')
+    @patch.object(DataJob, 'delete_xml_file')
+    @patch.object(tasks.process_data_jobs, 'apply_async')
+    @patch.object(DataJob, 'save')
+    @patch.object(DataJob, 'convert_to_file')
+    def test_create_deletes_job_and_raises_api_error_if_task_not_enqueued(self, mock_convert_to_file, mock_save,
+                                                                          mock_apply_async, mock_delete_xml_file,
+                                                                          mock_delete):
+        # Arrange
+        mock_apply_async.side_effect = Exception('broker unavailable')
+
+        # Act # Assert
+        with self.assertRaises(exceptions.ApiError):
+            data_job_api.create(_get_template(), 'title', '<tag></tag>', create_mock_user('1'))
+        self.assertTrue(mock_delete_xml_file.called)
+        self.assertTrue(mock_delete.called)
+
+
+class TestDataJobGetById(TestCase):
+
+    @patch.object(DataJob, 'get_by_id')
+    def test_get_by_id_returns_job_of_owner(self, mock_get_by_id):
+        # Arrange
+        data_job = _get_data_job('1')
+        mock_get_by_id.return_value = data_job
+
+        # Act
+        result = data_job_api.get_by_id(data_job.id, create_mock_user('1'))
+
+        # Assert
+        self.assertEqual(result, data_job)
+
+    @patch.object(DataJob, 'get_by_id')
+    def test_get_by_id_returns_job_to_superuser(self, mock_get_by_id):
+        # Arrange
+        data_job = _get_data_job('1')
+        mock_get_by_id.return_value = data_job
+
+        # Act
+        result = data_job_api.get_by_id(data_job.id, create_mock_user('2', is_superuser=True))
+
+        # Assert
+        self.assertEqual(result, data_job)
+
+    @patch.object(DataJob, 'get_by_id')
+    def test_get_by_id_of_other_user_raises_access_control_error(self, mock_get_by_id):
+        # Arrange
+        data_job = _get_data_job('1')
+        mock_get_by_id.return_value = data_job
+
+        # Act # Assert
+        with self.assertRaises(AccessControlError):
+            data_job_api.get_by_id(data_job.id, create_mock_user('2'))
+
+
+class TestDataJobProcessPendingJobs(TestCase):
+
+    @patch.object(DataJob, 'save')
+    @patch.object(data_api, 'bulk_upsert')
+    @patch.object(user_api, 'get_user_by_id')
+    @patch.object(DataJob, 'claim_pending_jobs')
+    def test_process_pending_jobs_saves_status_of_each_job(self, mock_claim, mock_get_user, mock_bulk_upsert,
+                                                           mock_save):
+        # Arrange
+        data_jobs = [_get_data_job('1'), _get_data_job('1')]
+        mock_claim.side_effect = [data_jobs, []]
+        mock_get_user.return_value = create_mock_user('1')
+        mock_bulk_upsert.return_value = [
+            {'status': data_api.BULK_STATUS_CREATED, 'id': 'data_id', 'message': None},
+            {'status': data_api.BULK_STATUS_ERROR, 'id': None, 'message': 'invalid'},
+        ]
+
+        # Act
+        count = data_job_api.process_pending_jobs('template_id', batch_size=2)
+
+        # Assert
+        self.assertEqual(count, 2)
+        self.assertEqual(data_jobs[0].status, STATUS_DONE)
+        self.assertEqual(data_jobs[0].data_id, 'data_id')
+        self.assertEqual(data_jobs[1].status, STATUS_ERROR)
+        self.assertEqual(data_jobs[1].message, 'invalid')
+        self.assertEqual(mock_save.call_count, 2)
+
+    @patch.object(DataJob, 'save')
+    @patch.object(data_api, 'bulk_upsert')
+    @patch.object(user_api, 'get_user_by_id')
+    @patch.object(DataJob, 'claim_pending_jobs')
+    def test_process_pending_jobs_saves_data_once_per_user(self, mock_claim, mock_get_user, mock_bulk_upsert,
+                                                           mock_save):
+        # Arrange
+        data_jobs = [_get_data_job('1'), _get_data_job('2'), _get_data_job('1')]
+        mock_claim.side_effect = [data_jobs, []]
+        mock_get_user.side_effect = lambda user_id: create_mock_user(user_id)
+        mock_bulk_upsert.side_effect = lambda data_list, user: [
+            {'status': data_api.BULK_STATUS_CREATED, 'id': 'data_id', 'message': None} for _ in data_list
+        ]
+
+        # Act
+        data_job_api.process_pending_jobs('template_id')
+
+        # Assert
+        self.assertEqual(mock_bulk_upsert.call_count, 2)
+        self.assertEqual([len(call[0][0]) for call in mock_bulk_upsert.call_args_list], [2, 1])
+        self.assertTrue(all(data_job.status == STATUS_DONE for data_job in data_jobs))
+
+    @patch.object(DataJob, 'save')
+    @patch.object(data_api, 'bulk_upsert')
+    @patch.object(user_api, 'get_user_by_id')
+    @patch.object(DataJob, 'claim_pending_jobs')
+    def test_process_pending_jobs_sets_error_if_user_not_found(self, mock_claim, mock_get_user, mock_bulk_upsert,
+                                                               mock_save):
+        # Arrange
+        data_jobs = [_get_data_job('1'), _get_data_job('1')]
+        mock_claim.side_effect = [data_jobs, []]
+        mock_get_user.side_effect = Exception('user not found')
+
+        # Act
+        data_job_api.process_pending_jobs('template_id')
+
+        # Assert
+        self.assertFalse(mock_bulk_upsert.called)
+        self.assertTrue(all(data_job.status == STATUS_ERROR for data_job in data_jobs))
+        self.assertTrue(all(data_job.message == 'user not found' for data_job in data_jobs))
+
+    @patch.object(DataJob, 'claim_pending_jobs')
+    def test_process_pending_jobs_without_pending_job_returns_zero(self, mock_claim):
+        # Arrange
+        mock_claim.return_value = []
+
+        # Act # Assert
+        self.assertEqual(data_job_api.process_pending_jobs('template_id'), 0)
+
+
+class TestDataJobResumeUnprocessedJobs(TestCase):
+
+    @patch.object(tasks.process_data_jobs, 'apply_async')
+    @patch.object(DataJob, 'get_template_ids_of_unprocessed_jobs')
+    def test_resume_unprocessed_jobs_enqueues_task_per_template(self, mock_get_template_ids, mock_apply_async):
+        # Arrange
+        template_ids = [ObjectId(), ObjectId()]
+        mock_get_template_ids.return_value = template_ids
+
+        # Act
+        count = data_job_api.resume_unprocessed_jobs()
+
+        # Assert
+        self.assertEqual(count, 2)
+        self.assertEqual([call[0][0] for call in mock_apply_async.call_args_list],
+                         [(str(template_id),) for template_id in template_ids])
+
+
+def _get_template():
+    template = Template()
+    template.id = ObjectId()
+    return template
+
+
+def _get_data_job(user_id):
+    data_job = DataJob(template=_get_template(), title='title', user_id=user_id)
+    data_job.id = ObjectId()
+    data_job.xml_content = '<tag></tag>'
+    return data_job
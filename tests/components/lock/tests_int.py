@@ -0,0 +1,198 @@
+""" Integration Test for Lock API
+"""
+import datetime
+
+from mock.mock import patch
+from pymongo.errors import DuplicateKeyError
+
+from core_main_app.commons.exceptions import LockError
+from core_main_app.components.lock import api as lock_api
+from core_main_app.components.lock.models import DatabaseLockObject
+from core_main_app.settings import LOCK_OBJECT_TTL
+from core_main_app.utils.integration_tests.integration_base_test_case import MongoIntegrationBaseTestCase
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+from tests.components.data.fixtures.fixtures import DataFixtures
+
+fixture_data = DataFixtures()
+
+
+class TestSetLockObject(MongoIntegrationBaseTestCase):
+    fixture = fixture_data
+
+    def test_set_lock_object_locks_object_for_other_users(self):
+        # Arrange
+        data = self.fixture.data_1
+        # Act
+        lock_api.set_lock_object(data, create_mock_user('1'))
+        # Assert
+        self.assertTrue(lock_api.is_object_locked(data, create_mock_user('2')))
+
+    def test_set_lock_object_does_not_lock_object_for_owner(self):
+        # Arrange
+        data = self.fixture.data_1
+        # Act
+        lock_api.set_lock_object(data, create_mock_user('1'))
+        # Assert
+        self.assertFalse(lock_api.is_object_locked(data, create_mock_user('1')))
+
+    def test_set_lock_object_twice_by_owner_renews_lock(self):
+        # Arrange
+        data = self.fixture.data_1
+        user = create_mock_user('1')
+        lock_api.set_lock_object(data, user)
+        first_lock_date = DatabaseLockObject.get_lock_by_object(data).lock_date
+        # Act
+        lock_api.set_lock_object(data, user)
+        # Assert
+        self.assertEqual(DatabaseLockObject.objects(object=data).count(), 1)
+        self.assertGreaterEqual(DatabaseLockObject.get_lock_by_object(data).lock_date, first_lock_date)
+
+    def test_set_lock_object_locked_by_other_user_raises_lock_error(self):
+        # Arrange
+        data = self.fixture.data_1
+        lock_api.set_lock_object(data, create_mock_user('1'))
+        # Act # Assert
+        with self.assertRaises(LockError):
+            lock_api.set_lock_object(data, create_mock_user('2'))
+
+    def test_set_lock_object_locked_by_other_user_keeps_lock(self):
+        # Arrange
+        data = self.fixture.data_1
+        lock_api.set_lock_object(data, create_mock_user('1'))
+        # Act
+        try:
+            lock_api.set_lock_object(data, create_mock_user('2'))
+        except LockError:
+            pass
+        # Assert
+        self.assertEqual(DatabaseLockObject.get_lock_by_object(data).user_id, '1')
+
+    def test_set_lock_object_with_expired_lock_of_other_user_takes_lock(self):
+        # Arrange
+        data = self.fixture.data_1
+        _set_expired_lock(data, '1')
+        # Act
+        lock_api.set_lock_object(data, create_mock_user('2'))
+        # Assert
+        self.assertEqual(DatabaseLockObject.objects(object=data).count(), 1)
+        self.assertEqual(DatabaseLockObject.get_lock_by_object(data).user_id, '2')
+
+    def test_set_lock_object_on_two_objects_locks_both(self):
+        # Arrange
+        user = create_mock_user('1')
+        # Act
+        lock_api.set_lock_object(self.fixture.data_1, user)
+        lock_api.set_lock_object(self.fixture.data_2, user)
+        # Assert
+        self.assertTrue(lock_api.is_object_locked(self.fixture.data_1, create_mock_user('2')))
+        self.assertTrue(lock_api.is_object_locked(self.fixture.data_2, create_mock_user('2')))
+
+    @patch.object(DatabaseLockObject, '_get_collection')
+    def test_set_lock_object_raises_lock_error_when_upsert_keeps_failing_on_unique_index(self,
+                                                                                       mock_get_collection):
+        # Arrange
+        mock_get_collection.return_value.find_one_and_update.side_effect = DuplicateKeyError('duplicate')
+        # Act # Assert
+        with self.assertRaises(LockError):
+            lock_api.set_lock_object(self.fixture.data_1, create_mock_user('1'))
+        self.assertEqual(mock_get_collection.return_value.find_one_and_update.call_count, 2)
+
+
+class TestIsObjectLocked(MongoIntegrationBaseTestCase):
+    fixture = fixture_data
+
+    def test_is_object_locked_returns_false_when_no_lock(self):
+        # Act # Assert
+        self.assertFalse(lock_api.is_object_locked(self.fixture.data_1, create_mock_user('1')))
+
+    def test_is_object_locked_returns_false_when_lock_expired(self):
+        # Arrange
+        _set_expired_lock(self.fixture.data_1, '1')
+        # Act # Assert
+        self.assertFalse(lock_api.is_object_locked(self.fixture.data_1, create_mock_user('2')))
+
+
+class TestRemoveLockOnObject(MongoIntegrationBaseTestCase):
+    fixture = fixture_data
+
+    def test_remove_lock_on_object_by_owner_unlocks_object(self):
+        # Arrange
+        data = self.fixture.data_1
+        lock_api.set_lock_object(data, create_mock_user('1'))
+        # Act
+        lock_api.remove_lock_on_object(data, create_mock_user('1'))
+        # Assert
+        self.assertFalse(lock_api.is_object_locked(data, create_mock_user('2')))
+        self.assertEqual(DatabaseLockObject.objects(object=data).count(), 0)
+
+    def test_remove_lock_on_object_by_other_user_keeps_lock(self):
+        # Arrange
+        data = self.fixture.data_1
+        lock_api.set_lock_object(data, create_mock_user('1'))
+        # Act
+        lock_api.remove_lock_on_object(data, create_mock_user('2'))
+        # Assert
+        self.assertTrue(lock_api.is_object_locked(data, create_mock_user('2')))
+
+    def test_remove_lock_on_object_not_locked_does_not_raise(self):
+        # Act
+        lock_api.remove_lock_on_object(self.fixture.data_1, create_mock_user('1'))
+        # Assert
+        self.assertEqual(DatabaseLockObject.objects(object=self.fixture.data_1).count(), 0)
+
+
+def _set_expired_lock(object, user_id):
+    """ Insert a lock that expired one second ago.
+
+    Args:
+        object:
+        user_id:
+
+    Returns:
+
+    """
+    lock_date = datetime.datetime.utcnow() - datetime.timedelta(seconds=LOCK_OBJECT_TTL + 1)
+    DatabaseLockObject._get_collection().insert_one({'object': object.id, 'user_id': user_id, 'lock_date': lock_date})
+
+
+class TestGetLockStatusMany(MongoIntegrationBaseTestCase):
+    fixture = fixture_data
+
+    def test_get_lock_status_many_returns_status_of_each_object(self):
+        # Arrange
+        lock_api.set_lock_object(self.fixture.data_1, create_mock_user('1'))
+        # Act
+        lock_status = lock_api.get_lock_status_many(self.fixture.data_collection, create_mock_user('2'))
+        # Assert
+        self.assertEqual(lock_status, {self.fixture.data_1.id: True, self.fixture.data_2.id: False})
+
+    def test_get_lock_status_many_object_locked_by_user_is_not_locked(self):
+        # Arrange
+        lock_api.set_lock_object(self.fixture.data_1, create_mock_user('1'))
+        # Act
+        lock_status = lock_api.get_lock_status_many(self.fixture.data_collection, create_mock_user('1'))
+        # Assert
+        self.assertFalse(lock_status[self.fixture.data_1.id])
+
+    def test_get_lock_status_many_expired_lock_is_not_locked(self):
+        # Arrange
+        _set_expired_lock(self.fixture.data_1, '1')
+        # Act
+        lock_status = lock_api.get_lock_status_many(self.fixture.data_collection, create_mock_user('2'))
+        # Assert
+        self.assertFalse(lock_status[self.fixture.data_1.id])
+
+    def test_get_lock_status_many_matches_is_object_locked(self):
+        # Arrange
+        lock_api.set_lock_object(self.fixture.data_1, create_mock_user('1'))
+        lock_api.set_lock_object(self.fixture.data_2, create_mock_user('2'))
+        user = create_mock_user('2')
+        # Act
+        lock_status = lock_api.get_lock_status_many(self.fixture.data_collection, user)
+        # Assert
+        for data in self.fixture.data_collection:
+            self.assertEqual(lock_status[data.id], lock_api.is_object_locked(data, user))
+
+    def test_get_lock_status_many_empty_list_returns_empty_dict(self):
+        # Act # Assert
+        self.assertEqual(lock_api.get_lock_status_many([], create_mock_user('1')), {})
@@ -87,6 +87,22 @@ class TestTemplateUpsert(TestCase):
             template_api.upsert(template)
 
 
+class TestTemplateSetSearchablePaths(TestCase):
+    @patch('core_main_app.components.template.models.Template.save')
+    def test_template_set_searchable_paths_sets_paths_and_saves(self, mock_save):
+        template = _create_template(filename="name.xsd")
+        template_api.set_searchable_paths(template, ['/root/a', '/root/*/@id'])
+        self.assertEqual(template.searchable_paths, ['/root/a', '/root/*/@id'])
+        self.assertTrue(mock_save.called)
+
+    @patch('core_main_app.components.template.models.Template.save')
+    def test_template_set_searchable_paths_invalid_path_raises_api_error(self, mock_save):
+        template = _create_template(filename="name.xsd")
+        with self.assertRaises(exceptions.ApiError):
+            template_api.set_searchable_paths(template, ['/root/@id/a'])
+        self.assertFalse(mock_save.called)
+
+
 def _generic_get_all_test(self, mock_get_all, act_function):
     # Arrange
     mock_template_filename = "Schema"
@@ -102,3 +102,52 @@ class TestGetGlobalWorkspace(MongoIntegrationTransactionTestCase):
         # Act
         with self.assertRaises(exceptions.DoesNotExist):
             workspace_api.get_global_workspace()
+
+
+class TestGetAllWorkspacesWithAccessBySuperuser(MongoIntegrationTransactionTestCase):
+
+    def setUp(self):
+        super(TestGetAllWorkspacesWithAccessBySuperuser, self).setUp()
+        self.superuser = UserFixtures().create_super_user(username="superuser")
+        self.user = UserFixtures().create_user(username="user")
+        self.workspace = workspace_api.create_and_save(TITLE_1, self.user.id)
+        self.superuser_workspace = workspace_api.create_and_save('title 2', self.superuser.id)
+
+    def test_superuser_reads_all_workspaces_without_permission_query(self):
+        # Act
+        with self.assertNumQueries(0):
+            workspaces = list(workspace_api.get_all_workspaces_with_read_access_by_user(self.superuser))
+
+        # Assert
+        self.assertEqual(set(workspace.id for workspace in workspaces),
+                         set(workspace.id for workspace in workspace_api.get_all()))
+
+    def test_superuser_writes_all_workspaces(self):
+        # Act
+        workspaces = workspace_api.get_all_workspaces_with_write_access_by_user(self.superuser)
+
+        # Assert
+        self.assertEqual(set(workspace.id for workspace in workspaces),
+                         set(workspace.id for workspace in workspace_api.get_all()))
+
+    def test_superuser_reads_all_workspaces_not_owned(self):
+        # Act
+        workspaces = workspace_api.get_all_workspaces_with_read_access_not_owned_by_user(self.superuser)
+
+        # Assert
+        workspace_ids = set(workspace.id for workspace in workspaces)
+        self.assertIn(self.workspace.id, workspace_ids)
+        self.assertNotIn(self.superuser_workspace.id, workspace_ids)
+
+    def test_superuser_can_read_and_write_workspace_of_other_user(self):
+        # Act # Assert
+        with self.assertNumQueries(0):
+            self.assertTrue(workspace_api.can_user_read_workspace(self.workspace, self.superuser))
+            self.assertTrue(workspace_api.can_user_write_workspace(self.workspace, self.superuser))
+
+    def test_user_does_not_read_workspace_of_other_user(self):
+        # Act
+        workspaces = workspace_api.get_all_workspaces_with_read_access_by_user(self.user)
+
+        # Assert
+        self.assertNotIn(self.superuser_workspace.id, set(workspace.id for workspace in workspaces))
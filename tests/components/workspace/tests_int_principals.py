@@ -0,0 +1,204 @@
+""" Integration Test for the principals of the workspaces and data
+"""
+from django.contrib.auth.models import Group
+from mock import patch
+
+from core_main_app.components.data import api as data_api
+from core_main_app.components.data.models import Data
+from core_main_app.components.template.models import Template
+from core_main_app.components.workspace import api as workspace_api
+from core_main_app.components.workspace import principals as workspace_principals
+from core_main_app.components.workspace.models import Workspace
+from core_main_app.permissions import principals
+from core_main_app.utils.integration_tests.integration_base_transaction_test_case import \
+    MongoIntegrationTransactionTestCase
+from tests.components.user.fixtures.fixtures import UserFixtures
+
+
+class TestWorkspacePrincipals(MongoIntegrationTransactionTestCase):
+
+    def setUp(self):
+        super(TestWorkspacePrincipals, self).setUp()
+        self.owner = UserFixtures().create_user(username="owner")
+        self.user = UserFixtures().create_user(username="user")
+        self.workspace = workspace_api.create_and_save('title', self.owner.id)
+        self.data = _create_data(self.workspace, str(self.owner.id))
+
+    def test_created_workspace_has_owner_principal(self):
+        # Assert
+        owner_principal = principals.get_user_principal(self.owner.id)
+        self.assertEqual(self.workspace.read_principals, [owner_principal])
+        self.assertEqual(self.workspace.write_principals, [owner_principal])
+
+    def test_saved_data_has_read_principals_of_workspace(self):
+        # Assert
+        self.assertEqual(_reload(self.data).read_principals, [principals.get_user_principal(self.owner.id)])
+
+    def test_read_access_given_to_user_adds_principal_to_workspace_and_data(self):
+        # Act
+        workspace_api.add_user_read_access_to_workspace(self.workspace, self.user, self.owner)
+
+        # Assert
+        user_principal = principals.get_user_principal(self.user.id)
+        self.assertIn(user_principal, _reload(self.workspace).read_principals)
+        self.assertNotIn(user_principal, _reload(self.workspace).write_principals)
+        self.assertIn(user_principal, _reload(self.data).read_principals)
+
+    def test_read_access_removed_from_user_removes_principal(self):
+        # Arrange
+        workspace_api.add_user_read_access_to_workspace(self.workspace, self.user, self.owner)
+
+        # Act
+        workspace_api.remove_user_read_access_to_workspace(self.workspace, self.user, self.owner)
+
+        # Assert
+        user_principal = principals.get_user_principal(self.user.id)
+        self.assertNotIn(user_principal, _reload(self.workspace).read_principals)
+        self.assertNotIn(user_principal, _reload(self.data).read_principals)
+
+    def test_write_access_given_to_group_adds_principal_to_workspace(self):
+        # Arrange
+        group = Group.objects.create(name='group')
+
+        # Act
+        workspace_api.add_group_write_access_to_workspace(self.workspace, group, self.owner)
+
+        # Assert
+        self.assertIn(principals.get_group_principal(group.id, group.name), _reload(self.workspace).write_principals)
+
+    def test_permissions_cleared_from_user_removes_principal(self):
+        # Arrange
+        workspace_api.add_user_read_access_to_workspace(self.workspace, self.user, self.owner)
+
+        # Act
+        self.user.user_permissions.clear()
+
+        # Assert
+        self.assertNotIn(principals.get_user_principal(self.user.id), _reload(self.data).read_principals)
+
+    def test_public_workspace_adds_public_principal_to_data(self):
+        # Act
+        workspace_api.set_workspace_public(self.workspace, self.owner)
+
+        # Assert
+        self.assertIn(principals.PUBLIC_PRINCIPAL, _reload(self.workspace).read_principals)
+        self.assertIn(principals.PUBLIC_PRINCIPAL, _reload(self.data).read_principals)
+
+    def test_data_assigned_to_workspace_gets_its_principals(self):
+        # Arrange
+        other_workspace = workspace_api.create_and_save('other title', self.user.id)
+        workspace_api.add_user_write_access_to_workspace(other_workspace, self.owner, self.user)
+
+        # Act
+        data_api.assign(self.data, other_workspace, self.owner)
+
+        # Assert
+        self.assertEqual(_reload(self.data).read_principals, [principals.get_user_principal(self.user.id)])
+        self.assertEqual(_reload(self.data).read_principals, _reload(other_workspace).read_principals)
+
+    def test_data_saved_in_same_workspace_does_not_read_principals(self):
+        # Arrange
+        data = _reload(self.data)
+        data.title = 'new title'
+
+        # Act
+        with patch('core_main_app.components.data.models._get_read_principals') as mock_get_read_principals:
+            data.save()
+
+        # Assert
+        self.assertFalse(mock_get_read_principals.called)
+        self.assertEqual(_reload(self.data).read_principals, [principals.get_user_principal(self.owner.id)])
+
+    def test_data_removed_from_workspace_loses_its_principals(self):
+        # Arrange
+        data = _reload(self.data)
+        data.workspace = None
+
+        # Act
+        data.save()
+
+        # Assert
+        self.assertEqual(_reload(self.data).read_principals, [])
+
+    def test_deleted_workspace_removes_principals_of_data(self):
+        # Act
+        workspace_api.delete(self.workspace, self.owner)
+
+        # Assert
+        self.assertEqual(_reload(self.data).read_principals, [])
+
+    def test_rebuild_principals_repairs_workspace_and_data(self):
+        # Arrange
+        Workspace.objects(pk=self.workspace.pk).update(set__read_principals=[], set__write_principals=[])
+        Data.objects(pk=self.data.pk).update(set__read_principals=[])
+
+        # Act
+        count = workspace_principals.rebuild_principals()
+
+        # Assert
+        owner_principal = principals.get_user_principal(self.owner.id)
+        self.assertEqual(count, Workspace.objects.count())
+        self.assertEqual(_reload(self.workspace).write_principals, [owner_principal])
+        self.assertEqual(_reload(self.data).read_principals, [owner_principal])
+
+
+class TestAccessByPrincipals(MongoIntegrationTransactionTestCase):
+
+    def setUp(self):
+        super(TestAccessByPrincipals, self).setUp()
+        self.owner = UserFixtures().create_user(username="owner")
+        self.user = UserFixtures().create_user(username="user")
+        self.workspace = workspace_api.create_and_save('title', self.owner.id)
+        self.private_workspace = workspace_api.create_and_save('private title', self.owner.id)
+        self.group = Group.objects.create(name='group')
+        self.user.groups.add(self.group)
+        workspace_api.add_group_read_access_to_workspace(self.workspace, self.group, self.owner)
+        self.shared_data = _create_data(self.workspace, str(self.owner.id))
+        self.private_data = _create_data(self.private_workspace, str(self.owner.id))
+        self.user_data = _create_data(None, str(self.user.id))
+
+    def test_query_returns_same_data_with_and_without_principals(self):
+        # Act
+        data_ids = _get_data_ids(data_api.execute_query({}, self.user))
+        with patch('core_main_app.components.data.access_control.USE_ACCESS_PRINCIPALS', True):
+            principals_data_ids = _get_data_ids(data_api.execute_query({}, self.user))
+
+        # Assert
+        self.assertEqual(principals_data_ids, data_ids)
+        self.assertEqual(principals_data_ids, {self.shared_data.id, self.user_data.id})
+
+    def test_read_workspaces_are_same_with_and_without_principals(self):
+        # Act
+        workspace_ids = _get_data_ids(workspace_api.get_all_workspaces_with_read_access_by_user(self.user))
+        with patch.object(workspace_api, 'USE_ACCESS_PRINCIPALS', True):
+            principals_workspace_ids = _get_data_ids(
+                workspace_api.get_all_workspaces_with_read_access_by_user(self.user))
+
+        # Assert
+        self.assertEqual(principals_workspace_ids, workspace_ids)
+        self.assertIn(self.workspace.id, principals_workspace_ids)
+        self.assertNotIn(self.private_workspace.id, principals_workspace_ids)
+
+    def test_write_workspaces_are_same_with_and_without_principals(self):
+        # Act
+        workspace_ids = _get_data_ids(workspace_api.get_all_workspaces_with_write_access_by_user(self.owner))
+        with patch.object(workspace_api, 'USE_ACCESS_PRINCIPALS', True):
+            principals_workspace_ids = _get_data_ids(
+                workspace_api.get_all_workspaces_with_write_access_by_user(self.owner))
+
+        # Assert
+        self.assertEqual(principals_workspace_ids, workspace_ids)
+        self.assertEqual(principals_workspace_ids, {self.workspace.id, self.private_workspace.id})
+
+
+def _create_data(workspace, user_id):
+    template = Template(filename='filename', content='<schema/>', hash='').save()
+    return Data(template=template, user_id=user_id, title='title', workspace=workspace).save()
+
+
+def _reload(document):
+    return type(document).objects.get(pk=document.pk)
+
+
+def _get_data_ids(documents):
+    return set(document.id for document in documents)
@@ -0,0 +1,107 @@
+""" Unit tests of the workspace access context
+"""
+from unittest import TestCase
+
+from bson import ObjectId
+from mock.mock import patch
+
+from core_main_app.components.workspace import access_context
+from core_main_app.components.workspace.models import Workspace
+from core_main_app.permissions import api as permission_api
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+
+
+class TestGetAccessContext(TestCase):
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_access_context_is_reused_for_the_same_user(self, get_all_workspaces_with_read_access_by_user):
+        # Arrange
+        workspace = _create_workspace()
+        get_all_workspaces_with_read_access_by_user.return_value = [workspace]
+        mock_user = create_mock_user('1')
+        # Act
+        first_context = access_context.get_access_context(mock_user)
+        second_context = access_context.get_access_context(mock_user)
+        first_context.can_read(workspace)
+        second_context.can_read(workspace.id)
+        # Assert
+        self.assertIs(first_context, second_context)
+        self.assertEqual(get_all_workspaces_with_read_access_by_user.call_count, 1)
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_access_context_is_recomputed_after_permission_change(self, get_all_workspaces_with_read_access_by_user):
+        # Arrange
+        workspace = _create_workspace()
+        get_all_workspaces_with_read_access_by_user.return_value = []
+        mock_user = create_mock_user('1')
+        self.assertFalse(access_context.get_access_context(mock_user).can_read(workspace))
+        get_all_workspaces_with_read_access_by_user.return_value = [workspace]
+        # Act
+        permission_api.invalidate_access()
+        # Assert
+        self.assertTrue(access_context.get_access_context(mock_user).can_read(workspace))
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_access_context_is_recomputed_after_clear(self, get_all_workspaces_with_read_access_by_user):
+        # Arrange
+        get_all_workspaces_with_read_access_by_user.return_value = []
+        mock_user = create_mock_user('1')
+        first_context = access_context.get_access_context(mock_user)
+        # Act
+        access_context.clear_access_context(mock_user)
+        # Assert
+        self.assertIsNot(first_context, access_context.get_access_context(mock_user))
+
+    def test_expired_context_is_not_reused(self):
+        # Arrange
+        context = access_context.WorkspaceAccessContext(create_mock_user('1'),
+                                                        version=permission_api.get_access_version(),
+                                                        creation_time=0)
+        # Act # Assert
+        self.assertTrue(context.is_expired(ttl=5))
+
+
+class TestWorkspaceAccessContext(TestCase):
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_write_access_by_user')
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_superuser_checks_do_not_compute_workspaces(self, get_all_workspaces_with_read_access_by_user,
+                                                         get_all_workspaces_with_write_access_by_user):
+        # Arrange
+        context = access_context.build_access_context(create_mock_user('1', is_superuser=True))
+        workspace = _create_workspace()
+        # Act
+        results = [context.can_read(workspace), context.can_write(workspace), context.can_read_or_write(workspace)]
+        # Assert
+        self.assertEqual(results, [True, True, True])
+        self.assertFalse(get_all_workspaces_with_read_access_by_user.called)
+        self.assertFalse(get_all_workspaces_with_write_access_by_user.called)
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_write_access_by_user')
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_read_check_does_not_compute_write_access(self, get_all_workspaces_with_read_access_by_user,
+                                                      get_all_workspaces_with_write_access_by_user):
+        # Arrange
+        get_all_workspaces_with_read_access_by_user.return_value = []
+        context = access_context.build_access_context(create_mock_user('1'))
+        # Act
+        context.can_read(_create_workspace())
+        # Assert
+        self.assertFalse(get_all_workspaces_with_write_access_by_user.called)
+
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_write_access_by_user')
+    @patch('core_main_app.components.workspace.api.get_all_workspaces_with_read_access_by_user')
+    def test_can_read_or_write_returns_true_if_workspace_is_writable(self, get_all_workspaces_with_read_access_by_user,
+                                                                      get_all_workspaces_with_write_access_by_user):
+        # Arrange
+        workspace = _create_workspace()
+        get_all_workspaces_with_read_access_by_user.return_value = []
+        get_all_workspaces_with_write_access_by_user.return_value = [workspace]
+        context = access_context.build_access_context(create_mock_user('1'))
+        # Act # Assert
+        self.assertTrue(context.can_read_or_write(workspace))
+        self.assertFalse(context.can_read(workspace))
+
+
+def _create_workspace():
+    return Workspace(id=ObjectId(), title='title', owner='1', read_perm_id='1', write_perm_id='2')
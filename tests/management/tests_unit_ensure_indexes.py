@@ -0,0 +1,47 @@
+""" Unit tests of the ensure_indexes command
+"""
+from StringIO import StringIO
+from unittest.case import TestCase
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from mock import patch
+
+from core_main_app.utils.databases import indexes
+
+
+class TestEnsureIndexesCommand(TestCase):
+
+    @patch.object(indexes, 'compare_indexes')
+    @patch.object(indexes, 'ensure_indexes')
+    def test_command_creates_indexes(self, mock_ensure_indexes, mock_compare_indexes):
+        # Arrange
+        mock_compare_indexes.return_value = {'data': {'missing': [], 'extra': []}}
+        stdout = StringIO()
+        # Act
+        call_command('ensure_indexes', stdout=stdout)
+        # Assert
+        mock_ensure_indexes.assert_called_once_with()
+        self.assertIn('All indexes are declared in the database.', stdout.getvalue())
+
+    @patch.object(indexes, 'compare_indexes')
+    @patch.object(indexes, 'ensure_indexes')
+    def test_command_check_does_not_create_indexes(self, mock_ensure_indexes, mock_compare_indexes):
+        # Arrange
+        mock_compare_indexes.return_value = {'data': {'missing': [], 'extra': [[('title', 1)]]}}
+        stdout = StringIO()
+        # Act
+        call_command('ensure_indexes', check=True, stdout=stdout)
+        # Assert
+        self.assertFalse(mock_ensure_indexes.called)
+        self.assertIn("data: extra index [('title', 1)]", stdout.getvalue())
+
+    @patch.object(indexes, 'compare_indexes')
+    @patch.object(indexes, 'ensure_indexes')
+    def test_command_check_with_missing_indexes_raises_command_error(self, mock_ensure_indexes,
+                                                                     mock_compare_indexes):
+        # Arrange
+        mock_compare_indexes.return_value = {'data': {'missing': [[('user_id', 1)]], 'extra': []}}
+        # Act # Assert
+        with self.assertRaises(CommandError):
+            call_command('ensure_indexes', check=True, stdout=StringIO())
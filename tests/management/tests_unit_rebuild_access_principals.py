@@ -0,0 +1,23 @@
+""" Unit tests of the rebuild_access_principals command
+"""
+from StringIO import StringIO
+from unittest.case import TestCase
+
+from django.core.management import call_command
+from mock import patch
+
+from core_main_app.components.workspace import principals as workspace_principals
+
+
+class TestRebuildAccessPrincipalsCommand(TestCase):
+
+    @patch.object(workspace_principals, 'rebuild_principals')
+    def test_command_rebuilds_principals(self, mock_rebuild_principals):
+        # Arrange
+        mock_rebuild_principals.return_value = 3
+        stdout = StringIO()
+        # Act
+        call_command('rebuild_access_principals', stdout=stdout)
+        # Assert
+        mock_rebuild_principals.assert_called_once_with()
+        self.assertIn('Principals of 3 workspace(s) and of their data rebuilt.', stdout.getvalue())
@@ -0,0 +1,51 @@
+""" Unit tests of the rebuild_dict_content command
+"""
+from StringIO import StringIO
+from unittest.case import TestCase
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from mock import patch
+
+from core_main_app.commons import exceptions
+from core_main_app.components.data import api as data_api
+from core_main_app.components.template import api as template_api
+
+
+class TestRebuildDictContentCommand(TestCase):
+
+    @patch.object(data_api, 'rebuild_dict_content')
+    def test_command_without_template_rebuilds_all_data(self, mock_rebuild_dict_content):
+        # Arrange
+        mock_rebuild_dict_content.return_value = (2, [])
+        stdout = StringIO()
+        # Act
+        call_command('rebuild_dict_content', stdout=stdout)
+        # Assert
+        mock_rebuild_dict_content.assert_called_once_with(None)
+        self.assertIn('2 data rebuilt, 0 errors.', stdout.getvalue())
+
+    @patch.object(template_api, 'get')
+    @patch.object(data_api, 'rebuild_dict_content')
+    def test_command_with_templates_rebuilds_data_of_templates(self, mock_rebuild_dict_content, mock_get):
+        # Arrange
+        mock_rebuild_dict_content.return_value = (1, [('data_id', 'error')])
+        mock_get.side_effect = lambda template_id: 'template_' + template_id
+        stdout = StringIO()
+        stderr = StringIO()
+        # Act
+        call_command('rebuild_dict_content', template_ids=['1', '2'], stdout=stdout, stderr=stderr)
+        # Assert
+        mock_rebuild_dict_content.assert_called_once_with(['template_1', 'template_2'])
+        self.assertIn('1 data rebuilt, 1 errors.', stdout.getvalue())
+        self.assertIn('data_id', stderr.getvalue())
+
+    @patch.object(template_api, 'get')
+    @patch.object(data_api, 'rebuild_dict_content')
+    def test_command_with_unknown_template_raises_command_error(self, mock_rebuild_dict_content, mock_get):
+        # Arrange
+        mock_get.side_effect = exceptions.DoesNotExist('not found')
+        # Act # Assert
+        with self.assertRaises(CommandError):
+            call_command('rebuild_dict_content', template_ids=['1'])
+        self.assertFalse(mock_rebuild_dict_content.called)
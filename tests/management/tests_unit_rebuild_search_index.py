@@ -0,0 +1,23 @@
+""" Unit tests of the rebuild_search_index command
+"""
+from StringIO import StringIO
+from unittest.case import TestCase
+
+from django.core.management import call_command
+from mock import patch
+
+from core_main_app.components.data import api as data_api
+
+
+class TestRebuildSearchIndexCommand(TestCase):
+
+    @patch.object(data_api, 'rebuild_search_index')
+    def test_command_rebuilds_search_index(self, mock_rebuild_search_index):
+        # Arrange
+        mock_rebuild_search_index.return_value = 3
+        stdout = StringIO()
+        # Act
+        call_command('rebuild_search_index', stdout=stdout)
+        # Assert
+        mock_rebuild_search_index.assert_called_once_with()
+        self.assertIn('Search index rebuilt with 3 data.', stdout.getvalue())
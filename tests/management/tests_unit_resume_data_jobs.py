@@ -0,0 +1,23 @@
+""" Unit tests of the resume_data_jobs command
+"""
+from StringIO import StringIO
+from unittest.case import TestCase
+
+from django.core.management import call_command
+from mock import patch
+
+from core_main_app.components.data_job import api as data_job_api
+
+
+class TestResumeDataJobsCommand(TestCase):
+
+    @patch.object(data_job_api, 'resume_unprocessed_jobs')
+    def test_command_resumes_unprocessed_jobs(self, mock_resume_unprocessed_jobs):
+        # Arrange
+        mock_resume_unprocessed_jobs.return_value = 2
+        stdout = StringIO()
+        # Act
+        call_command('resume_data_jobs', stdout=stdout)
+        # Assert
+        mock_resume_unprocessed_jobs.assert_called_once_with()
+        self.assertIn('Data jobs of 2 template(s) enqueued.', stdout.getvalue())
@@ -0,0 +1,131 @@
+""" Integration Test for the cache of the workspace permissions
+"""
+from django.contrib.auth.models import Group
+from django.core.cache import caches
+from mock import patch
+
+from core_main_app.permissions import api as permission_api
+from core_main_app.settings import WORKSPACE_PERMISSIONS_CACHE
+from core_main_app.utils.integration_tests.integration_base_transaction_test_case import \
+    MongoIntegrationTransactionTestCase
+from tests.components.user.fixtures.fixtures import UserFixtures
+
+
+class TestGetAllWorkspacePermissionsUserCanRead(MongoIntegrationTransactionTestCase):
+
+    def setUp(self):
+        super(TestGetAllWorkspacePermissionsUserCanRead, self).setUp()
+        caches[WORKSPACE_PERMISSIONS_CACHE].clear()
+        self.user = UserFixtures().create_user()
+        self.read_perm = permission_api.create_read_perm('title', str(self.user.id))
+        permission_api.add_permission_to_user(self.user, self.read_perm)
+
+    def test_permissions_are_read_from_cache_on_second_call(self):
+        # Arrange
+        permission_api.get_all_workspace_permissions_user_can_read(self.user)
+
+        # Act # Assert
+        with self.assertNumQueries(0):
+            permission_ids = permission_api.get_all_workspace_permissions_user_can_read(self.user)
+        self.assertEqual(permission_ids, [str(self.read_perm.id)])
+
+    def test_permission_added_to_user_is_returned(self):
+        # Arrange
+        permission_api.get_all_workspace_permissions_user_can_read(self.user)
+        other_read_perm = permission_api.create_read_perm('other title', str(self.user.id))
+
+        # Act
+        permission_api.add_permission_to_user(self.user, other_read_perm)
+
+        # Assert
+        self.assertEqual(sorted(permission_api.get_all_workspace_permissions_user_can_read(self.user)),
+                         sorted([str(self.read_perm.id), str(other_read_perm.id)]))
+
+    def test_permission_removed_from_user_is_not_returned(self):
+        # Arrange
+        permission_api.get_all_workspace_permissions_user_can_read(self.user)
+
+        # Act
+        permission_api.remove_permission_to_user(self.user, self.read_perm)
+
+        # Assert
+        self.assertEqual(permission_api.get_all_workspace_permissions_user_can_read(self.user), [])
+
+    def test_permission_added_to_group_of_user_is_returned(self):
+        # Arrange
+        group = Group.objects.create(name='group')
+        self.user.groups.add(group)
+        permission_api.get_all_workspace_permissions_user_can_read(self.user)
+        group_read_perm = permission_api.create_read_perm('group title', str(self.user.id))
+
+        # Act
+        permission_api.add_permission_to_group(group, group_read_perm)
+
+        # Assert
+        self.assertIn(str(group_read_perm.id), permission_api.get_all_workspace_permissions_user_can_read(self.user))
+
+    def test_permissions_of_group_joined_by_user_are_returned(self):
+        # Arrange
+        group = Group.objects.create(name='group')
+        group_read_perm = permission_api.create_read_perm('group title', str(self.user.id))
+        permission_api.add_permission_to_group(group, group_read_perm)
+        permission_api.get_all_workspace_permissions_user_can_read(self.user)
+
+        # Act
+        self.user.groups.add(group)
+
+        # Assert
+        self.assertIn(str(group_read_perm.id), permission_api.get_all_workspace_permissions_user_can_read(self.user))
+
+    def test_deleted_permission_is_not_returned(self):
+        # Arrange
+        permission_api.get_all_workspace_permissions_user_can_read(self.user)
+
+        # Act
+        permission_api.delete_permission(self.read_perm.id)
+
+        # Assert
+        self.assertEqual(permission_api.get_all_workspace_permissions_user_can_read(self.user), [])
+
+    def test_read_and_write_permissions_are_cached_separately(self):
+        # Arrange
+        permission_api.get_all_workspace_permissions_user_can_read(self.user)
+
+        # Act
+        permission_ids = permission_api.get_all_workspace_permissions_user_can_write(self.user)
+
+        # Assert
+        self.assertEqual(permission_ids, [])
+
+    @patch.object(permission_api, 'WORKSPACE_PERMISSIONS_CACHE_TTL', 0)
+    def test_permissions_are_queried_on_each_call_if_cache_is_disabled(self):
+        # Arrange
+        permission_api.get_all_workspace_permissions_user_can_read(self.user)
+
+        # Act # Assert
+        with self.assertNumQueries(1):
+            permission_api.get_all_workspace_permissions_user_can_read(self.user)
+
+
+class TestAccessVersion(MongoIntegrationTransactionTestCase):
+
+    def setUp(self):
+        super(TestAccessVersion, self).setUp()
+        caches[WORKSPACE_PERMISSIONS_CACHE].clear()
+
+    def test_invalidate_access_changes_version(self):
+        # Arrange
+        version = permission_api.get_access_version()
+
+        # Act
+        permission_api.invalidate_access()
+
+        # Assert
+        self.assertNotEqual(permission_api.get_access_version(), version)
+
+    def test_invalidate_access_without_version_in_cache_sets_version(self):
+        # Act
+        permission_api.invalidate_access()
+
+        # Assert
+        self.assertIsNotNone(caches[WORKSPACE_PERMISSIONS_CACHE].get(permission_api.ACCESS_VERSION_KEY))
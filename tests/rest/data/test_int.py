@@ -1,21 +1,31 @@
 """ Integration Test for Data Rest API
 """
+from urlparse import parse_qs, urlparse
 
+from django.core.cache import caches
 from mock import patch
 from rest_framework import status
 
+from core_main_app.components.data import api as data_api
 from core_main_app.components.data.models import Data
+from core_main_app.components.data_job import tasks as data_job_tasks
+from core_main_app.components.data_job.models import DataJob
 from core_main_app.components.workspace.models import Workspace
+from core_main_app.settings import DATA_QUERY_CACHE
 from core_main_app.rest.data import views as data_rest_views
+from core_main_app.utils import data_query_cache
 from core_main_app.utils.integration_tests.integration_base_test_case import \
     MongoIntegrationBaseTestCase
+from core_main_app.utils.pagination.rest_framework_paginator.pagination import KeysetResultsSetPagination
 from core_main_app.utils.tests_tools.MockUser import create_mock_user
 from core_main_app.utils.tests_tools.RequestMock import RequestMock
-from tests.components.data.fixtures.fixtures import DataFixtures, QueryDataFixtures, AccessControlDataFixture
+from tests.components.data.fixtures.fixtures import DataFixtures, QueryDataFixtures, AccessControlDataFixture, \
+    PaginationDataFixtures
 
 fixture_data = DataFixtures()
 fixture_data_query = QueryDataFixtures()
 fixture_data_workspace = AccessControlDataFixture()
+fixture_data_pagination = PaginationDataFixtures()
 
 
 class TestDataList(MongoIntegrationBaseTestCase):
@@ -58,6 +68,18 @@ class TestDataList(MongoIntegrationBaseTestCase):
         # Assert
         self.assertEqual(len(response.data), 1)
 
+    def test_get_with_fields_returns_requested_fields(self):
+        # Arrange
+        user = create_mock_user('1')
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataList.as_view(),
+                                              user,
+                                              data={'fields': 'id,title'})
+
+        # Assert
+        self.assertEqual(set(response.data[0].keys()), {'id', 'title'})
+
     def test_get_filtered_by_incorrect_title_returns_no_data(self):
         # Arrange
         user = create_mock_user('1')
@@ -125,6 +147,114 @@ class TestDataList(MongoIntegrationBaseTestCase):
         # Assert
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    @patch.object(data_rest_views, 'USE_BACKGROUND_DATA_INGESTION', True)
+    @patch.object(data_job_tasks.process_data_jobs, 'apply_async')
+    @patch.object(DataJob, 'convert_to_file')
+    def test_post_data_in_background_returns_http_202_with_job(self, mock_convert_to_file, mock_apply_async):
+        # Arrange
+        user = create_mock_user('1')
+        mock_data = {'template': str(self.fixture.template.id),
+                     'user_id': '1',
+                     'title': 'new data',
+                     'xml_content': '<tag></tag>'}
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.DataList.as_view(),
+                                               user,
+                                               data=mock_data)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(DataJob.objects.count(), 1)
+        self.assertTrue(mock_apply_async.called)
+
+
+class TestDataListAccessible(MongoIntegrationBaseTestCase):
+    fixture = fixture_data_workspace
+
+    def test_get_accessible_returns_owned_data_and_workspace_data(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataList.as_view(),
+                                              user,
+                                              data={'accessible': 'true'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(data['title'] for data in response.data), {'Data 1', 'Data 3', 'Data 4'})
+
+    @patch.object(KeysetResultsSetPagination, 'page_size', 2)
+    def test_get_accessible_with_cursor_pagination_returns_pages(self):
+        # Arrange
+        user = create_mock_user('1', is_superuser=True)
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataList.as_view(),
+                                              user,
+                                              data={'accessible': 'true', 'pagination': 'cursor',
+                                                    'fields': 'id,title'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+
+class TestDataListCursorPagination(MongoIntegrationBaseTestCase):
+    fixture = fixture_data_pagination
+
+    @patch.object(Data, 'xml_content')
+    def test_get_returns_first_page(self, mock_xml_content):
+        # Arrange
+        user = create_mock_user('1')
+        mock_xml_content.return_value = "content"
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataList.as_view(),
+                                              user,
+                                              data={'pagination': 'cursor'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    @patch.object(Data, 'xml_content')
+    def test_get_with_cursor_returns_next_page(self, mock_xml_content):
+        # Arrange
+        user = create_mock_user('1')
+        mock_xml_content.return_value = "content"
+        first_page = RequestMock.do_request_get(data_rest_views.DataList.as_view(),
+                                                user,
+                                                data={'pagination': 'cursor'})
+        cursor = parse_qs(urlparse(first_page.data['next']).query)['cursor'][0]
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataList.as_view(),
+                                              user,
+                                              data={'cursor': cursor})
+
+        # Assert
+        first_page_ids = set(data['id'] for data in first_page.data['results'])
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertFalse(any(data['id'] in first_page_ids for data in response.data['results']))
+
+    def test_get_with_invalid_cursor_returns_http_400(self):
+        # Arrange
+        user = create_mock_user('1')
+
+        # Act
+        response = RequestMock.do_request_get(data_rest_views.DataList.as_view(),
+                                              user,
+                                              data={'cursor': 'invalid'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class TestDataDetail(MongoIntegrationBaseTestCase):
     fixture = fixture_data
@@ -301,6 +431,45 @@ class TestExecuteLocalQueryView(MongoIntegrationBaseTestCase):
         # Assert
         self.assertEqual(len(response.data), 2)
 
+    def test_post_query_with_cursor_pagination_returns_page_of_data(self):
+        # Arrange
+        self.data = {"query": "{\"$or\": [{\"root.element\": \"value\"}, {\"root.element\":\"value2\"}]}",
+                     "pagination": "cursor"}
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
+
+    def test_post_query_with_fields_returns_requested_fields(self):
+        # Arrange
+        self.data.update({"query": "{\"root.element\": \"value\"}", "fields": "id,title"})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(set(response.data[0].keys()), {'id', 'title'})
+
+    def test_post_query_with_unknown_field_returns_http_400(self):
+        # Arrange
+        self.data.update({"query": "{}", "fields": "dict_content"})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(),
+                                               self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_post_empty_query_filter_by_templates_returns_all_data_of_the_template(self):
         # Arrange
         self.data.update({"query": "{}",
@@ -341,6 +510,149 @@ class TestExecuteLocalQueryView(MongoIntegrationBaseTestCase):
         self.assertEqual(len(response.data), 0)
 
 
+@patch.object(data_query_cache, 'DATA_QUERY_CACHE_TTL', 60)
+class TestExecuteLocalQueryViewCache(MongoIntegrationBaseTestCase):
+    fixture = fixture_data_query
+
+    def setUp(self):
+        super(TestExecuteLocalQueryViewCache, self).setUp()
+        caches[DATA_QUERY_CACHE].clear()
+        self.data = {"all": "true", "query": "{\"root.element\": \"value\"}",
+                     "templates": '[{"id": "' + str(self.fixture.template.id) + '"}]'}
+        self.user = create_mock_user('1', is_superuser=True)
+
+    def test_post_same_query_returns_cached_results(self):
+        # Arrange
+        RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(), self.user, data=self.data)
+        Data(template=self.fixture.template, user_id='1', dict_content={"root": {"element": "value"}},
+             title='title3').save()
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(), self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+
+    def test_post_query_after_invalidate_returns_new_results(self):
+        # Arrange
+        RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(), self.user, data=self.data)
+        Data(template=self.fixture.template, user_id='1', dict_content={"root": {"element": "value"}},
+             title='title3').save()
+
+        # Act
+        data_query_cache.invalidate([self.fixture.template.id])
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(), self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(len(response.data), 2)
+
+    @patch.object(Data, 'convert_to_dict')
+    def test_post_query_on_template_after_rebuild_of_all_dict_content_returns_new_results(self, mock_convert_to_dict):
+        # Arrange
+        RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(), self.user, data=self.data)
+        # dict content converted again from the xml content by the rebuild
+        Data.objects(pk=self.fixture.data_2.pk).update_one(set__dict_content={"root": {"element": "value"}})
+
+        # Act
+        data_api.rebuild_dict_content()
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(), self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(len(response.data), 2)
+
+    def test_post_query_with_other_fields_is_not_cached(self):
+        # Arrange
+        RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(), self.user, data=self.data)
+        self.data.update({"fields": "id,title"})
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalQueryView.as_view(), self.user,
+                                               data=self.data)
+
+        # Assert
+        self.assertEqual(set(response.data[0].keys()), {'id', 'title'})
+
+
+class TestExecuteLocalKeywordQueryView(MongoIntegrationBaseTestCase):
+    fixture = fixture_data_query
+
+    def setUp(self):
+        super(TestExecuteLocalKeywordQueryView, self).setUp()
+        self.user = create_mock_user('1', is_superuser=True)
+
+    @patch.object(Data, 'execute_text_query')
+    def test_post_keywords_executes_text_query_limited_to_most_relevant_data(self, mock_execute_text_query):
+        # Arrange
+        mock_execute_text_query.return_value = Data.objects.all()
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalKeywordQueryView.as_view(),
+                                               self.user,
+                                               data={"query": "first second", "all": "true"})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mock_execute_text_query.call_args[0][1], '"first" "second"')
+        self.assertEqual(mock_execute_text_query.call_args[0][3], data_rest_views.KEYWORD_SEARCH_MAX_RESULTS)
+
+    @patch.object(Data, 'execute_text_query')
+    def test_post_keywords_in_phrase_mode_searches_phrase(self, mock_execute_text_query):
+        # Arrange
+        mock_execute_text_query.return_value = Data.objects.all()
+
+        # Act
+        RequestMock.do_request_post(data_rest_views.ExecuteLocalKeywordQueryView.as_view(),
+                                    self.user,
+                                    data={"query": "first second", "options": '{"keyword_mode": "phrase"}'})
+
+        # Assert
+        self.assertEqual(mock_execute_text_query.call_args[0][1], '"first second"')
+
+    def test_post_keywords_with_unknown_mode_returns_http_400(self):
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalKeywordQueryView.as_view(),
+                                               self.user,
+                                               data={"query": "first", "options": '{"keyword_mode": "unknown"}'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch.object(data_rest_views, 'KEYWORD_SEARCH_MAX_RESULTS', 1)
+    @patch.object(Data, 'execute_text_query')
+    def test_post_keywords_counts_results_up_to_limit(self, mock_execute_text_query):
+        # Arrange
+        mock_execute_text_query.return_value = Data.objects.all().limit(1)
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalKeywordQueryView.as_view(),
+                                               self.user,
+                                               data={"query": "value", "fields": "id,title"})
+
+        # Assert
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(len(response.data['results']), 1)
+
+    @patch.object(Data, 'xml_content', '<root><element>first value</element></root>')
+    @patch.object(Data, 'execute_text_query')
+    def test_post_keywords_with_highlight_returns_snippets_of_page(self, mock_execute_text_query):
+        # Arrange
+        mock_execute_text_query.return_value = Data.objects.all()
+
+        # Act
+        response = RequestMock.do_request_post(data_rest_views.ExecuteLocalKeywordQueryView.as_view(),
+                                               self.user,
+                                               data={"query": "value", "fields": "id,title",
+                                                     "options": '{"highlight": true}'})
+
+        # Assert
+        self.assertEqual(set(response.data['results'][0].keys()), {'id', 'title', 'snippet'})
+        self.assertEqual(response.data['results'][0]['snippet'], 'first <em>value</em>')
+
+
 class TestDataAssign(MongoIntegrationBaseTestCase):
     fixture = fixture_data_workspace
 
@@ -1,12 +1,27 @@
 """Unit tests for data rest api
 """
+import struct
+import tarfile
+import zipfile
+from io import BytesIO
+
+from django.core.exceptions import RequestDataTooBig
 from django.test import SimpleTestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 from mock.mock import patch
 from rest_framework import status
 
 from core_main_app.commons.exceptions import DoesNotExist
 from core_main_app.components.data.models import Data
+from core_main_app.components.data_job.models import DataJob
+from core_main_app.commons.exceptions import RestApiError
+from core_main_app.components.template.models import Template
 from core_main_app.rest.data import views as data_rest_views
+from core_main_app.rest.data.serializers import DataSerializer
+from core_main_app.rest.data import utils as data_rest_utils
+from core_main_app.rest.data.utils import get_data_list_from_ndjson, get_fields_from_request, \
+    get_data_list_from_archive
 from core_main_app.utils.tests_tools.MockUser import create_mock_user
 from core_main_app.utils.tests_tools.RequestMock import RequestMock
 
@@ -109,6 +124,39 @@ class TestDataDetail(SimpleTestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class TestDataJobDetail(SimpleTestCase):
+    def setUp(self):
+        super(TestDataJobDetail, self).setUp()
+
+    @patch.object(DataJob, 'get_by_id')
+    def test_get_returns_http_404_when_job_not_found(self, mock_get_by_id):
+        # Arrange
+        mock_user = create_mock_user('1')
+        mock_get_by_id.side_effect = DoesNotExist("error")
+
+        # Mock
+        response = RequestMock.do_request_get(data_rest_views.DataJobDetail.as_view(),
+                                              mock_user,
+                                              param={'pk': '1'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch.object(DataJob, 'get_by_id')
+    def test_get_returns_http_403_when_job_of_other_user(self, mock_get_by_id):
+        # Arrange
+        mock_user = create_mock_user('1')
+        mock_get_by_id.return_value = DataJob(user_id='2')
+
+        # Mock
+        response = RequestMock.do_request_get(data_rest_views.DataJobDetail.as_view(),
+                                              mock_user,
+                                              param={'pk': '1'})
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
 class TestDataDownload(SimpleTestCase):
     def setUp(self):
         super(TestDataDownload, self).setUp()
@@ -126,3 +174,215 @@ class TestDataDownload(SimpleTestCase):
 
         # Assert
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestGetDataListFromNdjson(SimpleTestCase):
+    @patch.object(Template, 'get_by_id')
+    def test_get_data_list_from_ndjson_returns_one_data_per_line(self, mock_get_by_id):
+        # Arrange
+        mock_get_by_id.return_value = Template()
+        stream = ['{"template": "1", "title": "title_1", "xml_content": "<tag/>"}',
+                  '',
+                  '{"title": "title_2", "xml_content": "<tag/>"}']
+
+        # Act
+        data_list = get_data_list_from_ndjson(stream, create_mock_user('1'), template_id='1')
+
+        # Assert
+        self.assertEqual([data.title for data in data_list], ['title_1', 'title_2'])
+        self.assertEqual(mock_get_by_id.call_count, 1)
+
+    def test_get_data_list_from_ndjson_raises_rest_api_error_if_line_is_invalid(self):
+        # Arrange
+        stream = ['{"title": "title_1"}']
+
+        # Act # Assert
+        with self.assertRaises(RestApiError):
+            get_data_list_from_ndjson(stream, create_mock_user('1'), template_id='1')
+
+
+    @patch.object(data_rest_utils, 'BULK_UPLOAD_MAX_RECORDS', 1)
+    @patch.object(Template, 'get_by_id')
+    def test_get_data_list_from_ndjson_with_too_many_lines_raises_rest_api_error(self, mock_get_by_id):
+        # Arrange
+        mock_get_by_id.return_value = Template()
+        stream = ['{"title": "title_1", "xml_content": "<tag/>"}',
+                  '{"title": "title_2", "xml_content": "<tag/>"}']
+
+        # Act # Assert
+        with self.assertRaises(RestApiError):
+            get_data_list_from_ndjson(stream, create_mock_user('1'), template_id='1')
+
+    @patch.object(data_rest_utils, 'BULK_UPLOAD_MAX_FILE_SIZE', 10)
+    def test_get_data_list_from_ndjson_with_too_large_line_raises_rest_api_error(self):
+        # Arrange
+        stream = ['{"title": "title_1", "xml_content": "<tag/>"}']
+
+        # Act # Assert
+        with self.assertRaises(RestApiError):
+            get_data_list_from_ndjson(stream, create_mock_user('1'), template_id='1')
+
+    @patch.object(data_rest_utils, 'BULK_UPLOAD_MAX_TOTAL_SIZE', 60)
+    @patch.object(Template, 'get_by_id')
+    def test_get_data_list_from_ndjson_with_too_large_stream_raises_rest_api_error(self, mock_get_by_id):
+        # Arrange
+        mock_get_by_id.return_value = Template()
+        stream = ['{"title": "title_1", "xml_content": "<tag/>"}',
+                  '{"title": "title_2", "xml_content": "<tag/>"}']
+
+        # Act # Assert
+        with self.assertRaises(RestApiError):
+            get_data_list_from_ndjson(stream, create_mock_user('1'), template_id='1')
+
+
+class TestDataBulkUpload(SimpleTestCase):
+    @patch.object(data_rest_views.data_api, 'bulk_upsert')
+    @patch.object(Template, 'get_by_id')
+    def test_post_ndjson_reads_lines_from_request_stream(self, mock_get_by_id, mock_bulk_upsert):
+        # Arrange
+        mock_get_by_id.return_value = Template()
+        mock_bulk_upsert.side_effect = lambda data_list, user: [{'title': data.title} for data in data_list]
+        body = '{"title": "title_1", "xml_content": "<tag/>"}\n{"title": "title_2", "xml_content": "<tag/>"}\n'
+
+        # Act
+        response = _post_ndjson(body, '/rest/data/bulk/?template=1')
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'title': 'title_1'}, {'title': 'title_2'}])
+
+    @patch.object(data_rest_utils, 'BULK_UPLOAD_MAX_RECORDS', 1)
+    @patch.object(Template, 'get_by_id')
+    def test_post_ndjson_with_too_many_lines_returns_http_400(self, mock_get_by_id):
+        # Arrange
+        mock_get_by_id.return_value = Template()
+        body = '{"title": "title_1", "xml_content": "<tag/>"}\n{"title": "title_2", "xml_content": "<tag/>"}\n'
+
+        # Act
+        response = _post_ndjson(body, '/rest/data/bulk/?template=1')
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch.object(data_rest_views, 'get_data_list_from_ndjson')
+    def test_post_returns_http_413_when_request_data_is_too_big(self, mock_get_data_list_from_ndjson):
+        # Arrange
+        mock_get_data_list_from_ndjson.side_effect = RequestDataTooBig('Request body exceeded the maximum size.')
+
+        # Act
+        response = _post_ndjson('', '/rest/data/bulk/')
+
+        # Assert
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+
+class TestGetDataListFromArchive(SimpleTestCase):
+    def test_get_data_list_from_zip_returns_one_data_per_file(self):
+        # Arrange
+        archive_file = _create_zip({'folder/': '', 'folder/data_1.xml': '<tag/>', 'data_2.xml': '<tag/>'})
+
+        # Act
+        data_list = get_data_list_from_archive(archive_file, Template(), create_mock_user('1'))
+
+        # Assert
+        self.assertEqual(sorted(data.title for data in data_list), ['data_1.xml', 'data_2.xml'])
+
+    @patch.object(data_rest_utils, 'BULK_UPLOAD_MAX_FILES', 1)
+    def test_get_data_list_from_zip_with_too_many_files_raises_rest_api_error(self):
+        # Arrange
+        archive_file = _create_zip({'data_1.xml': '<tag/>', 'data_2.xml': '<tag/>'})
+
+        # Act # Assert
+        with self.assertRaises(RestApiError):
+            get_data_list_from_archive(archive_file, Template(), create_mock_user('1'))
+
+    @patch.object(data_rest_utils, 'BULK_UPLOAD_MAX_FILE_SIZE', 10)
+    def test_get_data_list_from_zip_with_too_large_file_raises_rest_api_error(self):
+        # Arrange
+        archive_file = _create_zip({'data_1.xml': '<tag>{}</tag>'.format('0' * 1000)})
+
+        # Act # Assert
+        with self.assertRaises(RestApiError):
+            get_data_list_from_archive(archive_file, Template(), create_mock_user('1'))
+
+    @patch.object(data_rest_utils, 'BULK_UPLOAD_MAX_FILE_SIZE', 10)
+    def test_get_data_list_from_zip_with_wrong_declared_size_raises_rest_api_error(self):
+        # Arrange
+        archive_file = _create_zip({'data_1.xml': '<tag>{}</tag>'.format('0' * 1000)}, declared_size=5)
+
+        # Act # Assert
+        with self.assertRaises(RestApiError):
+            get_data_list_from_archive(archive_file, Template(), create_mock_user('1'))
+
+    @patch.object(data_rest_utils, 'BULK_UPLOAD_MAX_TOTAL_SIZE', 10)
+    def test_get_data_list_from_tar_with_too_large_files_raises_rest_api_error(self):
+        # Arrange
+        archive_file = _create_tar({'data_1.xml': '<tag/>', 'data_2.xml': '<tag/>'})
+
+        # Act # Assert
+        with self.assertRaises(RestApiError):
+            get_data_list_from_archive(archive_file, Template(), create_mock_user('1'))
+
+
+class TestGetFieldsFromRequest(SimpleTestCase):
+
+    def test_no_fields_parameter_returns_none(self):
+        # Act # Assert
+        self.assertIsNone(get_fields_from_request(_create_request('/')))
+
+    def test_comma_separated_fields_returns_list_of_fields(self):
+        # Act
+        fields = get_fields_from_request(_create_request('/?fields=id, title'))
+        # Assert
+        self.assertEqual(fields, ['id', 'title'])
+
+    def test_unknown_field_raises_rest_api_error(self):
+        # Act # Assert
+        with self.assertRaises(RestApiError):
+            get_fields_from_request(_create_request('/?fields=id,dict_content'))
+
+
+class TestDataSerializerFields(SimpleTestCase):
+
+    def test_serializer_returns_requested_fields_only(self):
+        # Arrange
+        data = Data(title='title', user_id='1')
+        # Act
+        serializer = DataSerializer(data, fields=['title'])
+        # Assert
+        self.assertEqual(serializer.data.keys(), ['title'])
+
+
+def _create_request(url):
+    return Request(APIRequestFactory().get(url))
+
+
+def _post_ndjson(body, url):
+    request = APIRequestFactory().post(url, data=body, content_type='application/x-ndjson')
+    request.user = create_mock_user('1')
+    request._dont_enforce_csrf_checks = True
+    return data_rest_views.DataBulkUpload.as_view()(request)
+
+
+def _create_zip(files, declared_size=None):
+    archive_file = BytesIO()
+    with zipfile.ZipFile(archive_file, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in sorted(files.items()):
+            archive.writestr(name, content)
+    content = archive_file.getvalue()
+    if declared_size is not None:
+        # change the uncompressed size declared in the central directory (offset 24 of the file header)
+        header = content.index(b'PK\x01\x02')
+        content = content[:header + 24] + struct.pack('<I', declared_size) + content[header + 28:]
+    return BytesIO(content)
+
+
+def _create_tar(files):
+    archive_file = BytesIO()
+    with tarfile.open(fileobj=archive_file, mode='w') as archive:
+        for name, content in sorted(files.items()):
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, BytesIO(content))
+    archive_file.seek(0)
+    return archive_file
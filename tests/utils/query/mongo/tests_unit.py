@@ -1,6 +1,7 @@
 """Query tool unit tests
 """
-from core_main_app.utils.query.mongo.prepare import _compile_regex, _add_sub_document_root
+from core_main_app.utils.query.mongo import prepare
+from core_main_app.utils.query.mongo.prepare import _compile_regex, _add_sub_document_root, prepare_raw_query
 from unittest import TestCase
 import copy
 import re
@@ -32,6 +33,17 @@ class TestCompileRegex(TestCase):
         self.assertFalse(isinstance(query["$and"][1]["$or"][0]["dot.notation.2"], re._pattern_type))
         self.assertFalse(isinstance(query["$and"][1]["$or"][1]["dot.notation.2"], re._pattern_type))
 
+    def test_query_with_regex_in_not_nor_and_elem_match_returns_query_with_compiled_regex(self):
+        # set query
+        query = {"$nor": [{"dot.notation.1": {"$not": "/regex/"}},
+                          {"dot.notation.2": {"$elemMatch": {"$or": [{"child": "/regex/"}]}}}]}
+        # compile regex
+        _compile_regex(query)
+        # assert
+        self.assertTrue(isinstance(query["$nor"][0]["dot.notation.1"]["$not"], re._pattern_type))
+        self.assertTrue(isinstance(query["$nor"][1]["dot.notation.2"]["$elemMatch"]["$or"][0]["child"],
+                                   re._pattern_type))
+
     def test_query_without_regex_returns_same_query(self):
         # set query
         query = {"dot.notation": {"$gt": 0}}
@@ -104,3 +116,67 @@ class TestAddSubDocumentRoot(TestCase):
         _add_sub_document_root(query, "root")
         # assert
         self.assertEquals(query, expected_query)
+
+    def test_add_sub_document_root_to_nor_query(self):
+        # set query
+        query = {"$nor": [{"dot.notation": "test"}, {"dot.notation.#text": "test"}]}
+        # set expected query
+        expected_query = {"$nor": [{"root.dot.notation": "test"}, {"root.dot.notation.#text": "test"}]}
+        # compile regex
+        _add_sub_document_root(query, "root")
+        # assert
+        self.assertEquals(query, expected_query)
+
+    def test_add_sub_document_root_to_elem_match_query_only_changes_array_field(self):
+        # set query
+        query = {"list": {"$elemMatch": {"child": "test", "$or": [{"other": "test"}]}}}
+        # set expected query
+        expected_query = {"root.list": {"$elemMatch": {"child": "test", "$or": [{"other": "test"}]}}}
+        # compile regex
+        _add_sub_document_root(query, "root")
+        # assert
+        self.assertEquals(query, expected_query)
+
+
+class TestPrepareRawQuery(TestCase):
+
+    def setUp(self):
+        prepare.clear_cache()
+
+    def test_prepare_raw_query_returns_prepared_query(self):
+        # prepare query
+        query = prepare_raw_query('{"dot.notation": "/regex/"}', regex=True, sub_document_root="root")
+        # assert
+        self.assertEquals(query.keys(), ["root.dot.notation"])
+        self.assertTrue(isinstance(query["root.dot.notation"], re._pattern_type))
+
+    def test_prepare_raw_query_twice_parses_query_once(self):
+        # prepare query twice
+        prepare_raw_query('{"dot.notation": "/regex/"}', regex=True, sub_document_root="root")
+        query = prepare_raw_query('{"dot.notation": "/regex/"}', regex=True, sub_document_root="root")
+        # assert
+        self.assertEquals(prepare.get_stats()['queries']['hits'], 1)
+        self.assertTrue(isinstance(query["root.dot.notation"], re._pattern_type))
+
+    def test_prepare_raw_query_returns_copy_of_cached_query(self):
+        # prepare query and modify it
+        query = prepare_raw_query('{"$and": [{"dot.notation": 1}]}', regex=True, sub_document_root="root")
+        query["$and"].append({"template": 1})
+        # prepare query again
+        other_query = prepare_raw_query('{"$and": [{"dot.notation": 1}]}', regex=True, sub_document_root="root")
+        # assert
+        self.assertEquals(other_query, {"$and": [{"root.dot.notation": 1}]})
+
+    def test_prepare_raw_query_with_other_options_prepares_query_again(self):
+        # prepare query with two sub document roots
+        prepare_raw_query('{"dot.notation": 1}', regex=True, sub_document_root="root")
+        query = prepare_raw_query('{"dot.notation": 1}', regex=True, sub_document_root="other")
+        # assert
+        self.assertEquals(query, {"other.dot.notation": 1})
+
+    def test_same_regex_is_compiled_once(self):
+        # prepare two queries with the same regex
+        first_query = prepare_raw_query('{"a": "/regex/"}', regex=True)
+        second_query = prepare_raw_query('{"b": "/regex/"}', regex=True)
+        # assert
+        self.assertIs(first_query["a"], second_query["b"])
@@ -0,0 +1,107 @@
+""" Integration tests of the local search backend
+"""
+from core_main_app.components.data.models import Data
+from core_main_app.utils.integration_tests.integration_base_test_case import MongoIntegrationBaseTestCase
+from core_main_app.utils.query.constants import KEYWORD_MODE_ALL, KEYWORD_MODE_ANY, KEYWORD_MODE_PHRASE
+from core_main_app.utils.search.local_search_backend import LocalSearchBackend
+from tests.components.data.fixtures.fixtures import DataFixtures
+
+
+class SearchDataFixtures(DataFixtures):
+    """ Data fixtures for the keyword search
+    """
+
+    def generate_data_collection(self):
+        """ Generate a Data collection.
+
+        Returns:
+
+        """
+        self.data_1 = Data(template=self.template, user_id='1', title='title_1',
+                           dict_content={'root': {'name': 'Red fox', 'description': 'The quick red fox jumps'}}).save()
+        self.data_2 = Data(template=self.template, user_id='2', title='title_2',
+                           dict_content={'root': {'name': 'Fox', 'description': ['red', 'blue']}}).save()
+        self.data_3 = Data(template=self.template, user_id='1', title='title_3',
+                           dict_content={'root': {'name': 'Blue whale', 'description': 'A large animal'}}).save()
+        self.data_collection = [self.data_1, self.data_2, self.data_3]
+
+
+class TestLocalSearchBackend(MongoIntegrationBaseTestCase):
+    fixture = SearchDataFixtures()
+
+    def setUp(self):
+        super(TestLocalSearchBackend, self).setUp()
+        self.backend = LocalSearchBackend(':memory:')
+        self.backend.rebuild(self.fixture.data_collection)
+
+    def test_all_mode_returns_data_with_all_keywords(self):
+        # Act
+        results = self.backend.execute_text_query({}, 'red fox', KEYWORD_MODE_ALL)
+        # Assert
+        self.assertEqual(set(data.title for data in results), {'title_1', 'title_2'})
+
+    def test_any_mode_returns_data_with_one_keyword_most_relevant_first(self):
+        # Act
+        results = self.backend.execute_text_query({}, 'blue whale', KEYWORD_MODE_ANY)
+        # Assert
+        self.assertEqual([data.title for data in results], ['title_3', 'title_2'])
+
+    def test_phrase_mode_returns_data_with_consecutive_keywords(self):
+        # Act
+        results = self.backend.execute_text_query({}, 'red fox', KEYWORD_MODE_PHRASE)
+        # Assert
+        self.assertEqual([data.title for data in results], ['title_1'])
+
+    def test_phrase_does_not_span_two_strings(self):
+        # Act
+        results = self.backend.execute_text_query({}, 'red blue', KEYWORD_MODE_PHRASE)
+        # Assert
+        self.assertEqual(results, [])
+
+    def test_search_is_case_insensitive(self):
+        # Act
+        results = self.backend.execute_text_query({}, 'WHALE', KEYWORD_MODE_ALL)
+        # Assert
+        self.assertEqual([data.title for data in results], ['title_3'])
+
+    def test_results_are_filtered_by_query(self):
+        # Act
+        results = self.backend.execute_text_query({'user_id': '2'}, 'fox', KEYWORD_MODE_ALL)
+        # Assert
+        self.assertEqual([data.title for data in results], ['title_2'])
+
+    def test_results_are_limited(self):
+        # Act
+        results = self.backend.execute_text_query({}, 'fox', KEYWORD_MODE_ALL, limit=1)
+        # Assert
+        self.assertEqual(len(results), 1)
+
+    def test_results_load_projection_fields_only(self):
+        # Act
+        results = self.backend.execute_text_query({}, 'whale', KEYWORD_MODE_ALL, projection=['title'])
+        # Assert
+        self.assertEqual(results[0].title, 'title_3')
+        self.assertFalse(results[0].dict_content)
+
+    def test_updated_data_is_searched_with_new_content(self):
+        # Arrange
+        self.fixture.data_3.dict_content = {'root': {'name': 'Grey wolf'}}
+        self.fixture.data_3.save()
+        # Act
+        self.backend.index_data([self.fixture.data_3])
+        # Assert
+        self.assertEqual(self.backend.execute_text_query({}, 'whale', KEYWORD_MODE_ALL), [])
+        self.assertEqual([data.title for data in self.backend.execute_text_query({}, 'wolf', KEYWORD_MODE_ALL)],
+                         ['title_3'])
+
+    def test_deleted_data_is_not_ranked(self):
+        # Act
+        self.backend.delete_data([self.fixture.data_3])
+        # Assert
+        self.assertEqual(self.backend.rank(['whale'], KEYWORD_MODE_ALL), [])
+
+    def test_rebuild_returns_number_of_data_indexed(self):
+        # Act
+        count = self.backend.rebuild(self.fixture.data_collection)
+        # Assert
+        self.assertEqual(count, 3)
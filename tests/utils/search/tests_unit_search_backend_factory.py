@@ -0,0 +1,28 @@
+""" Unit tests of the search backend factory
+"""
+from unittest import TestCase
+
+from core_main_app.commons.exceptions import CoreError
+from core_main_app.utils.search import search_backend_factory
+from core_main_app.utils.search.local_search_backend import LocalSearchBackend
+from core_main_app.utils.search.mongo_text_search_backend import MongoTextSearchBackend
+
+
+class TestCreateSearchBackend(TestCase):
+
+    def test_create_mongo_search_backend_returns_mongo_text_backend(self):
+        # Act
+        backend = search_backend_factory.create_search_backend(search_backend_factory.MONGO_TEXT_SEARCH_BACKEND)
+        # Assert
+        self.assertIsInstance(backend, MongoTextSearchBackend)
+
+    def test_create_local_search_backend_returns_local_backend(self):
+        # Act
+        backend = search_backend_factory.create_search_backend(search_backend_factory.LOCAL_SEARCH_BACKEND)
+        # Assert
+        self.assertIsInstance(backend, LocalSearchBackend)
+
+    def test_create_unknown_search_backend_raises_core_error(self):
+        # Act # Assert
+        with self.assertRaises(CoreError):
+            search_backend_factory.create_search_backend('unknown')
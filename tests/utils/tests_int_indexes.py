@@ -0,0 +1,56 @@
+""" Integration tests of the query plans of the main queries
+"""
+from bson.objectid import ObjectId
+
+from core_main_app.components.data.models import Data
+from core_main_app.components.template.models import Template
+from core_main_app.components.template_version_manager.models import TemplateVersionManager
+from core_main_app.components.workspace.models import Workspace
+from core_main_app.utils.databases import indexes
+from core_main_app.utils.integration_tests.integration_base_test_case import MongoIntegrationBaseTestCase
+from core_main_app.utils.raw_query.mongo_raw_query import add_access_criteria
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+from tests.components.data.fixtures.fixtures import DataFixtures
+
+fixture_data = DataFixtures()
+
+
+class TestMainQueriesUseIndexes(MongoIntegrationBaseTestCase):
+    """ Query plans of the main queries. Needs a MongoDB database (query plans are not available with mongomock).
+    """
+    fixture = fixture_data
+
+    def setUp(self):
+        if not hasattr(Data._get_collection().find(), 'explain'):
+            self.skipTest('Query plans are not supported by the test database.')
+        super(TestMainQueriesUseIndexes, self).setUp()
+        indexes.ensure_indexes()
+
+    def test_data_queries_use_indexes(self):
+        workspace_id = ObjectId()
+        user = create_mock_user('1')
+        for queryset in [Data.get_all_by_user_id('1', '-last_modification_date'),
+                         Data.get_all_by_workspace(workspace_id),
+                         Data.get_all_by_list_workspace([workspace_id]),
+                         Data.get_all_by_list_template([ObjectId()]),
+                         Data.get_all('-last_modification_date'),
+                         Data.execute_query(add_access_criteria({}, [workspace_id], user)),
+                         Data.execute_query(add_access_criteria({}, [workspace_id], user), '-last_modification_date')]:
+            self.assertFalse(indexes.uses_collection_scan(queryset), queryset._query)
+
+    def test_workspace_queries_use_indexes(self):
+        for queryset in [Workspace.get_all_by_owner('1'),
+                         Workspace.get_all_workspaces_with_read_access_by_user_id('1', ['perm']),
+                         Workspace.get_all_workspaces_with_write_access_by_user_id('1', ['perm']),
+                         Workspace.get_all_public_workspaces(),
+                         Workspace.get_non_public_workspace_owned_by_user_id('1')]:
+            self.assertFalse(indexes.uses_collection_scan(queryset), queryset._query)
+
+    def test_template_queries_use_indexes(self):
+        for queryset in [Template.get_all_by_hash('hash'),
+                         Template.get_all_templates_by_dependencies([ObjectId()])]:
+            self.assertFalse(indexes.uses_collection_scan(queryset), queryset._query)
+
+    def test_template_version_manager_queries_use_indexes(self):
+        queryset = TemplateVersionManager.get_all_by_version_ids([str(ObjectId())])
+        self.assertFalse(indexes.uses_collection_scan(queryset), queryset._query)
@@ -0,0 +1,85 @@
+""" Integration tests of the cursor pagination
+"""
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core_main_app.commons.exceptions import RestApiError
+from core_main_app.components.data.models import Data
+from core_main_app.utils.integration_tests.integration_base_test_case import MongoIntegrationBaseTestCase
+from core_main_app.utils.pagination.rest_framework_paginator.pagination import KeysetResultsSetPagination
+from tests.components.data.fixtures.fixtures import PaginationDataFixtures
+
+fixture_data = PaginationDataFixtures()
+
+
+class TestKeysetResultsSetPagination(MongoIntegrationBaseTestCase):
+    fixture = fixture_data
+
+    def test_next_links_return_all_data_sorted_by_id(self):
+        # Act
+        data_list = _get_all_pages(None)
+        # Assert
+        expected_ids = sorted(data.id for data in self.fixture.data_collection)
+        self.assertEqual([data.id for data in data_list], expected_ids)
+
+    def test_next_links_return_all_data_sorted_by_order_field(self):
+        # Act
+        data_list = _get_all_pages('-title')
+        # Assert
+        expected_ids = [data.id for data in sorted(self.fixture.data_collection,
+                                                   key=lambda data: (data.title, data.id), reverse=True)]
+        self.assertEqual([data.id for data in data_list], expected_ids)
+
+    def test_previous_link_returns_previous_page(self):
+        # Arrange
+        first_paginator = _paginate('title', '/')
+        first_page = first_paginator.page
+        second_paginator = _paginate('title', first_paginator.get_next_link())
+        # Act
+        previous_paginator = _paginate('title', second_paginator.get_previous_link())
+        # Assert
+        self.assertEqual([data.id for data in previous_paginator.page], [data.id for data in first_page])
+        self.assertIsNone(previous_paginator.get_previous_link())
+        self.assertIsNone(first_paginator.get_previous_link())
+
+    def test_exact_count_returns_number_of_data(self):
+        # Act
+        paginator = _paginate(None, '/?count=exact')
+        # Assert
+        self.assertEqual(paginator.count, len(self.fixture.data_collection))
+        self.assertTrue(paginator.count_is_exact)
+
+    def test_no_count_returns_none(self):
+        # Act
+        paginator = _paginate(None, '/?count=none')
+        # Assert
+        self.assertIsNone(paginator.count)
+
+    def test_invalid_cursor_raises_rest_api_error(self):
+        # Act # Assert
+        with self.assertRaises(RestApiError):
+            _paginate(None, '/?cursor=invalid')
+
+    def test_cursor_of_other_order_field_raises_rest_api_error(self):
+        # Arrange
+        next_link = _paginate('title', '/').get_next_link()
+        # Act # Assert
+        with self.assertRaises(RestApiError):
+            _paginate(None, next_link)
+
+
+def _paginate(order_by_field, url):
+    paginator = KeysetResultsSetPagination(order_by_field=order_by_field)
+    request = Request(APIRequestFactory().get(url))
+    paginator.paginate_queryset(Data.objects.all(), request)
+    return paginator
+
+
+def _get_all_pages(order_by_field):
+    data_list = []
+    url = '/'
+    while url is not None:
+        paginator = _paginate(order_by_field, url)
+        data_list.extend(paginator.page)
+        url = paginator.get_next_link()
+    return data_list
@@ -0,0 +1,103 @@
+""" Data query results cache test class
+"""
+from unittest import TestCase
+
+from django.core.cache import caches
+from mock import patch
+
+from core_main_app.settings import DATA_QUERY_CACHE
+from core_main_app.utils import data_query_cache
+from core_main_app.utils.tests_tools.MockUser import create_mock_user
+
+QUERY = {'dict_content.root.element': 'value'}
+TEMPLATE_ID = '507f1f77bcf86cd799439011'
+OTHER_TEMPLATE_ID = '507f1f77bcf86cd799439012'
+
+
+@patch.object(data_query_cache, 'DATA_QUERY_CACHE_TTL', 60)
+class TestDataQueryCache(TestCase):
+
+    def setUp(self):
+        caches[DATA_QUERY_CACHE].clear()
+        data_query_cache.clear_stats()
+        self.user = create_mock_user('1')
+
+    def test_get_key_returns_same_key_for_same_query(self):
+        # Act
+        first_key = data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], self.user, {'page': 1})
+        second_key = data_query_cache.get_key('view', dict(QUERY), [TEMPLATE_ID], self.user, {'page': 1})
+        # Assert
+        self.assertEqual(first_key, second_key)
+
+    def test_get_key_returns_different_key_for_other_user(self):
+        # Act
+        first_key = data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], self.user)
+        second_key = data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], create_mock_user('2'))
+        # Assert
+        self.assertNotEqual(first_key, second_key)
+
+    def test_get_key_returns_different_key_for_other_page(self):
+        # Act
+        first_key = data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], self.user, {'page': 1})
+        second_key = data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], self.user, {'page': 2})
+        # Assert
+        self.assertNotEqual(first_key, second_key)
+
+    def test_invalidate_template_changes_key_of_queries_on_template(self):
+        # Arrange
+        first_key = data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], self.user)
+        # Act
+        data_query_cache.invalidate([TEMPLATE_ID])
+        # Assert
+        self.assertNotEqual(first_key, data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], self.user))
+
+    def test_invalidate_template_changes_key_of_queries_on_all_templates(self):
+        # Arrange
+        first_key = data_query_cache.get_key('view', QUERY, [], self.user)
+        # Act
+        data_query_cache.invalidate([TEMPLATE_ID])
+        # Assert
+        self.assertNotEqual(first_key, data_query_cache.get_key('view', QUERY, [], self.user))
+
+    def test_invalidate_template_keeps_key_of_queries_on_other_template(self):
+        # Arrange
+        first_key = data_query_cache.get_key('view', QUERY, [OTHER_TEMPLATE_ID], self.user)
+        # Act
+        data_query_cache.invalidate([TEMPLATE_ID])
+        # Assert
+        self.assertEqual(first_key, data_query_cache.get_key('view', QUERY, [OTHER_TEMPLATE_ID], self.user))
+
+    def test_invalidate_all_changes_key_of_queries_on_template(self):
+        # Arrange
+        first_key = data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], self.user)
+        # Act
+        data_query_cache.invalidate_all()
+        # Assert
+        self.assertNotEqual(first_key, data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], self.user))
+
+    def test_invalidate_all_changes_key_of_queries_on_all_templates(self):
+        # Arrange
+        first_key = data_query_cache.get_key('view', QUERY, [], self.user)
+        # Act
+        data_query_cache.invalidate_all()
+        # Assert
+        self.assertNotEqual(first_key, data_query_cache.get_key('view', QUERY, [], self.user))
+
+    def test_evicted_generation_changes_key(self):
+        # Arrange
+        first_key = data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], self.user)
+        # Act
+        caches[DATA_QUERY_CACHE].delete(data_query_cache._get_generation_key(TEMPLATE_ID))
+        # Assert
+        self.assertNotEqual(first_key, data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], self.user))
+
+    def test_get_stats_returns_hit_ratio(self):
+        # Arrange
+        key = data_query_cache.get_key('view', QUERY, [TEMPLATE_ID], self.user)
+        data_query_cache.get_results(key)
+        data_query_cache.set_results(key, [{'id': '1'}])
+        # Act
+        results = data_query_cache.get_results(key)
+        # Assert
+        self.assertEqual(results, [{'id': '1'}])
+        self.assertEqual(data_query_cache.get_stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
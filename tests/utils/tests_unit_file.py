@@ -0,0 +1,107 @@
+""" Unit tests of the file utils
+"""
+import hashlib
+from io import BytesIO
+from unittest import TestCase
+
+from django.test import RequestFactory
+
+from core_main_app.utils.file import get_file_http_response, get_file_stream_http_response
+
+FILE_CONTENT = b'<root>value</root>'
+FILE_MD5 = 'md5'
+
+
+class TestGetFileStreamHttpResponse(TestCase):
+
+    def test_response_streams_whole_file(self):
+        # Act
+        response = _get_response()
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), FILE_CONTENT)
+        self.assertEqual(response['Content-Length'], str(len(FILE_CONTENT)))
+        self.assertEqual(response['ETag'], '"md5"')
+
+    def test_response_sets_file_name_with_extension(self):
+        # Act
+        response = _get_response()
+        # Assert
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename=file.xml')
+
+    def test_matching_if_none_match_returns_not_modified(self):
+        # Act
+        response = _get_response(HTTP_IF_NONE_MATCH='"md5"')
+        # Assert
+        self.assertEqual(response.status_code, 304)
+
+    def test_other_if_none_match_returns_whole_file(self):
+        # Act
+        response = _get_response(HTTP_IF_NONE_MATCH='"other"')
+        # Assert
+        self.assertEqual(response.status_code, 200)
+
+    def test_range_returns_partial_content(self):
+        # Act
+        response = _get_response(HTTP_RANGE='bytes=1-4')
+        # Assert
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), FILE_CONTENT[1:5])
+        self.assertEqual(response['Content-Range'], 'bytes 1-4/{}'.format(len(FILE_CONTENT)))
+        self.assertEqual(response['Content-Length'], '4')
+
+    def test_suffix_range_returns_end_of_file(self):
+        # Act
+        response = _get_response(HTTP_RANGE='bytes=-7')
+        # Assert
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), FILE_CONTENT[-7:])
+
+    def test_open_range_returns_rest_of_file(self):
+        # Act
+        response = _get_response(HTTP_RANGE='bytes=6-')
+        # Assert
+        self.assertEqual(b''.join(response.streaming_content), FILE_CONTENT[6:])
+
+    def test_range_outside_of_file_returns_range_not_satisfiable(self):
+        # Act
+        response = _get_response(HTTP_RANGE='bytes=100-200')
+        # Assert
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */{}'.format(len(FILE_CONTENT)))
+
+    def test_range_with_other_if_range_returns_whole_file(self):
+        # Act
+        response = _get_response(HTTP_RANGE='bytes=1-4', HTTP_IF_RANGE='"other"')
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), FILE_CONTENT)
+
+    def test_multiple_ranges_return_whole_file(self):
+        # Act
+        response = _get_response(HTTP_RANGE='bytes=1-2,4-5')
+        # Assert
+        self.assertEqual(response.status_code, 200)
+
+
+class TestGetFileHttpResponse(TestCase):
+
+    def test_response_with_request_is_streamed_with_md5_etag(self):
+        # Act
+        response = get_file_http_response(u'<root>value</root>', 'file', 'text/xml', 'xml',
+                                          request=RequestFactory().get('/'))
+        # Assert
+        self.assertEqual(b''.join(response.streaming_content), FILE_CONTENT)
+        self.assertEqual(response['ETag'], '"{}"'.format(hashlib.md5(FILE_CONTENT).hexdigest()))
+
+    def test_response_without_request_returns_file(self):
+        # Act
+        response = get_file_http_response(u'<root>value</root>', 'file', 'text/xml', 'xml')
+        # Assert
+        self.assertEqual(response.content, FILE_CONTENT)
+
+
+def _get_response(**headers):
+    request = RequestFactory().get('/', **headers)
+    return get_file_stream_http_response(request, BytesIO(FILE_CONTENT), 'file', 'text/xml', 'xml',
+                                         length=len(FILE_CONTENT), md5=FILE_MD5)
@@ -0,0 +1,65 @@
+""" Keyword highlight test class
+"""
+from unittest import TestCase
+
+from core_main_app.utils.highlight import get_snippet, get_xml_text
+
+
+class TestGetXmlText(TestCase):
+
+    def test_get_xml_text_removes_tags(self):
+        # Act
+        text = get_xml_text('<root>\n  <element attribute="a">first</element><element>second</element>\n</root>')
+        # Assert
+        self.assertEqual(text, 'first second')
+
+    def test_get_xml_text_resolves_entities(self):
+        # Act
+        text = get_xml_text('<root><element>R&amp;D &lt;1&gt;</element></root>')
+        # Assert
+        self.assertEqual(text, 'R&D <1>')
+
+    def test_get_xml_text_ignores_comments(self):
+        # Act
+        text = get_xml_text('<root>first<!-- comment -->second</root>')
+        # Assert
+        self.assertEqual(text, 'first second')
+
+    def test_get_xml_text_of_snippet_is_escaped_once(self):
+        # Act
+        snippet = get_snippet(get_xml_text('<root><element>R&amp;D value</element></root>'), ['value'])
+        # Assert
+        self.assertEqual(snippet, 'R&amp;D <em>value</em>')
+
+
+class TestGetSnippet(TestCase):
+
+    def test_get_snippet_highlights_keywords(self):
+        # Act
+        snippet = get_snippet('the first value and the second Value', ['value'])
+        # Assert
+        self.assertEqual(snippet, 'the first <em>value</em> and the second <em>Value</em>')
+
+    def test_get_snippet_does_not_highlight_part_of_word(self):
+        # Act
+        snippet = get_snippet('values and value', ['value'])
+        # Assert
+        self.assertEqual(snippet, 'values and <em>value</em>')
+
+    def test_get_snippet_returns_extract_around_first_keyword(self):
+        # Act
+        snippet = get_snippet('a' * 100 + ' value ' + 'b' * 100, ['value'], length=21)
+        # Assert
+        self.assertEqual(snippet, '...aaaaaaaaa <em>value</em> bbbbb...')
+
+    def test_get_snippet_without_keyword_found_returns_start_of_text(self):
+        # Act
+        snippet = get_snippet('first second third', ['other'], length=12)
+        # Assert
+        self.assertEqual(snippet, 'first second...')
+
+    def test_get_snippet_escapes_text(self):
+        # Act
+        snippet = get_snippet('<b> & value', ['value'])
+        # Assert
+        self.assertEqual(snippet, '&lt;b&gt; &amp; <em>value</em>')
@@ -0,0 +1,86 @@
+""" Unit tests of the index management
+"""
+from unittest.case import TestCase
+
+from mock.mock import Mock
+
+from core_main_app.components.data.models import Data
+from core_main_app.components.template_version_manager.models import TemplateVersionManager
+from core_main_app.components.workspace.models import Workspace
+from core_main_app.utils.databases import indexes
+
+
+class TestDeclaredIndexes(TestCase):
+
+    def test_data_declares_indexes_of_access_criteria_clauses(self):
+        # Act
+        declared_indexes = Data.list_indexes()
+        # Assert
+        self.assertIn([('workspace', 1), ('last_modification_date', -1)], declared_indexes)
+        self.assertIn([('user_id', 1), ('last_modification_date', -1)], declared_indexes)
+        self.assertIn([('template', 1)], declared_indexes)
+
+    def test_workspace_declares_indexes_of_access_queries(self):
+        # Act
+        declared_indexes = Workspace.list_indexes()
+        # Assert
+        for index in [[('owner', 1), ('is_public', 1)], [('read_perm_id', 1)], [('write_perm_id', 1)],
+                      [('is_public', 1)]]:
+            self.assertIn(index, declared_indexes)
+
+    def test_template_version_manager_declares_versions_index(self):
+        # Act # Assert
+        self.assertIn([('_cls', 1), ('versions', 1)], TemplateVersionManager.list_indexes())
+
+
+class TestEnsureIndexes(TestCase):
+
+    def test_ensure_indexes_ensures_indexes_of_each_document(self):
+        # Arrange
+        documents = [Mock(), Mock()]
+        # Act
+        indexes.ensure_indexes(documents)
+        # Assert
+        for document in documents:
+            document.ensure_indexes.assert_called_once_with()
+
+    def test_compare_indexes_does_not_report_id_and_text_indexes_as_extra(self):
+        # Arrange
+        document = Mock()
+        document._get_collection_name.return_value = 'collection'
+        document.compare_indexes.return_value = {'missing': [[('a', 1)]],
+                                                 'extra': [[('_id', 1)], [('_fts', 'text'), ('_ftsx', 1)],
+                                                           [('b', 1)]]}
+        # Act
+        comparison = indexes.compare_indexes([document])
+        # Assert
+        self.assertEqual(comparison, {'collection': {'missing': [[('a', 1)]], 'extra': [[('b', 1)]]}})
+
+
+class TestQueryPlanStages(TestCase):
+
+    def test_get_query_plan_stages_returns_stages_of_winning_plan(self):
+        # Arrange
+        queryset = _get_mock_queryset({'stage': 'SUBPLAN', 'inputStage': {
+            'stage': 'FETCH', 'inputStage': {'stage': 'OR', 'inputStages': [{'stage': 'IXSCAN'},
+                                                                              {'stage': 'IXSCAN'}]}}})
+        # Act # Assert
+        self.assertEqual(indexes.get_query_plan_stages(queryset), ['SUBPLAN', 'FETCH', 'OR', 'IXSCAN', 'IXSCAN'])
+
+    def test_uses_collection_scan_returns_false_if_plan_uses_indexes(self):
+        # Arrange
+        queryset = _get_mock_queryset({'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN'}})
+        # Act # Assert
+        self.assertFalse(indexes.uses_collection_scan(queryset))
+
+    def test_uses_collection_scan_returns_true_if_a_clause_reads_the_collection(self):
+        # Arrange
+        queryset = _get_mock_queryset({'stage': 'OR', 'inputStages': [{'stage': 'IXSCAN'}, {'stage': 'COLLSCAN'}]})
+        # Act # Assert
+        self.assertTrue(indexes.uses_collection_scan(queryset))
+
+
+def _get_mock_queryset(winning_plan):
+    queryset = Mock()
+    queryset.explain.return_value = {'queryPlanner': {'winningPlan': winning_plan}}
+    return queryset
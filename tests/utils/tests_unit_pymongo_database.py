@@ -0,0 +1,48 @@
+""" Full text query test class
+"""
+from unittest import TestCase
+
+from core_main_app.commons.exceptions import ApiError
+from core_main_app.utils.databases.pymongo_database import get_full_text_query, get_full_text_search
+from core_main_app.utils.query.constants import KEYWORD_MODE_ANY, KEYWORD_MODE_PHRASE
+
+
+class TestGetFullTextSearch(TestCase):
+
+    def test_get_full_text_search_requires_all_keywords_by_default(self):
+        # Act
+        search = get_full_text_search('first, second')
+        # Assert
+        self.assertEqual(search, '"first" "second"')
+
+    def test_get_full_text_search_in_any_mode_returns_keywords(self):
+        # Act
+        search = get_full_text_search('first, second', KEYWORD_MODE_ANY)
+        # Assert
+        self.assertEqual(search, 'first second')
+
+    def test_get_full_text_search_in_phrase_mode_returns_phrase(self):
+        # Act
+        search = get_full_text_search('first, second', KEYWORD_MODE_PHRASE)
+        # Assert
+        self.assertEqual(search, '"first second"')
+
+    def test_get_full_text_search_with_unknown_mode_raises_api_error(self):
+        # Act # Assert
+        with self.assertRaises(ApiError):
+            get_full_text_search('first', 'unknown')
+
+
+class TestGetFullTextQuery(TestCase):
+
+    def test_get_full_text_query_returns_text_query(self):
+        # Act
+        query = get_full_text_query('first second')
+        # Assert
+        self.assertEqual(query, {'$text': {'$search': '"first" "second"'}})
+
+    def test_get_full_text_query_without_keyword_returns_empty_query(self):
+        # Act
+        query = get_full_text_query(' , ')
+        # Assert
+        self.assertEqual(query, {})
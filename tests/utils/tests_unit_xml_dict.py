@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+""" Unit tests of the streaming XML to dict conversion
+"""
+from collections import OrderedDict
+from unittest import TestCase
+
+import xmltodict
+from mock import patch
+
+import core_main_app.commons.exceptions as exceptions
+from core_main_app.utils import xml_dict
+from core_main_app.utils.xml import convert_value, post_processor, remove_lists_from_xml_dict
+from core_main_app.utils.xml_dict import xml_to_dict, is_path_valid
+
+XML_DOCUMENTS = [
+    u'<root><test>Hello</test></root>',
+    u'<a xmlns="urn:a" xmlns:p="urn:p" p:x="1.5" y="abc"><p:b>1</p:b><b> 2 </b><b>x</b>text<c/>tail<d z="3"> 7 </d></a>',
+    u'<root><value>inf</value><value>-0</value><value>1e3</value><value>2018-01-01</value><value> </value></root>',
+    u'<root><a><b>1</b><b>2</b></a><a><c k="v">text</c></a><d>é</d></root>',
+    '<?xml version="1.0" encoding="ISO-8859-1"?><root>\xe9t\xe9</root>',
+]
+
+
+class TestXmlToDict(TestCase):
+    def test_xml_to_dict_returns_same_dict_as_xmltodict(self):
+        for xml_string in XML_DOCUMENTS:
+            # Act
+            xml_dict_content = xml_to_dict(xml_string)
+            # Assert
+            self.assertEqual(repr(xml_dict_content), repr(xmltodict.parse(xml_string, postprocessor=post_processor)))
+
+    @patch.object(xml_dict, 'PARSER_CHUNK_SIZE', 3)
+    def test_xml_to_dict_by_small_chunks_returns_same_dict_as_xmltodict(self):
+        for xml_string in XML_DOCUMENTS:
+            # Act
+            xml_dict_content = xml_to_dict(xml_string)
+            # Assert
+            self.assertEqual(repr(xml_dict_content), repr(xmltodict.parse(xml_string, postprocessor=post_processor)))
+
+    def test_xml_to_dict_converts_numbers(self):
+        # Act
+        xml_dict_content = xml_to_dict('<root a="1"><b>2.5</b><c>x</c></root>')
+        # Assert
+        self.assertEqual(xml_dict_content, OrderedDict([(u'root', OrderedDict([(u'@a', 1), (u'b', 2.5),
+                                                                                 (u'c', u'x')]))]))
+
+    def test_xml_to_dict_throws_exception_when_invalid_xml(self):
+        # Act # Assert
+        with self.assertRaises(exceptions.XMLError):
+            xml_to_dict('<root><test>Hello</test?</root>')
+
+    def test_xml_to_dict_throws_exception_when_empty(self):
+        # Act # Assert
+        with self.assertRaises(exceptions.XMLError):
+            xml_to_dict('')
+
+    def test_xml_to_dict_with_limit_returns_same_dict_as_remove_lists_from_xml_dict(self):
+        # Arrange
+        xml_string = '<root><a>1</a><a>2</a><a>3</a><b><c>1</c><c>2</c></b><d>4</d></root>'
+        for max_list_size in range(0, 4):
+            expected_dict = xmltodict.parse(xml_string, postprocessor=post_processor)
+            remove_lists_from_xml_dict(expected_dict, max_list_size)
+            # Act
+            xml_dict_content = xml_to_dict(xml_string, max_list_size)
+            # Assert
+            self.assertEqual(repr(xml_dict_content), repr(expected_dict))
+
+    def test_xml_to_dict_with_limit_removes_list_exceeding_limit(self):
+        # Act
+        xml_dict_content = xml_to_dict('<root><a>1</a><a>2</a><a>3</a><b>4</b></root>', 2)
+        # Assert
+        self.assertEqual(xml_dict_content, {'root': {'b': 4}})
+
+    def test_xml_to_dict_with_limit_keeps_list_within_limit(self):
+        # Act
+        xml_dict_content = xml_to_dict('<root><a>1</a><a>2</a></root>', 2)
+        # Assert
+        self.assertEqual(xml_dict_content, {'root': {'a': [1, 2]}})
+
+    def test_xml_to_dict_with_limit_zero_keeps_single_elements(self):
+        # Act
+        xml_dict_content = xml_to_dict('<root><a>1</a><b>2</b><b>3</b></root>', 0)
+        # Assert
+        self.assertEqual(xml_dict_content, {'root': {'a': 1}})
+
+    def test_xml_to_dict_with_limit_removes_lists_in_list_items(self):
+        # Act
+        xml_dict_content = xml_to_dict('<root><a><b>1</b><b>2</b><b>3</b></a><a><b>4</b></a></root>', 2)
+        # Assert
+        self.assertEqual(xml_dict_content, {'root': {'a': [{}, {'b': 4}]}})
+
+    def test_xml_to_dict_with_limit_does_not_convert_elements_over_limit(self):
+        # Arrange
+        xml_string = '<root><a>1</a><a>2</a><a>3</a><a>4</a></root>'
+        with patch.object(xml_dict, 'convert_value', side_effect=convert_value) as mock_convert_value:
+            # Act
+            xml_to_dict(xml_string, 2)
+        # Assert
+        self.assertEqual(mock_convert_value.call_count, 2)
+
+
+class TestXmlToDictWithPaths(TestCase):
+    xml_string = '<root id="1" v="2"><a k="x">1</a><a>2</a><b><c>3</c><d>4</d></b><e>5</e>text</root>'
+
+    def test_xml_to_dict_with_paths_keeps_selected_elements(self):
+        # Act
+        xml_dict_content = xml_to_dict(self.xml_string, paths=['/root/a', 'root/b/d'])
+        # Assert
+        self.assertEqual(xml_dict_content, {'root': {'a': [{'@k': 'x', '#text': 1}, 2], 'b': {'d': 4}}})
+
+    def test_xml_to_dict_with_paths_keeps_selected_attributes(self):
+        # Act
+        xml_dict_content = xml_to_dict(self.xml_string, paths=['/root/@id', '/root/a/@k'])
+        # Assert
+        self.assertEqual(xml_dict_content, {'root': {'@id': 1, 'a': [{'@k': 'x'}, None]}})
+
+    def test_xml_to_dict_with_paths_wildcards(self):
+        # Act
+        xml_dict_content = xml_to_dict(self.xml_string, paths=['/root/*/c', '/root/@*'])
+        # Assert
+        self.assertEqual(xml_dict_content, {'root': {'@id': 1, '@v': 2, 'a': [None, None], 'b': {'c': 3},
+                                                     'e': None}})
+
+    def test_xml_to_dict_with_root_path_keeps_whole_xml(self):
+        # Act
+        xml_dict_content = xml_to_dict(self.xml_string, paths=['/root'])
+        # Assert
+        self.assertEqual(repr(xml_dict_content), repr(xml_to_dict(self.xml_string)))
+
+    def test_xml_to_dict_with_paths_not_matching_root_returns_none(self):
+        # Act # Assert
+        self.assertIsNone(xml_to_dict(self.xml_string, paths=['/other/a']))
+
+    def test_xml_to_dict_with_paths_and_limit_removes_lists_of_containing_elements(self):
+        # Act
+        xml_dict_content = xml_to_dict('<root><a><b>1</b></a><a><c>2</c></a></root>', 1, paths=['/root/a/b'])
+        # Assert
+        self.assertEqual(xml_dict_content, {'root': {}})
+
+    def test_xml_to_dict_with_invalid_path_raises_xml_error(self):
+        # Act # Assert
+        with self.assertRaises(exceptions.XMLError):
+            xml_to_dict(self.xml_string, paths=['/root//a'])
+
+
+class TestIsPathValid(TestCase):
+    def test_is_path_valid_returns_true_for_valid_paths(self):
+        for path in ['/root', 'root/a', '/root/*/b', '/root/a/@id', '/root/@*', '/ns:root/ns:a']:
+            self.assertTrue(is_path_valid(path), path)
+
+    def test_is_path_valid_returns_false_for_invalid_paths(self):
+        for path in ['', '/', '/root//a', '/root/@id/a', '/root/a[1]', '/root/a b', None, 1]:
+            self.assertFalse(is_path_valid(path), path)
+
+
+class TestConvertValue(TestCase):
+    def test_convert_value_returns_same_value_as_int_and_float(self):
+        for value in ['1', ' -2 ', '- 3', '1.5', '.5', '1e3', 'inf', 'NaN', '', ' ', 'text', '2018-01-01', '1L',
+                      u'١٢', u'²', None, 1.5]:
+            try:
+                expected_value = int(value)
+            except (ValueError, TypeError):
+                try:
+                    expected_value = float(value)
+                except (ValueError, TypeError):
+                    expected_value = value
+            # Act # Assert
+            self.assertEqual(repr(convert_value(value)), repr(expected_value))
@@ -2,10 +2,18 @@
     Xml operation test class
 """
 import core_main_app.commons.exceptions as exceptions
+import core_main_app.utils.xml as xml_utils
 from unittest import TestCase
-from core_main_app.utils.xml import raw_xml_to_dict, remove_lists_from_xml_dict
+from core_main_app.utils.xml import raw_xml_to_dict, remove_lists_from_xml_dict, validate_xml_data_many, \
+    build_xsd_tree, get_hash, is_schema_valid, get_imports_and_includes
+from core_main_app.utils.xsd_schema_cache import CompiledXmlSchema
 from collections import OrderedDict
 
+import billiard
+from lxml import etree
+from mock import patch
+from xml_utils.xsd_tree.xsd_tree import XSDTree
+
 
 class TestRawToDict(TestCase):
     def test_raw_to_dict_valid(self):
@@ -115,3 +123,183 @@ class TestRemoveListsFromXmlDict(TestCase):
             }
         })
 
+
+
+class TestValidateXmlDataMany(TestCase):
+    def setUp(self):
+        self.xsd_tree = XSDTree.build_tree('<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">'
+                                           '<xs:element name="tag"></xs:element></xs:schema>')
+        self.xml_strings = ['<tag>1</tag>', '<other>2</other>', '<tag>3</tag', '<tag>4</tag>']
+
+    def tearDown(self):
+        xml_utils.shutdown_validation_pool()
+
+    def test_validate_xml_data_many_returns_errors_in_order(self):
+        # Act
+        errors = validate_xml_data_many(self.xsd_tree, self.xml_strings)
+
+        # Assert
+        self.assertEqual([error is None for error in errors], [True, False, False, True])
+
+    def test_validate_xml_data_many_with_compiled_schema_returns_errors_in_order(self):
+        # Arrange
+        compiled_schema = CompiledXmlSchema(etree.XMLSchema(self.xsd_tree), self.xsd_tree)
+
+        # Act
+        errors = validate_xml_data_many(self.xsd_tree, self.xml_strings, compiled_schema)
+
+        # Assert
+        self.assertEqual([error is None for error in errors], [True, False, False, True])
+
+    @patch('core_main_app.utils.xml.XML_VALIDATION_MIN_BATCH_SIZE', 1)
+    @patch('core_main_app.utils.xml.XML_VALIDATION_PROCESSES', 2)
+    def test_validate_xml_data_many_in_daemonic_process_returns_errors_in_order(self):
+        # Arrange: celery workers are daemonic processes, which can not start a pool
+        worker_pool = billiard.Pool(1)
+
+        # Act
+        try:
+            errors = worker_pool.apply(_validate_xml_data_many_from_strings,
+                                       (XSDTree.tostring(self.xsd_tree), self.xml_strings))
+        finally:
+            worker_pool.terminate()
+            worker_pool.join()
+
+        # Assert
+        self.assertEqual([error is None for error in errors], [True, False, False, True])
+
+    @patch('core_main_app.utils.xml.XML_VALIDATION_MIN_BATCH_SIZE', 1)
+    @patch('core_main_app.utils.xml.XML_VALIDATION_PROCESSES', 2)
+    def test_validate_xml_data_many_in_pool_returns_errors_in_order(self):
+        # Act
+        errors = validate_xml_data_many(self.xsd_tree, self.xml_strings)
+
+        # Assert
+        self.assertEqual([error is None for error in errors], [True, False, False, True])
+
+    @patch('core_main_app.utils.xml.XML_VALIDATION_MIN_BATCH_SIZE', 1)
+    @patch('core_main_app.utils.xml.XML_VALIDATION_PROCESSES', 2)
+    def test_validate_xml_data_many_in_pool_reuses_pool_between_calls(self):
+        # Act
+        validate_xml_data_many(self.xsd_tree, self.xml_strings)
+        pool = xml_utils._validation_pool
+        errors = validate_xml_data_many(self.xsd_tree, self.xml_strings)
+
+        # Assert
+        self.assertIsNotNone(pool)
+        self.assertIs(xml_utils._validation_pool, pool)
+        self.assertEqual([error is None for error in errors], [True, False, False, True])
+
+    @patch('core_main_app.utils.xml.XML_VALIDATION_MIN_BATCH_SIZE', 1)
+    def test_validate_xml_data_many_in_pool_with_other_process_count_starts_new_pool(self):
+        # Arrange
+        with patch('core_main_app.utils.xml.XML_VALIDATION_PROCESSES', 2):
+            validate_xml_data_many(self.xsd_tree, self.xml_strings)
+        pool = xml_utils._validation_pool
+
+        # Act
+        with patch('core_main_app.utils.xml.XML_VALIDATION_PROCESSES', 3):
+            errors = validate_xml_data_many(self.xsd_tree, self.xml_strings)
+
+        # Assert
+        self.assertIsNot(xml_utils._validation_pool, pool)
+        self.assertEqual(xml_utils._validation_pool_processes, 3)
+        self.assertEqual([error is None for error in errors], [True, False, False, True])
+
+    @patch('core_main_app.utils.xml.XML_VALIDATION_MIN_BATCH_SIZE', 1)
+    @patch('core_main_app.utils.xml.XML_VALIDATION_PROCESSES', 2)
+    def test_validate_xml_data_many_in_pool_with_other_schema_returns_its_errors(self):
+        # Arrange
+        other_xsd_tree = XSDTree.build_tree('<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">'
+                                            '<xs:element name="other"></xs:element></xs:schema>')
+
+        # Act
+        validate_xml_data_many(self.xsd_tree, self.xml_strings)
+        errors = validate_xml_data_many(other_xsd_tree, self.xml_strings)
+
+        # Assert
+        self.assertEqual([error is None for error in errors], [False, True, False, False])
+
+    @patch('core_main_app.utils.xml.XML_VALIDATION_MIN_BATCH_SIZE', 1)
+    @patch('core_main_app.utils.xml.XML_VALIDATION_PROCESSES', 2)
+    def test_validate_xml_data_many_in_forked_process_starts_new_pool(self):
+        # Arrange
+        validate_xml_data_many(self.xsd_tree, self.xml_strings)
+        parent_pool = xml_utils._validation_pool
+
+        # Act
+        with patch.object(xml_utils, '_validation_pool_pid', -1):
+            errors = validate_xml_data_many(self.xsd_tree, self.xml_strings)
+            child_pool = xml_utils._validation_pool
+
+        # Assert
+        self.assertIsNot(child_pool, parent_pool)
+        self.assertEqual([error is None for error in errors], [True, False, False, True])
+        parent_pool.terminate()
+        parent_pool.join()
+
+    def test_validate_xml_data_many_returns_schema_error_for_each_document_if_schema_is_invalid(self):
+        # Arrange
+        xsd_tree = XSDTree.build_tree('<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">'
+                                      '<xs:element></xs:element></xs:schema>')
+
+        # Act
+        errors = validate_xml_data_many(xsd_tree, self.xml_strings)
+
+        # Assert
+        self.assertTrue(all(error is not None for error in errors))
+
+
+class TestSingleParseSchemaPipeline(TestCase):
+    def setUp(self):
+        self.xsd_string = '<?xml version="1.0"?>' \
+                          '<!-- comment -->' \
+                          '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">\n' \
+                          '    <xs:include schemaLocation="other.xsd"/>\n' \
+                          '    <xs:annotation><xs:documentation>doc</xs:documentation></xs:annotation>\n' \
+                          '    <xs:element name="root" type="xs:string"><!-- comment --></xs:element>\n' \
+                          '</xs:schema>'
+
+    def test_build_xsd_tree_raises_xml_error_if_not_well_formed(self):
+        # Act # Assert
+        with self.assertRaises(exceptions.XMLError):
+            build_xsd_tree('<xs:schema')
+
+    def test_get_hash_from_tree_equals_get_hash_from_string(self):
+        # Arrange
+        xsd_tree = build_xsd_tree(self.xsd_string)
+
+        # Act
+        tree_hash = get_hash(self.xsd_string, xsd_tree)
+
+        # Assert
+        self.assertEqual(tree_hash, get_hash(self.xsd_string))
+
+    def test_get_hash_from_tree_keeps_tree_annotations(self):
+        # Arrange
+        xsd_tree = build_xsd_tree(self.xsd_string)
+
+        # Act
+        get_hash(self.xsd_string, xsd_tree)
+
+        # Assert
+        self.assertEqual(len(xsd_tree.findall("{http://www.w3.org/2001/XMLSchema}annotation")), 1)
+
+    def test_get_imports_and_includes_from_tree(self):
+        # Act
+        imports, includes = get_imports_and_includes(self.xsd_string, build_xsd_tree(self.xsd_string))
+
+        # Assert
+        self.assertEqual((len(imports), len(includes)), (0, 1))
+
+    def test_is_schema_valid_with_tree_raises_core_error_if_include_has_no_schema_location(self):
+        # Arrange
+        xsd_string = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"><xs:include/></xs:schema>'
+
+        # Act # Assert
+        with self.assertRaises(exceptions.CoreError):
+            is_schema_valid(xsd_string, build_xsd_tree(xsd_string))
+
+
+def _validate_xml_data_many_from_strings(xsd_string, xml_strings):
+    return validate_xml_data_many(XSDTree.build_tree(xsd_string), xml_strings)
@@ -0,0 +1,118 @@
+""" Compiled XSD schema cache test class
+"""
+from unittest import TestCase
+
+from core_main_app.commons import exceptions
+from core_main_app.components.template.models import Template
+from core_main_app.utils import xsd_schema_cache
+from core_main_app.utils.lru_cache import LRUCache
+from xml_utils.xsd_tree.xsd_tree import XSDTree
+
+
+class TestLRUCache(TestCase):
+
+    def test_get_returns_default_and_counts_miss_when_key_is_absent(self):
+        # Arrange
+        cache = LRUCache(2)
+        # Act
+        result = cache.get('key', 'default')
+        # Assert
+        self.assertEqual(result, 'default')
+        self.assertEqual(cache.get_stats()['misses'], 1)
+
+    def test_get_returns_value_and_counts_hit_when_key_is_present(self):
+        # Arrange
+        cache = LRUCache(2)
+        cache.set('key', 'value')
+        # Act
+        result = cache.get('key')
+        # Assert
+        self.assertEqual(result, 'value')
+        self.assertEqual(cache.get_stats()['hits'], 1)
+
+    def test_set_evicts_least_recently_used_entry_when_full(self):
+        # Arrange
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        # Act
+        cache.set('c', 3)
+        # Assert
+        self.assertTrue('a' in cache)
+        self.assertFalse('b' in cache)
+        self.assertTrue('c' in cache)
+
+    def test_set_does_nothing_when_cache_is_disabled(self):
+        # Arrange
+        cache = LRUCache(0)
+        # Act
+        cache.set('a', 1)
+        # Assert
+        self.assertEqual(len(cache), 0)
+
+
+class TestXsdSchemaCache(TestCase):
+
+    def setUp(self):
+        xsd_schema_cache.clear()
+
+    def test_get_xml_schema_compiles_schema_once_per_hash(self):
+        # Arrange
+        template = _create_template(template_hash='hash')
+        # Act
+        first_schema = xsd_schema_cache.get_xml_schema(template)
+        second_schema = xsd_schema_cache.get_xml_schema(template)
+        # Assert
+        self.assertIs(first_schema, second_schema)
+        self.assertEqual(xsd_schema_cache.get_stats()['hits'], 1)
+        self.assertEqual(xsd_schema_cache.get_stats()['misses'], 1)
+
+    def test_get_xml_schema_does_not_cache_template_without_hash(self):
+        # Arrange
+        template = _create_template(template_hash=None)
+        # Act
+        xsd_schema_cache.get_xml_schema(template)
+        # Assert
+        self.assertEqual(xsd_schema_cache.get_stats()['size'], 0)
+
+    def test_invalidate_removes_compiled_schema(self):
+        # Arrange
+        template = _create_template(template_hash='hash')
+        first_schema = xsd_schema_cache.get_xml_schema(template)
+        # Act
+        xsd_schema_cache.invalidate('hash')
+        # Assert
+        self.assertIsNot(first_schema, xsd_schema_cache.get_xml_schema(template))
+
+    def test_get_xml_schema_raises_xsd_error_if_template_is_not_well_formed(self):
+        # Arrange
+        template = _create_template(template_hash='hash')
+        template.content += '<'
+        # Act # Assert
+        with self.assertRaises(exceptions.XSDError):
+            xsd_schema_cache.get_xml_schema(template)
+
+    def test_validate_returns_none_if_xml_is_valid(self):
+        # Arrange
+        xml_schema = xsd_schema_cache.get_xml_schema(_create_template(template_hash='hash'))
+        # Act
+        result = xml_schema.validate(XSDTree.build_tree('<tag>value</tag>'))
+        # Assert
+        self.assertIsNone(result)
+
+    def test_validate_returns_error_if_xml_is_invalid(self):
+        # Arrange
+        xml_schema = xsd_schema_cache.get_xml_schema(_create_template(template_hash='hash'))
+        # Act
+        result = xml_schema.validate(XSDTree.build_tree('<other>value</other>'))
+        # Assert
+        self.assertIsNotNone(result)
+
+
+def _create_template(template_hash):
+    template = Template()
+    template.content = '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">' \
+                       '<xs:element name="tag"></xs:element></xs:schema>'
+    template.hash = template_hash
+    return template
@@ -0,0 +1,92 @@
+""" Compiled XSLT cache test class
+"""
+import threading
+from unittest import TestCase
+
+from mock import patch
+
+from core_main_app.templatetags import xsl_transform_tag
+from core_main_app.utils import xslt_cache
+from core_main_app.utils.xml import xsl_transform
+
+XSLT = '<xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform">' \
+       '<xsl:template match="/"><p><xsl:value-of select="tag"/></p></xsl:template></xsl:stylesheet>'
+
+
+class TestXsltCache(TestCase):
+
+    def setUp(self):
+        xslt_cache.invalidate()
+
+    def test_get_xslt_transform_compiles_xslt_once(self):
+        # Act
+        first_transform = xslt_cache.get_xslt_transform(XSLT, 'id')
+        second_transform = xslt_cache.get_xslt_transform(XSLT, 'id')
+        # Assert
+        self.assertIs(first_transform, second_transform)
+        self.assertEqual(xslt_cache.get_stats()['misses'], 1)
+
+    def test_get_xslt_transform_compiles_modified_content(self):
+        # Arrange
+        first_transform = xslt_cache.get_xslt_transform(XSLT, 'id')
+        # Act
+        second_transform = xslt_cache.get_xslt_transform(XSLT.replace('<p>', '<div>').replace('</p>', '</div>'), 'id')
+        # Assert
+        self.assertIsNot(first_transform, second_transform)
+
+    def test_invalidate_removes_compiled_xslt(self):
+        # Arrange
+        first_transform = xslt_cache.get_xslt_transform(XSLT, 'id')
+        # Act
+        xslt_cache.invalidate()
+        # Assert
+        self.assertIsNot(first_transform, xslt_cache.get_xslt_transform(XSLT, 'id'))
+
+    def test_each_thread_compiles_its_own_xslt(self):
+        # Arrange
+        transforms = []
+        thread = threading.Thread(target=lambda: transforms.append(xslt_cache.get_xslt_transform(XSLT, 'id')))
+        # Act
+        thread.start()
+        thread.join()
+        # Assert
+        self.assertIsNot(transforms[0], xslt_cache.get_xslt_transform(XSLT, 'id'))
+
+    def test_xsl_transform_uses_compiled_xslt(self):
+        # Act
+        first_result = xsl_transform('<tag>value</tag>', XSLT)
+        second_result = xsl_transform('<tag>other</tag>', XSLT)
+        # Assert
+        self.assertTrue('value' in first_result)
+        self.assertTrue('other' in second_result)
+        self.assertEqual(xslt_cache.get_stats()['hits'], 1)
+
+
+class TestXslTransformTag(TestCase):
+
+    def setUp(self):
+        xslt_cache.invalidate()
+
+    @patch('core_main_app.components.template_xsl_rendering.api.get_by_template_id')
+    def test_render_looks_up_template_xslt_once(self, get_by_template_id):
+        # Arrange
+        get_by_template_id.return_value.list_xslt.id = 'id'
+        get_by_template_id.return_value.list_xslt.content = XSLT
+        # Act
+        xsl_transform_tag._render_xml_as_html('<tag>value</tag>', template_id='template_id')
+        result = xsl_transform_tag._render_xml_as_html('<tag>other</tag>', template_id='template_id')
+        # Assert
+        self.assertTrue('<p>other</p>' in result)
+        self.assertEqual(get_by_template_id.call_count, 1)
+
+    @patch('core_main_app.components.template_xsl_rendering.api.get_by_template_id')
+    def test_render_looks_up_template_xslt_again_after_invalidation(self, get_by_template_id):
+        # Arrange
+        get_by_template_id.return_value.list_xslt.id = 'id'
+        get_by_template_id.return_value.list_xslt.content = XSLT
+        xsl_transform_tag._render_xml_as_html('<tag>value</tag>', template_id='template_id')
+        # Act
+        xslt_cache.invalidate()
+        xsl_transform_tag._render_xml_as_html('<tag>value</tag>', template_id='template_id')
+        # Assert
+        self.assertEqual(get_by_template_id.call_count, 2)